@@ -0,0 +1,105 @@
+import argparse
+import os
+import tempfile
+import time
+
+import fastavro
+import numpy as np
+
+from lec02.hw.job2.dal.file_io import SALES_AVRO_SCHEMA
+from lec02.hw.job3.bll.aggregate_sales import factorize, grouped_totals
+from lec02.hw.job3.dal.avro_columns import load_sales_columns
+
+
+def generate_columns(rows: int, seed: int = 42) -> dict:
+    """Generates product and price columns with a skewed product distribution."""
+    rng = np.random.default_rng(seed)
+    product_ids = rng.zipf(1.3, rows) % 200
+    prices = rng.integers(100, 3000, rows).astype(np.float64)
+    prices[rng.random(rows) < 0.01] = np.nan
+    return {
+        "product": [f"Product {i}" for i in product_ids.tolist()],
+        "price": prices,
+    }
+
+
+def write_staging(stg_dir: str, columns: dict, files: int) -> None:
+    """Writes the columns as AVRO files of SALES_AVRO_SCHEMA, as Job2 does."""
+    prices = [None if np.isnan(p) else p for p in columns["price"].tolist()]
+    records = [
+        {
+            "client": "Client",
+            "purchase_date": "2022-08-09",
+            "product": product,
+            "price": price,
+        }
+        for product, price in zip(columns["product"], prices)
+    ]
+    chunk = -(-len(records) // files)
+    for i in range(files):
+        with open(os.path.join(stg_dir, f"sales_{i}.avro"), "wb") as f:
+            fastavro.writer(f, SALES_AVRO_SCHEMA, records[i * chunk : (i + 1) * chunk])
+
+
+def naive_aggregate(stg_dir: str) -> dict:
+    """Dict-of-sums loop over the decoded records, as consumers do today."""
+    totals: dict = {}
+    for filename in sorted(os.listdir(stg_dir)):
+        with open(os.path.join(stg_dir, filename), "rb") as f:
+            for record in fastavro.reader(f):
+                entry = totals.setdefault(record["product"], [0.0, 0, 0])
+                entry[1] += 1
+                if record["price"] is not None:
+                    entry[0] += record["price"]
+                    entry[2] += 1
+    return {
+        product: (revenue, sales, revenue / priced if priced else None)
+        for product, (revenue, sales, priced) in totals.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare loading AVRO columns and NumPy grouped reductions "
+        "with a dict-of-sums loop over the records."
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--files", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as stg_dir:
+        write_staging(stg_dir, generate_columns(args.rows), args.files)
+
+        start = time.perf_counter()
+        naive = naive_aggregate(stg_dir)
+        naive_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        columns = load_sales_columns(stg_dir)
+        load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    codes, keys = factorize(columns["product"])
+    factorize_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    totals = grouped_totals(codes, len(keys), columns["price"])
+    reduce_seconds = time.perf_counter() - start
+
+    assert naive.keys() == set(keys)
+    for key, revenue, sales in zip(
+        keys, totals["revenue"].tolist(), totals["sales"].tolist()
+    ):
+        assert sales == naive[key][1]
+        assert abs(revenue - naive[key][0]) <= 1e-6 * max(1.0, revenue)
+
+    numpy_seconds = load_seconds + factorize_seconds + reduce_seconds
+    print(f"{args.rows} rows in {args.files} files, {len(keys)} products")
+    print(f"dict-of-sums loop (load included): {naive_seconds:.3f} s")
+    print(f"load_sales_columns:                {load_seconds:.3f} s")
+    print(f"numpy factorize:                   {factorize_seconds:.3f} s")
+    print(f"numpy grouped reductions:          {reduce_seconds:.3f} s")
+    print(f"speedup (total):                   {naive_seconds / numpy_seconds:.1f}x")
+    print(
+        f"speedup (aggregation):             "
+        f"{naive_seconds / (factorize_seconds + reduce_seconds):.1f}x"
+    )
@@ -0,0 +1,93 @@
+import argparse
+import io
+import random
+import time
+
+import fastavro
+
+from lec02.hw.job2.bll.normalize_sales import normalize_sales_records
+from lec02.hw.job2.dal.file_io import SALES_AVRO_SCHEMA, build_typed_sales_schema
+
+
+def generate_records(count: int, seed: int = 42) -> list:
+    """Generates raw sales records shaped like the API pages."""
+    rng = random.Random(seed)
+    products = [f"Product {i}" for i in range(50)]
+    records = []
+    for i in range(count):
+        price = rng.randint(100, 3000)
+        records.append(
+            {
+                "client": f"Client {rng.randint(1, 5000)}",
+                "purchase_date": f"2022-08-{rng.randint(1, 28):02d}",
+                "product": rng.choice(products),
+                "price": price if i % 2 else price + 0.5,
+            }
+        )
+    return records
+
+
+def run_variant(name: str, records: list, schema: dict, price_type=None) -> dict:
+    """Measures normalize, encode and decode time and output size of one variant."""
+    parsed_schema = fastavro.parse_schema(schema)
+
+    start = time.perf_counter()
+    page_data = normalize_sales_records(records, price_type) if price_type else records
+    normalize_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    fastavro.writer(buffer, parsed_schema, page_data)
+    encode_seconds = time.perf_counter() - start
+
+    buffer.seek(0)
+    start = time.perf_counter()
+    decoded = sum(1 for _ in fastavro.reader(buffer))
+    decode_seconds = time.perf_counter() - start
+
+    assert decoded == len(records)
+    return {
+        "name": name,
+        "normalize_s": normalize_seconds,
+        "encode_s": encode_seconds,
+        "decode_s": decode_seconds,
+        "size_bytes": buffer.getbuffer().nbytes,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare SALES_AVRO_SCHEMA with the typed fast-path schema."
+    )
+    parser.add_argument("--records", type=int, default=500_000)
+    args = parser.parse_args()
+
+    test_records = generate_records(args.records)
+    results = [
+        run_variant("union (default)", test_records, SALES_AVRO_SCHEMA),
+        run_variant(
+            "typed double",
+            test_records,
+            build_typed_sales_schema("double"),
+            "double",
+        ),
+        run_variant(
+            "typed cents", test_records, build_typed_sales_schema("cents"), "cents"
+        ),
+    ]
+
+    baseline = results[0]
+    print(f"{args.records} records")
+    print(
+        f"{'variant':<18}{'normalize s':>12}{'encode s':>10}{'decode s':>10}"
+        f"{'size MB':>10}{'size %':>8}"
+    )
+    for result in results:
+        print(
+            f"{result['name']:<18}"
+            f"{result['normalize_s']:>12.3f}"
+            f"{result['encode_s']:>10.3f}"
+            f"{result['decode_s']:>10.3f}"
+            f"{result['size_bytes'] / 1e6:>10.2f}"
+            f"{100 * result['size_bytes'] / baseline['size_bytes']:>8.1f}"
+        )
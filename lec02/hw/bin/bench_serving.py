@@ -0,0 +1,139 @@
+import argparse
+import importlib.util
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from lec02.hw.common.serving import PRODUCTION_SERVERS
+
+# Directory holding the lec02 package, the servers are started from there
+REPO_ROOT: str = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+PORTS: Dict[str, int] = {"job1": 8091, "job2": 8092}
+
+
+def start_server(job: str, server: str, port: int, threads: int) -> tuple:
+    """Starts a job server in its own process group, returning it and its startup time."""
+    env = {
+        **os.environ,
+        "JOB_SERVER": server,
+        "JOB_PORT": str(port),
+        "JOB_THREADS": str(threads),
+        "LOG_LEVEL": "WARNING",
+    }
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", f"lec02.hw.{job}.main"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    # The server is up once it accepts connections
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server {server} exited with {process.returncode}.")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, time.perf_counter() - start
+        except OSError:
+            time.sleep(0.05)
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    """Stops a server with its workers or reloader."""
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def fetch(url: str) -> float:
+    """Sends a GET request on a new connection and returns its latency."""
+    start = time.perf_counter()
+    requests.get(url, timeout=30).raise_for_status()
+    return time.perf_counter() - start
+
+
+def run_load(url: str, requests_count: int, concurrency: int) -> tuple:
+    """Sends requests from concurrency client threads, returning latencies and wall time."""
+
+    def client(count: int) -> List[float]:
+        latencies = []
+        with requests.Session() as session:
+            for _ in range(count):
+                start = time.perf_counter()
+                session.get(url, timeout=30).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+        return latencies
+
+    counts = [
+        requests_count // concurrency + (i < requests_count % concurrency)
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = [
+            latency for result in executor.map(client, counts) for latency in result
+        ]
+    return latencies, time.perf_counter() - start
+
+
+def bench(job: str, server: str, path: str, args: argparse.Namespace) -> None:
+    """Measures a server and prints its startup, first request and throughput."""
+    port = PORTS[job]
+    process, startup_seconds = start_server(job, server, port, args.threads)
+    try:
+        url = f"http://127.0.0.1:{port}{path}"
+        first_seconds = fetch(url)
+        latencies, seconds = run_load(url, args.requests, args.concurrency)
+    finally:
+        stop_server(process)
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{server:<10} {startup_seconds:8.2f} s  {first_seconds * 1000:9.1f} ms  "
+        f"{len(latencies) / seconds:10,.0f} req/s  "
+        f"{statistics.median(latencies) * 1000:8.1f} ms  {p95 * 1000:8.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    installed = [s for s in PRODUCTION_SERVERS if importlib.util.find_spec(s)]
+    parser = argparse.ArgumentParser(
+        description="Compare the startup, first request latency and throughput "
+        "of a job server on the dev server and the production servers."
+    )
+    parser.add_argument("--job", choices=sorted(PORTS), default="job2")
+    parser.add_argument("--path", default="/debug/queue")
+    parser.add_argument("--servers", nargs="+", default=["dev", "werkzeug", *installed])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    print(
+        f"{args.job} GET {args.path}: {args.requests} requests from "
+        f"{args.concurrency} clients, {args.threads} server threads"
+    )
+    print(
+        f"{'server':<10} {'startup':>10}  {'first req':>12}  "
+        f"{'throughput':>16}  {'p50':>11}  {'p95':>11}"
+    )
+    for server in args.servers:
+        bench(args.job, server, args.path, args)
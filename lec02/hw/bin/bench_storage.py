@@ -0,0 +1,90 @@
+import argparse
+import logging
+import random
+import tempfile
+import time
+
+from lec02.hw.common.storage import (
+    LocalStorage,
+    StorageBackend,
+    clear_memory_stores,
+    get_storage,
+)
+from lec02.hw.job1.dal.local_disk import prepare_storage_dir, save_page_to_disk
+from lec02.hw.job2.bll.process_sales import process_sales_data
+
+DATE = "2022-08-09"
+
+
+def generate_pages(pages: int, page_size: int, seed: int = 42) -> list:
+    """Generates pages of sales records shaped like the API responses."""
+    rng = random.Random(seed)
+    return [
+        [
+            {
+                "client": f"Client {rng.randrange(5000)}",
+                "purchase_date": DATE,
+                "product": f"Product {rng.randrange(200)}",
+                "price": rng.randrange(100, 3000),
+            }
+            for _ in range(page_size)
+        ]
+        for _ in range(pages)
+    ]
+
+
+def run_jobs(storage: StorageBackend | None, root: str, pages: list) -> tuple:
+    """Runs the job1 page writes and the job2 conversion, on disk without storage."""
+    raw_dir = f"{root}/raw/sales/{DATE}"
+    stg_dir = f"{root}/stg/sales/{DATE}"
+
+    start = time.perf_counter()
+    prepare_storage_dir(raw_dir, storage=storage)
+    for page, page_data in enumerate(pages, start=1):
+        save_page_to_disk(page_data, raw_dir, f"sales_{DATE}_{page}.json", storage)
+    job1_seconds = time.perf_counter() - start
+
+    job_options = {"storage": storage} if storage is not None else {}
+
+    start = time.perf_counter()
+    process_sales_data(raw_dir, stg_dir, **job_options)
+    job2_seconds = time.perf_counter() - start
+
+    files = storage or LocalStorage()
+    raw_bytes = sum(len(files.read_bytes(key)) for key in files.list(raw_dir))
+    return job1_seconds, job2_seconds, raw_bytes
+
+
+def report(name: str, records: int, raw_bytes: int, seconds: float) -> None:
+    """Prints the throughput of a job run."""
+    print(
+        f"{name:<24} {seconds:7.3f} s  {records / seconds:12,.0f} records/s  "
+        f"{raw_bytes / seconds / 2**20:8.1f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare job1/job2 throughput on an in-memory store and on disk."
+    )
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Keep the per-page job logs out of the measurements
+    logging.disable(logging.INFO)
+
+    pages = generate_pages(args.pages, args.page_size)
+    records = args.pages * args.page_size
+
+    memory_times = run_jobs(get_storage("memory://bench"), "bench", pages)
+    # Free the in-memory zones before the disk run
+    clear_memory_stores("bench")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        disk_times = run_jobs(None, tmp_dir, pages)
+
+    print(f"{args.pages} pages of {args.page_size} records")
+    report("job1 memory (compute)", records, memory_times[2], memory_times[0])
+    report("job1 disk", records, disk_times[2], disk_times[0])
+    report("job2 memory (compute)", records, memory_times[2], memory_times[1])
+    report("job2 disk", records, disk_times[2], disk_times[1])
@@ -1,42 +1,201 @@
+import argparse
+import datetime
+import logging
 import os
+import sys
+import threading
 import time
-import requests
+import uuid
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
 
+import requests
 
-BASE_DIR = os.environ.get("BASE_DIR")
+from lec02.hw.common.dag import run_dag
 
-if not BASE_DIR:
-    print("BASE_DIR environment variable must be set")
-    exit(1)
 
 JOB1_PORT = 8081
 JOB2_PORT = 8082
+JOB3_PORT = 8083
+
+DEFAULT_DATE = "2022-08-09"
+MAX_BUSY_RETRIES = 10
+
+# Seconds job2 waits for job1 to clear the raw_dir of a previous run, which
+# includes the time job1 spends queued on a busy server
+JOB1_START_TIMEOUT = 600
 
-RAW_DIR = os.path.join(BASE_DIR, "raw", "sales", "2022-08-09")
-STG_DIR = os.path.join(BASE_DIR, "stg", "sales", "2022-08-09")
+BASE_DIR = os.environ.get("BASE_DIR", "")
+RAW_ROOT = os.path.join(BASE_DIR, "raw", "sales")
+STG_ROOT = os.path.join(BASE_DIR, "stg", "sales")
+RESULT_ROOT = os.path.join(BASE_DIR, "result", "sales")
 
 
-def run_job1():
-    print("Starting job1:")
-    resp = requests.post(
-        url=f"http://localhost:{JOB1_PORT}/",
-        json={"date": "2022-08-09", "raw_dir": RAW_DIR},
+def post_job(port, payload):
+    # Wait as told while the server is saturated (429/503 with Retry-After),
+    # then raise on failure, so the runner can retry the job
+    for _ in range(MAX_BUSY_RETRIES):
+        resp = requests.post(url=f"http://localhost:{port}/", json=payload)
+        if resp.status_code not in (429, 503) or "Retry-After" not in resp.headers:
+            break
+        print(
+            f"Job on port {port} is busy, retrying in {resp.headers['Retry-After']} s"
+        )
+        time.sleep(float(resp.headers["Retry-After"]))
+    if resp.status_code != 201:
+        raise RuntimeError(
+            f"Job on port {port} returned {resp.status_code}: {resp.text}"
+        )
+    return resp.json()
+
+
+def run_job1(date, run_id=None):
+    print(f"Starting job1 for {date}:")
+    post_job(
+        JOB1_PORT,
+        {
+            "date": date,
+            "raw_dir": os.path.join(RAW_ROOT, date),
+            **({"run_id": run_id} if run_id else {}),
+        },
     )
-    assert resp.status_code == 201
-    print("job1 completed!")
+    print(f"job1 completed for {date}!")
 
 
-def run_job2():
-    print("Starting job2:")
-    resp = requests.post(
-        url=f"http://localhost:{JOB2_PORT}/",
-        json={"raw_dir": RAW_DIR, "stg_dir": STG_DIR},
+def run_job2(date, watch=False, run_id=None):
+    print(f"Starting job2 for {date}:")
+    post_job(
+        JOB2_PORT,
+        {
+            "raw_dir": os.path.join(RAW_ROOT, date),
+            "stg_dir": os.path.join(STG_ROOT, date),
+            **({"watch": True} if watch else {}),
+            **({"run_id": run_id} if run_id else {}),
+        },
     )
-    assert resp.status_code == 201
-    print("job2 completed!")
+    print(f"job2 completed for {date}!")
+
+
+def wait_for_job1_start(date, job1, timeout=JOB1_START_TIMEOUT):
+    # job1 clears raw_dir first, so the pages of the previous run are not
+    # converted again; stop waiting once job1 is done, raise on timeout
+    success_marker = os.path.join(RAW_ROOT, date, "_SUCCESS")
+    deadline = time.monotonic() + timeout
+    while os.path.exists(success_marker) and not job1.done():
+        if time.monotonic() >= deadline:
+            raise TimeoutError(
+                f"job1 did not start on {date} within {timeout} s, "
+                f"the marker of the previous run is still in place"
+            )
+        time.sleep(0.05)
+
+
+def start_daemon(func, *args):
+    # Unlike pool threads, a daemon thread does not hold the exit of the script
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def run_job1_and_watch(date):
+    # job2 watches raw_dir and converts pages while job1 is still fetching;
+    # the run id tells the marker of this run from the previous one's
+    run_id = uuid.uuid4().hex
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        job1 = executor.submit(run_job1, date, run_id)
+        wait_for_job1_start(date, job1)
+        if job1.done():
+            job1.result()
+        job2 = start_daemon(run_job2, date, True, run_id)
+
+        # Raise as soon as job1 fails instead of waiting out the watch timeout;
+        # the abandoned watch ends on the server, and a retry uses a new run id
+        wait([job1, job2], return_when=FIRST_EXCEPTION)
+        if job1.done():
+            job1.result()
+        job2.result()
+        job1.result()
+
+
+def run_job3(date):
+    print(f"Starting job3 for {date}:")
+    post_job(
+        JOB3_PORT,
+        {
+            "stg_dir": os.path.join(STG_ROOT, date),
+            "result_dir": os.path.join(RESULT_ROOT, date),
+        },
+    )
+    print(f"job3 completed for {date}!")
+
+
+def get_dates(start_date, end_date):
+    start = datetime.date.fromisoformat(start_date)
+    end = datetime.date.fromisoformat(end_date)
+    return [
+        str(start + datetime.timedelta(days=i)) for i in range((end - start).days + 1)
+    ]
+
+
+def build_tasks(dates, watch=False):
+    # job1 -> job2 -> job3 per date, dates being independent of each other
+    tasks = {}
+    for date in dates:
+        if watch:
+            tasks[f"job1+job2 {date}"] = (lambda d=date: run_job1_and_watch(d), [])
+            tasks[f"job3 {date}"] = (lambda d=date: run_job3(d), [f"job1+job2 {date}"])
+        else:
+            tasks[f"job1 {date}"] = (lambda d=date: run_job1(d), [])
+            tasks[f"job2 {date}"] = (lambda d=date: run_job2(d), [f"job1 {date}"])
+            tasks[f"job3 {date}"] = (lambda d=date: run_job3(d), [f"job2 {date}"])
+    return tasks
 
 
 if __name__ == "__main__":
-    run_job1()
-    time.sleep(3)
-    run_job2()
+    parser = argparse.ArgumentParser(
+        description="Run job1 -> job2 -> job3 for a date range as a DAG."
+    )
+    parser.add_argument("start_date", nargs="?", default=DEFAULT_DATE)
+    parser.add_argument("end_date", nargs="?", default=None)
+    parser.add_argument(
+        "--parallel", type=int, default=4, help="Jobs running at once across dates"
+    )
+    parser.add_argument("--retries", type=int, default=2, help="Retries per job")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Overlap job2 with job1 per date, converting pages as they land",
+    )
+    args = parser.parse_args()
+
+    if not BASE_DIR:
+        print("BASE_DIR environment variable must be set")
+        exit(1)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    dates = get_dates(args.start_date, args.end_date or args.start_date)
+
+    start = time.perf_counter()
+    results = run_dag(
+        build_tasks(dates, watch=args.watch),
+        max_parallel=args.parallel,
+        retries=args.retries,
+    )
+    wall_seconds = time.perf_counter() - start
+
+    print(f"\n{'task':<26} {'status':<10} {'attempts':>8} {'seconds':>9}")
+    for name, outcome in results.items():
+        print(
+            f"{name:<26} {outcome['status']:<10} "
+            f"{outcome['attempts']:>8} {outcome['seconds']:>9.3f}"
+        )
+    print(f"Wall-clock: {wall_seconds:.3f} s")
+
+    if any(outcome["status"] != "succeeded" for outcome in results.values()):
+        sys.exit(1)
@@ -0,0 +1,42 @@
+import argparse
+import json
+import logging
+
+from lec02.hw.job1.bll.generate_sales import (
+    DEFAULT_GENERATOR_OPTIONS,
+    generate_sales_data,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write synthetic raw sales partitions in the Job1 format."
+    )
+    parser.add_argument("raw_root", help="Root of the date directories")
+    parser.add_argument("--start-date", default="2022-08-09")
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    for name, default in DEFAULT_GENERATOR_OPTIONS.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(default), default=default
+        )
+    args = parser.parse_args()
+
+    # Only log the run report, not every page
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("lec02.hw.job1.dal").setLevel(logging.WARNING)
+
+    report = generate_sales_data(
+        raw_root=args.raw_root,
+        start_date=args.start_date,
+        days=args.days,
+        pages=args.pages,
+        page_size=args.page_size,
+        workers=args.workers,
+        seed=args.seed,
+        **{name: getattr(args, name) for name in DEFAULT_GENERATOR_OPTIONS},
+    )
+    print(json.dumps(report, indent=4))
@@ -0,0 +1,212 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Default limits of a job server, overridden by environment variables
+DEFAULT_MAX_RUNNING: int = 2
+DEFAULT_MAX_QUEUED: int = 8
+DEFAULT_QUEUE_TIMEOUT: float = 300.0
+
+# Weight of the last job in the average job duration used for Retry-After
+DURATION_SMOOTHING: float = 0.2
+
+
+class AdmissionError(Exception):
+    """
+    Raised when a job server is too busy to admit a job.
+
+    Attributes:
+        status_code (int): HTTP status to answer with
+        retry_after (int): Seconds the client should wait before retrying
+    """
+
+    status_code: int = 503
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class QueueFullError(AdmissionError):
+    """Raised when all job slots are taken and the wait queue is full."""
+
+    status_code = 429
+
+
+class QueueTimeoutError(AdmissionError):
+    """Raised when a queued job did not get a slot within the queue timeout."""
+
+    status_code = 503
+
+
+class AdmissionController:
+    """
+    Bounds the jobs a server runs at once and the requests waiting for them.
+
+    At most max_running jobs run at once; up to max_queued more requests
+    wait for a slot, in arrival order, for at most queue_timeout seconds.
+    Requests beyond that are rejected right away, so a burst of requests
+    gets a quick answer with Retry-After instead of piling up threads.
+    """
+
+    def __init__(
+        self,
+        max_running: int = DEFAULT_MAX_RUNNING,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+    ) -> None:
+        if max_running < 1:
+            raise ValueError("max_running must be positive.")
+        if max_queued < 0:
+            raise ValueError("max_queued must not be negative.")
+        if queue_timeout < 0:
+            raise ValueError("queue_timeout must not be negative.")
+
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self._waiting: Deque[object] = deque()
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.avg_job_seconds: float | None = None
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """
+        Creates a controller from the environment variables of the server.
+
+        JOB_MAX_RUNNING, JOB_MAX_QUEUED and JOB_QUEUE_TIMEOUT override the
+        default limits.
+
+        Returns:
+            AdmissionController: The controller of the server
+
+        Raises:
+            ValueError: If a variable is not a valid number
+        """
+        return cls(
+            max_running=int(os.environ.get("JOB_MAX_RUNNING", DEFAULT_MAX_RUNNING)),
+            max_queued=int(os.environ.get("JOB_MAX_QUEUED", DEFAULT_MAX_QUEUED)),
+            queue_timeout=float(
+                os.environ.get("JOB_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT)
+            ),
+        )
+
+    def _retry_after(self) -> int:
+        # Time for the running and queued jobs to drain, at least a second
+        job_seconds = self.avg_job_seconds or 1.0
+        backlog = self.running + len(self._waiting)
+        return max(1, math.ceil(job_seconds * backlog / self.max_running))
+
+    def _acquire(self) -> float:
+        start = time.monotonic()
+        with self._condition:
+            if self.running >= self.max_running or self._waiting:
+                if len(self._waiting) >= self.max_queued:
+                    self.rejected += 1
+                    raise QueueFullError(
+                        f"Server is busy: {self.running} jobs running and "
+                        f"{len(self._waiting)} queued.",
+                        self._retry_after(),
+                    )
+
+                # Wait for a slot in arrival order
+                ticket = object()
+                self._waiting.append(ticket)
+                try:
+                    admitted = self._condition.wait_for(
+                        lambda: self.running < self.max_running
+                        and self._waiting[0] is ticket,
+                        timeout=self.queue_timeout,
+                    )
+                finally:
+                    self._waiting.remove(ticket)
+                    self._condition.notify_all()
+                if not admitted:
+                    self.timed_out += 1
+                    raise QueueTimeoutError(
+                        f"No job slot freed within {self.queue_timeout} seconds.",
+                        self._retry_after(),
+                    )
+
+            self.running += 1
+            self.admitted += 1
+            wait_seconds = time.monotonic() - start
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            return wait_seconds
+
+    def _release(self, job_seconds: float) -> None:
+        with self._condition:
+            self.running -= 1
+            if self.avg_job_seconds is None:
+                self.avg_job_seconds = job_seconds
+            else:
+                self.avg_job_seconds += DURATION_SMOOTHING * (
+                    job_seconds - self.avg_job_seconds
+                )
+            self._condition.notify_all()
+
+    @contextmanager
+    def admit(self) -> Iterator[float]:
+        """
+        Holds a job slot for the duration of the with block.
+
+        Yields:
+            float: Seconds the request waited in the queue
+
+        Raises:
+            QueueFullError: If all slots are taken and the queue is full
+            QueueTimeoutError: If no slot freed within the queue timeout
+        """
+        wait_seconds = self._acquire()
+        if wait_seconds >= 1:
+            logger.info(f"Job admitted after waiting {wait_seconds:.1f} s.")
+        start = time.monotonic()
+        try:
+            yield wait_seconds
+        finally:
+            self._release(time.monotonic() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the limits, queue depth and wait times of the server.
+
+        Returns:
+            Dict[str, Any]: Running and queued jobs, limits, counters of
+            admitted, rejected and timed out requests, and wait times
+        """
+        with self._condition:
+            return {
+                "running": self.running,
+                "queued": len(self._waiting),
+                "max_running": self.max_running,
+                "max_queued": self.max_queued,
+                "queue_timeout": self.queue_timeout,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_wait_seconds": round(
+                    self.total_wait_seconds / self.admitted if self.admitted else 0.0,
+                    3,
+                ),
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "avg_job_seconds": (
+                    round(self.avg_job_seconds, 3)
+                    if self.avg_job_seconds is not None
+                    else None
+                ),
+            }
@@ -0,0 +1,217 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Circuit states
+CLOSED: str = "closed"
+OPEN: str = "open"
+HALF_OPEN: str = "half_open"
+
+# Default settings of a circuit
+DEFAULT_FAILURE_RATE: float = 0.5
+DEFAULT_MIN_CALLS: int = 5
+DEFAULT_WINDOW: int = 20
+DEFAULT_OPEN_SECONDS: float = 30.0
+DEFAULT_HALF_OPEN_CALLS: int = 1
+
+
+class CircuitOpenError(ConnectionError):
+    """
+    Raised instead of calling an endpoint whose circuit is open.
+
+    It is a ConnectionError, so callers handling API outages handle it too,
+    without waiting for the retries of a call that cannot succeed.
+    """
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuit for {name} is open, retry in {retry_after:.1f} seconds."
+        )
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of an endpoint, shared by the threads calling it.
+
+    The circuit is closed while calls succeed. Once at least min_calls of the
+    last window calls were recorded and failure_rate of them failed, it opens:
+    calls are rejected with CircuitOpenError for open_seconds. It is then
+    half-open and lets half_open_calls probe calls through; the circuit
+    closes if they all succeed and opens again as soon as one fails.
+
+    before_call() returns a probe token, to pass to the record_success() or
+    record_failure() that must follow it. Only the results of the probes of
+    the current half-open period decide whether the circuit closes; calls
+    admitted before the circuit opened are ignored once it is no longer
+    closed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = DEFAULT_FAILURE_RATE,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        window: int = DEFAULT_WINDOW,
+        open_seconds: float = DEFAULT_OPEN_SECONDS,
+        half_open_calls: int = DEFAULT_HALF_OPEN_CALLS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1].")
+        if min_calls < 1 or window < min_calls:
+            raise ValueError("min_calls must be positive and at most window.")
+        if open_seconds < 0 or half_open_calls < 1:
+            raise ValueError("open_seconds and half_open_calls must be positive.")
+
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._half_open_period = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, an open circuit turning half-open after open_seconds."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() >= self._opened_at + self.open_seconds:
+            self._state = HALF_OPEN
+            self._half_open_period += 1
+            self._probes = 0
+            self._probe_successes = 0
+            logger.info(f"Circuit for {self.name} is half-open, probing.")
+        return self._state
+
+    def _open_error(self) -> CircuitOpenError:
+        retry_after = self._opened_at + self.open_seconds - self._clock()
+        return CircuitOpenError(self.name, max(0.0, retry_after))
+
+    def raise_if_open(self) -> None:
+        """
+        Fails fast while the circuit is open, without taking a probe slot.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            if self._current_state() == OPEN:
+                raise self._open_error()
+
+    def before_call(self) -> int | None:
+        """
+        Admits a call, as a probe if the circuit is half-open.
+
+        Returns:
+            int | None: Probe token to pass to record_success or
+            record_failure, None for a call of a closed circuit
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all
+                its probe slots taken
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == OPEN:
+                raise self._open_error()
+            if state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probes += 1
+                return self._half_open_period
+            return None
+
+    def _is_current_probe(self, probe: int | None) -> bool:
+        return self._state == HALF_OPEN and probe == self._half_open_period
+
+    def record_success(self, probe: int | None = None) -> None:
+        """
+        Records a successful call, closing a half-open circuit after its probes.
+
+        Args:
+            probe (int | None): Token returned by before_call
+        """
+        with self._lock:
+            if probe is not None:
+                if self._is_current_probe(probe):
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self._state = CLOSED
+                        self._outcomes.clear()
+                        logger.info(f"Circuit for {self.name} is closed again.")
+                return
+            if self._state == CLOSED:
+                self._outcomes.append(True)
+
+    def record_failure(self, probe: int | None = None) -> None:
+        """
+        Records a failed call, opening the circuit if failures are too frequent.
+
+        Args:
+            probe (int | None): Token returned by before_call
+        """
+        with self._lock:
+            if probe is not None:
+                if self._is_current_probe(probe):
+                    self._trip("probe call failed")
+                return
+            if self._state != CLOSED:
+                return
+
+            self._outcomes.append(False)
+            calls = len(self._outcomes)
+            failures = self._outcomes.count(False)
+            if calls >= self.min_calls and failures >= self.failure_rate * calls:
+                self._trip(f"{failures}/{calls} calls failed")
+
+    def _trip(self, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        logger.warning(
+            f"Circuit for {self.name} is open for {self.open_seconds} s: {reason}."
+        )
+
+
+# Circuits shared by every caller of the process, by endpoint
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, **settings) -> CircuitBreaker:
+    """
+    Returns the circuit breaker of an endpoint, creating it on first use.
+
+    Args:
+        name (str): Endpoint the circuit protects, e.g. its URL
+        **settings: CircuitBreaker settings, used when the circuit is created
+
+    Returns:
+        CircuitBreaker: The circuit shared by every caller of the endpoint
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **settings)
+        return _breakers[name]
+
+
+def reset_circuit_breakers() -> None:
+    """Forgets every circuit, e.g. between tests."""
+    with _breakers_lock:
+        _breakers.clear()
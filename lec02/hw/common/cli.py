@@ -0,0 +1,73 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+# Only the standard library is imported here: the command line entry points
+# import the jobs once their arguments are parsed, so --help, argument errors
+# and scheduler probes return without loading fastavro, requests or numpy.
+
+# Environment variable holding the root of the raw, stg and result trees
+ENV_BASE_DIR: str = "BASE_DIR"
+
+
+def get_dates(start_date: str, end_date: str | None = None) -> List[str]:
+    """
+    Lists the dates from start_date to end_date, both included.
+
+    Args:
+        start_date (str): First date (YYYY-MM-DD)
+        end_date (str | None): Last date (YYYY-MM-DD), start_date if None
+
+    Returns:
+        List[str]: The dates in order
+
+    Raises:
+        ValueError: If a date is invalid or the range is reversed
+    """
+    start = datetime.date.fromisoformat(start_date)
+    end = datetime.date.fromisoformat(end_date) if end_date else start
+    if start > end:
+        raise ValueError(f"Start date {start_date} is after end date {end_date}.")
+    return [
+        str(start + datetime.timedelta(days=i)) for i in range((end - start).days + 1)
+    ]
+
+
+def get_default_root(layer: str) -> str | None:
+    """
+    Returns the sales directory of a layer under BASE_DIR, if it is set.
+
+    Args:
+        layer (str): "raw", "stg" or "result"
+
+    Returns:
+        str | None: BASE_DIR/<layer>/sales, None without BASE_DIR
+    """
+    base_dir = os.environ.get(ENV_BASE_DIR)
+    return os.path.join(base_dir, layer, "sales") if base_dir else None
+
+
+def positive_int(value: str) -> int:
+    """
+    Parses a positive integer argument.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a positive integer
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a positive integer")
+    return number
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Writes a run report as one JSON object to stdout, logs going to stderr."""
+    json.dump(report, sys.stdout, default=str)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
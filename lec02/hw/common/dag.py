@@ -0,0 +1,167 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Tuple
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# DAG task: function to run and names of the tasks it depends on
+DagTask = Tuple[Callable[[], Any], List[str]]
+
+# Default delay before the first retry of a failed task, doubled on each retry
+DEFAULT_RETRY_DELAY: float = 1.0
+
+
+def validate_dag(tasks: Dict[str, DagTask]) -> List[str]:
+    """
+    Checks the dependencies of a DAG and orders its tasks.
+
+    Args:
+        tasks (Dict[str, DagTask]): Tasks by name
+
+    Returns:
+        List[str]: Task names in a topological order
+
+    Raises:
+        ValueError: If a task depends on an unknown task or on itself,
+            directly or through a cycle
+    """
+    for name, (_, deps) in tasks.items():
+        unknown = [dep for dep in deps if dep not in tasks]
+        if unknown:
+            raise ValueError(f"Task {name} depends on unknown tasks {unknown}.")
+
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(name: str, path: List[str]) -> None:
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            cycle = path[path.index(name) :] + [name]
+            raise ValueError(f"Tasks form a cycle: {' -> '.join(cycle)}.")
+        state[name] = "visiting"
+        for dep in tasks[name][1]:
+            visit(dep, path + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for name in tasks:
+        visit(name, [])
+    return order
+
+
+def _run_with_retries(
+    name: str, func: Callable[[], Any], retries: int, retry_delay: float
+) -> Tuple[Any, int]:
+    """Runs a task, retrying it with exponential backoff, in a worker thread."""
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return func(), attempt
+        except Exception as e:
+            if attempt > retries:
+                raise
+            delay = retry_delay * 2 ** (attempt - 1)
+            logger.warning(
+                f"Task {name} failed on attempt {attempt}/{retries + 1}: {e}. "
+                f"Retrying in {delay:.1f} s..."
+            )
+            time.sleep(delay)
+
+
+def run_dag(
+    tasks: Dict[str, DagTask],
+    max_parallel: int = 4,
+    retries: int = 0,
+    retry_delay: float = DEFAULT_RETRY_DELAY,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs the tasks of a DAG as soon as their dependencies have succeeded.
+
+    Tasks run in a pool of max_parallel threads. When a task completes, the
+    tasks whose dependencies have all succeeded are started right away, in
+    the order of tasks, so the wall-clock time shrinks to the critical path
+    when enough threads are available. A failing task is retried on its
+    own; if it still fails, the tasks depending on it are skipped while the
+    other branches go on.
+
+    Args:
+        tasks (Dict[str, DagTask]): Tasks by name
+        max_parallel (int): Maximum number of tasks running at once
+        retries (int): Number of retries of a failing task
+        retry_delay (float): Seconds before the first retry, doubled per retry
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Outcome of every task, in topological order:
+        "status" ("succeeded", "failed" or "skipped"), "attempts", "seconds"
+        and "result", or "error" for a failed or skipped task
+
+    Raises:
+        ValueError: If the DAG is invalid or max_parallel or retries is invalid
+    """
+    if max_parallel < 1:
+        raise ValueError("max_parallel must be positive.")
+    if retries < 0:
+        raise ValueError("retries must not be negative.")
+    order = validate_dag(tasks)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    waiting = list(order)
+    running: Dict[Future, Tuple[str, float]] = {}
+
+    def succeeded(name: str) -> bool:
+        return results[name]["status"] == "succeeded"
+
+    def start_ready(executor: ThreadPoolExecutor) -> None:
+        # Waiting tasks are in topological order, so skips cascade in one pass
+        # and ready tasks of earlier branches are started first
+        for name in list(waiting):
+            deps = tasks[name][1]
+            failed = [dep for dep in deps if dep in results and not succeeded(dep)]
+            if failed:
+                waiting.remove(name)
+                results[name] = {
+                    "status": "skipped",
+                    "attempts": 0,
+                    "seconds": 0.0,
+                    "error": f"Dependencies failed or skipped: {failed}",
+                }
+                logger.warning(f"Skipping task {name}: {failed} did not succeed.")
+            elif len(running) < max_parallel and all(dep in results for dep in deps):
+                waiting.remove(name)
+                logger.info(f"Starting task {name}.")
+                future = executor.submit(
+                    _run_with_retries, name, tasks[name][0], retries, retry_delay
+                )
+                running[future] = (name, time.perf_counter())
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        start_ready(executor)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, started = running.pop(future)
+                seconds = round(time.perf_counter() - started, 3)
+                try:
+                    result, attempts = future.result()
+                    results[name] = {
+                        "status": "succeeded",
+                        "attempts": attempts,
+                        "seconds": seconds,
+                        "result": result,
+                    }
+                    logger.info(f"Task {name} succeeded in {seconds} s.")
+                except Exception as e:
+                    results[name] = {
+                        "status": "failed",
+                        "attempts": retries + 1,
+                        "seconds": seconds,
+                        "error": str(e),
+                    }
+                    logger.error(f"Task {name} failed: {e}")
+            start_ready(executor)
+
+    return {name: results[name] for name in order}
@@ -0,0 +1,191 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict
+
+# Format of the text log lines, as configured by the jobs so far
+LOG_FORMAT: str = "%(asctime)s - %(levelname)s - %(message)s"
+LOG_DATEFMT: str = "%Y-%m-%d %H:%M:%S"
+
+# Default number of events (pages, files) between two progress summaries
+DEFAULT_LOG_EVERY: int = 100
+
+# Arguments a queued record can keep and format later in the listener thread
+_IMMUTABLE_ARGS = (str, int, float, bool, type(None))
+
+# Attributes of every LogRecord, anything else was passed with extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    The object holds the time, level, logger and message of the record, the
+    fields passed with extra= and the traceback of an exception, if any.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler leaving the message formatting to the listener thread.
+
+    QueueHandler formats every record in the logging thread; this one only
+    does so for arguments that could change before the listener handles the
+    record, and renders tracebacks, which hold frames, right away.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        args = record.args
+        if args and not (
+            isinstance(args, tuple)
+            and all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args)
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _Listener(QueueListener):
+    """
+    QueueListener which can be stopped twice, e.g. by a test and at exit,
+    and which restarts in forked processes, where its thread does not exist.
+    """
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
+
+    def restart_after_fork(self) -> None:
+        """Starts a listener thread in a forked child of a started listener."""
+        if self._thread is not None:
+            self._thread = None
+            self.start()
+
+
+class LogSampler:
+    """
+    Logs a progress summary every N events instead of a line per event.
+
+    Hot loops call tick() once per page or file; only every N-th call builds
+    and emits an INFO record, the others cost an increment and a modulo.
+    The message gets the number of events followed by the tick() arguments.
+    """
+
+    def __init__(
+        self, logger: logging.Logger, message: str, every: int | None = None
+    ) -> None:
+        self.logger = logger
+        self.message = message
+        self.every = every or get_log_every()
+        self.count = 0
+
+    def tick(self, *args: Any) -> None:
+        """Counts an event and logs the summary on every N-th one."""
+        self.count += 1
+        if self.count % self.every == 0:
+            self.logger.info(self.message, self.count, *args)
+
+
+def get_log_every() -> int:
+    """
+    Reads the number of events between two progress summaries.
+
+    Returns:
+        int: LOG_EVERY environment variable, DEFAULT_LOG_EVERY if unset
+
+    Raises:
+        ValueError: If LOG_EVERY is not a positive integer
+    """
+    every = int(os.environ.get("LOG_EVERY", DEFAULT_LOG_EVERY))
+    if every < 1:
+        raise ValueError("LOG_EVERY must be positive.")
+    return every
+
+
+def configure_logging(
+    level: str | None = None,
+    log_format: str | None = None,
+    use_queue: bool | None = None,
+) -> QueueListener | None:
+    """
+    Configures the root logger of a job.
+
+    By default this is the console handler of logging.basicConfig. With
+    use_queue, records are put on a queue by a DeferredQueueHandler and
+    written by a QueueListener thread, so request threads never wait for
+    the console; the listener is stopped, flushing the queue, at exit, and
+    restarted in forked processes such as server workers and process pools.
+    Like basicConfig, nothing is done if the root logger has handlers.
+
+    Args:
+        level (str | None): Log level, LOG_LEVEL environment variable or INFO
+        log_format (str | None): "text" or "json", LOG_FORMAT environment
+            variable or "text"
+        use_queue (bool | None): Write records from a listener thread,
+            LOG_QUEUE=1 environment variable if None
+
+    Returns:
+        QueueListener | None: The started listener with use_queue
+
+    Raises:
+        ValueError: If the level or the format is unsupported
+    """
+    level = (level or os.environ.get("LOG_LEVEL", "INFO")).upper()
+    log_format = (log_format or os.environ.get("LOG_FORMAT", "text")).lower()
+    if use_queue is None:
+        use_queue = os.environ.get("LOG_QUEUE", "0").lower() in ("1", "true", "yes")
+
+    if not isinstance(logging.getLevelName(level), int):
+        raise ValueError(f"Unsupported log level {level}.")
+    if log_format not in ("text", "json"):
+        raise ValueError(f"Unsupported log format {log_format}.")
+
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+    root.setLevel(level)
+
+    handler = logging.StreamHandler()
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter(datefmt=LOG_DATEFMT))
+    else:
+        handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATEFMT))
+
+    if not use_queue:
+        root.addHandler(handler)
+        return None
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = _Listener(log_queue, handler, respect_handler_level=True)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=listener.restart_after_fork)
+    return listener
@@ -0,0 +1,185 @@
+import logging
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Request header enabling memory tracing, as an alternative to "trace_memory"
+TRACE_MEMORY_HEADER: str = "X-Trace-Memory"
+
+# Default number of allocation sites in a report
+DEFAULT_TRACE_TOP: int = 10
+
+# Number of stack frames recorded per allocation
+TRACE_FRAMES: int = 1
+
+MIB: int = 1024 * 1024
+
+# tracemalloc is global to the process, so traced runs are serialized and the
+# last report is kept for the /debug/memory endpoint
+_trace_lock = threading.Lock()
+_last_report: Dict[str, Any] | None = None
+
+
+def get_trace_top(
+    input_data: Mapping[str, Any], headers: Mapping[str, str]
+) -> int | None:
+    """
+    Returns the report size of a request opting in to memory tracing.
+
+    Tracing is requested with a true "trace_memory" field or an
+    X-Trace-Memory header of 1, true or yes. "trace_top" sets the number of
+    allocation sites reported.
+
+    Args:
+        input_data (Mapping[str, Any]): JSON payload of the request
+        headers (Mapping[str, str]): Headers of the request
+
+    Returns:
+        int | None: Number of allocation sites to report, None without tracing
+
+    Raises:
+        ValueError: If "trace_memory" or "trace_top" is invalid
+    """
+    value = input_data.get("trace_memory")
+    if value is not None and not isinstance(value, bool):
+        raise ValueError("Parameter 'trace_memory' must be a boolean.")
+    top_n = input_data.get("trace_top", DEFAULT_TRACE_TOP)
+    if isinstance(top_n, bool) or not isinstance(top_n, int) or top_n < 1:
+        raise ValueError("Parameter 'trace_top' must be an integer >= 1.")
+
+    header = headers.get(TRACE_MEMORY_HEADER, "")
+    if value or header.strip().lower() in ("1", "true", "yes"):
+        return top_n
+    return None
+
+
+def _format_stat(stat: tracemalloc.StatisticDiff) -> Dict[str, Any]:
+    """Converts an allocation site difference to a JSON-serializable dict."""
+    frame = stat.traceback[0]
+    return {
+        "site": f"{frame.filename}:{frame.lineno}",
+        "size_kb": round(stat.size_diff / 1024, 1),
+        "count": stat.count_diff,
+    }
+
+
+def compare_snapshots(
+    before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, top_n: int
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Returns the allocation sites that grew the most between two snapshots.
+
+    Args:
+        before (tracemalloc.Snapshot): Snapshot taken before the run
+        after (tracemalloc.Snapshot): Snapshot taken after the run
+        top_n (int): Number of sites per ranking
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: "top_by_size" and "top_by_count",
+        sites ("file:line") with the size and number of blocks still
+        allocated after the run
+    """
+    # Ignore the allocations of tracemalloc itself
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), "lineno"
+    )
+    by_size = sorted(stats, key=lambda stat: stat.size_diff, reverse=True)
+    by_count = sorted(stats, key=lambda stat: stat.count_diff, reverse=True)
+    return {
+        "top_by_size": [_format_stat(stat) for stat in by_size[:top_n]],
+        "top_by_count": [_format_stat(stat) for stat in by_count[:top_n]],
+    }
+
+
+def run_traced(
+    func: Callable[..., Any], top_n: int = DEFAULT_TRACE_TOP, **kwargs: Any
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Runs a function with tracemalloc and reports where it allocated.
+
+    Snapshots are taken before and after the run; the report ranks the
+    allocation sites by the memory and number of blocks they added, and
+    gives the peak traced memory during the run. Allocations freed before
+    the end of the run only show in the peak. Tracing slows allocations
+    down severalfold, so it is meant for investigation only.
+
+    Args:
+        func (Callable[..., Any]): Job function to run
+        top_n (int): Number of allocation sites per ranking
+        **kwargs (Any): Keyword arguments of func
+
+    Returns:
+        Tuple[Any, Dict[str, Any]]: Result of func and the memory report,
+        with "peak_mb", "retained_mb", "top_by_size" and "top_by_count"
+    """
+    global _last_report
+
+    with _trace_lock:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(TRACE_FRAMES)
+        try:
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            traced_before, _ = tracemalloc.get_traced_memory()
+            result = func(**kwargs)
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started:
+                tracemalloc.stop()
+
+        report = {
+            "peak_mb": round(peak / MIB, 2),
+            "retained_mb": round((current - traced_before) / MIB, 2),
+            **compare_snapshots(before, after, top_n),
+        }
+        _last_report = report
+
+    name = getattr(func, "__name__", repr(func))
+    logger.info(f"Traced run of {name}: peak {report['peak_mb']} MiB.")
+    return result, report
+
+
+def get_memory_report(top_n: int = DEFAULT_TRACE_TOP) -> Dict[str, Any]:
+    """
+    Returns the memory report served by the /debug/memory endpoints.
+
+    Args:
+        top_n (int): Number of allocation sites of the live snapshot
+
+    Returns:
+        Dict[str, Any]: "tracing", the "last_run" report of run_traced (None
+        before the first traced run) and, while tracemalloc is running
+        (e.g. with PYTHONTRACEMALLOC=1), the "current_mb" and "peak_mb"
+        traced memory and the "top_by_size" sites of a live snapshot
+    """
+    report: Dict[str, Any] = {
+        "tracing": tracemalloc.is_tracing(),
+        "last_run": _last_report,
+    }
+    if report["tracing"]:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        report.update(
+            {
+                "current_mb": round(current / MIB, 2),
+                "peak_mb": round(peak / MIB, 2),
+                "top_by_size": [
+                    {
+                        "site": f"{stat.traceback[0].filename}:"
+                        f"{stat.traceback[0].lineno}",
+                        "size_kb": round(stat.size / 1024, 1),
+                        "count": stat.count,
+                    }
+                    for stat in snapshot.statistics("lineno")[:top_n]
+                ],
+            }
+        )
+    return report
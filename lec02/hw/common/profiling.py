@@ -0,0 +1,179 @@
+import cProfile
+import io
+import logging
+import marshal
+import os
+import pstats
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from lec02.hw.common.storage import StorageBackend
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Request header enabling profiling, as an alternative to the "profile" field
+PROFILE_HEADER: str = "X-Profile"
+
+# Name of the pstats dump saved next to the output of a profiled run
+PROFILE_FILENAME: str = "_profile.pstats"
+
+# Default number of functions in the returned summary
+DEFAULT_PROFILE_TOP: int = 20
+
+# Only one profiler can be active at a time since Python 3.12, so profiled
+# runs are serialized
+_profile_lock = threading.Lock()
+
+
+def get_profile_top(
+    input_data: Mapping[str, Any], headers: Mapping[str, str]
+) -> int | None:
+    """
+    Returns the summary size of a request opting in to profiling.
+
+    Profiling is requested with a true "profile" field or an X-Profile header
+    of 1, true or yes. "profile_top" sets the number of functions summarized.
+
+    Args:
+        input_data (Mapping[str, Any]): JSON payload of the request
+        headers (Mapping[str, str]): Headers of the request
+
+    Returns:
+        int | None: Number of functions to summarize, None without profiling
+
+    Raises:
+        ValueError: If "profile" or "profile_top" is invalid
+    """
+    value = input_data.get("profile")
+    if value is not None and not isinstance(value, bool):
+        raise ValueError("Parameter 'profile' must be a boolean.")
+    top_n = input_data.get("profile_top", DEFAULT_PROFILE_TOP)
+    if isinstance(top_n, bool) or not isinstance(top_n, int) or top_n < 1:
+        raise ValueError("Parameter 'profile_top' must be an integer >= 1.")
+
+    header = headers.get(PROFILE_HEADER, "")
+    if value or header.strip().lower() in ("1", "true", "yes"):
+        return top_n
+    return None
+
+
+def summarize_stats(stats: pstats.Stats, top_n: int) -> List[Dict[str, Any]]:
+    """
+    Returns the functions with the highest cumulative time.
+
+    Args:
+        stats (pstats.Stats): Profile of a run
+        top_n (int): Number of functions to return
+
+    Returns:
+        List[Dict[str, Any]]: "function" (file:line(name)), "calls",
+        "tottime" and "cumtime" in seconds, by decreasing cumtime
+    """
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        }
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in rows[:top_n]
+    ]
+
+
+def save_profile(
+    stats: pstats.Stats, filepath: str, storage: StorageBackend | None = None
+) -> None:
+    """
+    Saves a profile in the pstats dump format, readable by pstats.Stats.
+
+    Args:
+        stats (pstats.Stats): Profile of a run
+        filepath (str): Path of the dump, or key with a storage backend
+        storage (StorageBackend | None): Backend to write to instead of the
+            local disk
+
+    Raises:
+        IOError: If the dump cannot be written
+    """
+    try:
+        if storage is not None:
+            storage.write_bytes(filepath, marshal.dumps(stats.stats))
+        else:
+            os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+            stats.dump_stats(filepath)
+    except OSError as e:
+        logger.error(f"Error saving profile to {filepath}: {e}")
+        raise IOError(f"Error saving profile to {filepath}: {e}") from e
+
+    logger.info(f"Saved profile to {filepath}.")
+
+
+def _save_run_profile(
+    profiler: cProfile.Profile,
+    func: Callable[..., Any],
+    output_dir: str,
+    storage: StorageBackend | None,
+) -> Tuple[pstats.Stats, str]:
+    """Saves the profile of a run in its output directory."""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    filepath = os.path.join(output_dir, PROFILE_FILENAME)
+    save_profile(stats, filepath, storage)
+    name = getattr(func, "__name__", repr(func))
+    logger.info(f"Profiled run of {name} in {stats.total_tt:.3f} s.")
+    return stats, filepath
+
+
+def run_profiled(
+    func: Callable[..., Any],
+    output_dir: str,
+    top_n: int = DEFAULT_PROFILE_TOP,
+    **kwargs: Any,
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Runs a function under cProfile and saves the profile next to its output.
+
+    The profile is also saved if the function raises, so a failing run can be
+    investigated too; failing to save it is then only logged, and the error
+    of the function is re-raised. It is written through the "storage" keyword
+    argument of the function, if any. Only the calling thread is profiled,
+    not worker processes or threads, and concurrent profiled runs wait for
+    each other.
+
+    Args:
+        func (Callable[..., Any]): Job function to run
+        output_dir (str): Output directory of the run, receiving PROFILE_FILENAME
+        top_n (int): Number of functions in the summary
+        **kwargs (Any): Keyword arguments of func
+
+    Returns:
+        Tuple[Any, Dict[str, Any]]: Result of func and the profile report,
+        with the dump "file", "total_seconds" and the "top" functions
+
+    Raises:
+        IOError: If the profile of a successful run cannot be saved
+    """
+    storage = kwargs.get("storage")
+
+    with _profile_lock:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = func(**kwargs)
+        except Exception:
+            profiler.disable()
+            try:
+                _save_run_profile(profiler, func, output_dir, storage)
+            except IOError:
+                logger.warning("Profile of the failed run not saved.")
+            raise
+        finally:
+            profiler.disable()
+
+    stats, filepath = _save_run_profile(profiler, func, output_dir, storage)
+    return result, {
+        "file": filepath,
+        "total_seconds": round(stats.total_tt, 6),
+        "top": summarize_stats(stats, top_n),
+    }
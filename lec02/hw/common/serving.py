@@ -0,0 +1,228 @@
+import importlib.util
+import logging
+import os
+from typing import Any, Callable, Dict, Iterable, List
+
+from flask import Flask
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# WSGI servers a job server can run on, in order of preference for "auto".
+# "dev" is Flask's debug server with the reloader, as app.run(debug=True).
+PRODUCTION_SERVERS: tuple[str, ...] = ("gunicorn", "waitress")
+SERVERS: tuple[str, ...] = PRODUCTION_SERVERS + ("werkzeug", "dev")
+
+DEFAULT_HOST: str = "0.0.0.0"
+DEFAULT_WORKERS: int = 1
+DEFAULT_THREADS: int = 8
+
+# Seconds gunicorn waits for a silent worker, long enough for any job
+WORKER_TIMEOUT: int = 3600
+
+# Cheap routes requested once per process before serving, if the app has them
+WARM_UP_PATHS: tuple[str, ...] = ("/debug/queue",)
+
+# Warm-ups registered by the modules owning the pools of a process
+_warm_ups: List[Callable[[], Any]] = []
+
+
+def register_warm_up(warm_up: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Registers a function opening pools of a process, e.g. HTTP connections,
+    run by serve in every serving process before it accepts requests.
+
+    Modules owning such pools register their warm-up when imported, so a
+    server warms up whatever its jobs use. Usable as a decorator.
+
+    Args:
+        warm_up (Callable[[], Any]): Function taking no arguments; it must
+            not raise, a server having to start while a dependency is down
+
+    Returns:
+        Callable[[], Any]: warm_up itself
+    """
+    if warm_up not in _warm_ups:
+        _warm_ups.append(warm_up)
+    return warm_up
+
+
+def get_server_name(name: str | None = None) -> str:
+    """
+    Resolves the WSGI server to run on.
+
+    Args:
+        name (str | None): One of SERVERS or "auto", JOB_SERVER environment
+            variable or "auto" if None. "auto" picks the first installed
+            production server and falls back, with a warning, to the threaded
+            werkzeug server.
+
+    Returns:
+        str: Name of the server
+
+    Raises:
+        ValueError: If the server is unknown
+        ImportError: If the server is not installed
+    """
+    name = (name or os.environ.get("JOB_SERVER", "auto")).lower()
+    if name == "auto":
+        for candidate in PRODUCTION_SERVERS:
+            if importlib.util.find_spec(candidate) is not None:
+                return candidate
+        logger.warning(
+            "Neither gunicorn nor waitress is installed, serving on werkzeug; "
+            "run: pip install -r requirements.txt"
+        )
+        return "werkzeug"
+
+    if name not in SERVERS:
+        raise ValueError(
+            f"Unsupported server {name}, expected one of {', '.join(SERVERS)} or auto."
+        )
+    if name in PRODUCTION_SERVERS and importlib.util.find_spec(name) is None:
+        raise ImportError(f"Server {name} is not installed, run: pip install {name}")
+    return name
+
+
+def warm_up_app(app: Flask, paths: Iterable[str] = WARM_UP_PATHS) -> None:
+    """
+    Sends a request to cheap routes of the app, so the first client request
+    does not pay for the lazy setup of Flask and the JSON provider.
+
+    Args:
+        app (Flask): Application to warm up
+        paths (Iterable[str]): GET routes to request, skipped if not routed
+    """
+    routes = {rule.rule for rule in app.url_map.iter_rules()}
+    with app.test_client() as client:
+        for path in paths:
+            if path in routes:
+                client.get(path)
+
+
+def _warm_up(app: Flask, warm_up: Callable[[], Any] | None) -> None:
+    # Warm up the pools of the process, then the app itself
+    for registered in _warm_ups:
+        registered()
+    if warm_up is not None:
+        warm_up()
+    warm_up_app(app)
+    logger.info(f"Warmed up process {os.getpid()}.")
+
+
+def _run_gunicorn(
+    app: Flask,
+    bind: str,
+    workers: int,
+    threads: int,
+    warm_up: Callable[[], Any] | None,
+) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    options: Dict[str, Any] = {
+        "bind": bind,
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread",
+        "timeout": WORKER_TIMEOUT,
+        # The app, with fastavro, requests and the jobs, is already imported
+        # by the master; workers are forked from it and share those pages
+        "preload_app": True,
+        # Sockets must not be shared across processes: pools are warmed
+        # after the fork, once per worker
+        "post_fork": lambda server, worker: _warm_up(app, warm_up),
+    }
+
+    class _Application(BaseApplication):
+        def load_config(self) -> None:
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Flask:
+            return app
+
+    _Application().run()
+
+
+def serve(
+    app: Flask,
+    port: int,
+    host: str = DEFAULT_HOST,
+    server: str | None = None,
+    workers: int | None = None,
+    threads: int | None = None,
+    warm_up: Callable[[], Any] | None = None,
+    single_worker: bool = False,
+) -> None:
+    """
+    Runs a job server until it is stopped.
+
+    With gunicorn, workers processes are forked from this one, which already
+    imported the app, each serving requests from threads threads. Waitress
+    and werkzeug serve from threads of this process only. The registered
+    warm-ups, warm_up and a request to the cheap routes of the app run in
+    every serving process before it accepts requests.
+
+    The admission limits, in-flight jobs and circuit breakers of a server
+    are per process: with several workers, each one would admit its own
+    jobs, so servers holding them pass single_worker to refuse JOB_WORKERS
+    above 1.
+
+    Args:
+        app (Flask): Application to serve
+        port (int): Port to listen on, JOB_PORT environment variable first
+        host (str): Interface to listen on
+        server (str | None): WSGI server, see get_server_name
+        workers (int | None): Worker processes of gunicorn, DEFAULT_WORKERS
+            if None, JOB_WORKERS environment variable first
+        threads (int | None): Request threads per process, DEFAULT_THREADS
+            if None, JOB_THREADS environment variable first
+        warm_up (Callable[[], Any] | None): Opens the pools of a process,
+            after those registered with register_warm_up
+        single_worker (bool): Refuse more than one gunicorn worker, for apps
+            keeping state that must be shared by all requests
+
+    Raises:
+        ValueError: If the server is unknown, a setting is not a positive
+            number, or several workers are asked with single_worker
+        ImportError: If the server is not installed
+    """
+    server = get_server_name(server)
+    port = int(os.environ.get("JOB_PORT", port))
+    workers = int(os.environ.get("JOB_WORKERS", workers or DEFAULT_WORKERS))
+    threads = int(os.environ.get("JOB_THREADS", threads or DEFAULT_THREADS))
+    if workers < 1 or threads < 1:
+        raise ValueError("Workers and threads must be positive.")
+    if workers > 1 and single_worker:
+        raise ValueError(
+            f"{workers} workers requested, but the admission limits, in-flight "
+            "jobs and circuit breakers of this server are per process; run a "
+            "single worker and raise JOB_THREADS instead."
+        )
+    if workers > 1 and server != "gunicorn":
+        logger.warning(f"Server {server} runs a single process, ignoring workers.")
+
+    if server == "gunicorn":
+        logger.info(
+            f"Serving on {host}:{port} with gunicorn: "
+            f"{workers} workers x {threads} threads."
+        )
+    elif server == "waitress":
+        logger.info(f"Serving on {host}:{port} with waitress: {threads} threads.")
+    else:
+        logger.info(f"Serving on {host}:{port} with {server}: a thread per request.")
+
+    if server == "gunicorn":
+        _run_gunicorn(app, f"{host}:{port}", workers, threads, warm_up)
+    elif server == "waitress":
+        import waitress
+
+        _warm_up(app, warm_up)
+        waitress.serve(app, host=host, port=port, threads=threads)
+    elif server == "werkzeug":
+        from werkzeug.serving import run_simple
+
+        _warm_up(app, warm_up)
+        run_simple(host, port, app, threaded=True)
+    else:
+        app.run(debug=True, host=host, port=port)
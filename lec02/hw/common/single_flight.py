@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Default seconds a completed result is served to identical requests
+DEFAULT_RESULT_TTL: float = 5.0
+
+
+def make_request_key(
+    name: str, params: Dict[str, Any], path_fields: Iterable[str] = ()
+) -> str:
+    """
+    Builds the key of a job request from its normalized parameters.
+
+    Unset parameters are dropped and path parameters normalized, so
+    "raw/2022-08-09/" and "raw/2022-08-09" are the same job.
+
+    Args:
+        name (str): Name of the job or endpoint
+        params (Dict[str, Any]): Request parameters
+        path_fields (Iterable[str]): Parameters holding directory paths
+
+    Returns:
+        str: Key identifying identical requests
+    """
+    path_fields = set(path_fields)
+    normalized = {
+        field: (
+            os.path.normpath(value)
+            if field in path_fields and isinstance(value, str)
+            else value
+        )
+        for field, value in params.items()
+        if value is not None
+    }
+    return json.dumps([name, normalized], sort_keys=True, default=str)
+
+
+class _Call:
+    """A job in flight, with the result or error shared with its followers."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Runs a job once for concurrent identical requests.
+
+    The first request for a key runs the job; requests for the same key
+    arriving while it runs wait for it and get its result, or its error.
+    A successful result is also served for result_ttl seconds after the job
+    completed, absorbing retries of a request whose answer was lost.
+    """
+
+    def __init__(
+        self,
+        result_ttl: float = DEFAULT_RESULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if result_ttl < 0:
+            raise ValueError("result_ttl must not be negative.")
+        self.result_ttl = result_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._results: Dict[str, Tuple[float, Any]] = {}
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        """
+        Creates a SingleFlight with the JOB_RESULT_TTL environment variable.
+
+        Returns:
+            SingleFlight: The coalescer of the server
+
+        Raises:
+            ValueError: If JOB_RESULT_TTL is not a valid number
+        """
+        return cls(float(os.environ.get("JOB_RESULT_TTL", DEFAULT_RESULT_TTL)))
+
+    def do(
+        self, key: str, func: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Tuple[Any, bool]:
+        """
+        Runs func for the key, unless the same key is in flight or cached.
+
+        Args:
+            key (str): Key of the request, see make_request_key
+            func (Callable[..., Any]): Job to run
+            *args: Positional arguments of func
+            **kwargs: Keyword arguments of func
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it was shared with
+            another request rather than computed for this one
+
+        Raises:
+            Exception: Whatever func raised, for the request running it and
+                for the requests attached to it
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                if cached[0] > self._clock():
+                    self.coalesced += 1
+                    return cached[1], True
+                del self._results[key]
+
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            logger.info("Attached to an identical job in flight.")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.result_ttl > 0:
+                    self._results[key] = (self._clock() + self.result_ttl, call.result)
+                self._expire()
+            call.done.set()
+        return call.result, False
+
+    def _expire(self) -> None:
+        # Drop expired results, so one-off keys do not accumulate
+        now = self._clock()
+        expired = [key for key, (expires, _) in self._results.items() if expires <= now]
+        for key in expired:
+            del self._results[key]
@@ -0,0 +1,94 @@
+import os
+import threading
+from typing import Dict
+from urllib.parse import urlparse
+
+from lec02.hw.common.storage.base import (
+    StorageBackend,
+    DEFAULT_PART_SIZE,
+    DEFAULT_UPLOAD_WORKERS,
+)
+from lec02.hw.common.storage.local import LocalStorage
+from lec02.hw.common.storage.memory import MemoryStorage
+from lec02.hw.common.storage.s3 import S3Storage
+
+# Environment variable with the endpoint of an S3-compatible store
+S3_ENDPOINT_ENV: str = "S3_ENDPOINT_URL"
+
+# Named in-memory stores, shared by the jobs running in one process
+_memory_stores: Dict[str, MemoryStorage] = {}
+_memory_stores_lock = threading.Lock()
+
+
+def get_storage(url: str | None = None) -> StorageBackend:
+    """
+    Returns the storage backend of a URL.
+
+    Supported URLs:
+        - None, "" or "file://": local disk, keys being file paths
+        - "file:///<root>": local disk, keys relative to root
+        - "memory://<name>": named in-memory store, the same instance for
+          every call with the same name
+        - "s3://<bucket>/<prefix>": S3-compatible object store, at the
+          endpoint of the S3_ENDPOINT_URL environment variable if set
+
+    Args:
+        url (str | None): Storage URL
+
+    Returns:
+        StorageBackend: The backend
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+        ImportError: If boto3 is missing for an s3:// URL
+    """
+    if not url:
+        return LocalStorage()
+
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return LocalStorage(parsed.path)
+    if parsed.scheme == "memory":
+        name = parsed.netloc + parsed.path
+        with _memory_stores_lock:
+            return _memory_stores.setdefault(name, MemoryStorage())
+    if parsed.scheme == "s3":
+        return S3Storage(
+            bucket=parsed.netloc,
+            prefix=parsed.path,
+            endpoint_url=os.environ.get(S3_ENDPOINT_ENV),
+        )
+
+    raise ValueError(
+        f"Unsupported storage URL {url}, expected file://, memory:// or s3://"
+    )
+
+
+def clear_memory_stores(name: str | None = None) -> None:
+    """
+    Evicts a named in-memory store, or every store, freeing its objects.
+
+    A later get_storage call with the same name returns a new, empty store.
+
+    Args:
+        name (str | None): Name of the store, as in "memory://<name>", or None
+            for every store
+    """
+    with _memory_stores_lock:
+        if name is None:
+            _memory_stores.clear()
+        else:
+            _memory_stores.pop(name, None)
+
+
+__all__ = [
+    "StorageBackend",
+    "LocalStorage",
+    "MemoryStorage",
+    "S3Storage",
+    "get_storage",
+    "clear_memory_stores",
+    "DEFAULT_PART_SIZE",
+    "DEFAULT_UPLOAD_WORKERS",
+    "S3_ENDPOINT_ENV",
+]
@@ -0,0 +1,274 @@
+import abc
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterator, List, Tuple
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Size of the parts of a multipart upload, the S3 minimum being 5 MiB
+DEFAULT_PART_SIZE: int = 8 * 1024 * 1024
+
+# Number of parts uploaded concurrently
+DEFAULT_UPLOAD_WORKERS: int = 8
+
+
+def get_part_ranges(size: int, part_size: int) -> List[Tuple[int, int, int]]:
+    """
+    Splits a file into the parts of a multipart upload.
+
+    Args:
+        size (int): File size in bytes
+        part_size (int): Maximum part size in bytes
+
+    Returns:
+        List[Tuple[int, int, int]]: Part number (from 1), offset and length of
+        every part, a single empty part for an empty file
+    """
+    if part_size < 1:
+        raise ValueError("part_size must be positive.")
+    if size == 0:
+        return [(1, 0, 0)]
+    return [
+        (number, offset, min(part_size, size - offset))
+        for number, offset in enumerate(range(0, size, part_size), start=1)
+    ]
+
+
+class StorageBackend(abc.ABC):
+    """
+    Storage of the raw and staging zones, addressed by "/"-separated keys.
+
+    Implementations cover the local disk, memory and object stores. Missing
+    keys raise FileNotFoundError and other failures IOError, like the file
+    functions they replace. Writes are atomic: readers see either the
+    previous object or the complete new one.
+    """
+
+    @abc.abstractmethod
+    def list(self, prefix: str) -> List[str]:
+        """
+        Lists the keys under a prefix, recursively.
+
+        Args:
+            prefix (str): Directory-like prefix, with or without trailing "/"
+
+        Returns:
+            List[str]: Sorted keys, empty if nothing is stored under prefix
+        """
+
+    @abc.abstractmethod
+    def exists(self, key: str) -> bool:
+        """Checks whether an object is stored under a key."""
+
+    @abc.abstractmethod
+    def open_read(self, key: str) -> BinaryIO:
+        """
+        Opens an object as a binary stream.
+
+        Args:
+            key (str): Key of the object
+
+        Returns:
+            BinaryIO: Stream to read and close
+
+        Raises:
+            FileNotFoundError: If the object does not exist
+        """
+
+    @abc.abstractmethod
+    def _begin_write(self, key: str) -> Tuple[BinaryIO, Any]:
+        """Returns a writable stream and the state needed to commit it."""
+
+    @abc.abstractmethod
+    def _commit_write(self, key: str, stream: BinaryIO, state: Any) -> None:
+        """Publishes a written stream under its key and closes it."""
+
+    @abc.abstractmethod
+    def _abort_write(self, key: str, stream: BinaryIO, state: Any) -> None:
+        """Discards a written stream."""
+
+    @abc.abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """
+        Deletes every object under a prefix, or the object stored at it.
+
+        Args:
+            prefix (str): Directory-like prefix or key
+
+        Returns:
+            int: Number of objects deleted
+        """
+
+    @abc.abstractmethod
+    def _begin_multipart(self, key: str, size: int) -> Any:
+        """Starts a multipart upload and returns its state."""
+
+    @abc.abstractmethod
+    def _upload_part(self, upload: Any, number: int, offset: int, data: bytes) -> Any:
+        """Stores one part, safe to call from several threads."""
+
+    @abc.abstractmethod
+    def _complete_multipart(self, upload: Any, parts: List[Any]) -> None:
+        """Publishes the object from its parts, in part number order."""
+
+    @abc.abstractmethod
+    def _abort_multipart(self, upload: Any) -> None:
+        """Discards the parts of an upload."""
+
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[BinaryIO]:
+        """
+        Opens a binary stream published atomically under a key on success.
+
+        If the block raises, nothing is published.
+
+        Args:
+            key (str): Key of the object
+
+        Yields:
+            BinaryIO: Stream to write to
+
+        Raises:
+            IOError: If the object cannot be written
+        """
+        stream, state = self._begin_write(key)
+        try:
+            yield stream
+        except BaseException:
+            self._abort_write(key, stream, state)
+            raise
+        self._commit_write(key, stream, state)
+
+    @contextmanager
+    def open_local_write(self, key: str) -> Iterator[str]:
+        """
+        Yields a local file path whose content is published under a key.
+
+        For writers that need a real file, such as seekable AVRO writers. The
+        file is written to a temporary path, stored with write_bytes or, past
+        one part, uploaded in parallel parts with upload_file, then removed.
+        If the block raises, nothing is published.
+
+        Args:
+            key (str): Key of the object
+
+        Yields:
+            str: Local path to write the object to
+
+        Raises:
+            IOError: If the object cannot be written
+        """
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp")
+        os.close(fd)
+        try:
+            yield tmp_path
+            if os.path.getsize(tmp_path) > DEFAULT_PART_SIZE:
+                self.upload_file(key, tmp_path)
+            else:
+                with open(tmp_path, "rb") as f:
+                    self.write_bytes(key, f.read())
+        finally:
+            os.remove(tmp_path)
+
+    def is_dir(self, prefix: str) -> bool:
+        """Checks whether anything is stored under a directory-like prefix."""
+        return bool(self.list(prefix))
+
+    def list_dir(self, prefix: str) -> List[str]:
+        """
+        Lists the names of the objects directly under a prefix, like os.listdir.
+
+        Args:
+            prefix (str): Directory-like prefix
+
+        Returns:
+            List[str]: Names relative to prefix, empty if nothing is stored
+        """
+        prefix = prefix.rstrip("/") + "/"
+        return [
+            key[len(prefix) :]
+            for key in self.list(prefix)
+            if key.startswith(prefix) and "/" not in key[len(prefix) :]
+        ]
+
+    def make_dirs(self, prefix: str) -> None:
+        """Creates a directory-like prefix, a no-op without directories."""
+
+    def read_bytes(self, key: str) -> bytes:
+        """Returns the content of an object."""
+        with self.open_read(key) as stream:
+            return stream.read()
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        """Atomically stores data under a key."""
+        with self.open_write(key) as stream:
+            stream.write(data)
+
+    def upload_file(
+        self,
+        key: str,
+        filepath: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_workers: int = DEFAULT_UPLOAD_WORKERS,
+    ) -> int:
+        """
+        Uploads a local file in parts, several parts at a time.
+
+        Every thread reads its part with os.pread, so no file position is
+        shared. The object is only published once every part is stored, and
+        the upload is aborted if any part fails.
+
+        Args:
+            key (str): Key of the object
+            filepath (str): Local file to upload
+            part_size (int): Maximum size of a part in bytes
+            max_workers (int): Number of parts uploaded concurrently
+
+        Returns:
+            int: Number of parts uploaded
+
+        Raises:
+            FileNotFoundError: If filepath does not exist
+            IOError: If a part cannot be uploaded
+        """
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            parts_count = self._upload_fd(
+                key, fd, os.fstat(fd).st_size, part_size, max_workers
+            )
+        finally:
+            os.close(fd)
+
+        logger.info(f"Uploaded {filepath} to {key} in {parts_count} parts.")
+        return parts_count
+
+    def _upload_fd(
+        self, key: str, fd: int, size: int, part_size: int, max_workers: int
+    ) -> int:
+        """Uploads the content of an open file descriptor in parallel parts."""
+        ranges = get_part_ranges(size, part_size)
+        upload = self._begin_multipart(key, size)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                parts = list(
+                    executor.map(
+                        lambda part: self._upload_part(
+                            upload, part[0], part[1], os.pread(fd, part[2], part[1])
+                        ),
+                        ranges,
+                    )
+                )
+            self._complete_multipart(upload, parts)
+        except BaseException as e:
+            self._abort_multipart(upload)
+            logger.error(f"Error uploading parts of {key}: {e}")
+            if isinstance(e, OSError):
+                raise IOError(f"Error uploading parts of {key}: {e}") from e
+            raise
+
+        return len(ranges)
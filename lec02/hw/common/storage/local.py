@@ -0,0 +1,139 @@
+import logging
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+from lec02.hw.common.storage.base import StorageBackend
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Suffix of the temporary files written before an atomic rename
+TMP_SUFFIX: str = ".tmp"
+
+
+class LocalStorage(StorageBackend):
+    """
+    Storage on the local disk, keys being paths relative to a root directory.
+
+    Without a root, keys are used as file paths as they are. Writes go to a
+    temporary file in the target directory, renamed into place on commit.
+    """
+
+    def __init__(self, root: str = "") -> None:
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key.lstrip("/")) if self.root else key
+
+    def _key(self, path: str) -> str:
+        return (
+            os.path.relpath(path, self.root).replace(os.sep, "/") if self.root else path
+        )
+
+    def list(self, prefix: str) -> List[str]:
+        dir_path = self._path(prefix)
+        if not os.path.isdir(dir_path):
+            return []
+        return sorted(
+            self._key(os.path.join(walk_dir, filename))
+            for walk_dir, _, filenames in os.walk(dir_path)
+            for filename in filenames
+            if not filename.endswith(TMP_SUFFIX)
+        )
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def is_dir(self, prefix: str) -> bool:
+        return os.path.isdir(self._path(prefix))
+
+    def list_dir(self, prefix: str) -> List[str]:
+        # Subdirectories are listed too, like os.listdir
+        return os.listdir(self._path(prefix))
+
+    def make_dirs(self, prefix: str) -> None:
+        os.makedirs(self._path(prefix), exist_ok=True)
+
+    def open_read(self, key: str) -> BinaryIO:
+        try:
+            return open(self._path(key), "rb")
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Object {key} not found: {e}") from e
+        except OSError as e:
+            raise IOError(f"Error reading {key}: {e}") from e
+
+    def _tmp_path(self, key: str) -> str:
+        return f"{self._path(key)}.{uuid.uuid4().hex[:8]}{TMP_SUFFIX}"
+
+    def _begin_write(self, key: str) -> Tuple[BinaryIO, Any]:
+        tmp_path = self._tmp_path(key)
+        try:
+            os.makedirs(os.path.dirname(tmp_path) or ".", exist_ok=True)
+            return open(tmp_path, "wb"), tmp_path
+        except OSError as e:
+            raise IOError(f"Error writing {key}: {e}") from e
+
+    def _commit_write(self, key: str, stream: BinaryIO, state: Any) -> None:
+        try:
+            stream.close()
+            os.replace(state, self._path(key))
+        except OSError as e:
+            raise IOError(f"Error writing {key}: {e}") from e
+
+    def _abort_write(self, key: str, stream: BinaryIO, state: Any) -> None:
+        stream.close()
+        if os.path.exists(state):
+            os.remove(state)
+
+    @contextmanager
+    def open_local_write(self, key: str) -> Iterator[str]:
+        # The temporary file is renamed into place, no copy needed
+        tmp_path = self._tmp_path(key)
+        try:
+            os.makedirs(os.path.dirname(tmp_path) or ".", exist_ok=True)
+            yield tmp_path
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete_prefix(self, prefix: str) -> int:
+        path = self._path(prefix)
+        try:
+            if os.path.isdir(path):
+                count = sum(len(filenames) for _, _, filenames in os.walk(path))
+                shutil.rmtree(path)
+                return count
+            if os.path.isfile(path):
+                os.remove(path)
+                return 1
+        except OSError as e:
+            raise IOError(f"Error deleting {prefix}: {e}") from e
+        return 0
+
+    def _begin_multipart(self, key: str, size: int) -> Dict[str, Any]:
+        tmp_path = self._tmp_path(key)
+        os.makedirs(os.path.dirname(tmp_path) or ".", exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(fd, size)
+        return {"key": key, "tmp_path": tmp_path, "fd": fd}
+
+    def _upload_part(
+        self, upload: Dict[str, Any], number: int, offset: int, data: bytes
+    ) -> int:
+        os.pwrite(upload["fd"], data, offset)
+        return number
+
+    def _complete_multipart(self, upload: Dict[str, Any], parts: List[Any]) -> None:
+        os.close(upload.pop("fd"))
+        os.replace(upload["tmp_path"], self._path(upload["key"]))
+
+    def _abort_multipart(self, upload: Dict[str, Any]) -> None:
+        if "fd" in upload:
+            os.close(upload.pop("fd"))
+        if os.path.exists(upload["tmp_path"]):
+            os.remove(upload["tmp_path"])
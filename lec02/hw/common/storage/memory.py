@@ -0,0 +1,82 @@
+import io
+import logging
+import threading
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+from lec02.hw.common.storage.base import StorageBackend
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def _dir_prefix(prefix: str) -> str:
+    return prefix if not prefix or prefix.endswith("/") else prefix + "/"
+
+
+class MemoryStorage(StorageBackend):
+    """
+    Storage of objects as bytes in a dictionary, shared by the threads of a
+    process.
+
+    Objects are published by replacing the dictionary entry under a lock,
+    so writes are atomic and readers get an independent BytesIO.
+    """
+
+    def __init__(self) -> None:
+        self.objects: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def list(self, prefix: str) -> List[str]:
+        dir_prefix = _dir_prefix(prefix)
+        with self._lock:
+            return sorted(key for key in self.objects if key.startswith(dir_prefix))
+
+    def exists(self, key: str) -> bool:
+        return key in self.objects
+
+    def open_read(self, key: str) -> BinaryIO:
+        try:
+            return io.BytesIO(self.objects[key])
+        except KeyError:
+            raise FileNotFoundError(f"Object {key} not found")
+
+    def _begin_write(self, key: str) -> Tuple[BinaryIO, Any]:
+        return io.BytesIO(), None
+
+    def _commit_write(self, key: str, stream: BinaryIO, state: Any) -> None:
+        data = stream.getvalue()
+        stream.close()
+        with self._lock:
+            self.objects[key] = data
+
+    def _abort_write(self, key: str, stream: BinaryIO, state: Any) -> None:
+        stream.close()
+
+    def delete_prefix(self, prefix: str) -> int:
+        dir_prefix = _dir_prefix(prefix)
+        with self._lock:
+            keys = [
+                key
+                for key in self.objects
+                if key == prefix or key.startswith(dir_prefix)
+            ]
+            for key in keys:
+                del self.objects[key]
+        return len(keys)
+
+    def _begin_multipart(self, key: str, size: int) -> Dict[str, Any]:
+        return {"key": key, "parts": {}}
+
+    def _upload_part(
+        self, upload: Dict[str, Any], number: int, offset: int, data: bytes
+    ) -> int:
+        upload["parts"][number] = data
+        return number
+
+    def _complete_multipart(self, upload: Dict[str, Any], parts: List[Any]) -> None:
+        data = b"".join(upload["parts"][number] for number in sorted(parts))
+        with self._lock:
+            self.objects[upload["key"]] = data
+
+    def _abort_multipart(self, upload: Dict[str, Any]) -> None:
+        upload["parts"].clear()
@@ -0,0 +1,196 @@
+import logging
+import os
+import tempfile
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+from lec02.hw.common.storage.base import (
+    StorageBackend,
+    DEFAULT_PART_SIZE,
+    DEFAULT_UPLOAD_WORKERS,
+)
+
+# boto3 is only needed for the object store backend
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Maximum number of keys of a DeleteObjects request
+DELETE_BATCH_SIZE: int = 1000
+
+# Size up to which a write is buffered in memory before spilling to disk
+WRITE_BUFFER_SIZE: int = 16 * 1024 * 1024
+
+# Error codes of a missing object
+NOT_FOUND_CODES: tuple[str, ...] = ("NoSuchKey", "404", "NotFound")
+
+
+def _error_code(error: Exception) -> str | None:
+    """Returns the error code of a botocore ClientError, None otherwise."""
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code")
+    return None
+
+
+class S3Storage(StorageBackend):
+    """
+    Storage in an S3-compatible object store bucket.
+
+    Keys are stored below an optional prefix. Objects are written with a
+    single PUT, which S3 publishes atomically, or with a multipart upload
+    for files larger than a part. Any S3-compatible endpoint (MinIO, a moto
+    server) can be used through endpoint_url.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        client: Any = None,
+        endpoint_url: str | None = None,
+        part_size: int = DEFAULT_PART_SIZE,
+    ) -> None:
+        if client is None:
+            if boto3 is None:
+                raise ImportError(
+                    "boto3 is required for S3Storage, install it with "
+                    "'pip install boto3'."
+                )
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = client
+        self.part_size = part_size
+
+    def _object_key(self, key: str) -> str:
+        key = key.lstrip("/")
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _key(self, object_key: str) -> str:
+        return object_key[len(self.prefix) + 1 :] if self.prefix else object_key
+
+    def _list_object_keys(self, prefix: str) -> List[str]:
+        object_prefix = self._object_key(prefix)
+        if object_prefix and not object_prefix.endswith("/"):
+            object_prefix += "/"
+
+        object_keys: List[str] = []
+        request: Dict[str, Any] = {"Bucket": self.bucket, "Prefix": object_prefix}
+        try:
+            while True:
+                response = self.client.list_objects_v2(**request)
+                object_keys.extend(item["Key"] for item in response.get("Contents", []))
+                if not response.get("IsTruncated"):
+                    break
+                request["ContinuationToken"] = response["NextContinuationToken"]
+        except Exception as e:
+            raise IOError(f"Error listing {prefix}: {e}") from e
+        return object_keys
+
+    def list(self, prefix: str) -> List[str]:
+        return sorted(
+            self._key(object_key) for object_key in self._list_object_keys(prefix)
+        )
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except Exception as e:
+            if _error_code(e) in NOT_FOUND_CODES:
+                return False
+            raise IOError(f"Error reading {key}: {e}") from e
+
+    def open_read(self, key: str) -> BinaryIO:
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self._object_key(key)
+            )
+        except Exception as e:
+            if _error_code(e) in NOT_FOUND_CODES:
+                raise FileNotFoundError(f"Object {key} not found") from e
+            raise IOError(f"Error reading {key}: {e}") from e
+        return response["Body"]
+
+    def _begin_write(self, key: str) -> Tuple[BinaryIO, Any]:
+        return tempfile.SpooledTemporaryFile(max_size=WRITE_BUFFER_SIZE), None
+
+    def _commit_write(self, key: str, stream: BinaryIO, state: Any) -> None:
+        try:
+            size = stream.tell()
+            stream.seek(0)
+            if size > self.part_size:
+                # Upload the parts in parallel from the spooled file
+                stream.flush()
+                self._upload_fd(
+                    key, stream.fileno(), size, self.part_size, DEFAULT_UPLOAD_WORKERS
+                )
+            else:
+                self.client.put_object(
+                    Bucket=self.bucket, Key=self._object_key(key), Body=stream.read()
+                )
+        except Exception as e:
+            raise IOError(f"Error writing {key}: {e}") from e
+        finally:
+            stream.close()
+
+    def _abort_write(self, key: str, stream: BinaryIO, state: Any) -> None:
+        stream.close()
+
+    def delete_prefix(self, prefix: str) -> int:
+        object_keys = self._list_object_keys(prefix)
+        if self.exists(prefix):
+            object_keys.append(self._object_key(prefix))
+
+        try:
+            for start in range(0, len(object_keys), DELETE_BATCH_SIZE):
+                batch = object_keys[start : start + DELETE_BATCH_SIZE]
+                self.client.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                )
+        except Exception as e:
+            raise IOError(f"Error deleting {prefix}: {e}") from e
+        return len(object_keys)
+
+    def _begin_multipart(self, key: str, size: int) -> Dict[str, Any]:
+        object_key = self._object_key(key)
+        response = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=object_key
+        )
+        return {"Key": object_key, "UploadId": response["UploadId"]}
+
+    def _upload_part(
+        self, upload: Dict[str, Any], number: int, offset: int, data: bytes
+    ) -> Dict[str, Any]:
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=upload["Key"],
+            UploadId=upload["UploadId"],
+            PartNumber=number,
+            Body=data,
+        )
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    def _complete_multipart(self, upload: Dict[str, Any], parts: List[Any]) -> None:
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=upload["Key"],
+            UploadId=upload["UploadId"],
+            MultipartUpload={
+                "Parts": sorted(parts, key=lambda part: part["PartNumber"])
+            },
+        )
+
+    def _abort_multipart(self, upload: Dict[str, Any]) -> None:
+        try:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=upload["Key"], UploadId=upload["UploadId"]
+            )
+        except Exception as e:
+            logger.warning(f"Error aborting upload of {upload['Key']}: {e}")
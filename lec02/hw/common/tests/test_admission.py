@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from lec02.hw.common.admission import (
+    AdmissionController,
+    QueueFullError,
+    QueueTimeoutError,
+)
+
+
+def test_admission_controller_queues_in_order():
+    """Test queued requests get the slot in arrival order once it is freed."""
+
+    # Setup a controller with one slot, held by the test
+    controller = AdmissionController(max_running=1, max_queued=2, queue_timeout=5)
+    order = []
+
+    def job(name):
+        with controller.admit():
+            order.append(name)
+
+    with controller.admit():
+        threads = []
+        for name in ("first", "second"):
+            thread = threading.Thread(target=job, args=(name,))
+            thread.start()
+            threads.append(thread)
+            while controller.stats()["queued"] < len(threads):
+                time.sleep(0.01)
+
+        # Test that a third waiting request is rejected right away
+        with pytest.raises(QueueFullError) as excinfo:
+            with controller.admit():
+                pass
+        assert excinfo.value.status_code == 429
+        assert excinfo.value.retry_after >= 1
+        time.sleep(0.05)
+
+    # Call function under test by freeing the slot
+    for thread in threads:
+        thread.join()
+
+    # Assert the queued requests ran in order and the statistics
+    assert order == ["first", "second"]
+    stats = controller.stats()
+    assert stats["running"] == 0
+    assert stats["queued"] == 0
+    assert stats["admitted"] == 3
+    assert stats["rejected"] == 1
+    assert stats["max_wait_seconds"] >= 0.05
+
+
+def test_admission_controller_queue_timeout():
+    """Test a queued request is rejected with 503 when no slot frees in time."""
+
+    # Setup a controller with its only slot taken
+    controller = AdmissionController(max_running=1, max_queued=1, queue_timeout=0.05)
+
+    # Test that the waiting request times out
+    with controller.admit():
+        with pytest.raises(QueueTimeoutError) as excinfo:
+            with controller.admit():
+                pass
+
+    # Assert the error and counters
+    assert excinfo.value.status_code == 503
+    assert controller.stats()["timed_out"] == 1
+    assert controller.stats()["queued"] == 0
+
+
+def test_admission_controller_from_env(monkeypatch):
+    """Test AdmissionController.from_env reads the JOB_* variables."""
+
+    # Setup environment variables
+    monkeypatch.setenv("JOB_MAX_RUNNING", "3")
+    monkeypatch.setenv("JOB_MAX_QUEUED", "0")
+    monkeypatch.setenv("JOB_QUEUE_TIMEOUT", "1.5")
+
+    # Call function under test
+    stats = AdmissionController.from_env().stats()
+
+    # Assert the limits
+    assert (stats["max_running"], stats["max_queued"], stats["queue_timeout"]) == (
+        3,
+        0,
+        1.5,
+    )
+
+
+def test_admission_controller_invalid():
+    """Test AdmissionController rejects invalid limits."""
+
+    # Test that the constructor raises ValueError
+    with pytest.raises(ValueError, match="max_running"):
+        AdmissionController(max_running=0)
+    with pytest.raises(ValueError, match="max_queued"):
+        AdmissionController(max_queued=-1)
@@ -0,0 +1,152 @@
+import pytest
+
+from lec02.hw.common.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    get_circuit_breaker,
+    reset_circuit_breakers,
+)
+
+
+class FakeClock:
+    """Clock advanced by the tests."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _open_circuit(clock: FakeClock) -> CircuitBreaker:
+    """Returns a circuit opened by 2 failures out of 3 calls."""
+    breaker = CircuitBreaker(
+        "api", failure_rate=0.5, min_calls=3, open_seconds=10, clock=clock
+    )
+    for success in (True, False, False):
+        breaker.before_call()
+        if success:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+    return breaker
+
+
+def test_circuit_breaker_opens_on_failure_rate():
+    """Test the circuit opens once the failure rate is reached over min_calls."""
+
+    # Setup a circuit with one failure out of two calls, below min_calls
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "api", failure_rate=0.5, min_calls=3, open_seconds=10, clock=clock
+    )
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+    # Call function under test
+    breaker.record_failure()
+
+    # Assert calls are rejected with the remaining open time
+    assert breaker.state == OPEN
+    clock.now += 4
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == pytest.approx(6)
+    assert isinstance(excinfo.value, ConnectionError)
+
+
+def test_circuit_breaker_half_open_probe_closes():
+    """Test a half-open circuit admits one probe and closes when it succeeds."""
+
+    # Setup an open circuit past its open time
+    clock = FakeClock()
+    breaker = _open_circuit(clock)
+    clock.now += 10
+
+    # Call function under test
+    probe = breaker.before_call()
+
+    # Assert other calls wait for the probe, which closes the circuit
+    assert probe is not None
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+    assert breaker.before_call() is None
+
+
+def test_circuit_breaker_half_open_probe_reopens():
+    """Test a failed probe opens the circuit for another open time."""
+
+    # Setup a half-open circuit
+    clock = FakeClock()
+    breaker = _open_circuit(clock)
+    clock.now += 10
+    probe = breaker.before_call()
+
+    # Call function under test
+    breaker.record_failure(probe)
+
+    # Assert the circuit is open again
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.raise_if_open()
+
+
+def test_circuit_breaker_half_open_ignores_other_calls():
+    """Test only the probes of the current half-open period decide the circuit."""
+
+    # Setup a call admitted while closed, and a circuit turning half-open
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "api", failure_rate=0.5, min_calls=1, open_seconds=10, clock=clock
+    )
+    late_call = breaker.before_call()
+    breaker.before_call()
+    breaker.record_failure()
+    clock.now += 10
+    stale_probe = breaker.before_call()
+    breaker.record_failure(stale_probe)
+    clock.now += 10
+    probe = breaker.before_call()
+
+    # Call function under test with the calls admitted earlier
+    breaker.record_success(late_call)
+    breaker.record_failure(late_call)
+    breaker.record_success(stale_probe)
+
+    # Assert the circuit waits for its own probe
+    assert breaker.state == HALF_OPEN
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+
+
+def test_get_circuit_breaker_shared_by_name():
+    """Test get_circuit_breaker returns one circuit per endpoint."""
+
+    # Call function under test
+    reset_circuit_breakers()
+    try:
+        breaker = get_circuit_breaker("api", min_calls=2)
+
+        # Assert the same circuit is returned, keeping its settings
+        assert get_circuit_breaker("api") is breaker
+        assert breaker.min_calls == 2
+        assert get_circuit_breaker("other") is not breaker
+    finally:
+        reset_circuit_breakers()
+
+
+def test_circuit_breaker_invalid_settings():
+    """Test CircuitBreaker rejects invalid settings."""
+
+    # Test that the constructor raises ValueError
+    with pytest.raises(ValueError, match="failure_rate"):
+        CircuitBreaker("api", failure_rate=0)
+    with pytest.raises(ValueError, match="min_calls"):
+        CircuitBreaker("api", min_calls=30, window=20)
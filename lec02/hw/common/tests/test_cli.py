@@ -0,0 +1,52 @@
+import argparse
+
+import pytest
+
+from lec02.hw.common.cli import get_dates, get_default_root, positive_int
+
+
+def test_get_dates():
+    """Test get_dates lists a range with both ends, or a single date."""
+
+    # Call function under test
+    dates = get_dates("2022-08-30", "2022-09-02")
+    single = get_dates("2022-08-09")
+
+    # Assert the dates
+    assert dates == ["2022-08-30", "2022-08-31", "2022-09-01", "2022-09-02"]
+    assert single == ["2022-08-09"]
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date",
+    [("2022-08-10", "2022-08-09"), ("2022-13-01", None)],
+)
+def test_get_dates_invalid(start_date, end_date):
+    """Test get_dates rejects reversed ranges and invalid dates."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError):
+        get_dates(start_date, end_date)
+
+
+def test_get_default_root(monkeypatch):
+    """Test the default roots follow BASE_DIR and are unset without it."""
+
+    # Call function under test with and without BASE_DIR
+    monkeypatch.setenv("BASE_DIR", "/data")
+    raw_root = get_default_root("raw")
+    monkeypatch.delenv("BASE_DIR")
+    missing_root = get_default_root("raw")
+
+    # Assert the roots
+    assert raw_root == "/data/raw/sales"
+    assert missing_root is None
+
+
+@pytest.mark.parametrize("value", ["0", "-2", "two"])
+def test_positive_int_invalid(value):
+    """Test positive_int rejects anything but positive integers."""
+
+    # Test that the function raises ArgumentTypeError
+    with pytest.raises(argparse.ArgumentTypeError, match="not a positive integer"):
+        positive_int(value)
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from lec02.hw.common.dag import run_dag, validate_dag
+
+
+def _noop():
+    """Task doing nothing."""
+    return None
+
+
+def test_validate_dag_orders_tasks():
+    """Test validate_dag returns dependencies before their dependents."""
+
+    # Setup a diamond DAG
+    tasks = {
+        "d": (_noop, ["b", "c"]),
+        "b": (_noop, ["a"]),
+        "c": (_noop, ["a"]),
+        "a": (_noop, []),
+    }
+
+    # Call function under test
+    order = validate_dag(tasks)
+
+    # Assert topological order
+    assert order.index("a") < order.index("b") < order.index("d")
+    assert order.index("c") < order.index("d")
+
+
+@pytest.mark.parametrize(
+    "tasks, error",
+    [
+        ({"a": (_noop, ["x"])}, "Task a depends on unknown tasks"),
+        ({"a": (_noop, ["b"]), "b": (_noop, ["a"])}, "Tasks form a cycle"),
+    ],
+)
+def test_validate_dag_invalid(tasks, error):
+    """Test validate_dag rejects unknown dependencies and cycles."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        validate_dag(tasks)
+
+
+def test_run_dag_starts_dependents_on_completion():
+    """Test run_dag starts a task as soon as its own dependency completes."""
+
+    # Setup two chains, the first one with a slow head
+    events = []
+    lock = threading.Lock()
+
+    def step(name, seconds=0.0):
+        def run():
+            time.sleep(seconds)
+            with lock:
+                events.append(name)
+            return name
+
+        return run
+
+    tasks = {
+        "job1 a": (step("job1 a", 0.2), []),
+        "job2 a": (step("job2 a"), ["job1 a"]),
+        "job1 b": (step("job1 b"), []),
+        "job2 b": (step("job2 b"), ["job1 b"]),
+    }
+
+    # Call function under test
+    results = run_dag(tasks, max_parallel=2)
+
+    # Assert chain b completed without waiting for the slow chain a
+    assert events.index("job2 b") < events.index("job1 a")
+    assert all(outcome["status"] == "succeeded" for outcome in results.values())
+    assert results["job2 a"]["result"] == "job2 a"
+
+
+def test_run_dag_retries_and_skips():
+    """Test run_dag retries failing tasks and skips dependents of failures."""
+
+    # Setup a flaky task and a task that always fails
+    calls = {"flaky": 0}
+
+    def flaky():
+        calls["flaky"] += 1
+        if calls["flaky"] < 2:
+            raise ConnectionError("API down")
+
+    def broken():
+        raise RuntimeError("bad data")
+
+    tasks = {
+        "flaky": (flaky, []),
+        "after flaky": (_noop, ["flaky"]),
+        "broken": (broken, []),
+        "after broken": (_noop, ["broken"]),
+        "last": (_noop, ["after broken"]),
+    }
+
+    # Call function under test
+    results = run_dag(tasks, max_parallel=2, retries=1, retry_delay=0)
+
+    # Assert retried, failed and skipped tasks
+    assert results["flaky"]["status"] == "succeeded"
+    assert results["flaky"]["attempts"] == 2
+    assert results["after flaky"]["status"] == "succeeded"
+    assert results["broken"] == {
+        "status": "failed",
+        "attempts": 2,
+        "seconds": results["broken"]["seconds"],
+        "error": "bad data",
+    }
+    assert results["after broken"]["status"] == "skipped"
+    assert results["last"]["status"] == "skipped"
@@ -0,0 +1,189 @@
+import contextlib
+import io
+import json
+import logging
+import os
+import queue
+import sys
+from unittest import mock
+
+import pytest
+
+from lec02.hw.common.logging_setup import (
+    DeferredQueueHandler,
+    JsonFormatter,
+    LogSampler,
+    configure_logging,
+)
+
+
+@contextlib.contextmanager
+def _empty_root_logger():
+    """Empties the root logger, including pytest's capture handlers, for a test."""
+    root = logging.getLogger()
+    level = root.level
+    with mock.patch.object(root, "handlers", []):
+        try:
+            yield root
+        finally:
+            for handler in root.handlers:
+                handler.close()
+            root.setLevel(level)
+
+
+def test_json_formatter():
+    """Test JsonFormatter writes the message, extra fields and traceback as JSON."""
+
+    # Setup a record with an extra field and an exception
+    try:
+        raise ValueError("bad page")
+    except ValueError:
+        record = logging.makeLogRecord(
+            {
+                "name": "job",
+                "levelno": logging.ERROR,
+                "levelname": "ERROR",
+                "msg": "Page %d failed.",
+                "args": (3,),
+                "exc_info": sys.exc_info(),
+                "date": "2022-08-09",
+            }
+        )
+
+    # Call function under test
+    entry = json.loads(JsonFormatter().format(record))
+
+    # Assert the structured fields
+    assert entry["level"] == "ERROR"
+    assert entry["logger"] == "job"
+    assert entry["message"] == "Page 3 failed."
+    assert entry["date"] == "2022-08-09"
+    assert "ValueError: bad page" in entry["exc_info"]
+
+
+def test_deferred_queue_handler_keeps_immutable_args():
+    """Test DeferredQueueHandler defers formatting of immutable arguments only."""
+
+    # Setup a handler on a plain queue
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    logger = logging.getLogger("test_deferred_queue_handler")
+    logger.addHandler(handler)
+    logger.propagate = False
+    records = ["a"]
+
+    # Call function under test
+    try:
+        logger.warning("Saved %d records to %s.", 2, "sales_1.json")
+        logger.warning("Records: %s", records)
+        records.append("b")
+    finally:
+        logger.removeHandler(handler)
+
+    # Assert immutable arguments are kept, mutable ones formatted right away
+    deferred, formatted = log_queue.get(), log_queue.get()
+    assert deferred.args == (2, "sales_1.json")
+    assert deferred.getMessage() == "Saved 2 records to sales_1.json."
+    assert formatted.args is None
+    assert formatted.getMessage() == "Records: ['a']"
+
+
+def test_log_sampler():
+    """Test LogSampler logs a summary every N events."""
+
+    # Setup a sampler logging every 2 events
+    logger = mock.Mock()
+    sampler = LogSampler(logger, "Saved %d pages with %d records so far.", every=2)
+
+    # Call function under test
+    for records in (10, 20, 30, 40, 50):
+        sampler.tick(records)
+
+    # Assert the summaries
+    assert logger.info.call_args_list == [
+        mock.call("Saved %d pages with %d records so far.", 2, 20),
+        mock.call("Saved %d pages with %d records so far.", 4, 40),
+    ]
+
+
+def test_configure_logging_queue_json():
+    """Test configure_logging writes JSON records from a listener thread."""
+
+    # Setup an output stream for the console handler
+    stream = io.StringIO()
+
+    # Call function under test
+    with _empty_root_logger() as root, mock.patch(
+        "logging.StreamHandler", return_value=logging.StreamHandler(stream)
+    ):
+        listener = configure_logging(level="info", log_format="json", use_queue=True)
+        try:
+            logging.getLogger("job").info("Saved %d pages.", 5)
+            logging.getLogger("job").debug("Page %d saved.", 5)
+        finally:
+            listener.stop()
+        handlers = root.handlers[:]
+
+    # Assert the INFO record was written by the listener as JSON
+    assert [type(handler) for handler in handlers] == [DeferredQueueHandler]
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["message"] == "Saved 5 pages."
+
+
+def test_configure_logging_keeps_existing_handlers():
+    """Test configure_logging does nothing when the root logger has handlers."""
+
+    # Setup an existing handler
+    handler = logging.NullHandler()
+
+    # Call function under test
+    with _empty_root_logger() as root:
+        root.addHandler(handler)
+        listener = configure_logging(use_queue=True)
+        handlers = root.handlers[:]
+
+    # Assert nothing was configured
+    assert listener is None
+    assert handlers == [handler]
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"level": "LOUD"}, "Unsupported log level LOUD"),
+        ({"log_format": "xml"}, "Unsupported log format xml"),
+    ],
+)
+def test_configure_logging_invalid(options, error):
+    """Test configure_logging rejects unsupported levels and formats."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        configure_logging(**options)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="os.fork is not available")
+def test_configure_logging_queue_after_fork(tmp_path):
+    """Test a forked process, like a server worker, still writes queued records."""
+
+    # Setup a queued console handler writing to a file
+    log_path = tmp_path / "job.log"
+
+    # Call function under test, logging from a forked child
+    with open(log_path, "w") as stream, _empty_root_logger(), mock.patch(
+        "logging.StreamHandler", return_value=logging.StreamHandler(stream)
+    ):
+        listener = configure_logging(level="info", use_queue=True)
+        try:
+            pid = os.fork()
+            if pid == 0:
+                logging.getLogger("job").info("Logged from worker.")
+                listener.stop()
+                os._exit(0)
+            os.waitpid(pid, 0)
+        finally:
+            listener.stop()
+
+    # Assert the record of the child was written
+    assert "Logged from worker." in log_path.read_text()
@@ -0,0 +1,74 @@
+import tracemalloc
+
+import pytest
+
+from lec02.hw.common.memory_tracing import (
+    get_memory_report,
+    get_trace_top,
+    run_traced,
+)
+
+
+def _allocate(count: int) -> list:
+    """Small job function building a list of dicts, like a decoded page."""
+    return [{"client": f"Client {i}", "price": i} for i in range(count)]
+
+
+@pytest.mark.parametrize(
+    "input_data, headers, expected",
+    [
+        ({}, {}, None),
+        ({"trace_memory": True}, {}, 10),
+        ({"trace_memory": True, "trace_top": 3}, {}, 3),
+        ({}, {"X-Trace-Memory": "true"}, 10),
+    ],
+)
+def test_get_trace_top(input_data, headers, expected):
+    """Test get_trace_top reads the trace_memory field and header."""
+
+    # Assert the report size, None without tracing
+    assert get_trace_top(input_data, headers) == expected
+
+
+def test_get_trace_top_invalid():
+    """Test get_trace_top rejects a non-boolean trace_memory parameter."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match="'trace_memory' must be a boolean"):
+        get_trace_top({"trace_memory": 1}, {})
+
+
+def test_run_traced():
+    """Test run_traced reports the allocation sites of the run."""
+
+    # Call function under test
+    result, report = run_traced(_allocate, 5, count=20000)
+
+    # Assert result, peak and that the list of dicts is the top site
+    assert len(result) == 20000
+    assert report["peak_mb"] >= report["retained_mb"] > 1
+    assert len(report["top_by_size"]) <= 5
+    assert "test_memory_tracing.py" in report["top_by_size"][0]["site"]
+    assert report["top_by_count"][0]["count"] >= 20000
+    assert not tracemalloc.is_tracing()
+
+    # Assert the report is kept for the /debug/memory endpoint
+    assert get_memory_report()["last_run"] == report
+
+
+def test_get_memory_report_while_tracing():
+    """Test get_memory_report adds live allocation sites while tracing."""
+
+    # Setup tracing started outside of run_traced
+    tracemalloc.start()
+    try:
+        pages = _allocate(1000)
+        report = get_memory_report(3)
+    finally:
+        tracemalloc.stop()
+
+    # Assert live traced memory and sites
+    assert report["tracing"] is True
+    assert report["current_mb"] > 0
+    assert len(report["top_by_size"]) == 3
+    assert pages
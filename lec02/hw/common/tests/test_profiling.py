@@ -0,0 +1,130 @@
+import pstats
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from lec02.hw.common.profiling import (
+    PROFILE_FILENAME,
+    get_profile_top,
+    run_profiled,
+)
+from lec02.hw.common.storage import MemoryStorage
+
+
+def _job(count: int, storage=None) -> int:
+    """Small job function to profile."""
+    return sum(sorted(range(count)))
+
+
+@pytest.mark.parametrize(
+    "input_data, headers, expected",
+    [
+        ({}, {}, None),
+        ({"profile": False}, {}, None),
+        ({"profile": True}, {}, 20),
+        ({"profile": True, "profile_top": 5}, {}, 5),
+        ({}, {"X-Profile": "1"}, 20),
+        ({}, {"X-Profile": "no"}, None),
+    ],
+)
+def test_get_profile_top(input_data, headers, expected):
+    """Test get_profile_top reads the profile field and header."""
+
+    # Assert the summary size, None without profiling
+    assert get_profile_top(input_data, headers) == expected
+
+
+@pytest.mark.parametrize(
+    "input_data, error",
+    [
+        ({"profile": "yes"}, "Parameter 'profile' must be a boolean."),
+        ({"profile_top": 0}, "Parameter 'profile_top' must be an integer >= 1."),
+    ],
+)
+def test_get_profile_top_invalid(input_data, error):
+    """Test get_profile_top rejects invalid parameters."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        get_profile_top(input_data, {})
+
+
+def test_run_profiled(tmp_path):
+    """Test run_profiled returns the result and saves a readable pstats dump."""
+
+    # Call function under test
+    result, profile = run_profiled(_job, str(tmp_path), 3, count=1000)
+
+    # Assert result, summary and dump
+    assert result == sum(range(1000))
+    assert profile["file"] == str(tmp_path / PROFILE_FILENAME)
+    assert 1 <= len(profile["top"]) <= 3
+    assert profile["top"][0]["cumtime"] >= profile["top"][-1]["cumtime"]
+    assert any("_job" in row["function"] for row in profile["top"])
+    assert pstats.Stats(profile["file"]).total_calls > 0
+
+
+def test_run_profiled_storage_and_error():
+    """Test run_profiled writes through the job storage, also when it fails."""
+
+    # Setup a job failing after some work
+    storage = MemoryStorage()
+
+    def failing_job(storage):
+        _job(100)
+        raise ValueError("boom")
+
+    # Test that the error is re-raised
+    with pytest.raises(ValueError, match="boom"):
+        run_profiled(failing_job, "stg", storage=storage)
+
+    # Assert the profile was saved to the backend
+    assert storage.exists(f"stg/{PROFILE_FILENAME}")
+
+
+@mock.patch("lec02.hw.common.profiling.logger.warning")
+def test_run_profiled_error_not_masked_by_save(mock_logger_warning):
+    """Test run_profiled re-raises the job error when its profile cannot be saved."""
+
+    # Setup a failing job and a backend failing too
+    storage = mock.Mock()
+    storage.write_bytes.side_effect = OSError("Disk full")
+
+    def failing_job(storage):
+        raise ValueError("boom")
+
+    # Test that the error of the job is re-raised, not the save error
+    with pytest.raises(ValueError, match="boom"):
+        run_profiled(failing_job, "stg", storage=storage)
+
+    # Assert the save failure was logged
+    mock_logger_warning.assert_called_once()
+
+
+def test_run_profiled_serializes_runs(tmp_path):
+    """Test concurrent run_profiled calls never overlap."""
+
+    # Setup a job recording how many runs are active
+    active = []
+    overlaps = []
+
+    def slow_job(storage=None):
+        active.append(1)
+        overlaps.append(len(active))
+        time.sleep(0.05)
+        active.pop()
+
+    # Call function under test from several threads
+    threads = [
+        threading.Thread(target=run_profiled, args=(slow_job, str(tmp_path)))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert the runs were serialized
+    assert overlaps == [1, 1, 1]
@@ -0,0 +1,205 @@
+from unittest import mock
+
+import pytest
+from flask import Flask
+
+from lec02.hw.common.serving import (
+    get_server_name,
+    register_warm_up,
+    serve,
+    warm_up_app,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_registered_warm_ups(monkeypatch):
+    """Isolates the tests from the warm-ups registered by imported jobs."""
+    monkeypatch.setattr("lec02.hw.common.serving._warm_ups", [])
+
+
+def _make_app(calls):
+    """Creates an app with a cheap route counting its requests."""
+    app = Flask(__name__)
+
+    @app.route("/debug/queue")
+    def debug_queue():
+        calls.append("/debug/queue")
+        return {}, 200
+
+    return app
+
+
+@pytest.mark.parametrize(
+    "installed, expected",
+    [
+        ({"gunicorn", "waitress"}, "gunicorn"),
+        ({"waitress"}, "waitress"),
+        (set(), "werkzeug"),
+    ],
+)
+def test_get_server_name_auto(installed, expected, monkeypatch):
+    """Test auto picks the first installed production server, else werkzeug."""
+
+    # Setup the installed servers
+    monkeypatch.delenv("JOB_SERVER", raising=False)
+    find_spec = lambda name: object() if name in installed else None
+
+    # Call function under test
+    with mock.patch("importlib.util.find_spec", side_effect=find_spec):
+        name = get_server_name()
+
+    # Assert the chosen server
+    assert name == expected
+
+
+def test_get_server_name_invalid(monkeypatch):
+    """Test unknown and missing servers are rejected."""
+
+    # Setup no production server installed
+    monkeypatch.setenv("JOB_SERVER", "gunicorn")
+
+    # Test that the function raises for a missing and an unknown server
+    with mock.patch("importlib.util.find_spec", return_value=None):
+        with pytest.raises(ImportError, match="pip install gunicorn"):
+            get_server_name()
+    with pytest.raises(ValueError, match="Unsupported server uwsgi"):
+        get_server_name("uwsgi")
+
+
+def test_warm_up_app():
+    """Test warm_up_app requests the routed paths and skips the others."""
+
+    # Setup an app with the queue route only
+    calls = []
+    app = _make_app(calls)
+
+    # Call function under test
+    warm_up_app(app, paths=("/debug/queue", "/debug/memory"))
+
+    # Assert the routed path was requested once
+    assert calls == ["/debug/queue"]
+
+
+def test_serve_werkzeug_warms_up(monkeypatch):
+    """Test serve warms up the process before running the threaded server."""
+
+    # Setup the environment of the server
+    monkeypatch.setenv("JOB_PORT", "9091")
+    monkeypatch.delenv("JOB_THREADS", raising=False)
+    calls = []
+    app = _make_app(calls)
+    warm_up = mock.Mock(side_effect=lambda: calls.append("warm_up"))
+
+    # Call function under test
+    with mock.patch("werkzeug.serving.run_simple") as mock_run_simple:
+        serve(app, port=8081, server="werkzeug", warm_up=warm_up)
+
+    # Assert the pools and the app were warmed up before serving
+    assert calls == ["warm_up", "/debug/queue"]
+    mock_run_simple.assert_called_once_with("0.0.0.0", 9091, app, threaded=True)
+
+
+def test_serve_runs_registered_warm_ups(monkeypatch):
+    """Test serve runs the registered warm-ups once each, before warm_up."""
+
+    # Setup the environment of the server and the registered warm-up
+    monkeypatch.delenv("JOB_PORT", raising=False)
+    calls = []
+    app = _make_app(calls)
+    registered = mock.Mock(side_effect=lambda: calls.append("registered"))
+    assert register_warm_up(registered) is registered
+    register_warm_up(registered)
+
+    # Call function under test
+    with mock.patch("werkzeug.serving.run_simple"):
+        serve(
+            app,
+            port=8081,
+            server="werkzeug",
+            warm_up=lambda: calls.append("warm_up"),
+        )
+
+    # Assert every warm-up ran before the app was requested
+    assert calls == ["registered", "warm_up", "/debug/queue"]
+
+
+def test_serve_dev(monkeypatch):
+    """Test the dev server is Flask's debug server, without warm-up."""
+
+    # Setup the environment of the server
+    monkeypatch.delenv("JOB_PORT", raising=False)
+    app = mock.Mock()
+    warm_up = mock.Mock()
+
+    # Call function under test
+    serve(app, port=8082, server="dev", warm_up=warm_up)
+
+    # Assert the debug server was run
+    app.run.assert_called_once_with(debug=True, host="0.0.0.0", port=8082)
+    warm_up.assert_not_called()
+
+
+def test_serve_invalid_threads(monkeypatch):
+    """Test serve rejects a non-positive number of threads."""
+
+    # Setup an invalid environment
+    monkeypatch.setenv("JOB_THREADS", "0")
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match="must be positive"):
+        serve(mock.Mock(), port=8081, server="werkzeug")
+
+
+def test_serve_gunicorn_preloads_and_warms_up_workers(monkeypatch):
+    """Test gunicorn runs preloaded gthread workers warmed up after the fork."""
+
+    # Setup gunicorn, skipped where it is not installed
+    pytest.importorskip("gunicorn")
+    for name in ("JOB_PORT", "JOB_WORKERS", "JOB_THREADS"):
+        monkeypatch.delenv(name, raising=False)
+    calls = []
+    app = _make_app(calls)
+    warm_up = mock.Mock()
+
+    # Call function under test
+    with mock.patch("gunicorn.app.base.BaseApplication.run", autospec=True) as mock_run:
+        serve(app, port=8081, server="gunicorn", workers=3, threads=4, warm_up=warm_up)
+    application = mock_run.call_args.args[0]
+    application.cfg.post_fork(None, None)
+
+    # Assert the settings, the app and the worker warm-up
+    assert application.cfg.workers == 3
+    assert application.cfg.threads == 4
+    assert application.cfg.preload_app is True
+    assert application.load() is app
+    warm_up.assert_called_once_with()
+    assert calls == ["/debug/queue"]
+
+
+def test_get_server_name_auto_fallback_warns(monkeypatch, caplog):
+    """Test auto warns when it falls back to werkzeug."""
+
+    # Setup no production server installed
+    monkeypatch.delenv("JOB_SERVER", raising=False)
+
+    # Call function under test
+    with mock.patch("importlib.util.find_spec", return_value=None):
+        with caplog.at_level("WARNING", logger="lec02.hw.common.serving"):
+            name = get_server_name()
+
+    # Assert the fallback was reported
+    assert name == "werkzeug"
+    assert "pip install -r requirements.txt" in caplog.text
+
+
+def test_serve_single_worker_rejects_workers(monkeypatch):
+    """Test serve refuses several workers for apps with per-process state."""
+
+    # Setup two workers in the environment
+    monkeypatch.setenv("JOB_WORKERS", "2")
+
+    # Test that the function raises ValueError before serving
+    with mock.patch("werkzeug.serving.run_simple") as mock_run_simple:
+        with pytest.raises(ValueError, match="run a single worker"):
+            serve(mock.Mock(), port=8081, server="werkzeug", single_worker=True)
+    mock_run_simple.assert_not_called()
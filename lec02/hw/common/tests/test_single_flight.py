@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+from lec02.hw.common.single_flight import SingleFlight, make_request_key
+
+
+class FakeClock:
+    """Clock advanced by the tests."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _run_concurrently(flight, key, func, count):
+    """Calls flight.do from several threads once func is running."""
+    outcomes = []
+    lock = threading.Lock()
+
+    def call():
+        try:
+            outcome = flight.do(key, func)
+        except Exception as e:
+            outcome = e
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test concurrent calls for a key run the job once and share its result."""
+
+    # Setup a job blocked until all requests are attached
+    flight = SingleFlight(result_ttl=0)
+    release = threading.Event()
+    calls = []
+
+    def job():
+        calls.append(1)
+        release.wait(5)
+        return {"records": 3}
+
+    # Call function under test from three threads
+    threads, outcomes = _run_concurrently(flight, "job1 2022-08-09", job, 3)
+    while flight.coalesced < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    # Assert one run, one leader and two attached requests
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in outcomes) == [False, True, True]
+    assert all(result == {"records": 3} for result, _ in outcomes)
+
+
+def test_single_flight_shares_errors_without_caching():
+    """Test attached calls get the error of the job, which is not cached."""
+
+    # Setup a failing job blocked until the second request is attached
+    flight = SingleFlight(result_ttl=60)
+    release = threading.Event()
+
+    def job():
+        release.wait(5)
+        raise ConnectionError("API down")
+
+    # Call function under test from two threads
+    threads, outcomes = _run_concurrently(flight, "key", job, 2)
+    while flight.coalesced < 1:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    # Assert both requests failed and the next one runs the job again
+    assert [str(outcome) for outcome in outcomes] == ["API down", "API down"]
+    assert flight.do("key", lambda: "ok") == ("ok", False)
+
+
+def test_single_flight_result_ttl():
+    """Test a result is served from the cache until it expires."""
+
+    # Setup a coalescer with a 5 second result cache
+    clock = FakeClock()
+    flight = SingleFlight(result_ttl=5, clock=clock)
+    runs = iter(range(10))
+
+    # Call function under test
+    first = flight.do("key", lambda: next(runs))
+    clock.now += 4
+    cached = flight.do("key", lambda: next(runs))
+    clock.now += 2
+    expired = flight.do("key", lambda: next(runs))
+
+    # Assert the second call was served from the cache
+    assert (first, cached, expired) == ((0, False), (0, True), (1, False))
+
+
+def test_make_request_key():
+    """Test make_request_key normalizes paths and ignores unset parameters."""
+
+    # Call function under test
+    key = make_request_key(
+        "job1",
+        {"raw_dir": "raw/sales/2022-08-09/", "date": "2022-08-09", "storage": None},
+        path_fields=("raw_dir",),
+    )
+
+    # Assert identical requests share the key and others do not
+    assert key == make_request_key(
+        "job1",
+        {"date": "2022-08-09", "raw_dir": "raw/sales/./2022-08-09"},
+        path_fields=("raw_dir",),
+    )
+    assert key != make_request_key(
+        "job1", {"date": "2022-08-10", "raw_dir": "raw/sales/2022-08-09"}
+    )
+
+
+def test_single_flight_invalid_ttl():
+    """Test SingleFlight rejects a negative result_ttl."""
+
+    # Test that the constructor raises ValueError
+    with pytest.raises(ValueError, match="result_ttl"):
+        SingleFlight(result_ttl=-1)
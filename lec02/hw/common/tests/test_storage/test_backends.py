@@ -0,0 +1,189 @@
+import os
+
+import pytest
+
+from lec02.hw.common.storage import (
+    clear_memory_stores,
+    get_storage,
+    LocalStorage,
+    MemoryStorage,
+    S3Storage,
+)
+from lec02.hw.common.storage import base
+from lec02.hw.common.storage.base import get_part_ranges
+
+
+@pytest.fixture(params=["local", "memory", "s3"])
+def storage(request, tmp_path):
+    """Backend under test; S3 runs against moto's in-process S3 stand-in."""
+    if request.param == "local":
+        yield LocalStorage(str(tmp_path / "store"))
+    elif request.param == "memory":
+        yield MemoryStorage()
+    else:
+        boto3 = pytest.importorskip("boto3")
+        moto = pytest.importorskip("moto")
+        with moto.mock_aws():
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket="sales")
+            yield S3Storage("sales", prefix="zones", client=client, part_size=5 << 20)
+
+
+def test_write_read_and_list(storage):
+    """Test backends store objects atomically and list them by prefix."""
+
+    # Call functions under test
+    storage.write_bytes("raw/2022-08-09/sales_1.json", b"[1]")
+    with storage.open_write("raw/2022-08-09/sales_2.json") as stream:
+        stream.write(b"[2]")
+    storage.write_bytes("raw/2022-08-10/sales_1.json", b"[3]")
+
+    # Assert listing and content
+    assert storage.list("raw/2022-08-09") == [
+        "raw/2022-08-09/sales_1.json",
+        "raw/2022-08-09/sales_2.json",
+    ]
+    assert len(storage.list("raw/")) == 3
+    assert storage.list("stg") == []
+    with storage.open_read("raw/2022-08-09/sales_2.json") as stream:
+        assert stream.read() == b"[2]"
+    assert storage.exists("raw/2022-08-10/sales_1.json")
+    assert not storage.exists("raw/2022-08-10/sales_2.json")
+
+
+def test_open_write_failure_publishes_nothing(storage):
+    """Test a write interrupted by an error leaves no object behind."""
+
+    # Call function under test with a failing block
+    with pytest.raises(RuntimeError):
+        with storage.open_write("raw/sales_1.json") as stream:
+            stream.write(b"partial")
+            raise RuntimeError("interrupted")
+
+    # Assert nothing was published
+    assert storage.list("raw") == []
+
+
+def test_open_read_missing(storage):
+    """Test reading a missing object raises FileNotFoundError."""
+
+    # Test that the function raises FileNotFoundError
+    with pytest.raises(FileNotFoundError):
+        storage.open_read("raw/missing.json")
+
+
+def test_delete_prefix(storage):
+    """Test delete_prefix removes every object under a prefix only."""
+
+    # Setup objects
+    storage.write_bytes("raw/2022-08-09/sales_1.json", b"1")
+    storage.write_bytes("raw/2022-08-09/sales_2.json", b"2")
+    storage.write_bytes("raw/2022-08-09x/sales_1.json", b"3")
+
+    # Call function under test
+    deleted = storage.delete_prefix("raw/2022-08-09")
+
+    # Assert only the prefix was deleted
+    assert deleted == 2
+    assert storage.list("raw") == ["raw/2022-08-09x/sales_1.json"]
+    assert storage.delete_prefix("raw/2022-08-09") == 0
+
+
+def test_upload_file(storage, tmp_path):
+    """Test upload_file uploads a file in parallel parts, reassembled in order."""
+
+    # Setup file spanning several parts
+    data = os.urandom(5 << 20) + os.urandom(5 << 20) + b"tail"
+    filepath = tmp_path / "upload.bin"
+    filepath.write_bytes(data)
+
+    # Call function under test
+    parts = storage.upload_file("stg/upload.bin", str(filepath), part_size=5 << 20)
+
+    # Assert parts and content
+    assert parts == 3
+    assert storage.read_bytes("stg/upload.bin") == data
+
+
+def test_directory_helpers(storage):
+    """Test is_dir, list_dir and make_dirs behave like their os counterparts."""
+
+    # Setup objects
+    storage.write_bytes("raw/2022-08-09/sales_1.json", b"1")
+    storage.write_bytes("raw/2022-08-09/nested/sales_2.json", b"2")
+
+    # Call function under test
+    storage.make_dirs("stg/2022-08-09")
+
+    # Assert only direct children are listed
+    assert storage.is_dir("raw/2022-08-09")
+    assert not storage.is_dir("raw/2022-08-10")
+    names = storage.list_dir("raw/2022-08-09")
+    assert "sales_1.json" in names
+    assert "nested/sales_2.json" not in names
+
+
+def test_open_local_write(storage, monkeypatch):
+    """Test open_local_write publishes a local file, in parts past one part."""
+
+    # Setup a tiny part size and record the parallel uploads
+    monkeypatch.setattr(base, "DEFAULT_PART_SIZE", 4)
+    uploads = []
+    upload_file = storage.upload_file
+    monkeypatch.setattr(
+        storage,
+        "upload_file",
+        lambda key, filepath: uploads.append(key) or upload_file(key, filepath),
+    )
+
+    # Call function under test
+    with storage.open_local_write("stg/small.avro") as path:
+        with open(path, "wb") as f:
+            f.write(b"abc")
+    with storage.open_local_write("stg/large.avro") as path:
+        with open(path, "wb") as f:
+            f.write(b"0123456789")
+    with pytest.raises(RuntimeError):
+        with storage.open_local_write("stg/failed.avro") as path:
+            raise RuntimeError("interrupted")
+
+    # Assert content, and that the failed write published nothing
+    assert storage.list("stg") == ["stg/large.avro", "stg/small.avro"]
+    assert storage.read_bytes("stg/small.avro") == b"abc"
+    assert storage.read_bytes("stg/large.avro") == b"0123456789"
+    assert not os.path.exists(path)
+
+    # Assert the local disk renames instead of uploading
+    expected = [] if isinstance(storage, LocalStorage) else ["stg/large.avro"]
+    assert uploads == expected
+
+
+def test_get_part_ranges():
+    """Test get_part_ranges covers a file with consecutive parts."""
+
+    # Assert part ranges
+    assert get_part_ranges(10, 4) == [(1, 0, 4), (2, 4, 4), (3, 8, 2)]
+    assert get_part_ranges(0, 4) == [(1, 0, 0)]
+
+
+def test_get_storage(tmp_path):
+    """Test get_storage selects the backend of a URL."""
+
+    # Assert backends per scheme
+    assert isinstance(get_storage(None), LocalStorage)
+    local = get_storage(f"file://{tmp_path}")
+    assert isinstance(local, LocalStorage) and local.root == str(tmp_path)
+    bench = get_storage("memory://bench")
+    assert get_storage("memory://bench") is bench
+    assert get_storage("memory://other") is not bench
+
+    # Assert evicted stores are replaced by new, empty ones
+    bench.write_bytes("raw/sales.json", b"[]")
+    clear_memory_stores("bench")
+    assert get_storage("memory://bench") is not bench
+    assert get_storage("memory://bench").list("raw") == []
+    clear_memory_stores()
+
+    # Test that an unsupported scheme raises ValueError
+    with pytest.raises(ValueError, match="Unsupported storage URL"):
+        get_storage("ftp://host/path")
@@ -0,0 +1,86 @@
+from unittest import mock
+
+import pytest
+
+from lec02.hw.common.storage import s3
+from lec02.hw.common.storage.s3 import S3Storage
+
+
+class _ClientError(Exception):
+    """Error shaped like botocore's ClientError."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+def test_list_follows_continuation_tokens():
+    """Test list requests every page of a truncated listing."""
+
+    # Setup client returning two pages
+    client = mock.Mock()
+    client.list_objects_v2.side_effect = [
+        {
+            "Contents": [{"Key": "zones/raw/b.json"}],
+            "IsTruncated": True,
+            "NextContinuationToken": "token",
+        },
+        {"Contents": [{"Key": "zones/raw/a.json"}], "IsTruncated": False},
+    ]
+    storage = S3Storage("sales", prefix="zones", client=client)
+
+    # Call function under test
+    result = storage.list("raw")
+
+    # Assert keys and requests
+    assert result == ["raw/a.json", "raw/b.json"]
+    client.list_objects_v2.assert_has_calls(
+        [
+            mock.call(Bucket="sales", Prefix="zones/raw/"),
+            mock.call(Bucket="sales", Prefix="zones/raw/", ContinuationToken="token"),
+        ]
+    )
+
+
+def test_open_read_not_found():
+    """Test open_read maps a NoSuchKey error to FileNotFoundError."""
+
+    # Setup client without the object
+    client = mock.Mock()
+    client.get_object.side_effect = _ClientError("NoSuchKey")
+    storage = S3Storage("sales", client=client)
+
+    # Test that the function raises FileNotFoundError
+    with pytest.raises(FileNotFoundError, match="Object raw/a.json not found"):
+        storage.open_read("raw/a.json")
+
+
+def test_upload_file_aborts_on_failed_part(tmp_path):
+    """Test upload_file aborts the multipart upload when a part fails."""
+
+    # Setup client failing the second part
+    client = mock.Mock()
+    client.create_multipart_upload.return_value = {"UploadId": "upload"}
+    client.upload_part.side_effect = [{"ETag": "1"}, OSError("connection reset")]
+    filepath = tmp_path / "upload.bin"
+    filepath.write_bytes(b"x" * 10)
+    storage = S3Storage("sales", client=client)
+
+    # Test that the function raises IOError
+    with pytest.raises(IOError, match="connection reset"):
+        storage.upload_file("stg/upload.bin", str(filepath), part_size=5, max_workers=1)
+
+    # Assert upload was aborted, not completed
+    client.abort_multipart_upload.assert_called_once_with(
+        Bucket="sales", Key="stg/upload.bin", UploadId="upload"
+    )
+    client.complete_multipart_upload.assert_not_called()
+
+
+def test_s3_storage_requires_boto3():
+    """Test S3Storage explains how to install boto3 when it is missing."""
+
+    # Test that the constructor raises ImportError
+    with mock.patch.object(s3, "boto3", None):
+        with pytest.raises(ImportError, match="pip install boto3"):
+            S3Storage("sales")
@@ -0,0 +1,156 @@
+"""
+Runs Job1 in-process, without the Flask server:
+
+    python -m lec02.hw.job1 2022-08-01 2022-08-31 --parallel 4
+
+The pages of every date are saved under --raw-root/<date>, and a JSON report
+with the pages, records and seconds of every date is written to stdout.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from lec02.hw.common.cli import get_dates, get_default_root, positive_int, print_report
+from lec02.hw.common.logging_setup import configure_logging
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command line of Job1.
+
+    Args:
+        argv (List[str] | None): Arguments, sys.argv[1:] if None
+
+    Returns:
+        argparse.Namespace: The arguments, with the dates of the range
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m lec02.hw.job1",
+        description="Fetch the sales of a date range from the API and save "
+        "them as JSON pages, one directory per date.",
+    )
+    parser.add_argument("start_date", help="First date (YYYY-MM-DD)")
+    parser.add_argument("end_date", nargs="?", help="Last date, start_date if omitted")
+    parser.add_argument(
+        "--raw-root",
+        default=get_default_root("raw"),
+        help="Directory of the date directories, BASE_DIR/raw/sales by default",
+    )
+    parser.add_argument(
+        "--raw-dir",
+        help="Directory of the pages of a single date, instead of --raw-root",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=positive_int,
+        default=1,
+        help="Dates fetched at once (default: 1)",
+    )
+    parser.add_argument(
+        "--storage", help="Storage URL to save to instead of the local disk"
+    )
+    parser.add_argument(
+        "--run-id", help="Identifier written to the _SUCCESS marker of every date"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        args.dates = get_dates(args.start_date, args.end_date)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.raw_dir and len(args.dates) > 1:
+        parser.error("--raw-dir requires a single date, use --raw-root for a range.")
+    if not args.raw_dir and not args.raw_root:
+        parser.error("--raw-root is required when BASE_DIR is not set.")
+    return args
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Saves the sales of every date, the dates being independent of each other.
+
+    Args:
+        args (argparse.Namespace): Arguments of parse_args
+
+    Returns:
+        Dict[str, Any]: Report with the status, pages, records and seconds of
+        every date, or the error of a failed one
+
+    Raises:
+        ValueError: If the storage URL is invalid
+    """
+    # Imported here, so parsing the arguments stays fast
+    from lec02.hw.common.storage import get_storage
+    from lec02.hw.job1.bll.sales_api import save_sales_to_local_disk
+
+    # Only pass the backend when one is selected
+    job_options: Dict[str, Any] = {}
+    if args.storage:
+        try:
+            job_options["storage"] = get_storage(args.storage)
+        except (ValueError, ImportError) as e:
+            raise ValueError(f"Invalid 'storage' parameter: {e}") from e
+    if args.run_id:
+        job_options["run_id"] = args.run_id
+
+    def run_date(date: str) -> Dict[str, Any]:
+        raw_dir = args.raw_dir or os.path.join(args.raw_root, date)
+        start = time.perf_counter()
+        try:
+            report = save_sales_to_local_disk(date=date, raw_dir=raw_dir, **job_options)
+            outcome = {"status": "succeeded", "raw_dir": raw_dir, **report}
+        except (ValueError, ConnectionError, OSError, TypeError) as e:
+            logger.error(f"Job1 failed for {date}: {e}")
+            outcome = {"status": "failed", "raw_dir": raw_dir, "error": str(e)}
+        outcome["seconds"] = round(time.perf_counter() - start, 3)
+        return outcome
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+        outcomes = dict(zip(args.dates, executor.map(run_date, args.dates)))
+
+    return {
+        "job": "job1",
+        "status": (
+            "succeeded"
+            if all(outcome["status"] == "succeeded" for outcome in outcomes.values())
+            else "failed"
+        ),
+        "dates": outcomes,
+        "pages": sum(outcome.get("pages", 0) for outcome in outcomes.values()),
+        "records": sum(outcome.get("records", 0) for outcome in outcomes.values()),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    Runs Job1 from the command line.
+
+    Returns:
+        int: Exit status, 1 if any date failed
+    """
+    args = parse_args(argv)
+
+    # Logs go to stderr, the report to stdout, see LOG_* variables
+    configure_logging()
+
+    try:
+        report = run(args)
+    except ValueError as e:
+        logger.error(str(e))
+        report = {"job": "job1", "status": "failed", "error": str(e)}
+    print_report(report)
+    return 0 if report["status"] == "succeeded" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import datetime
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from lec02.hw.job1.dal import local_disk
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+# Number of pages written by one worker task
+PAGES_PER_TASK: int = 8
+
+# Default shape of a generated dataset, close to the API pages
+DEFAULT_GENERATOR_OPTIONS: Dict[str, Any] = {
+    "clients": 5000,
+    "products": 200,
+    "skew": 1.1,
+    "null_rate": 0.0,
+    "float_rate": 0.5,
+    "min_price": 100,
+    "max_price": 3000,
+}
+
+
+def build_zipf_cdf(cardinality: int, skew: float) -> np.ndarray:
+    """
+    Builds the cumulative distribution of a finite Zipf law.
+
+    Args:
+        cardinality (int): Number of distinct values
+        skew (float): Zipf exponent, 0 for a uniform distribution
+
+    Returns:
+        np.ndarray: Cumulative probability of every rank, the last being 1
+    """
+    weights = 1.0 / np.arange(1, cardinality + 1, dtype=np.float64) ** skew
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def generate_sales_page(
+    rng: np.random.Generator,
+    date: str,
+    page_size: int,
+    client_cdf: np.ndarray,
+    product_cdf: np.ndarray,
+    null_rate: float,
+    float_rate: float,
+    min_price: int,
+    max_price: int,
+) -> List[Dict[str, Any]]:
+    """
+    Generates a page of sales records shaped like the API responses.
+
+    Clients and products are drawn from Zipf distributions, so a few of them
+    dominate like in real sales. Prices are ints, or floats with cents for a
+    float_rate share of the records, matching the ["int", "float", "null"]
+    price of SALES_AVRO_SCHEMA. Every field is null with probability null_rate.
+
+    Args:
+        rng (np.random.Generator): Random generator of the page
+        date (str): Purchase date of the records (YYYY-MM-DD)
+        page_size (int): Number of records
+        client_cdf (np.ndarray): Cumulative distribution of the client ranks
+        product_cdf (np.ndarray): Cumulative distribution of the product ranks
+        null_rate (float): Probability of a null value, per field
+        float_rate (float): Probability of a float price
+        min_price (int): Lowest price
+        max_price (int): Highest price
+
+    Returns:
+        List[Dict[str, Any]]: Records with client, purchase_date, product and price
+    """
+    clients = np.searchsorted(client_cdf, rng.random(page_size)).tolist()
+    products = np.searchsorted(product_cdf, rng.random(page_size)).tolist()
+    prices = rng.integers(min_price, max_price + 1, page_size)
+    cents = rng.integers(1, 100, page_size)
+    is_float = (rng.random(page_size) < float_rate).tolist()
+    is_null = (rng.random((page_size, 4)) < null_rate).tolist()
+
+    records = []
+    for i, (price, cent) in enumerate(zip(prices.tolist(), cents.tolist())):
+        client_null, date_null, product_null, price_null = is_null[i]
+        if is_float[i]:
+            price += cent / 100
+        records.append(
+            {
+                "client": None if client_null else f"Client {clients[i] + 1}",
+                "purchase_date": None if date_null else date,
+                "product": None if product_null else f"Product {products[i] + 1}",
+                "price": None if price_null else price,
+            }
+        )
+    return records
+
+
+def _write_pages(
+    raw_dir: str,
+    date: str,
+    first_page: int,
+    last_page: int,
+    page_size: int,
+    seed: int,
+    options: Dict[str, Any],
+) -> Tuple[List[str], int]:
+    """Generates and saves a range of pages of a date, in a worker process."""
+    client_cdf = build_zipf_cdf(options["clients"], options["skew"])
+    product_cdf = build_zipf_cdf(options["products"], options["skew"])
+    day = datetime.date.fromisoformat(date).toordinal()
+
+    filenames = []
+    records_count = 0
+    for page in range(first_page, last_page + 1):
+        # Seed every page on its own, so the data does not depend on workers
+        rng = np.random.default_rng([seed, day, page])
+        page_data = generate_sales_page(
+            rng,
+            date,
+            page_size,
+            client_cdf,
+            product_cdf,
+            options["null_rate"],
+            options["float_rate"],
+            options["min_price"],
+            options["max_price"],
+        )
+        filename = f"sales_{date}_{page}.json"
+        local_disk.save_page_to_disk(page_data, dir_path=raw_dir, filename=filename)
+        filenames.append(filename)
+        records_count += len(page_data)
+    return filenames, records_count
+
+
+def _validate_generator_options(
+    days: int, pages: int, page_size: int, options: Dict[str, Any]
+) -> None:
+    """Raises ValueError if the shape of the dataset is invalid."""
+    for name, value in (
+        ("days", days),
+        ("pages", pages),
+        ("page_size", page_size),
+        ("clients", options["clients"]),
+        ("products", options["products"]),
+    ):
+        if value < 1:
+            raise ValueError(f"{name} must be positive.")
+    if options["skew"] < 0:
+        raise ValueError("skew must not be negative.")
+    for name in ("null_rate", "float_rate"):
+        if not 0 <= options[name] <= 1:
+            raise ValueError(f"{name} must be between 0 and 1.")
+    if not 0 <= options["min_price"] <= options["max_price"]:
+        raise ValueError("min_price must be between 0 and max_price.")
+
+
+def generate_sales_data(
+    raw_root: str,
+    start_date: str,
+    days: int = 1,
+    pages: int = 10,
+    page_size: int = 1000,
+    workers: int | None = None,
+    seed: int = 42,
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    Writes synthetic raw sales partitions for load and scale testing.
+
+    Every date gets a raw_root/<date> directory with pages and a _SUCCESS
+    marker written by the local_disk functions, so the files are the same
+    as the ones of save_sales_to_local_disk. Pages are generated in worker
+    processes, and the data only depends on seed, not on workers.
+
+    Args:
+        raw_root (str): Root of the raw date directories, e.g. BASE_DIR/raw/sales
+        start_date (str): First date (YYYY-MM-DD)
+        days (int): Number of consecutive dates
+        pages (int): Number of pages per date
+        page_size (int): Number of records per page
+        workers (int | None): Number of worker processes, defaults to the CPU count
+        seed (int): Seed of the random generators
+        **options (Any): Overrides of DEFAULT_GENERATOR_OPTIONS: "clients" and
+            "products" cardinalities, Zipf "skew", "null_rate" per field,
+            "float_rate" of prices, "min_price" and "max_price"
+
+    Returns:
+        Dict[str, Any]: Run report with the number of dates, files and records
+        written and the elapsed seconds
+
+    Raises:
+        ValueError: If the dataset shape or an option is invalid
+        OSError: If a directory or file cannot be written
+    """
+    unknown = set(options) - set(DEFAULT_GENERATOR_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unsupported generator options: {sorted(unknown)}")
+    options = {**DEFAULT_GENERATOR_OPTIONS, **options}
+    _validate_generator_options(days, pages, page_size, options)
+    first_day = datetime.date.fromisoformat(start_date)
+    dates = [(first_day + datetime.timedelta(days=i)).isoformat() for i in range(days)]
+
+    logger.info(
+        f"Generating {days} dates x {pages} pages x {page_size} records "
+        f"into {raw_root}..."
+    )
+    start = time.perf_counter()
+
+    # Prepare the date directories and split their pages into tasks
+    tasks = []
+    for date in dates:
+        raw_dir = os.path.join(raw_root, date)
+        local_disk.prepare_storage_dir(raw_dir)
+        for first_page in range(1, pages + 1, PAGES_PER_TASK):
+            last_page = min(first_page + PAGES_PER_TASK - 1, pages)
+            tasks.append((raw_dir, date, first_page, last_page))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    results: Dict[str, Tuple[List[str], int]] = {date: ([], 0) for date in dates}
+
+    def record(date: str, filenames: List[str], records_count: int) -> None:
+        date_filenames, date_records = results[date]
+        results[date] = (date_filenames + filenames, date_records + records_count)
+
+    if workers == 1:
+        for raw_dir, date, first_page, last_page in tasks:
+            record(
+                date,
+                *_write_pages(
+                    raw_dir, date, first_page, last_page, page_size, seed, options
+                ),
+            )
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (
+                    date,
+                    executor.submit(
+                        _write_pages,
+                        raw_dir,
+                        date,
+                        first_page,
+                        last_page,
+                        page_size,
+                        seed,
+                        options,
+                    ),
+                )
+                for raw_dir, date, first_page, last_page in tasks
+            ]
+            for date, future in futures:
+                record(date, *future.result())
+
+    # Mark every date complete once all its pages are written
+    for date, (filenames, records_count) in results.items():
+        local_disk.save_success_marker(
+            os.path.join(raw_root, date), filenames, records_count
+        )
+
+    report = {
+        "dates": len(dates),
+        "files_written": sum(len(filenames) for filenames, _ in results.values()),
+        "records_written": sum(count for _, count in results.values()),
+        "workers": workers,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    logger.info(
+        f"Generated {report['records_written']} records in "
+        f"{report['files_written']} files in {report['seconds']} s."
+    )
+    return report
@@ -1,5 +1,8 @@
 import logging
+from typing import Any, Dict
 
+from lec02.hw.common.logging_setup import LogSampler
+from lec02.hw.common.storage import StorageBackend
 from lec02.hw.job1.dal import sales_api, local_disk
 
 
@@ -7,13 +10,25 @@ from lec02.hw.job1.dal import sales_api, local_disk
 logger = logging.getLogger(__name__)
 
 
-def save_sales_to_local_disk(date: str, raw_dir: str) -> None:
+def save_sales_to_local_disk(
+    date: str,
+    raw_dir: str,
+    storage: StorageBackend | None = None,
+    run_id: str | None = None,
+) -> Dict[str, Any]:
     """
     Save sales data for a specific date to local disk by fetching pages from API.
 
     Args:
         date (str): The date to fetch sales data for (format: YYYY-MM-DD)
         raw_dir (str): Directory path where files will be saved
+        storage (StorageBackend | None): Backend to save to instead of the
+            local disk, e.g. an in-memory store for benchmarks
+        run_id (str | None): Identifier of the run, written to the _SUCCESS
+            marker so a watching Job2 ignores the marker of a previous run
+
+    Returns:
+        Dict[str, Any]: Run report with the number of pages and records saved
 
     Raises:
         ValueError: If input parameters are invalid
@@ -24,18 +39,26 @@ def save_sales_to_local_disk(date: str, raw_dir: str) -> None:
     """
     logger.info(f"Saving sales data for {date} to local disk.")
 
+    # Only pass the backend when one is selected
+    storage_options = {"storage": storage} if storage is not None else {}
+    marker_options = {"run_id": run_id} if run_id is not None else {}
+
     try:
         # Create a storage directory if it doesn't exist
         logger.info(f"Preparing storage directory {raw_dir}...")
-        local_disk.prepare_storage_dir(dir_path=raw_dir)
+        local_disk.prepare_storage_dir(dir_path=raw_dir, **storage_options)
         logger.info(f"Storage directory {raw_dir} created successfully.")
 
         page = 1
         total_records_saved = 0
+        saved_filenames = []
+
+        # Log per page at DEBUG level, with an INFO summary every N pages
+        progress = LogSampler(logger, "Saved %d pages with %d records so far.")
 
         # Fetch and save pages until no more data
         while True:
-            logger.info(f"Processing page {page}...")
+            logger.debug("Processing page %d...", page)
             page_data = sales_api.get_sales_per_page(date=date, page=page)
 
             # Exit loop if no more data
@@ -47,16 +70,28 @@ def save_sales_to_local_disk(date: str, raw_dir: str) -> None:
             filename = f"sales_{date}_{page}.json"
 
             # Save page data to disk
-            logger.info(f"Saving page {page} to {filename}...")
-            local_disk.save_page_to_disk(page_data, dir_path=raw_dir, filename=filename)
+            local_disk.save_page_to_disk(
+                page_data, dir_path=raw_dir, filename=filename, **storage_options
+            )
+            saved_filenames.append(filename)
             total_records_saved += len(page_data)
-            logger.info(
-                f"Page {page} with {total_records_saved} records "
-                f"saved to {filename}."
+            logger.debug(
+                "Page %d with %d records saved to %s.", page, len(page_data), filename
             )
+            progress.tick(total_records_saved)
             page += 1
 
         logger.info(f"All pages processed. Saved {total_records_saved} records.")
+
+        # Signal readers that no more pages will land
+        local_disk.save_success_marker(
+            dir_path=raw_dir,
+            filenames=saved_filenames,
+            records=total_records_saved,
+            **storage_options,
+            **marker_options,
+        )
+        return {"pages": len(saved_filenames), "records": total_records_saved}
     except (ValueError, ConnectionError, OSError, IOError, TypeError) as e:
         # Handle expected errors
         logger.error(f"An error occurred while saving data: {e}")
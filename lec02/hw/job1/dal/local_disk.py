@@ -1,15 +1,27 @@
 import os
-import shutil
 import logging
 import json
 from typing import Any, Dict, List
 
+from lec02.hw.common.storage import LocalStorage, StorageBackend
 
 # Get a logger specific to this module
 logger = logging.getLogger(__name__)
 
+# Marker written once every page of a run has been saved
+SUCCESS_MARKER = "_SUCCESS"
 
-def prepare_storage_dir(dir_path: str) -> None:
+
+def _write_json(
+    filepath: str, data: Any, storage: StorageBackend | None, **dump_options: Any
+) -> None:
+    """Atomically writes data as a JSON file, to the local disk by default."""
+    (storage or LocalStorage()).write_bytes(
+        filepath, json.dumps(data, **dump_options).encode("utf-8")
+    )
+
+
+def prepare_storage_dir(dir_path: str, storage: StorageBackend | None = None) -> None:
     """This function handles directory preparation for storing files:
     1. If the directory exists already:
        - Logs info message
@@ -18,8 +30,13 @@ def prepare_storage_dir(dir_path: str) -> None:
        - Logs info message
     3. Creates a new empty directory
 
+    On an object store, the objects under dir_path are deleted and no
+    directory is created.
+
     Args:
         dir_path (str): Path to the directory that needs to be prepared
+        storage (StorageBackend | None): Backend to use, the local disk by
+            default
 
     Returns:
         None
@@ -28,15 +45,16 @@ def prepare_storage_dir(dir_path: str) -> None:
         OSError: If there are permission/filesystem issues, creating directory
         Exception: For any other unexpected errors
     """
+    storage = storage or LocalStorage()
     try:
-        if os.path.exists(dir_path):  # If a directory exists
+        if storage.is_dir(dir_path):  # If a directory exists
             # Log message and remove directory
             logger.info(f"Directory {dir_path} already exists. Removing...")
-            shutil.rmtree(dir_path)
+            storage.delete_prefix(dir_path)
         else:
             logger.info(f"Directory {dir_path} does not exist. Creating...")
 
-        os.makedirs(dir_path)
+        storage.make_dirs(dir_path)
         logger.info(f"Directory {dir_path} created successfully.")
 
     except OSError as e:
@@ -48,14 +66,21 @@ def prepare_storage_dir(dir_path: str) -> None:
 
 
 def save_page_to_disk(
-    page_data: List[Dict[str, Any]], dir_path: str, filename: str
+    page_data: List[Dict[str, Any]],
+    dir_path: str,
+    filename: str,
+    storage: StorageBackend | None = None,
 ) -> None:
     """Function that saves page data to disk as a JSON file
 
+    The page is written to a temporary file which is then renamed, so a
+    reader watching the directory never sees a partially written page.
+
     Args:
         page_data: List of dictionaries containing the page data to save
         dir_path: Directory path where to save the file
         filename: Name of the file to create
+        storage: Backend to write to, the local disk by default
 
     Returns:
         None
@@ -67,24 +92,65 @@ def save_page_to_disk(
     """
 
     filepath = os.path.join(dir_path, filename)
-    logger.info(f"Saving {len(page_data)} to {filepath}...")
 
     try:
-        # Open a file and save JSON data with proper encoding and formatting
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(page_data, f, ensure_ascii=False, indent=4)
+        # Save JSON data with proper encoding and formatting, atomically
+        _write_json(filepath, page_data, storage, ensure_ascii=False, indent=4)
 
-        logger.info(f"{len(page_data)} records saved to {filepath}.")
+        logger.debug("%d records saved to %s.", len(page_data), filepath)
 
     except IOError as e:
         # Handle I/O errors (permissions, disk full etc.)
-        logger.error(f"Error saving to {filepath}: {e}", exc_info=True)
+        logger.error("Error saving to %s: %s", filepath, e, exc_info=True)
         raise IOError(f"Error saving to {filepath}: {e}") from e
     except TypeError as e:
         # Handle JSON serialization errors
-        logger.error(f"Error saving to {filepath}: {e}", exc_info=True)
+        logger.error("Error saving to %s: %s", filepath, e, exc_info=True)
         raise TypeError(f"Error saving to {filepath}: {e}") from e
     except Exception as e:
         # Handle any other unexpected errors
-        logger.exception(f"An unexpected error occurred: {e}")
+        logger.exception("An unexpected error occurred: %s", e)
         raise Exception(f"An unexpected error occurred: {e}") from e
+
+
+def save_success_marker(
+    dir_path: str,
+    filenames: List[str],
+    records: int,
+    storage: StorageBackend | None = None,
+    run_id: str | None = None,
+) -> None:
+    """Function that marks a directory as complete
+
+    Writes a _SUCCESS file listing the pages of the run, so a reader
+    converting pages as they land knows when the run is finished. With a
+    run_id, a reader can tell the marker of its run from one left by a
+    previous run.
+
+    Args:
+        dir_path: Directory path holding the pages
+        filenames: Names of the page files written by the run
+        records: Total number of records saved
+        storage: Backend to write to, the local disk by default
+        run_id: Identifier of the run, written to the marker if given
+
+    Returns:
+        None
+
+    Raises:
+        IOError: If there are I/O errors while saving the marker
+    """
+
+    filepath = os.path.join(dir_path, SUCCESS_MARKER)
+
+    try:
+        marker: Dict[str, Any] = {"files": filenames, "records": records}
+        if run_id is not None:
+            marker["run_id"] = run_id
+        _write_json(filepath, marker, storage, indent=4)
+
+        logger.info(f"Marked {dir_path} as complete with {len(filenames)} files.")
+
+    except IOError as e:
+        logger.error(f"Error saving to {filepath}: {e}", exc_info=True)
+        raise IOError(f"Error saving to {filepath}: {e}") from e
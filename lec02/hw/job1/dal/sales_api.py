@@ -2,14 +2,19 @@
 import json
 import os
 import logging
+import threading
 import time
 import pprint
 
 # Importing third party modules
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Any, Dict, List, Optional
 
+from lec02.hw.common.circuit_breaker import CircuitBreaker, get_circuit_breaker
+from lec02.hw.common.serving import register_warm_up
+
 # Load environment variables
 load_dotenv()
 
@@ -32,6 +37,86 @@ INITIAL_DELAY: float = 1.0
 BACKOFF_FACTOR: float = 2.0
 RETRY_STATUS_CODES: set[int] = {500, 502, 503, 504}
 
+# Circuit breaker configuration, shared by every page fetch of the process:
+# open after half of the last 20 attempts failed (at least 5 recorded),
+# then let one probe through every 30 seconds
+CIRCUIT_FAILURE_RATE: float = 0.5
+CIRCUIT_MIN_CALLS: int = 5
+CIRCUIT_WINDOW: int = 20
+CIRCUIT_OPEN_SECONDS: float = 30.0
+CIRCUIT_HALF_OPEN_CALLS: int = 1
+
+# Connections to the API kept open per process, one per concurrent page fetch
+HTTP_POOL_SIZE: int = 8
+WARM_UP_TIMEOUT: float = 5.0
+
+# HTTP session of the process; a forked worker opens its own connections
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Returns the HTTP session of the current process, creating it on first use.
+
+    The session keeps up to HTTP_POOL_SIZE connections to the API open, so
+    page fetches after the first one skip the TCP and TLS handshakes. Sockets
+    must not be shared across processes, so a process forked from the one
+    which created the session gets a new one.
+
+    Returns:
+        requests.Session: The pooled session of the process
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, pool_block=False
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+@register_warm_up
+def warm_up_http_session(timeout: float = WARM_UP_TIMEOUT) -> bool:
+    """
+    Opens a connection to the API, so the first job skips the handshakes.
+    Registered with serve, which runs it in every serving process of a job
+    server fetching from the API.
+
+    The warm-up bypasses the circuit breaker and never raises: the status of
+    the answer does not matter, and a server must start while the API is down.
+
+    Args:
+        timeout (float): Seconds to wait for the API
+
+    Returns:
+        bool: Whether the API answered
+    """
+    try:
+        get_http_session().head(BASE_URL, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Could not warm up the connection to {BASE_URL}: {e}")
+        return False
+    logger.info(f"Warmed up the connection to {BASE_URL}.")
+    return True
+
+
+def get_api_circuit_breaker() -> CircuitBreaker:
+    """Returns the circuit breaker of the sales endpoint."""
+    return get_circuit_breaker(
+        API_URL,
+        failure_rate=CIRCUIT_FAILURE_RATE,
+        min_calls=CIRCUIT_MIN_CALLS,
+        window=CIRCUIT_WINDOW,
+        open_seconds=CIRCUIT_OPEN_SECONDS,
+        half_open_calls=CIRCUIT_HALF_OPEN_CALLS,
+    )
+
 
 def get_sales_per_page(date: str, page: int) -> List[Dict[str, Any]] | None:
     """
@@ -43,6 +128,8 @@ def get_sales_per_page(date: str, page: int) -> List[Dict[str, Any]] | None:
     :return: A list of sales data dictionaries for the page, or None if the page indicates the end of data.
     :raises ValueError: If the API response is not a list.
     :raises ConnectionError: For network-related errors or non-404 HTTP errors.
+    :raises CircuitOpenError: If the API circuit is open after repeated failures,
+        without calling the API.
     """
 
     if not AUTH_TOKEN:
@@ -52,11 +139,24 @@ def get_sales_per_page(date: str, page: int) -> List[Dict[str, Any]] | None:
     headers: Dict[str, str] = {"Authorization": AUTH_TOKEN}
     params: Dict[str, str] = {"page": str(page), "date": date}
     last_exception: Exception | None = None
+    breaker = get_api_circuit_breaker()
 
     for attempt in range(MAX_RETRIES):
+        # Fail fast while the API is known to be down
+        probe = breaker.before_call()
 
         try:
-            response = requests.get(API_URL, headers=headers, params=params, timeout=20)
+            try:
+                response = get_http_session().get(
+                    API_URL, headers=headers, params=params, timeout=20
+                )
+            except Exception:
+                breaker.record_failure(probe)
+                raise
+            if response.status_code in RETRY_STATUS_CODES:
+                breaker.record_failure(probe)
+            else:
+                breaker.record_success(probe)
 
             if response.status_code == 404:
                 logger.warning(f"Page {page} not found, assuming end of data.")
@@ -107,6 +207,8 @@ def get_sales_per_page(date: str, page: int) -> List[Dict[str, Any]] | None:
             raise  # Re-raise unexpected errors
 
         if attempt < MAX_RETRIES - 1:
+            # Do not sleep through an outage the circuit already knows of
+            breaker.raise_if_open()
             delay = INITIAL_DELAY * (BACKOFF_FACTOR**attempt)
             logger.info(f"Waiting {delay:.2f} seconds before next retry...")
             time.sleep(delay)
@@ -1,21 +1,28 @@
 # Import necessary modules
 import logging
+import math
 from typing import Any, Dict, Tuple
 from flask import Flask, request
 from dotenv import load_dotenv
+from lec02.hw.common.admission import AdmissionController, AdmissionError
+from lec02.hw.common.circuit_breaker import CircuitOpenError
+from lec02.hw.common.logging_setup import configure_logging
+from lec02.hw.common.memory_tracing import (
+    get_memory_report,
+    get_trace_top,
+    run_traced,
+)
+from lec02.hw.common.profiling import get_profile_top, run_profiled
+from lec02.hw.common.serving import serve
+from lec02.hw.common.single_flight import SingleFlight, make_request_key
+from lec02.hw.common.storage import get_storage
 from lec02.hw.job1.bll.sales_api import save_sales_to_local_disk
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging to output to the console (stdout/stderr)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    # filename=str(os.path.basename(__file__).replace(".py", ".log")), # Uncomment to log to file
-    # filemode="a", # Append mode for a log file
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+# Configure logging to output to the console (stdout/stderr), see LOG_* variables
+configure_logging()
 
 # Get a logger specific to this module
 logger = logging.getLogger(__name__)
@@ -23,10 +30,55 @@ logger = logging.getLogger(__name__)
 # Initialize Flask application
 app = Flask(__name__)
 
+# Bound the jobs running at once and waiting, see JOB_* variables
+admission = AdmissionController.from_env()
+
+# Run identical concurrent requests once, see JOB_RESULT_TTL
+jobs_in_flight = SingleFlight.from_env()
+
+
+def _run_job(
+    date: str,
+    raw_dir: str,
+    job_options: Dict[str, Any],
+    profile_top: int | None,
+    trace_top: int | None,
+) -> Dict[str, Any]:
+    """Runs the job in a job slot and returns the response body."""
+    # Wait for a job slot, or get rejected when the server is saturated
+    with admission.admit():
+        # Execute job to save sales data
+        logger.info(">>> Running job...")
+        response: Dict[str, Any] = {"message": "Job completed successfully."}
+        if profile_top is not None:
+            # Run under cProfile, saving the profile next to the pages
+            _, response["profile"] = run_profiled(
+                save_sales_to_local_disk,
+                raw_dir,
+                profile_top,
+                date=date,
+                raw_dir=raw_dir,
+                **job_options,
+            )
+        elif trace_top is not None:
+            # Run with tracemalloc, reporting the top allocation sites
+            _, response["memory"] = run_traced(
+                save_sales_to_local_disk,
+                trace_top,
+                date=date,
+                raw_dir=raw_dir,
+                **job_options,
+            )
+        else:
+            save_sales_to_local_disk(date=date, raw_dir=raw_dir, **job_options)
+        return response
+
 
 # Define endpoint that accepts POST requests at root URL
 @app.route("/", methods=["POST"])
-def run_job_endpoint() -> Tuple[Dict[str, Any], int]:
+def run_job_endpoint() -> (
+    Tuple[Dict[str, Any], int] | Tuple[Dict[str, Any], int, Dict[str, str]]
+):
     """
     Process POST request to run sales data collection job.
 
@@ -58,15 +110,69 @@ def run_job_endpoint() -> Tuple[Dict[str, Any], int]:
         logger.error("Missing 'raw_dir' parameter in input data.")
         return {"error": "Missing 'raw_dir' parameter in input data."}, 400
 
+    # Select the storage backend, the local disk unless a URL is given
+    job_options: Dict[str, Any] = {}
+    if input_data.get("storage"):
+        try:
+            job_options["storage"] = get_storage(input_data["storage"])
+        except (ValueError, ImportError) as e:
+            logger.error(f"Invalid 'storage' parameter: {e}")
+            return {"error": f"Invalid 'storage' parameter: {e}"}, 400
+
+    # Tag the _SUCCESS marker with the run, for a Job2 watching raw_dir
+    if input_data.get("run_id") is not None:
+        if not isinstance(input_data["run_id"], str):
+            logger.error("Parameter 'run_id' must be a string.")
+            return {"error": "Parameter 'run_id' must be a string."}, 400
+        job_options["run_id"] = input_data["run_id"]
+
+    # Check whether the run is profiled or memory traced, on fields or headers
+    try:
+        profile_top = get_profile_top(input_data, request.headers)
+        trace_top = get_trace_top(input_data, request.headers)
+        if profile_top is not None and trace_top is not None:
+            raise ValueError(
+                "Parameter 'trace_memory' cannot be combined with 'profile'."
+            )
+    except ValueError as e:
+        logger.error(str(e))
+        return {"error": str(e)}, 400
+
     # Log job execution details
     logger.info(f"Running job for date {date} and saving to {raw_dir}.")
 
     try:
-        # Execute job to save sales data
-        logger.info(">>> Running job...")
-        save_sales_to_local_disk(date=date, raw_dir=raw_dir)
+        # Attach to an identical job in flight, or to its recent result
+        key = make_request_key(
+            "job1",
+            {**input_data, "profile_top": profile_top, "trace_top": trace_top},
+            path_fields=("raw_dir",),
+        )
+        response, shared = jobs_in_flight.do(
+            key, _run_job, date, raw_dir, job_options, profile_top, trace_top
+        )
+        if shared:
+            response = {**response, "coalesced": True}
         logger.info(">>> Job completed successfully.")
-        return {"message": "Job completed successfully."}, 201
+        return response, 201
+
+    # Reject the job while the server is saturated
+    except AdmissionError as e:
+        logger.warning(f"Job rejected: {e}")
+        return (
+            {"error": f"Job rejected: {e}"},
+            e.status_code,
+            {"Retry-After": str(e.retry_after)},
+        )
+
+    # Fail fast while the sales API circuit is open
+    except CircuitOpenError as e:
+        logger.warning(f"Sales API unavailable: {e}")
+        return (
+            {"error": f"Sales API unavailable: {e}"},
+            503,
+            {"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        )
 
     # Handle expected errors
     except (ValueError, ConnectionError, OSError, IOError, TypeError) as e:
@@ -79,7 +185,39 @@ def run_job_endpoint() -> Tuple[Dict[str, Any], int]:
         return {"error": f"An unexpected error occurred: {e}"}, 500
 
 
+@app.route("/debug/queue", methods=["GET"])
+def debug_queue_endpoint() -> Tuple[Dict[str, Any], int]:
+    """
+    Return the running and queued jobs, limits and wait times of the server.
+
+    Returns:
+        Tuple containing the queue statistics and HTTP status code
+    """
+    return {**admission.stats(), "coalesced": jobs_in_flight.coalesced}, 200
+
+
+@app.route("/debug/memory", methods=["GET"])
+def debug_memory_endpoint() -> Tuple[Dict[str, Any], int]:
+    """
+    Return the memory report of the last traced run and, while tracemalloc
+    is running, the live allocation sites.
+
+    Returns:
+        Tuple containing the memory report and HTTP status code
+    """
+    top_n = request.args.get("top", default=10, type=int)
+    return get_memory_report(max(1, top_n)), 200
+
+
 # Main function to start the Flask server and run the application
 if __name__ == "__main__":
     logger.info("Flask server startup for Job 1...")
-    app.run(debug=True, host="0.0.0.0", port=8081)
+    # Serve on gunicorn or waitress if installed, see JOB_SERVER; requests
+    # beyond the running and queued jobs are rejected, so keep threads for them.
+    # Admission, in-flight jobs and circuits live in this process: one worker
+    serve(
+        app,
+        port=8081,
+        threads=admission.max_running + admission.max_queued + 2,
+        single_worker=True,
+    )
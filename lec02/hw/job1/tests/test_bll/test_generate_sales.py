@@ -0,0 +1,133 @@
+import json
+
+import numpy as np
+import pytest
+
+from lec02.hw.job1.bll.generate_sales import (
+    build_zipf_cdf,
+    generate_sales_data,
+    generate_sales_page,
+)
+
+
+def _read_dir(date_dir):
+    """Reads the marker and pages of a generated date directory."""
+    with open(date_dir / "_SUCCESS", encoding="utf-8") as f:
+        marker = json.load(f)
+    pages = []
+    for filename in marker["files"]:
+        with open(date_dir / filename, encoding="utf-8") as f:
+            pages.append(json.load(f))
+    return marker, pages
+
+
+def test_build_zipf_cdf():
+    """Test build_zipf_cdf skews the first ranks and is uniform without skew."""
+
+    # Call function under test
+    skewed = build_zipf_cdf(100, 1.5)
+    uniform = build_zipf_cdf(4, 0)
+
+    # Assert distribution shape
+    assert skewed[-1] == pytest.approx(1.0)
+    assert skewed[0] > 0.3
+    assert uniform.tolist() == pytest.approx([0.25, 0.5, 0.75, 1.0])
+
+
+def test_generate_sales_page():
+    """Test generate_sales_page respects cardinalities, nulls and price types."""
+
+    # Call function under test
+    records = generate_sales_page(
+        np.random.default_rng(1),
+        "2022-08-09",
+        2000,
+        build_zipf_cdf(10, 1.1),
+        build_zipf_cdf(3, 1.1),
+        null_rate=0.1,
+        float_rate=0.5,
+        min_price=100,
+        max_price=200,
+    )
+
+    # Assert values and null rates
+    assert len(records) == 2000
+    clients = {r["client"] for r in records} - {None}
+    assert clients <= {f"Client {i}" for i in range(1, 11)}
+    assert {r["product"] for r in records} - {None} <= {
+        "Product 1",
+        "Product 2",
+        "Product 3",
+    }
+    assert {r["purchase_date"] for r in records} == {"2022-08-09", None}
+    prices = [r["price"] for r in records if r["price"] is not None]
+    assert {type(price) for price in prices} == {int, float}
+    assert all(100 <= price < 201 for price in prices)
+    assert 100 < sum(r["client"] is None for r in records) < 300
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_sales_data(tmp_path, workers):
+    """Test generate_sales_data writes pages and markers like save_sales_to_local_disk."""
+
+    # Call function under test
+    report = generate_sales_data(
+        str(tmp_path),
+        "2022-08-30",
+        days=3,
+        pages=10,
+        page_size=5,
+        workers=workers,
+        clients=50,
+    )
+
+    # Assert report, directories and markers
+    assert report["dates"] == 3
+    assert report["files_written"] == 30
+    assert report["records_written"] == 150
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "2022-08-30",
+        "2022-08-31",
+        "2022-09-01",
+    ]
+    marker, pages = _read_dir(tmp_path / "2022-09-01")
+    assert marker == {
+        "files": [f"sales_2022-09-01_{page}.json" for page in range(1, 11)],
+        "records": 50,
+    }
+    assert all(len(page) == 5 for page in pages)
+
+    # Assert pages are formatted like save_page_to_disk
+    page_text = (tmp_path / "2022-09-01" / "sales_2022-09-01_1.json").read_text()
+    assert page_text == json.dumps(pages[0], ensure_ascii=False, indent=4)
+
+
+def test_generate_sales_data_deterministic(tmp_path):
+    """Test generate_sales_data output does not depend on the number of workers."""
+
+    # Call function under test with different workers
+    generate_sales_data(str(tmp_path / "a"), "2022-08-09", pages=9, workers=1)
+    generate_sales_data(str(tmp_path / "b"), "2022-08-09", pages=9, workers=2)
+
+    # Assert both datasets are identical
+    assert _read_dir(tmp_path / "a" / "2022-08-09") == _read_dir(
+        tmp_path / "b" / "2022-08-09"
+    )
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"days": 0}, "days must be positive."),
+        ({"clients": 0}, "clients must be positive."),
+        ({"null_rate": 1.5}, "null_rate must be between 0 and 1."),
+        ({"min_price": 10, "max_price": 5}, "min_price must be between"),
+        ({"colour": "red"}, "Unsupported generator options"),
+    ],
+)
+def test_generate_sales_data_invalid_options(tmp_path, options, error):
+    """Test generate_sales_data rejects invalid dataset shapes."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        generate_sales_data(str(tmp_path), "2022-08-09", **options)
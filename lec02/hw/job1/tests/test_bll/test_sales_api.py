@@ -7,9 +7,11 @@ from lec02.hw.job1.bll.sales_api import save_sales_to_local_disk
 @mock.patch("lec02.hw.job1.bll.sales_api.local_disk.prepare_storage_dir")
 @mock.patch("lec02.hw.job1.bll.sales_api.sales_api.get_sales_per_page")
 @mock.patch("lec02.hw.job1.bll.sales_api.local_disk.save_page_to_disk")
+@mock.patch("lec02.hw.job1.bll.sales_api.local_disk.save_success_marker")
 @mock.patch("lec02.hw.job1.bll.sales_api.logger.info")
 def test_save_sales_to_local_disk_success_multiple_pages(
     mock_logger_info,
+    mock_save_success_marker,
     mock_save_page_to_disk,
     mock_get_sales_per_page,
     mock_prepare_storage_dir,
@@ -48,7 +50,10 @@ def test_save_sales_to_local_disk_success_multiple_pages(
     mock_get_sales_per_page.side_effect = [page1_data, page2_data, None]
 
     # Call function under test
-    save_sales_to_local_disk(date=test_date, raw_dir=test_dir)
+    report = save_sales_to_local_disk(date=test_date, raw_dir=test_dir)
+
+    # Assert the report counts the saved pages and records
+    assert report == {"pages": 2, "records": 3}
 
     # Assert prepare_storage_dir was called once with correct parameters
     mock_prepare_storage_dir.assert_called_once_with(dir_path=test_dir)
@@ -76,18 +81,26 @@ def test_save_sales_to_local_disk_success_multiple_pages(
         ]
     )
 
-    # Assert appropriate log messages were recorded
-    assert (
-        mock_logger_info.call_count >= 8
-    )  # At least 8 log messages should be recorded
+    # Assert the directory was marked complete with every page
+    mock_save_success_marker.assert_called_once_with(
+        dir_path=test_dir,
+        filenames=[f"sales_{test_date}_1.json", f"sales_{test_date}_2.json"],
+        records=3,
+    )
+
+    # Assert only run-level messages were logged at INFO, pages being at DEBUG
+    assert mock_logger_info.call_count == 5
+    mock_logger_info.assert_any_call("All pages processed. Saved 3 records.")
 
 
 @mock.patch("lec02.hw.job1.bll.sales_api.local_disk.prepare_storage_dir")
 @mock.patch("lec02.hw.job1.bll.sales_api.sales_api.get_sales_per_page")
 @mock.patch("lec02.hw.job1.bll.sales_api.local_disk.save_page_to_disk")
+@mock.patch("lec02.hw.job1.bll.sales_api.local_disk.save_success_marker")
 @mock.patch("lec02.hw.job1.bll.sales_api.logger.info")
 def test_save_sales_to_local_disk_no_data(
     mock_logger_info,
+    mock_save_success_marker,
     mock_save_page_to_disk,
     mock_get_sales_per_page,
     mock_prepare_storage_dir,
@@ -113,6 +126,11 @@ def test_save_sales_to_local_disk_no_data(
     # Assert save_page_to_disk was not called
     mock_save_page_to_disk.assert_not_called()
 
+    # Assert an empty run is still marked complete
+    mock_save_success_marker.assert_called_once_with(
+        dir_path=test_dir, filenames=[], records=0
+    )
+
     # Assert appropriate log messages were recorded
     mock_logger_info.assert_any_call(f"Page 1 is empty, no more data to save.")
     mock_logger_info.assert_any_call("All pages processed. Saved 0 records.")
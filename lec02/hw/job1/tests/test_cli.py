@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+
+from lec02.hw.job1.__main__ import main, parse_args
+
+# Directory holding the lec02 package
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), *[".."] * 4))
+
+
+def test_parse_args_date_range():
+    """Test parse_args expands the date range of the command line."""
+
+    # Call function under test
+    args = parse_args(
+        ["2022-08-08", "2022-08-10", "--raw-root", "raw", "--parallel", "3"]
+    )
+
+    # Assert the dates and options
+    assert args.dates == ["2022-08-08", "2022-08-09", "2022-08-10"]
+    assert args.parallel == 3
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["2022-08-10", "2022-08-09", "--raw-root", "raw"],
+        ["2022-08-09", "2022-08-10", "--raw-dir", "raw/2022-08-09"],
+        ["2022-08-09", "--raw-root", "raw", "--parallel", "0"],
+    ],
+)
+def test_parse_args_invalid(argv):
+    """Test parse_args rejects reversed ranges, --raw-dir ranges and bad knobs."""
+
+    # Test that the parser exits with a usage error
+    with pytest.raises(SystemExit) as exc_info:
+        parse_args(argv)
+    assert exc_info.value.code == 2
+
+
+@mock.patch("lec02.hw.job1.bll.sales_api.save_sales_to_local_disk")
+def test_main_reports_every_date(mock_save_sales_to_local_disk, capsys):
+    """Test main runs every date in-process and prints a JSON report."""
+
+    # Setup the second date failing
+    mock_save_sales_to_local_disk.side_effect = [
+        {"pages": 2, "records": 150},
+        ConnectionError("API down"),
+    ]
+
+    # Call function under test
+    status = main(["2022-08-09", "2022-08-10", "--raw-root", "raw"])
+
+    # Assert the report and the exit status
+    report = json.loads(capsys.readouterr().out)
+    assert status == 1
+    assert report["status"] == "failed"
+    assert report["records"] == 150
+    assert report["dates"]["2022-08-09"]["status"] == "succeeded"
+    assert report["dates"]["2022-08-10"]["error"] == "API down"
+    mock_save_sales_to_local_disk.assert_any_call(
+        date="2022-08-09", raw_dir=os.path.join("raw", "2022-08-09")
+    )
+
+
+def test_parse_args_imports_no_job_modules():
+    """Test parsing the command line does not import the heavy modules."""
+
+    # Setup a fresh interpreter parsing the arguments
+    code = (
+        "import sys\n"
+        "from lec02.hw.job1.__main__ import parse_args\n"
+        "parse_args(['2022-08-09', '--raw-root', 'raw'])\n"
+        "print([m for m in ('requests', 'fastavro', 'flask') if m in sys.modules])\n"
+    )
+
+    # Call function under test
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+
+    # Assert nothing heavy was imported
+    assert result.stdout.strip() == "[]", result.stderr
@@ -3,33 +3,38 @@ from unittest.mock import call
 import pytest
 import json
 
-from lec02.hw.job1.dal.local_disk import prepare_storage_dir, save_page_to_disk
+from lec02.hw.common.storage import MemoryStorage
+from lec02.hw.job1.dal.local_disk import (
+    prepare_storage_dir,
+    save_page_to_disk,
+    save_success_marker,
+)
 
 
-@mock.patch("lec02.hw.job1.dal.local_disk.os.path.exists")
-@mock.patch("lec02.hw.job1.dal.local_disk.shutil.rmtree")
+@mock.patch("lec02.hw.job1.dal.local_disk.os.path.isdir")
+@mock.patch("lec02.hw.common.storage.local.shutil.rmtree")
 @mock.patch("lec02.hw.job1.dal.local_disk.os.makedirs")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.info")
 def test_prepare_storage_dir_when_not_exists(
-    mock_logger_info, mock_os_makedirs, mock_shutil_rmtree, mock_os_path_exists
+    mock_logger_info, mock_os_makedirs, mock_shutil_rmtree, mock_os_path_isdir
 ):
     """Test prepare_storage_dir function behavior when directory does not exist."""
 
     # Test when the directory does not exist
-    mock_os_path_exists.return_value = False
+    mock_os_path_isdir.return_value = False
     test_directory = "test/directory/path"
 
     # Call function under test
     prepare_storage_dir(test_directory)
 
     # Assert directory existence check was called
-    mock_os_path_exists.assert_called_once_with(test_directory)
+    mock_os_path_isdir.assert_any_call(test_directory)
 
     # Assert directory creation was not called
     mock_shutil_rmtree.assert_not_called()
 
     # Assert directory creation was called
-    mock_os_makedirs.assert_called_once_with(test_directory)
+    mock_os_makedirs.assert_called_once_with(test_directory, exist_ok=True)
 
     # Assert logging messages
     mock_logger_info.assert_has_calls(
@@ -40,29 +45,29 @@ def test_prepare_storage_dir_when_not_exists(
     )
 
 
-@mock.patch("lec02.hw.job1.dal.local_disk.os.path.exists")
-@mock.patch("lec02.hw.job1.dal.local_disk.shutil.rmtree")
+@mock.patch("lec02.hw.job1.dal.local_disk.os.path.isdir")
+@mock.patch("lec02.hw.common.storage.local.shutil.rmtree")
 @mock.patch("lec02.hw.job1.dal.local_disk.os.makedirs")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.info")
 def test_prepare_storage_dir_when_exists(
-    mock_logger_info, mock_os_makedirs, mock_shutil_rmtree, mock_os_path_exists
+    mock_logger_info, mock_os_makedirs, mock_shutil_rmtree, mock_os_path_isdir
 ):
     """Test prepare_storage_dir function behavior when directory already exists."""
     # Test when the directory existes
-    mock_os_path_exists.return_value = True
+    mock_os_path_isdir.return_value = True
     test_directory = "test/directory/path"
 
     # Call function under test
     prepare_storage_dir(test_directory)
 
     # Assert directory existence check was called
-    mock_os_path_exists.assert_called_once_with(test_directory)
+    mock_os_path_isdir.assert_any_call(test_directory)
 
     # Assert directory creation was called
     mock_shutil_rmtree.assert_called_once_with(test_directory)
 
     # Assert directory creation was called
-    mock_os_makedirs.assert_called_once_with(test_directory)
+    mock_os_makedirs.assert_called_once_with(test_directory, exist_ok=True)
 
     # Assert logging messages
     mock_logger_info.assert_has_calls(
@@ -73,8 +78,8 @@ def test_prepare_storage_dir_when_exists(
     )
 
 
-@mock.patch("lec02.hw.job1.dal.local_disk.os.path.exists")
-@mock.patch("lec02.hw.job1.dal.local_disk.shutil.rmtree")
+@mock.patch("lec02.hw.job1.dal.local_disk.os.path.isdir")
+@mock.patch("lec02.hw.common.storage.local.shutil.rmtree")
 @mock.patch("lec02.hw.job1.dal.local_disk.os.makedirs")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.info")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.error")
@@ -83,23 +88,26 @@ def test_prepare_storage_dir_when_rmtree_fails(
     mock_logger_info,
     mock_os_makedirs,
     mock_shutil_rmtree,
-    mock_os_path_exists,
+    mock_os_path_isdir,
 ):
     """Test prepare_storage_dir function behavior when directory already
     exists but an error occurs during removal."""
 
-    mock_os_path_exists.return_value = True
+    mock_os_path_isdir.return_value = True
     test_directory = "test/directory/path"
     error_msg = f"Error during removal {test_directory}"
     mock_shutil_rmtree.side_effect = OSError(error_msg)
+    storage_error_msg = f"Error deleting {test_directory}: {error_msg}"
 
     with pytest.raises(OSError) as excinfo:
         prepare_storage_dir(test_directory)
 
-    assert f"Error with directory {test_directory}: {error_msg}" in str(excinfo.value)
+    assert f"Error with directory {test_directory}: {storage_error_msg}" in str(
+        excinfo.value
+    )
 
     # Assert directory existence check was called
-    mock_os_path_exists.assert_called_once_with(test_directory)
+    mock_os_path_isdir.assert_any_call(test_directory)
 
     # Assert logging messages
     mock_logger_info.assert_called_once_with(
@@ -111,15 +119,15 @@ def test_prepare_storage_dir_when_rmtree_fails(
 
     # Assert error logging was called
     mock_logger_error.assert_called_once_with(
-        f"Error with directory {test_directory}: {error_msg}", exc_info=True
+        f"Error with directory {test_directory}: {storage_error_msg}", exc_info=True
     )
 
     # Assert directory creation was not called
     mock_os_makedirs.assert_not_called()
 
 
-@mock.patch("lec02.hw.job1.dal.local_disk.os.path.exists")
-@mock.patch("lec02.hw.job1.dal.local_disk.shutil.rmtree")
+@mock.patch("lec02.hw.job1.dal.local_disk.os.path.isdir")
+@mock.patch("lec02.hw.common.storage.local.shutil.rmtree")
 @mock.patch("lec02.hw.job1.dal.local_disk.os.makedirs")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.info")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.error")
@@ -128,12 +136,12 @@ def test_prepare_storage_dir_when_makedirs_fails(
     mock_logger_info,
     mock_os_makedirs,
     mock_shutil_rmtree,
-    mock_os_path_exists,
+    mock_os_path_isdir,
 ):
     """Test prepare_storage_dir function behavior when directory not
     exists but en error occurs during creation."""
 
-    mock_os_path_exists.return_value = False
+    mock_os_path_isdir.return_value = False
     test_directory = "test/directory/path"
     error_msg = f"Error during creation {test_directory}"
     mock_os_makedirs.side_effect = OSError(error_msg)
@@ -144,7 +152,7 @@ def test_prepare_storage_dir_when_makedirs_fails(
     assert f"Error with directory {test_directory}: {error_msg}" in str(excinfo.value)
 
     # Assert directory existence check was called
-    mock_os_path_exists.assert_called_once_with(test_directory)
+    mock_os_path_isdir.assert_any_call(test_directory)
 
     # Assert logging messages
     mock_logger_info.assert_called_once_with(
@@ -155,18 +163,27 @@ def test_prepare_storage_dir_when_makedirs_fails(
     mock_shutil_rmtree.assert_not_called()
 
     # Assert os.makedirs was called
-    mock_os_makedirs.assert_called_once_with(test_directory)
+    mock_os_makedirs.assert_called_once_with(test_directory, exist_ok=True)
 
     mock_logger_error.assert_called_once_with(
         f"Error with directory {test_directory}: {error_msg}", exc_info=True
     )
 
 
-@mock.patch("lec02.hw.job1.dal.local_disk.open", mock.mock_open())
-@mock.patch("lec02.hw.job1.dal.local_disk.json.dump")
+@mock.patch("lec02.hw.common.storage.local.open", new_callable=mock.mock_open)
+@mock.patch("lec02.hw.job1.dal.local_disk.os.makedirs")
+@mock.patch("lec02.hw.job1.dal.local_disk.os.replace")
+@mock.patch("lec02.hw.job1.dal.local_disk.json.dumps")
 @mock.patch("lec02.hw.job1.dal.local_disk.os.path.join")
-@mock.patch("lec02.hw.job1.dal.local_disk.logger.info")
-def test_save_page_to_disk_success(mock_logger_info, mock_os_path_join, mock_json_dump):
+@mock.patch("lec02.hw.job1.dal.local_disk.logger.debug")
+def test_save_page_to_disk_success(
+    mock_logger_debug,
+    mock_os_path_join,
+    mock_json_dumpss,
+    mock_os_replace,
+    mock_os_makedirs,
+    mock_open,
+):
     """Test save_page_to_disk function behavior when successfully saving data to disk."""
 
     # Setup test data
@@ -180,6 +197,7 @@ def test_save_page_to_disk_success(mock_logger_info, mock_os_path_join, mock_jso
 
     # Configure mock behavior
     mock_os_path_join.return_value = test_filepath
+    mock_json_dumpss.return_value = "[]"
 
     # Call function under test
     save_page_to_disk(test_data, test_dir, test_filename)
@@ -187,28 +205,35 @@ def test_save_page_to_disk_success(mock_logger_info, mock_os_path_join, mock_jso
     # Assert path joining was called with correct parameters
     mock_os_path_join.assert_called_once_with(test_dir, test_filename)
 
-    # Assert json.dump was called with correct parameters
-    mock_json_dump.assert_called_once()
-    args, kwargs = mock_json_dump.call_args
+    # Assert json.dumps was called with correct parameters
+    mock_json_dumpss.assert_called_once()
+    args, kwargs = mock_json_dumpss.call_args
     assert args[0] == test_data  # First arg should be the data
     assert kwargs.get("ensure_ascii") is False
     assert kwargs.get("indent") == 4
 
-    # Assert logging messages
-    mock_logger_info.assert_has_calls(
-        [
-            call(f"Saving {len(test_data)} to {test_filepath}..."),
-            call(f"{len(test_data)} records saved to {test_filepath}."),
-        ]
+    # Assert the page was written to a temporary file and published atomically
+    mock_open.assert_called_once()
+    tmp_filepath, mode = mock_open.call_args.args
+    assert tmp_filepath.startswith(f"{test_filepath}.")
+    assert tmp_filepath.endswith(".tmp")
+    assert mode == "wb"
+    mock_open().write.assert_called_once_with(b"[]")
+    mock_os_replace.assert_called_once_with(tmp_filepath, test_filepath)
+
+    # Assert the page was logged lazily at DEBUG level
+    mock_logger_debug.assert_called_once_with(
+        "%d records saved to %s.", len(test_data), test_filepath
     )
 
 
-@mock.patch("lec02.hw.job1.dal.local_disk.open")
+@mock.patch("lec02.hw.common.storage.local.open")
+@mock.patch("lec02.hw.job1.dal.local_disk.os.makedirs")
 @mock.patch("lec02.hw.job1.dal.local_disk.os.path.join")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.info")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.error")
 def test_save_page_to_disk_io_error(
-    mock_logger_error, mock_logger_info, mock_os_path_join, mock_open
+    mock_logger_error, mock_logger_info, mock_os_path_join, mock_os_makedirs, mock_open
 ):
     """Test save_page_to_disk function behavior when an IOError occurs during file writing."""
 
@@ -221,36 +246,36 @@ def test_save_page_to_disk_io_error(
     # Configure mock behavior
     mock_os_path_join.return_value = test_filepath
     error_msg = "Permission denied"
-    mock_open.side_effect = IOError(error_msg)
+    error = IOError(error_msg)
+    mock_open.side_effect = error
 
     # Test that the function raises IOError
     with pytest.raises(IOError) as excinfo:
         save_page_to_disk(test_data, test_dir, test_filename)
 
     # Assert error message contains expected information
-    assert f"Error saving to {test_filepath}: {error_msg}" in str(excinfo.value)
+    storage_error = excinfo.value.__cause__
+    assert str(storage_error) == f"Error writing {test_filepath}: {error_msg}"
+    assert f"Error saving to {test_filepath}: {storage_error}" in str(excinfo.value)
 
     # Assert path joining was called with correct parameters
     mock_os_path_join.assert_called_once_with(test_dir, test_filename)
 
-    # Assert logging messages
-    mock_logger_info.assert_called_once_with(
-        f"Saving {len(test_data)} to {test_filepath}..."
-    )
+    # Assert no page was logged at INFO level
+    mock_logger_info.assert_not_called()
 
     # Assert error logging was called
     mock_logger_error.assert_called_once_with(
-        f"Error saving to {test_filepath}: {error_msg}", exc_info=True
+        "Error saving to %s: %s", test_filepath, storage_error, exc_info=True
     )
 
 
-@mock.patch("lec02.hw.job1.dal.local_disk.open", mock.mock_open())
-@mock.patch("lec02.hw.job1.dal.local_disk.json.dump")
+@mock.patch("lec02.hw.job1.dal.local_disk.json.dumps")
 @mock.patch("lec02.hw.job1.dal.local_disk.os.path.join")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.info")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.error")
 def test_save_page_to_disk_type_error(
-    mock_logger_error, mock_logger_info, mock_os_path_join, mock_json_dump
+    mock_logger_error, mock_logger_info, mock_os_path_join, mock_json_dumps
 ):
     """Test save_page_to_disk function behavior when a TypeError occurs during JSON serialization."""
 
@@ -265,7 +290,8 @@ def test_save_page_to_disk_type_error(
     # Configure mock behavior
     mock_os_path_join.return_value = test_filepath
     error_msg = "Object of type 'function' is not JSON serializable"
-    mock_json_dump.side_effect = TypeError(error_msg)
+    error = TypeError(error_msg)
+    mock_json_dumps.side_effect = error
 
     # Test that the function raises TypeError
     with pytest.raises(TypeError) as excinfo:
@@ -277,24 +303,21 @@ def test_save_page_to_disk_type_error(
     # Assert path joining was called with correct parameters
     mock_os_path_join.assert_called_once_with(test_dir, test_filename)
 
-    # Assert logging messages
-    mock_logger_info.assert_called_once_with(
-        f"Saving {len(test_data)} to {test_filepath}..."
-    )
+    # Assert no page was logged at INFO level
+    mock_logger_info.assert_not_called()
 
     # Assert error logging was called
     mock_logger_error.assert_called_once_with(
-        f"Error saving to {test_filepath}: {error_msg}", exc_info=True
+        "Error saving to %s: %s", test_filepath, error, exc_info=True
     )
 
 
-@mock.patch("lec02.hw.job1.dal.local_disk.open", mock.mock_open())
-@mock.patch("lec02.hw.job1.dal.local_disk.json.dump")
+@mock.patch("lec02.hw.job1.dal.local_disk.json.dumps")
 @mock.patch("lec02.hw.job1.dal.local_disk.os.path.join")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.info")
 @mock.patch("lec02.hw.job1.dal.local_disk.logger.exception")
 def test_save_page_to_disk_unexpected_error(
-    mock_logger_exception, mock_logger_info, mock_os_path_join, mock_json_dump
+    mock_logger_exception, mock_logger_info, mock_os_path_join, mock_json_dumps
 ):
     """Test save_page_to_disk function behavior when an unexpected exception occurs."""
 
@@ -307,7 +330,8 @@ def test_save_page_to_disk_unexpected_error(
     # Configure mock behavior
     mock_os_path_join.return_value = test_filepath
     error_msg = "Unexpected error occurred"
-    mock_json_dump.side_effect = Exception(error_msg)
+    error = Exception(error_msg)
+    mock_json_dumps.side_effect = error
 
     # Test that the function raises Exception
     with pytest.raises(Exception) as excinfo:
@@ -319,12 +343,95 @@ def test_save_page_to_disk_unexpected_error(
     # Assert path joining was called with correct parameters
     mock_os_path_join.assert_called_once_with(test_dir, test_filename)
 
-    # Assert logging messages
-    mock_logger_info.assert_called_once_with(
-        f"Saving {len(test_data)} to {test_filepath}..."
-    )
+    # Assert no page was logged at INFO level
+    mock_logger_info.assert_not_called()
 
     # Assert exception logging was called
     mock_logger_exception.assert_called_once_with(
-        f"An unexpected error occurred: {error_msg}"
+        "An unexpected error occurred: %s", error
     )
+
+
+def test_save_page_to_disk_failure_removes_tmp_file(tmp_path):
+    """Test save_page_to_disk leaves neither the page nor its temporary file on failure."""
+
+    # Setup a page that cannot be serialized past its first record
+    page_data = [{"id": 1}, {"id": 2, "function": lambda x: x}]
+
+    # Test that the function raises TypeError
+    with pytest.raises(TypeError):
+        save_page_to_disk(page_data, str(tmp_path), "sales_1.json")
+
+    # Assert no partial file is left behind
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_success_marker(tmp_path):
+    """Test save_success_marker writes the page list and record count."""
+
+    # Setup test data
+    filenames = ["sales_2022-08-09_1.json", "sales_2022-08-09_2.json"]
+
+    # Call function under test
+    save_success_marker(str(tmp_path), filenames, 150)
+
+    # Assert marker content and that no temporary file is left
+    with open(tmp_path / "_SUCCESS", encoding="utf-8") as f:
+        assert json.load(f) == {"files": filenames, "records": 150}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["_SUCCESS"]
+
+
+def test_save_success_marker_run_id(tmp_path):
+    """Test save_success_marker tags the marker with the run id."""
+
+    # Call function under test
+    save_success_marker(str(tmp_path), [], 0, run_id="run-2")
+
+    # Assert the run id is in the marker
+    with open(tmp_path / "_SUCCESS", encoding="utf-8") as f:
+        assert json.load(f)["run_id"] == "run-2"
+
+
+@mock.patch("lec02.hw.common.storage.local.open")
+@mock.patch("lec02.hw.job1.dal.local_disk.os.makedirs")
+@mock.patch("lec02.hw.job1.dal.local_disk.logger.error")
+def test_save_success_marker_io_error(mock_logger_error, mock_os_makedirs, mock_open):
+    """Test save_success_marker wraps I/O errors."""
+
+    # Setup test data
+    test_dir = "test/directory"
+    mock_open.side_effect = IOError("Disk full")
+
+    # Test that the function raises IOError
+    with pytest.raises(IOError) as excinfo:
+        save_success_marker(test_dir, [], 0)
+
+    # Assert error message and logging
+    assert f"Error saving to {test_dir}/_SUCCESS: " in str(excinfo.value)
+    assert "Disk full" in str(excinfo.value)
+    mock_logger_error.assert_called_once()
+
+
+def test_save_page_to_disk_with_storage():
+    """Test the pages and _SUCCESS marker are written to a storage backend."""
+
+    # Setup an in-memory backend holding a page of a previous run
+    storage = MemoryStorage()
+    test_dir = "raw/sales/2022-08-09"
+    storage.write_bytes(f"{test_dir}/sales_2022-08-09_9.json", b"[]")
+    page_data = [{"client": "Ann", "price": 100}]
+
+    # Call functions under test
+    prepare_storage_dir(test_dir, storage=storage)
+    save_page_to_disk(page_data, test_dir, "sales_2022-08-09_1.json", storage=storage)
+    save_success_marker(test_dir, ["sales_2022-08-09_1.json"], 1, storage=storage)
+
+    # Assert the previous run is gone and the new objects are stored
+    assert storage.list(test_dir) == [
+        f"{test_dir}/_SUCCESS",
+        f"{test_dir}/sales_2022-08-09_1.json",
+    ]
+    page = storage.read_bytes(f"{test_dir}/sales_2022-08-09_1.json")
+    assert json.loads(page) == page_data
+    marker = storage.read_bytes(f"{test_dir}/_SUCCESS")
+    assert json.loads(marker) == {"files": ["sales_2022-08-09_1.json"], "records": 1}
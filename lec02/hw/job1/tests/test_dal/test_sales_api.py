@@ -4,18 +4,33 @@ import pytest
 import requests
 import time
 
+from lec02.hw.common.circuit_breaker import CircuitOpenError, reset_circuit_breakers
 from lec02.hw.job1.dal.sales_api import (
+    get_http_session,
     get_sales_per_page,
+    warm_up_http_session,
     API_URL,
+    BASE_URL,
     ERR_TOKEN_MISSING,
+    HTTP_POOL_SIZE,
     MAX_RETRIES,
     RETRY_STATUS_CODES,
 )
 
 
+@pytest.fixture(autouse=True)
+def closed_circuit():
+    """Starts every test with a closed API circuit."""
+    reset_circuit_breakers()
+    yield
+    reset_circuit_breakers()
+
+
 @mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")  # Mock environment
 # variable
-@mock.patch("lec02.hw.job1.dal.sales_api.requests.get")  # Mock requests.get call
+@mock.patch(
+    "lec02.hw.job1.dal.sales_api.requests.Session.get"
+)  # Mock the pooled session call
 def test_get_sales_per_page_success(mock_requests_get):
     # Setup mock response
     mock_response = mock.Mock()
@@ -61,7 +76,7 @@ def test_get_sales_per_page_success(mock_requests_get):
 
 
 @mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")
-@mock.patch("lec02.hw.job1.dal.sales_api.requests.get")
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.get")
 def test_get_sales_per_page_end_of_data_404(mock_requests_get):
     # Setup mock response for 404 error
     mock_response = mock.Mock()
@@ -90,7 +105,7 @@ def test_get_sales_per_page_end_of_data_404(mock_requests_get):
 
 
 @mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")
-@mock.patch("lec02.hw.job1.dal.sales_api.requests.get")
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.get")
 def test_get_sales_per_page_end_of_data_empty_list(mock_requests_get):
     # Setup mock response
     mock_response = mock.Mock()
@@ -118,7 +133,7 @@ def test_get_sales_per_page_end_of_data_empty_list(mock_requests_get):
 
 
 @mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")
-@mock.patch("lec02.hw.job1.dal.sales_api.requests.get")
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.get")
 def test_get_sales_per_page_unauthorized_401(mock_requests_get):
     # Setup mock response for 401 error
     mock_response = mock.Mock()
@@ -150,7 +165,7 @@ def test_get_sales_per_page_unauthorized_401(mock_requests_get):
 
 
 @mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")
-@mock.patch("lec02.hw.job1.dal.sales_api.requests.get")
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.get")
 def test_get_sales_per_page_forbidden_403(mock_requests_get):
     # Setup mock response for 403 error
     mock_response = mock.Mock()
@@ -181,7 +196,7 @@ def test_get_sales_per_page_forbidden_403(mock_requests_get):
 
 
 @mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")
-@mock.patch("lec02.hw.job1.dal.sales_api.requests.get")
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.get")
 def test_get_sales_per_page_invalid_json(mock_requests_get):
     # Setup mock response
     mock_response = mock.Mock()
@@ -227,7 +242,7 @@ def test_get_sales_per_page_missing_auth_token():
 
 
 @mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")
-@mock.patch("lec02.hw.job1.dal.sales_api.requests.get")
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.get")
 def test_get_sales_per_page_response_not_list(mock_requests_get):
     """Test get_sales_per_page function behavior when API response is not a list."""
 
@@ -258,7 +273,7 @@ def test_get_sales_per_page_response_not_list(mock_requests_get):
 
 
 @mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")
-@mock.patch("lec02.hw.job1.dal.sales_api.requests.get")
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.get")
 @mock.patch("lec02.hw.job1.dal.sales_api.time.sleep")  # Mock sleep to avoid waiting
 def test_get_sales_per_page_network_error_with_retry(mock_sleep, mock_requests_get):
     """Test get_sales_per_page function behavior with network errors and retry logic."""
@@ -315,7 +330,7 @@ def test_get_sales_per_page_network_error_with_retry(mock_sleep, mock_requests_g
 
 
 @mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")
-@mock.patch("lec02.hw.job1.dal.sales_api.requests.get")
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.get")
 @mock.patch("lec02.hw.job1.dal.sales_api.time.sleep")  # Mock sleep to avoid waiting
 def test_get_sales_per_page_retryable_http_error(mock_sleep, mock_requests_get):
     """Test get_sales_per_page function behavior with retryable HTTP errors (5xx)."""
@@ -376,7 +391,7 @@ def test_get_sales_per_page_retryable_http_error(mock_sleep, mock_requests_get):
 
 
 @mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")
-@mock.patch("lec02.hw.job1.dal.sales_api.requests.get")
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.get")
 @mock.patch("lec02.hw.job1.dal.sales_api.time.sleep")  # Mock sleep to avoid waiting
 def test_get_sales_per_page_max_retries_reached(mock_sleep, mock_requests_get):
     """Test get_sales_per_page function behavior when max retries are reached."""
@@ -413,3 +428,58 @@ def test_get_sales_per_page_max_retries_reached(mock_sleep, mock_requests_get):
         mock.call(API_URL, headers=expected_headers, params=expected_params, timeout=20)
     ] * MAX_RETRIES
     mock_requests_get.assert_has_calls(expected_calls)
+
+
+@mock.patch("lec02.hw.job1.dal.sales_api.AUTH_TOKEN", "test_token")
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.get")
+@mock.patch("lec02.hw.job1.dal.sales_api.time.sleep")
+def test_get_sales_per_page_circuit_open(mock_sleep, mock_requests_get):
+    """Test get_sales_per_page fails fast once the API circuit is open."""
+
+    # Setup a persistent network error
+    mock_requests_get.side_effect = requests.exceptions.ConnectionError("refused")
+
+    # Call function under test until the circuit opens on the 5th failure
+    with pytest.raises(ConnectionError, match="after 3 attempts"):
+        get_sales_per_page(date="2024-05-07", page=1)
+    with pytest.raises(CircuitOpenError):
+        get_sales_per_page(date="2024-05-07", page=2)
+
+    # Assert the retries stopped without sleeping once the circuit opened
+    assert mock_requests_get.call_count == 5
+    assert mock_sleep.call_count == 3
+
+    # Test that later calls do not reach the API
+    with pytest.raises(CircuitOpenError, match="Circuit for .* is open"):
+        get_sales_per_page(date="2024-05-07", page=3)
+    assert mock_requests_get.call_count == 5
+
+
+def test_get_http_session_per_process():
+    """Test the pooled session is reused in a process and renewed after a fork."""
+
+    # Call function under test in this process and in a forked child
+    session = get_http_session()
+    same_session = get_http_session()
+    with mock.patch("lec02.hw.job1.dal.sales_api.os.getpid", return_value=-1):
+        child_session = get_http_session()
+
+    # Assert the session is shared within a process only
+    assert same_session is session
+    assert child_session is not session
+    assert session.get_adapter(API_URL)._pool_maxsize == HTTP_POOL_SIZE
+
+
+@mock.patch("lec02.hw.job1.dal.sales_api.requests.Session.head")
+def test_warm_up_http_session(mock_requests_head):
+    """Test the warm-up opens a connection to the API and survives an outage."""
+
+    # Call function under test with the API up, then down
+    warmed = warm_up_http_session(timeout=1.0)
+    mock_requests_head.side_effect = requests.exceptions.ConnectionError("refused")
+    warmed_down = warm_up_http_session(timeout=1.0)
+
+    # Assert the outcome, without raising
+    assert warmed is True
+    assert warmed_down is False
+    mock_requests_head.assert_called_with(BASE_URL, timeout=1.0)
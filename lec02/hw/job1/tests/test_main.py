@@ -1,8 +1,14 @@
 from unittest import mock
 import pytest
 import json
+import threading
+import time
 from flask import Flask
 
+from lec02.hw.common.admission import AdmissionController
+from lec02.hw.common.circuit_breaker import CircuitOpenError
+from lec02.hw.common.single_flight import SingleFlight
+from lec02.hw.common.storage import clear_memory_stores, get_storage
 from lec02.hw.job1.main import app, run_job_endpoint
 
 
@@ -14,6 +20,20 @@ def client():
         yield client
 
 
+@pytest.fixture(autouse=True)
+def jobs_in_flight():
+    """Fixture to isolate the coalescing of identical requests per test."""
+    with mock.patch("lec02.hw.job1.main.jobs_in_flight", SingleFlight()) as flight:
+        yield flight
+
+
+@pytest.fixture(autouse=True)
+def memory_stores():
+    """Fixture to evict the named in-memory stores created by a test."""
+    yield
+    clear_memory_stores()
+
+
 @mock.patch("lec02.hw.job1.main.save_sales_to_local_disk")
 def test_run_job_endpoint_success(mock_save_sales_to_local_disk, client):
     """Test run_job_endpoint function behavior with valid input data."""
@@ -143,6 +163,85 @@ def test_run_job_endpoint_connection_error(mock_save_sales_to_local_disk, client
     )
 
 
+@mock.patch("lec02.hw.job1.main.save_sales_to_local_disk")
+def test_run_job_endpoint_circuit_open(mock_save_sales_to_local_disk, client):
+    """Test run_job_endpoint returns 503 with Retry-After while the API circuit is open."""
+
+    # Configure mock to fail fast on the open circuit
+    mock_save_sales_to_local_disk.side_effect = CircuitOpenError("sales", 12.3)
+
+    # Call endpoint with test data
+    response = client.post("/", json={"date": "2024-05-07", "raw_dir": "test/raw/dir"})
+
+    # Assert the client is told when to retry
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "13"
+    assert "Sales API unavailable" in response.get_json()["error"]
+
+
+@mock.patch("lec02.hw.job1.main.save_sales_to_local_disk")
+def test_run_job_endpoint_saturated(mock_save_sales_to_local_disk, client):
+    """Test run_job_endpoint returns 429 with Retry-After when no job can be queued."""
+
+    # Setup a server whose only slot is taken and without a wait queue
+    controller = AdmissionController(max_running=1, max_queued=0)
+
+    # Call endpoint while the slot is held
+    with mock.patch("lec02.hw.job1.main.admission", controller):
+        with controller.admit():
+            response = client.post(
+                "/", json={"date": "2024-05-07", "raw_dir": "test/raw/dir"}
+            )
+        stats = client.get("/debug/queue").get_json()
+
+    # Assert the request was rejected without running the job
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert "Job rejected: Server is busy" in response.get_json()["error"]
+    mock_save_sales_to_local_disk.assert_not_called()
+    assert stats["rejected"] == 1
+    assert stats["running"] == 0
+
+
+@mock.patch("lec02.hw.job1.main.save_sales_to_local_disk")
+def test_run_job_endpoint_coalesces_duplicates(
+    mock_save_sales_to_local_disk, jobs_in_flight
+):
+    """Test duplicate requests in flight attach to the running job."""
+
+    # Setup a job blocked until the duplicate request is attached
+    release = threading.Event()
+    mock_save_sales_to_local_disk.side_effect = lambda **kwargs: release.wait(5)
+    responses = []
+
+    def post(raw_dir):
+        with app.test_client() as client:
+            responses.append(
+                client.post("/", json={"date": "2024-05-07", "raw_dir": raw_dir})
+            )
+
+    # Call endpoint twice, with the same directory written differently
+    threads = [
+        threading.Thread(target=post, args=(raw_dir,))
+        for raw_dir in ("test/raw/dir", "test/raw/dir/")
+    ]
+    for thread in threads:
+        thread.start()
+    while jobs_in_flight.coalesced < 1:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    # Assert the job ran once and both requests succeeded
+    mock_save_sales_to_local_disk.assert_called_once()
+    assert [response.status_code for response in responses] == [201, 201]
+    assert sorted(bool(r.get_json().get("coalesced")) for r in responses) == [
+        False,
+        True,
+    ]
+
+
 @mock.patch("lec02.hw.job1.main.save_sales_to_local_disk")
 def test_run_job_endpoint_os_error(mock_save_sales_to_local_disk, client):
     """Test run_job_endpoint function behavior when save_sales_to_local_disk raises OSError."""
@@ -199,3 +298,138 @@ def test_run_job_endpoint_unexpected_error(mock_save_sales_to_local_disk, client
     mock_save_sales_to_local_disk.assert_called_once_with(
         date=test_date, raw_dir=test_dir
     )
+
+
+@mock.patch("lec02.hw.job1.main.save_sales_to_local_disk")
+def test_run_job_endpoint_with_storage(mock_save_sales_to_local_disk, client):
+    """Test run_job_endpoint passes the backend selected by the storage URL."""
+
+    # Setup test parameters
+    test_input = {
+        "date": "2024-05-07",
+        "raw_dir": "test/raw/dir",
+        "storage": "memory://test-job1",
+    }
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert the named in-memory store was passed to the job
+    assert response.status_code == 201
+    mock_save_sales_to_local_disk.assert_called_once_with(
+        date="2024-05-07",
+        raw_dir="test/raw/dir",
+        storage=get_storage("memory://test-job1"),
+    )
+
+
+@mock.patch("lec02.hw.job1.main.save_sales_to_local_disk")
+def test_run_job_endpoint_run_id(mock_save_sales_to_local_disk, client):
+    """Test run_job_endpoint passes the run id of the marker and validates it."""
+
+    # Setup test parameters
+    test_input = {"date": "2024-05-07", "raw_dir": "test/raw/dir", "run_id": "r1"}
+
+    # Call endpoint with a valid and an invalid run id
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+    invalid_response = client.post(
+        "/",
+        data=json.dumps({**test_input, "run_id": 1}),
+        content_type="application/json",
+    )
+
+    # Assert the run id was passed, and the invalid one rejected
+    assert response.status_code == 201
+    mock_save_sales_to_local_disk.assert_called_once_with(
+        date="2024-05-07", raw_dir="test/raw/dir", run_id="r1"
+    )
+    assert invalid_response.status_code == 400
+
+
+@mock.patch("lec02.hw.job1.main.save_sales_to_local_disk")
+def test_run_job_endpoint_invalid_storage(mock_save_sales_to_local_disk, client):
+    """Test run_job_endpoint rejects an unsupported storage URL."""
+
+    # Setup test parameters
+    test_input = {"date": "2024-05-07", "raw_dir": "test/raw/dir", "storage": "ftp://x"}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert the request is rejected before running the job
+    assert response.status_code == 400
+    assert "Invalid 'storage' parameter" in json.loads(response.data)["error"]
+    mock_save_sales_to_local_disk.assert_not_called()
+
+
+@mock.patch("lec02.hw.job1.main.save_sales_to_local_disk")
+def test_run_job_endpoint_profile(mock_save_sales_to_local_disk, client, tmp_path):
+    """Test run_job_endpoint profiles the run and returns a summary."""
+
+    # Setup test parameters
+    test_input = {"date": "2024-05-07", "raw_dir": str(tmp_path), "profile": True}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert the profile summary and dump next to the pages
+    assert response.status_code == 201
+    profile = json.loads(response.data)["profile"]
+    assert profile["file"] == str(tmp_path / "_profile.pstats")
+    assert profile["top"]
+    assert (tmp_path / "_profile.pstats").exists()
+    mock_save_sales_to_local_disk.assert_called_once_with(
+        date="2024-05-07", raw_dir=str(tmp_path)
+    )
+
+
+@mock.patch("lec02.hw.job1.main.save_sales_to_local_disk")
+def test_run_job_endpoint_trace_memory(mock_save_sales_to_local_disk, client):
+    """Test run_job_endpoint traces the run and serves the report at /debug/memory."""
+
+    # Setup test parameters
+    test_input = {"date": "2024-05-07", "raw_dir": "test/raw/dir", "trace_memory": True}
+
+    # Call endpoints with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+    debug_response = client.get("/debug/memory")
+
+    # Assert the memory report of the run and of the debug endpoint
+    assert response.status_code == 201
+    memory = json.loads(response.data)["memory"]
+    assert {"peak_mb", "retained_mb", "top_by_size", "top_by_count"} <= set(memory)
+    assert debug_response.status_code == 200
+    assert json.loads(debug_response.data)["last_run"] == memory
+
+
+def test_run_job_endpoint_profile_and_trace_memory(client):
+    """Test run_job_endpoint rejects profiling and memory tracing together."""
+
+    # Setup test parameters
+    test_input = {
+        "date": "2024-05-07",
+        "raw_dir": "test/raw/dir",
+        "profile": True,
+        "trace_memory": True,
+    }
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"] == (
+        "Parameter 'trace_memory' cannot be combined with 'profile'."
+    )
@@ -0,0 +1,244 @@
+"""
+Runs Job2 in-process, without the Flask server:
+
+    python -m lec02.hw.job2 2022-08-01 2022-08-31 --workers 4 --incremental
+    python -m lec02.hw.job2 --raw-dir raw/2022-08-09 --stg-dir stg/2022-08-09
+
+A date range converts the date directories under --raw-root through one
+shared worker pool (process_sales_tree), --raw-dir a single directory
+(process_sales_data, or watch_sales_data with --watch). The run report is
+written to stdout as JSON.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from typing import Any, Dict, List
+
+from lec02.hw.common.cli import get_dates, get_default_root, positive_int, print_report
+from lec02.hw.common.logging_setup import configure_logging
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+# Options of the conversion, passed to the job only when set
+JOB_OPTIONS: tuple[str, ...] = (
+    "incremental",
+    "typed_schema",
+    "partition_by",
+    "num_buckets",
+    "block_stats",
+    "block_index",
+    "block_records",
+    "workers",
+    "memory_limit_mb",
+    "dedup",
+    "dedup_memory_mb",
+    "sort_by",
+    "dimensions",
+    "storage",
+    "watch_timeout",
+    "run_id",
+)
+
+# Options watch_sales_data supports
+WATCH_OPTIONS: tuple[str, ...] = (
+    "typed_schema",
+    "partition_by",
+    "num_buckets",
+    "block_stats",
+    "block_index",
+    "block_records",
+    "watch_timeout",
+    "run_id",
+)
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command line of Job2.
+
+    Values of the options are validated by the job itself, which is only
+    imported once the arguments are parsed.
+
+    Args:
+        argv (List[str] | None): Arguments, sys.argv[1:] if None
+
+    Returns:
+        argparse.Namespace: The arguments, with job_options holding the
+        options that were set
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m lec02.hw.job2",
+        description="Convert the JSON sales pages of a date range, or of a "
+        "directory, to AVRO.",
+    )
+    parser.add_argument(
+        "start_date", nargs="?", help="First date (YYYY-MM-DD), all dates if omitted"
+    )
+    parser.add_argument("end_date", nargs="?", help="Last date, start_date if omitted")
+
+    paths = parser.add_argument_group("directories")
+    paths.add_argument(
+        "--raw-root",
+        default=get_default_root("raw"),
+        help="Directory of the raw date directories, BASE_DIR/raw/sales by default",
+    )
+    paths.add_argument(
+        "--stg-root",
+        default=get_default_root("stg"),
+        help="Directory of the staging date directories, BASE_DIR/stg/sales by default",
+    )
+    paths.add_argument("--raw-dir", help="Convert this directory instead of dates")
+    paths.add_argument("--stg-dir", help="Target directory of --raw-dir")
+
+    output = parser.add_argument_group("output layout")
+    output.add_argument("--typed-schema", help="Typed price encoding: double or cents")
+    output.add_argument("--partition-by", help="Field of the Hive-style partitions")
+    output.add_argument("--num-buckets", type=positive_int, help="Hash buckets")
+    output.add_argument("--block-stats", action="store_true", help="Column stats")
+    output.add_argument("--block-index", action="store_true", help="Block index")
+    output.add_argument("--block-records", type=positive_int, help="Records/block")
+    output.add_argument("--sort-by", help="Single file sorted by this key")
+    output.add_argument(
+        "--dimensions", action="store_true", help="Surrogate keys for dimensions"
+    )
+
+    run_options = parser.add_argument_group("run")
+    run_options.add_argument(
+        "--incremental", action="store_true", help="Only convert changed inputs"
+    )
+    run_options.add_argument("--workers", type=positive_int, help="Worker processes")
+    run_options.add_argument(
+        "--memory-limit-mb", type=positive_int, help="RSS budget of the run"
+    )
+    run_options.add_argument("--dedup", action="store_true", help="Drop duplicates")
+    run_options.add_argument(
+        "--dedup-memory-mb", type=positive_int, help="Memory budget of --dedup"
+    )
+    run_options.add_argument(
+        "--storage", help="Storage URL to convert through, with --raw-dir only"
+    )
+    run_options.add_argument(
+        "--watch", action="store_true", help="Convert pages as Job1 saves them"
+    )
+    run_options.add_argument(
+        "--watch-timeout", type=positive_int, help="Seconds to wait for Job1"
+    )
+    run_options.add_argument(
+        "--run-id", help="With --watch, wait for the marker of this Job1 run"
+    )
+    args = parser.parse_args(argv)
+
+    args.job_options = {
+        name: getattr(args, name)
+        for name in JOB_OPTIONS
+        if getattr(args, name) not in (None, False)
+    }
+
+    if args.raw_dir or args.stg_dir:
+        if not (args.raw_dir and args.stg_dir):
+            parser.error("--raw-dir and --stg-dir must be given together.")
+        if args.start_date:
+            parser.error("Dates cannot be combined with --raw-dir.")
+    else:
+        if not (args.raw_root and args.stg_root):
+            parser.error("--raw-root and --stg-root are required without BASE_DIR.")
+        if args.start_date:
+            try:
+                get_dates(args.start_date, args.end_date)
+            except ValueError as e:
+                parser.error(str(e))
+        for name in ("watch", "storage"):
+            if getattr(args, name):
+                parser.error(f"--{name} requires --raw-dir.")
+
+    for name in ("watch_timeout", "run_id"):
+        if getattr(args, name) and not args.watch:
+            parser.error(f"--{name.replace('_', '-')} requires --watch.")
+    if args.watch:
+        for name in args.job_options:
+            if name not in WATCH_OPTIONS:
+                parser.error(
+                    f"--{name.replace('_', '-')} cannot be combined with --watch."
+                )
+    return args
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Runs the conversion selected by the arguments.
+
+    Args:
+        args (argparse.Namespace): Arguments of parse_args
+
+    Returns:
+        Dict[str, Any]: Report with the mode, the run report of the job and
+        the seconds it took
+
+    Raises:
+        ValueError: If an option is invalid
+        Exception: Whatever the job raised
+    """
+    # Imported here, so parsing the arguments stays fast
+    from lec02.hw.common.storage import get_storage
+    from lec02.hw.job2.bll.process_sales import process_sales_data, process_sales_tree
+    from lec02.hw.job2.bll.watch_sales import watch_sales_data
+
+    job_options = dict(args.job_options)
+    if "storage" in job_options:
+        try:
+            job_options["storage"] = get_storage(job_options["storage"])
+        except (ValueError, ImportError) as e:
+            raise ValueError(f"Invalid 'storage' parameter: {e}") from e
+
+    if not args.raw_dir:
+        mode, job = "tree", process_sales_tree
+        job_args: Dict[str, Any] = {
+            "raw_root": args.raw_root,
+            "stg_root": args.stg_root,
+            "start_date": args.start_date,
+            "end_date": args.end_date or args.start_date,
+        }
+    elif args.watch:
+        mode, job = "watch", watch_sales_data
+        job_args = {"raw_dir": args.raw_dir, "stg_dir": args.stg_dir}
+    else:
+        mode, job = "dir", process_sales_data
+        job_args = {"raw_dir": args.raw_dir, "stg_dir": args.stg_dir}
+
+    start = time.perf_counter()
+    report = job(**job_args, **job_options)
+    return {
+        "job": "job2",
+        "status": "succeeded",
+        "mode": mode,
+        "report": report,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    Runs Job2 from the command line.
+
+    Returns:
+        int: Exit status, 1 if the job failed
+    """
+    args = parse_args(argv)
+
+    # Logs go to stderr, the report to stdout, see LOG_* variables
+    configure_logging()
+
+    try:
+        report = run(args)
+    except Exception as e:
+        logger.error(f"Job2 failed: {e}")
+        report = {"job": "job2", "status": "failed", "error": str(e)}
+    print_report(report)
+    return 0 if report["status"] == "succeeded" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
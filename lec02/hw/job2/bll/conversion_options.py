@@ -0,0 +1,184 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+from lec02.hw.common.storage import StorageBackend
+from lec02.hw.job2.dal.file_io import (
+    build_typed_sales_schema,
+    SALES_AVRO_SCHEMA,
+    TYPED_PRICE_TYPES,
+)
+from lec02.hw.job2.dal.avro_index import DEFAULT_BLOCK_RECORDS
+from lec02.hw.job2.dal.partitioned_writer import PARTITION_FIELDS
+from lec02.hw.job2.dal.external_sort import SORT_KEYS
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+# Options each mode cannot be combined with: watch converts pages one by one
+# in-process, and a storage backend, file:// included, only supports the
+# conversion without local state
+WATCH_EXCLUDED: tuple[str, ...] = (
+    "incremental",
+    "workers",
+    "memory_limit_mb",
+    "dedup",
+    "sort_by",
+    "dimensions",
+)
+STORAGE_EXCLUDED: tuple[str, ...] = (
+    "watch",
+    "incremental",
+    "partition_by",
+    "memory_limit_mb",
+    "sort_by",
+    "dimensions",
+)
+
+
+def _fail(message: str) -> None:
+    """Logs and raises an invalid option."""
+    logger.error(message)
+    raise ValueError(message)
+
+
+@dataclass
+class ConversionOptions:
+    """
+    Options of a Job2 conversion, validated in one place for
+    process_sales_data, process_sales_tree, watch_sales_data,
+    extract_sales_to_avro and the Job2 server.
+
+    Attributes:
+        watch (bool): The conversion runs with watch_sales_data
+        tree (bool): The conversion runs with process_sales_tree
+        Others: See process_sales_data and watch_sales_data
+    """
+
+    incremental: bool = False
+    typed_schema: str | None = None
+    partition_by: str | None = None
+    num_buckets: int | None = None
+    block_stats: bool = False
+    block_index: bool = False
+    block_records: int | None = None
+    workers: int | None = None
+    memory_limit_mb: int | None = None
+    dedup: bool = False
+    dedup_memory_mb: int | None = None
+    sort_by: str | None = None
+    dimensions: bool = False
+    storage: StorageBackend | None = None
+    watch: bool = False
+    watch_timeout: int | None = None
+    run_id: str | None = None
+    tree: bool = False
+
+    def validate(self) -> None:
+        """
+        Checks the values of the options and the combinations they allow.
+
+        Raises:
+            ValueError: If an option is invalid or cannot be combined with
+                another one
+        """
+        # Output layout
+        if self.typed_schema is not None and self.typed_schema not in TYPED_PRICE_TYPES:
+            _fail(
+                f"Unsupported price type {self.typed_schema}, expected one of "
+                f"{TYPED_PRICE_TYPES}"
+            )
+        if self.partition_by is not None and self.partition_by not in PARTITION_FIELDS:
+            _fail(
+                f"Unsupported partition key {self.partition_by}, expected one of "
+                f"{PARTITION_FIELDS}"
+            )
+        if self.num_buckets is not None and (
+            not self.partition_by or self.num_buckets < 1
+        ):
+            _fail("num_buckets requires partition_by and must be positive.")
+        for name in ("block_records", "workers", "memory_limit_mb", "watch_timeout"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                _fail(f"{name} must be positive.")
+
+        # The sorted output replaces the per-file outputs, which partitioning
+        # and incremental runs work on
+        if self.sort_by is not None:
+            if self.sort_by not in SORT_KEYS:
+                _fail(
+                    f"Unsupported sort key {self.sort_by}, expected one of "
+                    f"{tuple(SORT_KEYS)}"
+                )
+            for name in ("partition_by", "incremental"):
+                if getattr(self, name):
+                    _fail(f"sort_by cannot be combined with {name}.")
+
+        # Surrogate keys are assigned in-process, and the fact files no longer
+        # hold the values partitioning, sorting and statistics work on
+        if self.dimensions:
+            for name in ("partition_by", "sort_by", "block_stats"):
+                if getattr(self, name):
+                    _fail(f"dimensions cannot be combined with {name}.")
+            if (self.workers or 1) > 1:
+                _fail("dimensions cannot be combined with several workers.")
+
+        # Records are deduplicated in-process, in file order, over every input
+        if not self.dedup:
+            if self.dedup_memory_mb is not None:
+                _fail("dedup_memory_mb requires dedup.")
+        else:
+            if self.dedup_memory_mb is not None and self.dedup_memory_mb < 1:
+                _fail("dedup_memory_mb must be positive.")
+            if self.incremental:
+                _fail("dedup cannot be combined with incremental.")
+            if (self.workers or 1) > 1:
+                _fail("dedup cannot be combined with several workers.")
+
+        # The conversion state, partitions, sort runs and dimension files are
+        # written to the local disk, outside any backend root. A file://
+        # backend is no exception: without storage, the jobs use the disk.
+        if self.storage is not None:
+            if self.tree:
+                _fail("storage cannot be combined with raw_root.")
+            for name in STORAGE_EXCLUDED:
+                if getattr(self, name):
+                    _fail(f"storage cannot be combined with {name}.")
+            if (self.workers or 1) > 1:
+                _fail("storage cannot be combined with workers.")
+
+        for name in ("watch_timeout", "run_id"):
+            if getattr(self, name) is not None and not self.watch:
+                _fail(f"{name} requires watch.")
+        if self.watch:
+            if self.tree:
+                _fail("watch cannot be combined with raw_root.")
+            for name in WATCH_EXCLUDED:
+                if getattr(self, name):
+                    _fail(f"{name} cannot be combined with watch.")
+
+    def get_output_settings(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Returns the AVRO schema and the block arguments of the writers.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: Output schema, and the block
+            arguments of the writers, empty for plain AVRO files
+        """
+        # Only pass block options when enabled, keeping the plain write path
+        block_options: Dict[str, Any] = {}
+        if self.block_stats or self.block_index:
+            block_options = {
+                "block_stats": self.block_stats,
+                "block_index": self.block_index,
+                "block_records": self.block_records or DEFAULT_BLOCK_RECORDS,
+            }
+
+        # Select output schema, coercing records when the typed variant is used
+        schema = (
+            build_typed_sales_schema(self.typed_schema)
+            if self.typed_schema
+            else SALES_AVRO_SCHEMA
+        )
+
+        return schema, block_options
@@ -0,0 +1,192 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List
+
+from lec02.hw.job2.bll.memory_budget import MIB
+from lec02.hw.job2.dal.hash_runs import write_hash_run, HashRun, DIGEST_SIZE
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+# Fields identifying a sales record
+DEDUP_FIELDS: tuple[str, ...] = ("client", "purchase_date", "product", "price")
+
+# Default memory budget of the deduplication state
+DEFAULT_DEDUP_MEMORY_MB: int = 64
+
+# Approximate memory of a digest held in the exact set: the bytes object plus
+# its share of the hash table
+EXACT_ENTRY_BYTES: int = 96
+
+# Number of bit positions set per key in the Bloom filter
+BLOOM_HASHES: int = 7
+
+
+def get_record_digest(record: Dict[str, Any]) -> bytes:
+    """
+    Hashes the normalized identifying fields of a sales record.
+
+    Strings are stripped and prices compared as floats, so "TV " and "TV", or
+    a price of 100 and 100.0, identify the same record. Missing values are
+    kept distinct from empty strings.
+
+    Args:
+        record (Dict[str, Any]): Raw sales record
+
+    Returns:
+        bytes: Digest of DIGEST_SIZE bytes
+    """
+    parts = []
+    for field in DEDUP_FIELDS:
+        value = record.get(field)
+        if value is None:
+            parts.append("\x00")
+        elif field == "price":
+            parts.append(repr(float(value)))
+        else:
+            parts.append(str(value).strip())
+    return hashlib.blake2b(
+        "\x1f".join(parts).encode("utf-8"), digest_size=DIGEST_SIZE
+    ).digest()
+
+
+class BloomFilter:
+    """
+    Bit array answering whether a digest may have been added.
+
+    The bit positions are derived from the two halves of the digest with
+    double hashing, so no further hashing is needed.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int = BLOOM_HASHES) -> None:
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = num_hashes
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, digest: bytes) -> List[int]:
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:16], "little") | 1
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, digest: bytes) -> None:
+        """Sets the bits of a digest."""
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(digest)
+        )
+
+
+class RecordDeduplicator:
+    """
+    Drops sales records already seen during a run, across files.
+
+    Digests of the records are kept in an exact set until it exceeds half of
+    the memory budget. The set is then spilled to a sorted run on disk and
+    its digests are added to a Bloom filter sized by the other half of the
+    budget. A digest missing from the set is only looked up in the runs when
+    the Bloom filter reports it, so the result stays exact while most new
+    records never touch the disk.
+    """
+
+    def __init__(
+        self,
+        memory_limit_bytes: int = DEFAULT_DEDUP_MEMORY_MB * MIB,
+        spill_dir: str | None = None,
+    ) -> None:
+        if memory_limit_bytes < 1:
+            raise ValueError("memory_limit_bytes must be positive.")
+
+        self.max_exact_keys = max(1, memory_limit_bytes // 2 // EXACT_ENTRY_BYTES)
+        self.bloom_bits = memory_limit_bytes // 2 * 8
+        self.spill_dir = spill_dir
+        self._owns_spill_dir = spill_dir is None
+        self._exact: set[bytes] = set()
+        self._bloom: BloomFilter | None = None
+        self._runs: List[HashRun] = []
+        self.records_seen = 0
+        self.duplicates = 0
+        self.run_lookups = 0
+
+    def is_duplicate(self, record: Dict[str, Any]) -> bool:
+        """
+        Checks whether a record was seen before, remembering it if not.
+
+        Args:
+            record (Dict[str, Any]): Raw sales record
+
+        Returns:
+            bool: True if an identical record was already seen
+        """
+        self.records_seen += 1
+        digest = get_record_digest(record)
+
+        if digest in self._exact:
+            self.duplicates += 1
+            return True
+        if self._bloom is not None and digest in self._bloom:
+            self.run_lookups += 1
+            if any(digest in run for run in self._runs):
+                self.duplicates += 1
+                return True
+
+        self._exact.add(digest)
+        if len(self._exact) >= self.max_exact_keys:
+            self._spill()
+        return False
+
+    def filter_records(self, page_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns the records of a page not seen before, in their original order.
+
+        Args:
+            page_data (List[Dict[str, Any]]): Raw sales records
+
+        Returns:
+            List[Dict[str, Any]]: Records without duplicates
+        """
+        return [record for record in page_data if not self.is_duplicate(record)]
+
+    def _spill(self) -> None:
+        """Moves the exact set to a run on disk and into the Bloom filter."""
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="dedup-")
+        if self._bloom is None:
+            self._bloom = BloomFilter(self.bloom_bits)
+            logger.info(
+                f"Deduplication set reached {len(self._exact)} keys, "
+                f"spilling to {self.spill_dir}."
+            )
+
+        run_filepath = os.path.join(self.spill_dir, f"run-{len(self._runs):05d}.bin")
+        write_hash_run(run_filepath, self._exact)
+        for digest in self._exact:
+            self._bloom.add(digest)
+        self._runs.append(HashRun(run_filepath))
+        self._exact = set()
+
+    def get_report(self) -> Dict[str, Any]:
+        """Returns the deduplication counters for the run report."""
+        return {
+            "duplicates_removed": self.duplicates,
+            "dedup_spills": len(self._runs),
+        }
+
+    def close(self) -> None:
+        """Closes the spilled runs and removes the spill directory it created."""
+        for run in self._runs:
+            run.close()
+        if self._owns_spill_dir and self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def __enter__(self) -> "RecordDeduplicator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
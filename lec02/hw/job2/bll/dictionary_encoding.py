@@ -0,0 +1,104 @@
+import logging
+from typing import Any, Dict, List
+
+from lec02.hw.job2.dal.dimensions import DIMENSION_FIELDS
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+
+class DictionaryEncoder:
+    """
+    Interning table of the client and product values of a run.
+
+    Pages repeat a few products and clients thousands of times, and the JSON
+    decoder creates a new str object for every occurrence. intern_record is
+    used as the object_hook of the decoder, so every repeated value is
+    replaced by one shared object while the page is parsed rather than
+    after it is fully in memory.
+
+    With dimensions, every value also gets an integer surrogate key, in
+    order of first appearance, and encode_record stores the keys in place of
+    the values. Keys loaded from earlier runs are kept, so they stay stable
+    across runs writing to the same staging directory.
+    """
+
+    def __init__(
+        self,
+        dimensions: Dict[str, List[str]] | None = None,
+        fields: tuple[str, ...] = DIMENSION_FIELDS,
+    ) -> None:
+        self.fields = fields
+        self.with_dimensions = dimensions is not None
+        self.values: Dict[str, List[str]] = {
+            field: list((dimensions or {}).get(field, [])) for field in fields
+        }
+        self.keys: Dict[str, Dict[str, int]] = {
+            field: {value: key for key, value in enumerate(self.values[field])}
+            for field in fields
+        }
+        self.table: Dict[str, str] = {
+            value: value for values in self.values.values() for value in values
+        }
+        self.new_values = 0
+
+    def intern(self, value: str) -> str:
+        """Returns the shared object equal to a string."""
+        return self.table.setdefault(value, value)
+
+    def intern_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replaces the client and product values of a record by shared objects.
+
+        Args:
+            record (Dict[str, Any]): Decoded JSON object, updated in place
+
+        Returns:
+            Dict[str, Any]: The same record
+        """
+        table = self.table
+        for field in self.fields:
+            value = record.get(field)
+            if value.__class__ is str:
+                record[field] = table.setdefault(value, value)
+        return record
+
+    def get_key(self, field: str, value: str | None) -> int | None:
+        """
+        Returns the surrogate key of a value, assigning one if it is new.
+
+        Args:
+            field (str): One of the encoded fields
+            value (str | None): Value to encode
+
+        Returns:
+            int | None: Surrogate key, None for a missing value
+        """
+        if value is None:
+            return None
+
+        keys = self.keys[field]
+        key = keys.get(value)
+        if key is None:
+            key = keys[value] = len(keys)
+            self.values[field].append(self.intern(value))
+            self.new_values += 1
+        return key
+
+    def encode_records(self, page_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Replaces the encoded fields of records by "<field>_id" surrogate keys.
+
+        Args:
+            page_data (List[Dict[str, Any]]): Records to encode
+
+        Returns:
+            List[Dict[str, Any]]: Records matching the fact schema
+        """
+        encoded = []
+        for record in page_data:
+            fact = dict(record)
+            for field in self.fields:
+                fact[f"{field}_id"] = self.get_key(field, fact.pop(field, None))
+            encoded.append(fact)
+        return encoded
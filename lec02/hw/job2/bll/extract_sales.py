@@ -0,0 +1,170 @@
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List
+
+from lec02.hw.common.logging_setup import LogSampler
+from lec02.hw.job1.dal import local_disk, sales_api
+from lec02.hw.job2.bll.conversion_options import ConversionOptions
+from lec02.hw.job2.bll.process_sales import create_stg_dir, write_page
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+# Pages waiting to be archived before extraction waits for the tee
+MAX_PENDING_ARCHIVES: int = 4
+
+
+class RawArchiver:
+    """
+    Asynchronous "tee" archiving pages to the raw zone as Job1 does.
+
+    Pages are saved by a background thread with the Job1 local_disk
+    functions, so the archive matches a Job1 run and Job2 can convert it
+    again later. At most max_pending pages wait to be saved, so a slow disk
+    slows extraction down rather than filling the memory.
+    """
+
+    def __init__(
+        self, raw_dir: str, date: str, max_pending: int = MAX_PENDING_ARCHIVES
+    ) -> None:
+        self.raw_dir = raw_dir
+        self.date = date
+        self.max_pending = max_pending
+        self.filenames: List[str] = []
+        self.records = 0
+        self._pending: Deque[Future] = deque()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="raw-archiver"
+        )
+        local_disk.prepare_storage_dir(raw_dir)
+
+    def submit(self, page: int, page_data: List[Dict[str, Any]]) -> None:
+        """Queues a page to be saved, waiting if too many pages are pending."""
+        while len(self._pending) >= self.max_pending:
+            self._pending.popleft().result()
+
+        filename = f"sales_{self.date}_{page}.json"
+        self._pending.append(
+            self._executor.submit(
+                local_disk.save_page_to_disk, page_data, self.raw_dir, filename
+            )
+        )
+        self.filenames.append(filename)
+        self.records += len(page_data)
+
+    def finish(self) -> None:
+        """Waits for the pending pages and writes the _SUCCESS marker."""
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            self._executor.shutdown(wait=True)
+        local_disk.save_success_marker(self.raw_dir, self.filenames, self.records)
+
+    def abort(self) -> None:
+        """Stops archiving without marking the raw directory complete."""
+        for future in self._pending:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+
+def extract_sales_to_avro(
+    date: str,
+    stg_dir: str,
+    raw_dir: str | None = None,
+    typed_schema: str | None = None,
+    partition_by: str | None = None,
+    num_buckets: int | None = None,
+    block_stats: bool = False,
+    block_index: bool = False,
+    block_records: int | None = None,
+) -> Dict[str, Any]:
+    """
+    Fetches the sales pages of a date and writes them straight to AVRO.
+
+    This fuses Job1 and Job2 in one process: every page returned by
+    get_sales_per_page is written as sales_<date>_<page>.avro in stg_dir,
+    the same files as a Job1 + Job2 run, without encoding the page to JSON,
+    writing it to disk and parsing it back. With raw_dir, the pages are also
+    archived as JSON by a background thread, off the critical path.
+
+    Args:
+        date (str): The date to fetch sales data for (format: YYYY-MM-DD)
+        stg_dir (str): Target directory for the AVRO files
+        raw_dir (str | None): Directory to archive the raw JSON pages to, with
+            a _SUCCESS marker, as Job1 does
+        typed_schema (str | None): See process_sales_data
+        partition_by (str | None): See process_sales_data
+        num_buckets (int | None): See process_sales_data
+        block_stats (bool): See process_sales_data
+        block_index (bool): See process_sales_data
+        block_records (int | None): See process_sales_data
+
+    Returns:
+        Dict[str, Any]: Run report with the pages and records written, and
+        the pages archived with raw_dir
+
+    Raises:
+        ValueError: If the options are invalid or the API returns bad data
+        ConnectionError: If API communication fails
+        OSError: If a directory or file cannot be written
+    """
+    logger.info(f"Extracting sales data for {date} to {stg_dir}...")
+
+    options = ConversionOptions(
+        typed_schema=typed_schema,
+        partition_by=partition_by,
+        num_buckets=num_buckets,
+        block_stats=block_stats,
+        block_index=block_index,
+        block_records=block_records,
+    )
+    options.validate()
+    schema, block_options = options.get_output_settings()
+    create_stg_dir(stg_dir)
+    archiver = RawArchiver(raw_dir, date) if raw_dir else None
+
+    page = 1
+    records_count = 0
+    progress = LogSampler(logger, "Extracted %d pages with %d records so far.")
+    try:
+        # Fetch and write pages until no more data
+        while True:
+            page_data = sales_api.get_sales_per_page(date=date, page=page)
+            if page_data is None:
+                logger.info(f"Page {page} is empty, no more data to extract.")
+                break
+
+            # Archive the page in the background before it is normalized
+            if archiver is not None:
+                archiver.submit(page, page_data)
+
+            page_records, _ = write_page(
+                page_data,
+                stg_dir=stg_dir,
+                output_filename=f"sales_{date}_{page}.avro",
+                schema=schema,
+                typed_schema=typed_schema,
+                partition_by=partition_by,
+                num_buckets=num_buckets,
+                block_options=block_options,
+            )
+            records_count += page_records
+            progress.tick(records_count)
+            page += 1
+
+        if archiver is not None:
+            archiver.finish()
+
+    except Exception:
+        if archiver is not None:
+            archiver.abort()
+        raise
+
+    logger.info(f"Extracted {page - 1} pages with {records_count} records.")
+    return {
+        "files_processed": page - 1,
+        "records_processed": records_count,
+        **({"files_archived": len(archiver.filenames)} if archiver else {}),
+    }
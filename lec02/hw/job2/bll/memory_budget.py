@@ -0,0 +1,124 @@
+import logging
+import os
+from typing import Iterable
+
+from lec02.hw.job2.dal.memory import get_peak_rss_bytes, get_process_tree_rss_bytes
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+# Peak memory of converting a JSON page, relative to the file size: the text
+# plus the decoded list of dicts, which takes about three times the file size
+PAGE_MEMORY_FACTOR: int = 4
+
+# Estimated RSS of an idle worker process with fastavro and NumPy loaded
+WORKER_BASELINE_BYTES: int = 64 * 1024 * 1024
+
+# Bytes per MiB
+MIB: int = 1024 * 1024
+
+
+def estimate_page_cost(filepath: str) -> int:
+    """
+    Estimates the peak memory of converting a JSON page.
+
+    Args:
+        filepath (str): Path of the JSON page
+
+    Returns:
+        int: Estimated bytes
+    """
+    return os.path.getsize(filepath) * PAGE_MEMORY_FACTOR
+
+
+def plan_workers(
+    limit_bytes: int, base_bytes: int, page_costs: Iterable[int], max_workers: int
+) -> int:
+    """
+    Derives how many worker processes fit in a memory budget.
+
+    Every worker is counted with its baseline plus the cost of the largest
+    page, so any mix of pages fits.
+
+    Args:
+        limit_bytes (int): Memory budget of the whole process tree
+        base_bytes (int): RSS already used before the run
+        page_costs (Iterable[int]): Estimated cost of every page to convert
+        max_workers (int): Upper bound, e.g. the CPU count
+
+    Returns:
+        int: Number of workers, at least 1
+    """
+    per_worker = WORKER_BASELINE_BYTES + max(page_costs, default=0)
+    return max(1, min(max_workers, (limit_bytes - base_bytes) // per_worker))
+
+
+class MemoryGuard:
+    """
+    Admits new work only while the process tree stays within a memory budget.
+
+    The memory in use is taken as the larger of the measured RSS and the
+    baseline plus the estimated cost of the work in flight, since pages just
+    admitted are not loaded yet. When nothing is in flight, work is always
+    admitted so the run makes progress. Without a limit, the guard only
+    records the peak RSS.
+    """
+
+    def __init__(self, limit_bytes: int | None = None, base_bytes: int = 0) -> None:
+        self.limit_bytes = limit_bytes
+        self.base_bytes = base_bytes
+        self.reserved = 0
+        self.throttled = 0
+        self.peak_rss = 0
+        self._start_peak = get_peak_rss_bytes()
+
+    def sample(self) -> int | None:
+        """Measures the RSS of the process tree and updates the peak."""
+        rss = get_process_tree_rss_bytes()
+        if rss is not None and rss > self.peak_rss:
+            self.peak_rss = rss
+        return rss
+
+    def try_acquire(self, cost: int, in_flight: int) -> bool:
+        """
+        Reserves memory for new work if the budget allows it.
+
+        Args:
+            cost (int): Estimated bytes of the work
+            in_flight (int): Number of tasks still running
+
+        Returns:
+            bool: True if the work was admitted
+        """
+        rss = self.sample()
+        if self.limit_bytes is not None and in_flight:
+            in_use = max(rss or 0, self.base_bytes + self.reserved)
+            if in_use + cost > self.limit_bytes:
+                self.throttled += 1
+                return False
+
+        if self.limit_bytes is not None and (rss or 0) + cost > self.limit_bytes:
+            logger.warning(
+                f"Admitting {cost // MIB} MiB of work over the memory limit of "
+                f"{self.limit_bytes // MIB} MiB, nothing else is running."
+            )
+        self.reserved += cost
+        return True
+
+    def release(self, cost: int) -> None:
+        """Returns the memory reserved for finished work."""
+        self.reserved -= cost
+        self.sample()
+
+    def get_peak_mib(self) -> float:
+        """
+        Returns the peak RSS observed during the run, in MiB.
+
+        The sampled peak of the process tree is combined with the high-water
+        mark of the current process when that was reached during the run.
+        """
+        peak = self.peak_rss
+        process_peak = get_peak_rss_bytes()
+        if process_peak > self._start_peak:
+            peak = max(peak, process_peak)
+        return round(peak / MIB, 1)
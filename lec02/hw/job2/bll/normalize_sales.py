@@ -0,0 +1,90 @@
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+
+from lec02.hw.job2.dal.file_io import TYPED_PRICE_TYPES
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+# Python types of the price values accepted from JSON, None being missing
+PRICE_TYPES: frozenset[type] = frozenset({int, float, type(None)})
+
+
+def normalize_sales_records(
+    page_data: List[Dict[str, Any]], price_type: str = "double"
+) -> List[Dict[str, Any]]:
+    """
+    Coerces raw sales records to the typed fast-path AVRO schema.
+
+    The page is converted column by column with NumPy: purchase_date is parsed
+    into days since epoch and price into a float64 array, or into integer cents
+    when price_type is "cents". Neither field is nullable in the typed schema,
+    so records missing one are rejected.
+
+    Args:
+        page_data (List[Dict[str, Any]]): Raw sales records read from JSON
+        price_type (str): Either "double" or "cents"
+
+    Returns:
+        List[Dict[str, Any]]: Records matching build_typed_sales_schema(price_type)
+
+    Raises:
+        ValueError: If price_type is unsupported, if a purchase_date or price
+            is missing or cannot be coerced, or if a price is not a number
+    """
+    if price_type not in TYPED_PRICE_TYPES:
+        raise ValueError(
+            f"Unsupported price type {price_type}, expected one of {TYPED_PRICE_TYPES}"
+        )
+
+    if not page_data:
+        return []
+
+    # Split records into columns
+    clients = [record.get("client") for record in page_data]
+    products = [record.get("product") for record in page_data]
+    raw_dates = [record.get("purchase_date") for record in page_data]
+    raw_prices = [record.get("price") for record in page_data]
+
+    # Parse dates as days since epoch
+    try:
+        dates = np.array(raw_dates, dtype="datetime64[D]")
+    except (TypeError, ValueError) as e:
+        logger.error(f"Invalid purchase_date value: {e}")
+        raise ValueError(f"Invalid purchase_date value: {e}") from e
+
+    missing_dates = int(np.count_nonzero(np.isnat(dates)))
+    if missing_dates:
+        logger.error(f"{missing_dates} records have no purchase_date.")
+        raise ValueError(f"{missing_dates} records have no purchase_date.")
+
+    days = dates.astype(np.int64)
+
+    # Only JSON numbers are prices: NumPy would also parse numeric strings and
+    # bools, which the plain schema rejects
+    if not {type(price) for price in raw_prices} <= PRICE_TYPES:
+        invalid = next(price for price in raw_prices if type(price) not in PRICE_TYPES)
+        logger.error(f"Invalid price value: {invalid!r}")
+        raise ValueError(f"Invalid price value: {invalid!r}")
+
+    # Parse prices, None becomes NaN
+    prices = np.array(raw_prices, dtype=np.float64)
+
+    # The typed price is not nullable, whatever its encoding
+    missing_prices = int(np.count_nonzero(np.isnan(prices)))
+    if missing_prices:
+        logger.error(f"{missing_prices} records have no price.")
+        raise ValueError(f"{missing_prices} records have no price.")
+
+    if price_type == "cents":
+        prices = np.rint(prices * 100).astype(np.int64)
+
+    # Rebuild records from the coerced columns
+    return [
+        {"client": client, "purchase_date": day, "product": product, "price": price}
+        for client, day, product, price in zip(
+            clients, days.tolist(), products, prices.tolist()
+        )
+    ]
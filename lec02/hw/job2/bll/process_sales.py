@@ -1,100 +1,981 @@
+import datetime
 import logging
 import os
+import shutil
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
-from lec02.hw.job2.dal.file_io import read_json_file, write_avro_file, SALES_AVRO_SCHEMA
+from lec02.hw.common.logging_setup import LogSampler
+from lec02.hw.common.storage import LocalStorage, StorageBackend
+from lec02.hw.job2.bll.conversion_options import ConversionOptions
+from lec02.hw.job2.bll.memory_budget import (
+    estimate_page_cost,
+    plan_workers,
+    MemoryGuard,
+    MIB,
+    WORKER_BASELINE_BYTES,
+)
+from lec02.hw.job2.bll.dictionary_encoding import DictionaryEncoder
+from lec02.hw.job2.bll.dedup_sales import RecordDeduplicator, DEFAULT_DEDUP_MEMORY_MB
+from lec02.hw.job2.bll.normalize_sales import normalize_sales_records
+from lec02.hw.job2.dal.file_io import read_json_file, write_avro_file
+from lec02.hw.job2.dal.avro_index import get_index_filepath
+from lec02.hw.job2.dal.partitioned_writer import write_partitioned_avro_file
+from lec02.hw.job2.dal.date_partitions import find_date_partitions
+from lec02.hw.job2.dal.dimensions import (
+    build_fact_schema,
+    load_dimension,
+    save_dimension,
+    DIMENSION_FIELDS,
+)
+from lec02.hw.job2.dal.external_sort import (
+    merge_sorted_runs,
+    write_sorted_run,
+    SORT_RUNS_DIR,
+    SORTED_FILENAME,
+)
+from lec02.hw.job2.dal.conversion_state import (
+    get_file_fingerprint,
+    is_input_unchanged,
+    load_conversion_state,
+    save_conversion_state,
+)
 
 # Get a logger specific to this module
 logger = logging.getLogger(__name__)
 
+# Seconds between RSS checks while new work is held back
+ADMISSION_POLL_INTERVAL: float = 0.05
+
+# Converted files between two saves of the conversion state of a partition
+STATE_CHECKPOINT_FILES: int = 100
+
+# Conversion task: input filename, input path, staging directory and output
+# filename
+ConversionTask = Tuple[str, str, str, str]
+
+
+def convert_file(
+    input_filepath: str,
+    stg_dir: str,
+    output_filename: str,
+    schema: Dict[str, Any],
+    typed_schema: str | None = None,
+    partition_by: str | None = None,
+    num_buckets: int | None = None,
+    block_options: Dict[str, Any] | None = None,
+    deduplicator: RecordDeduplicator | None = None,
+    sort_by: str | None = None,
+    encoders: Dict[str, DictionaryEncoder] | None = None,
+    storage: StorageBackend | None = None,
+) -> Tuple[int, List[str]]:
+    """
+    Converts a single JSON file to AVRO.
+
+    Args:
+        input_filepath (str): Path of the JSON file to convert
+        stg_dir (str): Target directory for converted AVRO files
+        output_filename (str): Name of the AVRO file to write
+        schema (Dict[str, Any]): AVRO schema of the output
+        typed_schema (str | None): Price type of the typed schema, if used
+        partition_by (str | None): Field used as partition key, if any
+        num_buckets (int | None): Number of hash buckets of the partition key
+        block_options (Dict[str, Any] | None): block_stats, block_index and
+            block_records arguments of the writers, empty for plain AVRO files
+        deduplicator (RecordDeduplicator | None): Drops records already seen
+            during the run, in-process conversion only
+        sort_by (str | None): Write the records sorted by this key as a run
+            in SORT_RUNS_DIR, to be merged by _merge_partition_runs
+        encoders (Dict[str, DictionaryEncoder] | None): Encoder of every
+            staging directory with dimensions, storing surrogate keys. Without
+            it, client and product values are interned per file while the
+            file is parsed.
+        storage (StorageBackend | None): Backend to read and write instead of
+            the local disk
+
+    Returns:
+        Tuple[int, List[str]]: Number of records converted and the written files
+        relative to stg_dir
+    """
+    logger.debug("Processing file %s...", input_filepath)
+
+    # Intern the values of the file, in the run-level encoder with dimensions
+    encoder = encoders[stg_dir] if encoders else DictionaryEncoder()
+
+    # Only pass the backend when one is selected
+    storage_options = {"storage": storage} if storage is not None else {}
+
+    # Read JSON file content, interning repeated values while parsing
+    try:
+        page_data = read_json_file(
+            input_filepath,
+            object_hook=encoder.intern_record,
+            **storage_options,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        logger.error("Error reading file %s: %s", input_filepath, e, exc_info=True)
+        raise
+    except Exception as e:
+        logger.exception("An unexpected error occurred: %s", e)
+        raise Exception(f"An unexpected error occurred: {e}") from e
+
+    return write_page(
+        page_data,
+        stg_dir=stg_dir,
+        output_filename=output_filename,
+        schema=schema,
+        typed_schema=typed_schema,
+        partition_by=partition_by,
+        num_buckets=num_buckets,
+        block_options=block_options,
+        deduplicator=deduplicator,
+        sort_by=sort_by,
+        encoder=encoder,
+        storage=storage,
+    )
+
+
+def write_page(
+    page_data: List[Dict[str, Any]],
+    stg_dir: str,
+    output_filename: str,
+    schema: Dict[str, Any],
+    typed_schema: str | None = None,
+    partition_by: str | None = None,
+    num_buckets: int | None = None,
+    block_options: Dict[str, Any] | None = None,
+    deduplicator: RecordDeduplicator | None = None,
+    sort_by: str | None = None,
+    encoder: DictionaryEncoder | None = None,
+    storage: StorageBackend | None = None,
+) -> Tuple[int, List[str]]:
+    """
+    Writes a page of decoded records to AVRO.
+
+    Args:
+        page_data (List[Dict[str, Any]]): Records of the page
+        stg_dir (str): Target directory for converted AVRO files
+        output_filename (str): Name of the AVRO file to write
+        schema (Dict[str, Any]): AVRO schema of the output
+        typed_schema (str | None): See convert_file
+        partition_by (str | None): See convert_file
+        num_buckets (int | None): See convert_file
+        block_options (Dict[str, Any] | None): See convert_file
+        deduplicator (RecordDeduplicator | None): See convert_file
+        sort_by (str | None): See convert_file
+        encoder (DictionaryEncoder | None): Encoder of stg_dir, storing
+            surrogate keys with dimensions
+        storage (StorageBackend | None): See convert_file
+
+    Returns:
+        Tuple[int, List[str]]: Number of records written and the written files
+        relative to stg_dir
+    """
+    # Only pass the backend when one is selected
+    storage_options = {"storage": storage} if storage is not None else {}
+
+    # Drop records already converted from this or an earlier file
+    if deduplicator is not None:
+        page_data = deduplicator.filter_records(page_data)
+
+    # Coerce records to the typed schema
+    if typed_schema:
+        page_data = normalize_sales_records(page_data, typed_schema)
+
+    # Store surrogate keys instead of client and product values
+    if encoder is not None and encoder.with_dimensions:
+        page_data = encoder.encode_records(page_data)
+
+    output_filepath = os.path.join(stg_dir, output_filename)
+
+    # Write data to AVRO file, to a sorted run, or to one AVRO file per partition
+    try:
+        if sort_by:
+            run_filename = os.path.join(SORT_RUNS_DIR, output_filename)
+            write_sorted_run(
+                page_data=page_data,
+                schema=schema,
+                filepath=os.path.join(stg_dir, run_filename),
+                sort_by=sort_by,
+            )
+            outputs = [run_filename]
+        elif partition_by:
+            outputs = write_partitioned_avro_file(
+                page_data=page_data,
+                schema=schema,
+                base_dir=stg_dir,
+                filename=output_filename,
+                partition_by=partition_by,
+                num_buckets=num_buckets,
+                **(block_options or {}),
+            )
+        else:
+            write_avro_file(
+                page_data=page_data,
+                schema=schema,
+                filepath=output_filepath,
+                **(block_options or {}),
+                **storage_options,
+            )
+            outputs = [output_filename]
+        logger.debug("File %s saved successfully.", output_filepath)
+    except (IOError, TypeError, Exception) as e:
+        logger.error("Error saving file %s: %s", output_filepath, e, exc_info=True)
+        raise
+
+    return len(page_data), outputs
+
+
+def remove_outputs(stg_dir: str, outputs: Iterable[str]) -> int:
+    """
+    Removes output files, their sidecar indexes and the partition directories
+    they leave empty.
+
+    Args:
+        stg_dir (str): Staging directory holding the outputs
+        outputs (Iterable[str]): Output files relative to stg_dir
+
+    Returns:
+        int: Number of files removed
+    """
+    removed_count = 0
+    for output in outputs:
+        output_filepath = os.path.join(stg_dir, output)
+        if not os.path.exists(output_filepath):
+            continue
+
+        os.remove(output_filepath)
+        removed_count += 1
+        if os.path.exists(get_index_filepath(output_filepath)):
+            os.remove(get_index_filepath(output_filepath))
+        logger.debug("Deleted stale output file %s.", output_filepath)
+
+        # Remove the partition directory once it is empty
+        parent_dir = os.path.dirname(output_filepath)
+        if os.path.normpath(parent_dir) != os.path.normpath(stg_dir) and not os.listdir(
+            parent_dir
+        ):
+            os.rmdir(parent_dir)
+
+    return removed_count
+
+
+def _create_encoders(
+    partitions: List[Dict[str, Any]], dimensions: bool
+) -> Dict[str, DictionaryEncoder] | None:
+    """
+    Creates the encoder of every partition with its dimensions loaded.
+
+    Without dimensions, no run-level encoder is needed: convert_file interns
+    the values of each file on its own, and nothing is pickled into the
+    tasks of the worker processes.
+    """
+    if not dimensions:
+        return None
+
+    encoders: Dict[str, DictionaryEncoder] = {}
+    for partition in partitions:
+        stg_dir = partition["stg_dir"]
+        encoders[stg_dir] = DictionaryEncoder(
+            {field: load_dimension(stg_dir, field) for field in DIMENSION_FIELDS}
+        )
+        partition["encoder"] = encoders[stg_dir]
+    return encoders
+
+
+def _save_dimensions(partition: Dict[str, Any]) -> None:
+    """Writes the dimension files of a partition."""
+    encoder = partition["encoder"]
+    for field in encoder.fields:
+        save_dimension(partition["stg_dir"], field, encoder.values[field])
+
+
+def _create_deduplicator(
+    dedup: bool, dedup_memory_mb: int | None
+) -> RecordDeduplicator | None:
+    """Creates the deduplicator of validated options, None without dedup."""
+    if not dedup:
+        return None
+    return RecordDeduplicator((dedup_memory_mb or DEFAULT_DEDUP_MEMORY_MB) * MIB)
+
+
+def _prepare_conversion(
+    options: ConversionOptions,
+) -> Tuple[Dict[str, Any], Dict[str, Any], RecordDeduplicator | None]:
+    """
+    Builds the settings of a run from its validated options.
+
+    Args:
+        options (ConversionOptions): Validated options of the run
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any], RecordDeduplicator | None]:
+        Options recorded in the conversion state, arguments of convert_file
+        shared by every file, and the deduplicator of the run, if any
+    """
+    schema, block_options = options.get_output_settings()
+
+    # Options that change the output, recorded in the conversion state
+    output_options: Dict[str, Any] = {
+        "typed_schema": options.typed_schema,
+        "partition_by": options.partition_by,
+        "num_buckets": options.num_buckets,
+        **block_options,
+        # Only recorded when set, keeping the states of plain runs valid
+        **({"dimensions": True} if options.dimensions else {}),
+    }
+    convert_options: Dict[str, Any] = {
+        "schema": schema,
+        "typed_schema": options.typed_schema,
+        "partition_by": options.partition_by,
+        "num_buckets": options.num_buckets,
+        "block_options": block_options,
+    }
+    if options.sort_by:
+        convert_options["sort_by"] = options.sort_by
+    if options.dimensions:
+        convert_options["schema"] = build_fact_schema(schema)
+        convert_options["dimensions"] = True
+    if options.storage is not None:
+        convert_options["storage"] = options.storage
+
+    deduplicator = _create_deduplicator(options.dedup, options.dedup_memory_mb)
+    if deduplicator is not None:
+        convert_options["deduplicator"] = deduplicator
+
+    return output_options, convert_options, deduplicator
+
+
+def create_stg_dir(stg_dir: str, storage: StorageBackend | None = None) -> None:
+    """Creates a staging directory, raising OSError on failure."""
+    try:
+        (storage or LocalStorage()).make_dirs(stg_dir)
+        logger.info(f"Created directory {stg_dir} if it did not exist.")
+    except OSError as e:
+        logger.error(f"Error creating directory {stg_dir}: {e}", exc_info=True)
+        raise OSError(f"Error creating directory {stg_dir}: {e}") from e
+
+
+def _plan_partition(
+    raw_dir: str,
+    stg_dir: str,
+    incremental: bool,
+    output_options: Dict[str, Any],
+    storage: StorageBackend | None = None,
+) -> Dict[str, Any]:
+    """
+    Lists the JSON files of a raw directory and selects those to convert.
+
+    Args:
+        raw_dir (str): Source directory containing JSON files
+        stg_dir (str): Target directory for converted AVRO files
+        incremental (bool): Skip inputs unchanged since the last run
+        output_options (Dict[str, Any]): Options recorded in the conversion state
+        storage (StorageBackend | None): Backend holding raw_dir, if not the
+            local disk
+
+    Returns:
+        Dict[str, Any]: Partition with its conversion tasks, conversion states
+        and counters
+    """
+    # Load the state of the previous run for incremental conversion
+    previous_state = load_conversion_state(stg_dir) if incremental else {}
+    current_state: Dict[str, Dict[str, Any]] = {}
+    tasks: List[ConversionTask] = []
+    files_skipped_count = 0
+
+    # Collect the JSON files of source directory to convert
+    for filename in sorted((storage or LocalStorage()).list_dir(raw_dir)):
+        if filename.lower().endswith(".json"):
+            input_filepath = os.path.join(raw_dir, filename)
+
+            # Generate output file name
+            output_filename = filename.replace(".json", ".avro")
+
+            # Skip inputs already converted and unchanged since last run
+            previous = previous_state.get(filename)
+            if incremental:
+                fingerprint = get_file_fingerprint(input_filepath, previous)
+                current_state[filename] = {
+                    **fingerprint,
+                    "outputs": previous.get("outputs", []) if previous else [],
+                    "options": output_options,
+                }
+
+                if is_input_unchanged(previous, current_state[filename], stg_dir):
+                    logger.debug("Skipping unchanged file %s.", input_filepath)
+                    files_skipped_count += 1
+                    continue
+
+            tasks.append((filename, input_filepath, stg_dir, output_filename))
+
+        else:
+            logger.debug("Skipping file %s as it is not a JSON file.", filename)
+
+    return {
+        "raw_dir": raw_dir,
+        "stg_dir": stg_dir,
+        "incremental": incremental,
+        "tasks": tasks,
+        "previous_state": previous_state,
+        "current_state": current_state,
+        "pending": {task[0] for task in tasks},
+        "unsaved": 0,
+        "files_processed": 0,
+        "files_skipped": files_skipped_count,
+        "files_deleted": 0,
+        "records_processed": 0,
+        "progress": LogSampler(
+            logger, "Converted %d files with %d records from %s so far."
+        ),
+    }
+
+
+def _record_conversion(
+    partition: Dict[str, Any], filename: str, records_count: int, outputs: List[str]
+) -> None:
+    """Updates the counters and conversion state of a partition for a file."""
+    partition["files_processed"] += 1
+    partition["records_processed"] += records_count
+    logger.debug("Converted %d records from file %s.", records_count, filename)
+    partition["progress"].tick(partition["records_processed"], partition["raw_dir"])
+
+    if partition["incremental"]:
+        partition["current_state"][filename]["outputs"] = outputs
+        partition["pending"].discard(filename)
+
+        # Delete outputs of the previous conversion no longer written
+        previous = partition["previous_state"].get(filename)
+        if previous:
+            partition["files_deleted"] += remove_outputs(
+                partition["stg_dir"], set(previous.get("outputs", [])) - set(outputs)
+            )
+
+        partition["unsaved"] += 1
+        if partition["unsaved"] >= STATE_CHECKPOINT_FILES:
+            _checkpoint_partition(partition)
+
+
+def _checkpoint_partition(partition: Dict[str, Any]) -> None:
+    """
+    Saves the conversion state of a partition in the middle of a run.
+
+    Files still pending keep their entry of the previous run, so a run that
+    stops early only skips the files it has converted. Dimensions are saved
+    first, so the state never refers to surrogate keys not on disk.
+    """
+    if partition.get("encoder") is not None:
+        _save_dimensions(partition)
+
+    save_conversion_state(
+        partition["stg_dir"],
+        {
+            **partition["previous_state"],
+            **{
+                filename: entry
+                for filename, entry in partition["current_state"].items()
+                if filename not in partition["pending"]
+            },
+        },
+    )
+    partition["unsaved"] = 0
+
+
+def _merge_partition_runs(
+    partition: Dict[str, Any], convert_options: Dict[str, Any]
+) -> None:
+    """Merges the sorted runs of a partition into its sorted output file."""
+    if not partition["tasks"]:
+        return
+
+    stg_dir = partition["stg_dir"]
+    runs_dir = os.path.join(stg_dir, SORT_RUNS_DIR)
+    merge_sorted_runs(
+        run_filepaths=[
+            os.path.join(runs_dir, output_filename)
+            for _, _, _, output_filename in partition["tasks"]
+        ],
+        schema=convert_options["schema"],
+        output_filepath=os.path.join(stg_dir, SORTED_FILENAME),
+        sort_by=convert_options["sort_by"],
+        **convert_options["block_options"],
+    )
+    shutil.rmtree(runs_dir, ignore_errors=True)
+
+
+def _finalize_partition(partition: Dict[str, Any]) -> None:
+    """Deletes outputs of vanished inputs and saves the conversion state."""
+    if not partition["incremental"]:
+        return
+
+    # Delete outputs whose inputs have disappeared
+    for filename, entry in partition["previous_state"].items():
+        if filename not in partition["current_state"]:
+            partition["files_deleted"] += remove_outputs(
+                partition["stg_dir"], entry.get("outputs", [])
+            )
+
+    save_conversion_state(partition["stg_dir"], partition["current_state"])
+
+
+def _run_conversions(
+    tasks: List[ConversionTask],
+    convert_options: Dict[str, Any],
+    workers: int,
+    guard: MemoryGuard,
+) -> Iterator[Tuple[ConversionTask, int, List[str]]]:
+    """
+    Converts files serially, or in worker processes admitted by a memory guard.
+
+    In parallel mode a file is only submitted when a worker is free and the
+    guard admits its estimated cost; otherwise the loop waits for running
+    conversions to finish and measures the RSS again. In serial mode with a
+    memory limit, every file still goes through the guard, which admits it
+    as nothing else runs and warns when it alone exceeds the budget.
+
+    Args:
+        tasks (List[ConversionTask]): Files to convert
+        convert_options (Dict[str, Any]): Keyword arguments of convert_file
+            shared by every file
+        workers (int): Number of worker processes, 1 to convert in-process
+        guard (MemoryGuard): Guard sampling the RSS and admitting work
+
+    Yields:
+        Tuple[ConversionTask, int, List[str]]: Task, records converted and
+        written files, in completion order
+    """
+    if workers <= 1:
+        for task in tasks:
+            _, input_filepath, stg_dir, output_filename = task
+            # Only estimated with a limit, storage keys having no file size
+            cost = (
+                estimate_page_cost(input_filepath)
+                if guard.limit_bytes is not None
+                else 0
+            )
+            guard.try_acquire(cost, 0)
+            try:
+                records_count, outputs = convert_file(
+                    input_filepath=input_filepath,
+                    stg_dir=stg_dir,
+                    output_filename=output_filename,
+                    **convert_options,
+                )
+            finally:
+                guard.release(cost)
+            yield task, records_count, outputs
+        guard.sample()
+        return
+
+    pending = deque(tasks)
+    in_flight: Dict[Future, Tuple[ConversionTask, int]] = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while pending or in_flight:
+            # Admit new work while a worker is free and the budget allows it
+            while pending and len(in_flight) < workers:
+                _, input_filepath, stg_dir, output_filename = pending[0]
+                cost = estimate_page_cost(input_filepath)
+                if not guard.try_acquire(cost, len(in_flight)):
+                    break
+                future = executor.submit(
+                    convert_file,
+                    input_filepath=input_filepath,
+                    stg_dir=stg_dir,
+                    output_filename=output_filename,
+                    **convert_options,
+                )
+                in_flight[future] = (pending.popleft(), cost)
+
+            done, _ = wait(
+                in_flight, timeout=ADMISSION_POLL_INTERVAL, return_when=FIRST_COMPLETED
+            )
+            guard.sample()
+            for future in done:
+                task, cost = in_flight.pop(future)
+                guard.release(cost)
+                records_count, outputs = future.result()
+                yield task, records_count, outputs
+
+
+def _convert_partitions(
+    partitions: List[Dict[str, Any]],
+    convert_options: Dict[str, Any],
+    workers: int | None,
+    memory_limit_mb: int | None,
+) -> Tuple[int, MemoryGuard]:
+    """
+    Converts the files of every partition through one shared set of workers.
+
+    Args:
+        partitions (List[Dict[str, Any]]): Partitions returned by _plan_partition
+        convert_options (Dict[str, Any]): Output arguments of convert_file
+        workers (int | None): Requested number of worker processes
+        memory_limit_mb (int | None): RSS budget of the job and its workers
+
+    Returns:
+        Tuple[int, MemoryGuard]: Number of workers used and the memory guard
+    """
+    tasks = [task for partition in partitions for task in partition["tasks"]]
+    dimensions = convert_options.pop("dimensions", False)
+    convert_options = {
+        **convert_options,
+        "encoders": _create_encoders(partitions, dimensions),
+    }
+
+    # Derive the number of workers from the memory budget
+    limit_bytes = memory_limit_mb * MIB if memory_limit_mb else None
+    guard = MemoryGuard(limit_bytes)
+    base_bytes = guard.sample() or 0
+    if limit_bytes is not None and tasks:
+        workers = plan_workers(
+            limit_bytes,
+            base_bytes,
+            [estimate_page_cost(task[1]) for task in tasks],
+            workers or os.cpu_count() or 1,
+        )
+        logger.info(
+            f"Using {workers} workers for a memory limit of {memory_limit_mb} MiB."
+        )
+    workers = max(1, min(workers or 1, len(tasks)))
+    guard.base_bytes = base_bytes + (
+        workers * WORKER_BASELINE_BYTES if workers > 1 else 0
+    )
+
+    # Convert the files, in parallel if several workers are used
+    partitions_by_stg_dir = {
+        partition["stg_dir"]: partition for partition in partitions
+    }
+    try:
+        for task, records_count, outputs in _run_conversions(
+            tasks, convert_options, workers, guard
+        ):
+            filename, _, stg_dir, _ = task
+            _record_conversion(
+                partitions_by_stg_dir[stg_dir], filename, records_count, outputs
+            )
+    except Exception:
+        # Keep the files converted so far for the next incremental run
+        for partition in partitions:
+            if partition["incremental"] and partition["unsaved"]:
+                try:
+                    _checkpoint_partition(partition)
+                except IOError as e:
+                    logger.warning(f"Conversion state not checkpointed: {e}")
+        raise
+
+    for partition in partitions:
+        if convert_options.get("sort_by"):
+            _merge_partition_runs(partition, convert_options)
+        if dimensions:
+            _save_dimensions(partition)
+        _finalize_partition(partition)
+
+    return workers, guard
+
 
 # Process sales data function
-def process_sales_data(raw_dir: str, stg_dir: str) -> None:
+def process_sales_data(
+    raw_dir: str,
+    stg_dir: str,
+    incremental: bool = False,
+    typed_schema: str | None = None,
+    partition_by: str | None = None,
+    num_buckets: int | None = None,
+    block_stats: bool = False,
+    block_index: bool = False,
+    block_records: int | None = None,
+    workers: int | None = None,
+    memory_limit_mb: int | None = None,
+    dedup: bool = False,
+    dedup_memory_mb: int | None = None,
+    sort_by: str | None = None,
+    dimensions: bool = False,
+    storage: StorageBackend | None = None,
+) -> Dict[str, Any]:
     """
     Process sales data files from JSON format to AVRO format.
 
     Args:
         raw_dir (str): Source directory containing JSON files
         stg_dir (str): Target directory for converted AVRO files
+        incremental (bool): Only convert new or changed inputs, based on the
+            conversion state kept in stg_dir, and delete outputs whose inputs
+            have disappeared
+        typed_schema (str | None): Write the typed fast-path schema with price
+            encoded as "double" or "cents" instead of SALES_AVRO_SCHEMA
+        partition_by (str | None): Write Hive-style partition directories keyed
+            by this field instead of a flat stg_dir
+        num_buckets (int | None): Hash the partition key into this many buckets
+            instead of partitioning by value
+        block_stats (bool): Write fixed-size AVRO blocks and a sidecar index with
+            per-block and per-file column statistics next to each output
+        block_index (bool): Write fixed-size AVRO blocks and a sidecar index with
+            the offset and record count of every block, for splittable reads
+        block_records (int | None): Number of records per AVRO block, defaults
+            to DEFAULT_BLOCK_RECORDS
+        workers (int | None): Number of worker processes converting files in
+            parallel. Defaults to 1, or with memory_limit_mb to the number of
+            workers that fit the budget (at most the CPU count).
+        memory_limit_mb (int | None): RSS budget of the job and its workers.
+            The number of workers is capped to fit it, and no file is
+            submitted while the measured RSS plus its estimated cost exceeds
+            it, unless nothing else runs. A single page is never split.
+        dedup (bool): Drop records whose normalized (client, purchase_date,
+            product, price) were already converted during the run, from any
+            file. Files are converted in name order, keeping first occurrences.
+        dedup_memory_mb (int | None): Memory budget of the deduplication
+            state, defaults to DEFAULT_DEDUP_MEMORY_MB. Beyond it, record
+            hashes are spilled to disk behind a Bloom filter.
+        sort_by (str | None): Write a single SORTED_FILENAME ordered by
+            "purchase_date" or "client" instead of one file per input, with
+            an external merge sort: every input is sorted into a run, and
+            the runs are merged with a k-way heap merge.
+        dimensions (bool): Store client and product as integer surrogate
+            keys ("client_id", "product_id") in the AVRO files, and write
+            their values to dimension files in DIMENSIONS_DIR. Keys are kept
+            across runs writing to the same stg_dir.
+        storage (StorageBackend | None): Read the JSON files and write the
+            AVRO files through this backend instead of the local disk, e.g.
+            MemoryStorage to measure the conversion without disk I/O. Only
+            the plain conversion is supported, optionally with typed_schema
+            and dedup.
+
+    Returns:
+        Dict[str, Any]: Run report with file and record counters, the number
+        of workers, the peak RSS in MiB and how often work was held back,
+        plus the duplicates removed and spills with dedup
 
     Raises:
         FileNotFoundError: If raw_dir does not exist
+        ValueError: If the partitioning or parallelism options are invalid
         OSError: If stg_dir cannot be created
         Exception: For other unexpected errors
     """
     logger.info(f"Processing sales data from {raw_dir} and saving to {stg_dir}...")
 
     # Validate source directory exists
-    if not os.path.isdir(raw_dir):
+    if not (storage or LocalStorage()).is_dir(raw_dir):
         logger.error(f"Raw directory {raw_dir} does not exist or is not a directory.")
         raise FileNotFoundError(
             f"Raw directory {raw_dir} does not exist or is not a " f"directory."
         )
 
-    # Create target directory if needed
+    options = ConversionOptions(
+        incremental=incremental,
+        typed_schema=typed_schema,
+        partition_by=partition_by,
+        num_buckets=num_buckets,
+        block_stats=block_stats,
+        block_index=block_index,
+        block_records=block_records,
+        workers=workers,
+        memory_limit_mb=memory_limit_mb,
+        dedup=dedup,
+        dedup_memory_mb=dedup_memory_mb,
+        sort_by=sort_by,
+        dimensions=dimensions,
+        storage=storage,
+    )
+    options.validate()
+    output_options, convert_options, deduplicator = _prepare_conversion(options)
+
+    # Create target directory if needed, object stores have no directories
+    create_stg_dir(stg_dir, storage)
+
     try:
-        os.makedirs(stg_dir, exist_ok=True)
-        logger.info(f"Created directory {stg_dir} if it did not exist.")
-    except OSError as e:
-        logger.error(f"Error creating directory {stg_dir}: {e}", exc_info=True)
-        raise OSError(f"Error creating directory {stg_dir}: {e}") from e
+        partition = _plan_partition(
+            raw_dir, stg_dir, incremental, output_options, storage
+        )
+        workers, guard = _convert_partitions(
+            [partition], convert_options, workers, memory_limit_mb
+        )
+
+        # Log final processing statistics
+        logger.info(
+            f"Processed {partition['files_processed']} files with "
+            f"{partition['records_processed']} records."
+        )
+
+        return {
+            "files_processed": partition["files_processed"],
+            "files_skipped": partition["files_skipped"],
+            "files_deleted": partition["files_deleted"],
+            "records_processed": partition["records_processed"],
+            "workers": workers,
+            "peak_rss_mb": guard.get_peak_mib(),
+            "throttled": guard.throttled,
+            **(deduplicator.get_report() if deduplicator else {}),
+            **(
+                {
+                    "dimensions": {
+                        field: len(values)
+                        for field, values in partition["encoder"].values.items()
+                    }
+                }
+                if dimensions
+                else {}
+            ),
+        }
+
+    except Exception as e:
+        logger.exception(f"An unexpected error occurred: {e}")
+        raise Exception(f"An unexpected error occurred: {e}") from e
+
+    finally:
+        if deduplicator is not None:
+            deduplicator.close()
+
+
+def process_sales_tree(
+    raw_root: str,
+    stg_root: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    incremental: bool = False,
+    typed_schema: str | None = None,
+    partition_by: str | None = None,
+    num_buckets: int | None = None,
+    block_stats: bool = False,
+    block_index: bool = False,
+    block_records: int | None = None,
+    workers: int | None = None,
+    memory_limit_mb: int | None = None,
+    dedup: bool = False,
+    dedup_memory_mb: int | None = None,
+    sort_by: str | None = None,
+    dimensions: bool = False,
+) -> Dict[str, Any]:
+    """
+    Process the sales data of every date directory under a root directory.
 
-    # Initialize counters for processed files and records
-    files_processed_count = 0
-    total_records_processed = 0
+    Date directories (e.g. raw/sales/2022-08-09) are discovered with a
+    scandir walk and mirrored under stg_root. The files of all dates are
+    converted through one shared pool of workers, so every core is busy for
+    the whole run rather than one date at a time.
 
+    Args:
+        raw_root (str): Root of the raw date directories, e.g. BASE_DIR/raw/sales
+        stg_root (str): Root of the staging date directories
+        start_date (str | None): First date to process (YYYY-MM-DD)
+        end_date (str | None): Last date to process (YYYY-MM-DD)
+        incremental (bool): See process_sales_data, applied per date
+        typed_schema (str | None): See process_sales_data
+        partition_by (str | None): See process_sales_data
+        num_buckets (int | None): See process_sales_data
+        block_stats (bool): See process_sales_data
+        block_index (bool): See process_sales_data
+        block_records (int | None): See process_sales_data
+        workers (int | None): Number of worker processes, defaults to the CPU
+            count (capped by memory_limit_mb)
+        memory_limit_mb (int | None): See process_sales_data
+        dedup (bool): See process_sales_data, across all dates. Converts
+            in-process, so workers defaults to 1.
+        dedup_memory_mb (int | None): See process_sales_data
+        sort_by (str | None): See process_sales_data, one sorted file per date
+        dimensions (bool): See process_sales_data, dimension files per date
+
+    Returns:
+        Dict[str, Any]: Run report with the counters of process_sales_data
+        summed over all dates, and the dates processed
+
+    Raises:
+        FileNotFoundError: If raw_root does not exist
+        ValueError: If the date range or other options are invalid
+        OSError: If a staging directory cannot be created
+        Exception: For other unexpected errors
+    """
+    logger.info(f"Processing sales data tree {raw_root} into {stg_root}...")
+
+    # Validate source directory exists
+    if not os.path.isdir(raw_root):
+        logger.error(f"Raw directory {raw_root} does not exist or is not a directory.")
+        raise FileNotFoundError(
+            f"Raw directory {raw_root} does not exist or is not a directory."
+        )
+
+    options = ConversionOptions(
+        incremental=incremental,
+        typed_schema=typed_schema,
+        partition_by=partition_by,
+        num_buckets=num_buckets,
+        block_stats=block_stats,
+        block_index=block_index,
+        block_records=block_records,
+        workers=workers,
+        memory_limit_mb=memory_limit_mb,
+        dedup=dedup,
+        dedup_memory_mb=dedup_memory_mb,
+        sort_by=sort_by,
+        dimensions=dimensions,
+        tree=True,
+    )
+    options.validate()
+
+    # Validate date range
     try:
-        # Process each JSON file in source directory
-        for filename in os.listdir(raw_dir):
-            if filename.lower().endswith(".json"):
-                input_filepath = os.path.join(raw_dir, filename)
-                logger.info(f"Processing file {input_filepath}...")
+        start = datetime.date.fromisoformat(start_date) if start_date else None
+        end = datetime.date.fromisoformat(end_date) if end_date else None
+    except ValueError as e:
+        logger.error(f"Invalid date range: {e}")
+        raise ValueError(f"Invalid date range: {e}") from e
+    if start and end and start > end:
+        logger.error(f"Start date {start_date} is after end date {end_date}.")
+        raise ValueError(f"Start date {start_date} is after end date {end_date}.")
 
-                # Read JSON file content
-                try:
-                    page_data = read_json_file(input_filepath)
-                    logger.info(f"File {input_filepath} read successfully.")
-                except (FileNotFoundError, ValueError) as e:
-                    logger.error(
-                        f"Error reading file {input_filepath}: " f"{e}", exc_info=True
-                    )
-                    raise
-                except Exception as e:
-                    logger.exception(f"An unexpected error occurred: {e}")
-                    raise Exception(f"An unexpected error occurred: {e}") from e
-
-                # Generate output file path
-                output_filename = filename.replace(".json", ".avro")
-                output_filepath = os.path.join(stg_dir, output_filename)
-
-                # Write data to AVRO file
-                try:
-                    write_avro_file(
-                        page_data=page_data,
-                        schema=SALES_AVRO_SCHEMA,
-                        filepath=output_filepath,
-                    )
-                    logger.info(f"File {output_filepath} saved successfully.")
-                    files_processed_count += 1
-                    total_records_processed += len(page_data)
-                    logger.info(
-                        f"Processed {total_records_processed} records "
-                        f"from file {input_filepath}."
-                    )
-                except (IOError, TypeError, Exception) as e:
-                    logger.error(
-                        f"Error saving file {output_filepath}: " f"{e}", exc_info=True
-                    )
-                    raise
-
-            else:
-                logger.info(f"Skipping file {filename} as it is not a JSON file.")
+    output_options, convert_options, deduplicator = _prepare_conversion(options)
 
-        # Log final processing statistics
+    # Discover the date directories and create their staging directories
+    rel_paths = find_date_partitions(raw_root, start, end)
+    for rel_path in rel_paths:
+        create_stg_dir(os.path.join(stg_root, rel_path))
+
+    try:
+        partitions = [
+            _plan_partition(
+                os.path.join(raw_root, rel_path),
+                os.path.join(stg_root, rel_path),
+                incremental,
+                output_options,
+            )
+            for rel_path in rel_paths
+        ]
+
+        workers, guard = _convert_partitions(
+            partitions,
+            convert_options,
+            workers or (1 if dedup or dimensions else os.cpu_count()),
+            memory_limit_mb,
+        )
+
+        report: Dict[str, Any] = {
+            counter: sum(partition[counter] for partition in partitions)
+            for counter in (
+                "files_processed",
+                "files_skipped",
+                "files_deleted",
+                "records_processed",
+            )
+        }
         logger.info(
-            f"Processed {files_processed_count} files with "
-            f"{total_records_processed} records."
+            f"Processed {len(partitions)} dates with {report['files_processed']} "
+            f"files and {report['records_processed']} records."
         )
 
+        return {
+            **report,
+            "dates": rel_paths,
+            "workers": workers,
+            "peak_rss_mb": guard.get_peak_mib(),
+            "throttled": guard.throttled,
+            **(deduplicator.get_report() if deduplicator else {}),
+        }
+
     except Exception as e:
         logger.exception(f"An unexpected error occurred: {e}")
         raise Exception(f"An unexpected error occurred: {e}") from e
+
+    finally:
+        if deduplicator is not None:
+            deduplicator.close()
@@ -0,0 +1,179 @@
+import logging
+import os
+import time
+from typing import Any, Dict, List
+
+from lec02.hw.job2.bll.conversion_options import ConversionOptions
+from lec02.hw.job2.bll.process_sales import (
+    convert_file,
+    create_stg_dir,
+    remove_outputs,
+)
+from lec02.hw.job2.dal.dir_watcher import (
+    create_dir_watcher,
+    read_success_marker,
+    DEFAULT_POLL_INTERVAL,
+    SUCCESS_MARKER,
+)
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+# Default time to wait for the completion marker of Job1, in seconds
+DEFAULT_WATCH_TIMEOUT: int = 600
+
+
+def watch_sales_data(
+    raw_dir: str,
+    stg_dir: str,
+    watch_timeout: int = DEFAULT_WATCH_TIMEOUT,
+    typed_schema: str | None = None,
+    partition_by: str | None = None,
+    num_buckets: int | None = None,
+    block_stats: bool = False,
+    block_index: bool = False,
+    block_records: int | None = None,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    run_id: str | None = None,
+) -> Dict[str, Any]:
+    """
+    Converts JSON pages to AVRO as Job1 publishes them.
+
+    raw_dir is watched (with inotify where available, polling otherwise) and
+    each JSON page is converted as soon as it lands, so conversion overlaps
+    with extraction. The run finishes once the _SUCCESS marker of Job1 has
+    appeared and every page it lists has been converted. raw_dir may not
+    exist yet when the watch starts. If Job1 recreates it, the outputs
+    converted so far are removed and the watch starts over.
+
+    raw_dir may still hold the pages and marker of a previous run when the
+    watch starts. With run_id, a marker of another run is ignored, so the
+    watch does not finish on stale data before Job1 recreated raw_dir.
+
+    Args:
+        raw_dir (str): Source directory Job1 writes to
+        stg_dir (str): Target directory for converted AVRO files
+        watch_timeout (int): Seconds to wait for the run to complete
+        typed_schema (str | None): See process_sales_data
+        partition_by (str | None): See process_sales_data
+        num_buckets (int | None): See process_sales_data
+        block_stats (bool): See process_sales_data
+        block_index (bool): See process_sales_data
+        block_records (int | None): See process_sales_data
+        poll_interval (float): Initial delay between checks when polling
+        run_id (str | None): Run of Job1 to wait for, the run_id of its
+            _SUCCESS marker. Any marker completes the watch if None.
+
+    Returns:
+        Dict[str, Any]: Run report with file and record counters, the watcher
+        used and the seconds spent
+
+    Raises:
+        TimeoutError: If the run does not complete within watch_timeout
+        FileNotFoundError: If a page listed in the marker does not exist
+        ValueError: If the options or the marker are invalid
+        OSError: If stg_dir cannot be created
+        Exception: For other unexpected errors
+    """
+    logger.info(f"Watching {raw_dir} for sales data to save to {stg_dir}...")
+
+    options = ConversionOptions(
+        typed_schema=typed_schema,
+        partition_by=partition_by,
+        num_buckets=num_buckets,
+        block_stats=block_stats,
+        block_index=block_index,
+        block_records=block_records,
+        watch=True,
+        watch_timeout=watch_timeout,
+        run_id=run_id,
+    )
+    options.validate()
+    schema, block_options = options.get_output_settings()
+
+    # Create target directory if needed
+    create_stg_dir(stg_dir)
+
+    converted: Dict[str, List[str]] = {}
+
+    def convert(filename: str) -> int:
+        records_count, outputs = convert_file(
+            input_filepath=os.path.join(raw_dir, filename),
+            stg_dir=stg_dir,
+            output_filename=filename.replace(".json", ".avro"),
+            schema=schema,
+            typed_schema=typed_schema,
+            partition_by=partition_by,
+            num_buckets=num_buckets,
+            block_options=block_options,
+        )
+        converted[filename] = outputs
+        return records_count
+
+    total_records_processed = 0
+    started = time.monotonic()
+    deadline = started + watch_timeout
+
+    try:
+        with create_dir_watcher(raw_dir, poll_interval) as watcher:
+            generation = watcher.generation
+            marker: Dict[str, Any] | None = None
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Run in {raw_dir} not completed after {watch_timeout}s, "
+                        f"{len(converted)} files converted."
+                    )
+
+                filenames = watcher.poll(remaining)
+
+                # Job1 restarted the run: drop the outputs of the previous one
+                if watcher.generation != generation:
+                    remove_outputs(
+                        stg_dir, [o for outputs in converted.values() for o in outputs]
+                    )
+                    converted.clear()
+                    total_records_processed = 0
+                    marker = None
+                    generation = watcher.generation
+
+                for filename in filenames:
+                    if filename == SUCCESS_MARKER:
+                        marker = read_success_marker(raw_dir)
+                        if run_id is not None and marker.get("run_id") != run_id:
+                            logger.info(
+                                f"Ignoring the marker of run {marker.get('run_id')} "
+                                f"in {raw_dir}, waiting for run {run_id}."
+                            )
+                            marker = None
+                    elif filename.lower().endswith(".json"):
+                        total_records_processed += convert(filename)
+
+                if marker is not None:
+                    # Pages are published before the marker, so they all exist
+                    for filename in marker["files"]:
+                        if filename not in converted:
+                            total_records_processed += convert(filename)
+                    break
+
+    except (TimeoutError, FileNotFoundError, ValueError) as e:
+        logger.error(f"Error watching {raw_dir}: {e}")
+        raise
+    except Exception as e:
+        logger.exception(f"An unexpected error occurred: {e}")
+        raise Exception(f"An unexpected error occurred: {e}") from e
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Processed {len(converted)} files with {total_records_processed} records "
+        f"in {elapsed:.2f}s while watching {raw_dir}."
+    )
+
+    return {
+        "files_processed": len(converted),
+        "records_processed": total_records_processed,
+        "watcher": watcher.kind,
+        "seconds": round(elapsed, 3),
+    }
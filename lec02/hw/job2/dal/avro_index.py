@@ -0,0 +1,273 @@
+import io
+import json
+import logging
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List
+
+import fastavro
+from fastavro.write import Writer
+
+from lec02.hw.common.storage import LocalStorage, StorageBackend
+from lec02.hw.job2.dal.column_stats import (
+    ColumnStatsCollector,
+    RangePredicate,
+    record_matches,
+    stats_may_match,
+)
+
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Suffix of the sidecar index written next to each AVRO file
+INDEX_SUFFIX: str = ".index.json"
+
+# Version of the sidecar index format
+INDEX_VERSION: int = 1
+
+# Default number of records per AVRO block
+DEFAULT_BLOCK_RECORDS: int = 4096
+
+
+def get_index_filepath(filepath: str) -> str:
+    """Returns the path of the sidecar index of an AVRO file."""
+    return filepath + INDEX_SUFFIX
+
+
+class IndexedAvroWriter:
+    """
+    Writes AVRO blocks of a fixed number of records and records where they are.
+
+    Every block is flushed explicitly, so the byte offset, length and record
+    count of each block are known as it is emitted. Column statistics are
+    optionally collected per block and per file.
+    """
+
+    def __init__(
+        self,
+        fo: BinaryIO,
+        schema: Dict[str, Any],
+        block_records: int = DEFAULT_BLOCK_RECORDS,
+        collect_stats: bool = True,
+    ) -> None:
+        if block_records < 1:
+            raise ValueError("block_records must be positive")
+
+        self.fo = fo
+        self.block_records = block_records
+        self.collect_stats = collect_stats
+        # Blocks are only flushed by flush_block, never by the size threshold
+        self.writer = Writer(fo, fastavro.parse_schema(schema), sync_interval=1 << 62)
+        self.header_size = fo.tell()
+        self.blocks: List[Dict[str, Any]] = []
+        self.file_stats = ColumnStatsCollector()
+        self._block_stats = ColumnStatsCollector()
+        self._block_count = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.writer.write(record)
+        self._block_count += 1
+        if self.collect_stats:
+            self._block_stats.add(record)
+        if self._block_count >= self.block_records:
+            self.flush_block()
+
+    def flush_block(self) -> None:
+        if not self._block_count:
+            return
+
+        offset = self.fo.tell()
+        self.writer.flush()
+        block: Dict[str, Any] = {
+            "offset": offset,
+            "length": self.fo.tell() - offset,
+            "records": self._block_count,
+        }
+
+        if self.collect_stats:
+            block["stats"] = self._block_stats.to_dict()
+            self.file_stats.merge(self._block_stats)
+            self._block_stats = ColumnStatsCollector()
+
+        self.blocks.append(block)
+        self._block_count = 0
+
+    def close(self) -> Dict[str, Any]:
+        """Flushes the last block and returns the sidecar index."""
+        self.flush_block()
+        index: Dict[str, Any] = {
+            "version": INDEX_VERSION,
+            "header_size": self.header_size,
+            "sync_marker": self.writer.sync_marker.hex(),
+            "records": sum(block["records"] for block in self.blocks),
+            "blocks": self.blocks,
+        }
+        if self.collect_stats:
+            index["stats"] = self.file_stats.to_dict(include_sketches=True)
+        return index
+
+
+def save_avro_index(
+    filepath: str, index: Dict[str, Any], storage: StorageBackend | None = None
+) -> None:
+    """
+    Atomically writes the compact sidecar index of an AVRO file.
+
+    Args:
+        filepath (str): Path of the AVRO file
+        index (Dict[str, Any]): Index returned by IndexedAvroWriter.close
+        storage (StorageBackend | None): Backend to write to, the local disk
+            by default
+
+    Raises:
+        OSError: If the sidecar cannot be written
+    """
+    (storage or LocalStorage()).write_bytes(
+        get_index_filepath(filepath),
+        json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+    )
+
+
+def load_avro_index(filepath: str) -> Dict[str, Any] | None:
+    """
+    Loads the sidecar index of an AVRO file.
+
+    Args:
+        filepath (str): Path of the AVRO file
+
+    Returns:
+        Dict[str, Any] | None: The index, or None if missing or unsupported
+    """
+    try:
+        with open(get_index_filepath(filepath), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable index of {filepath}: {e}")
+        return None
+
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        logger.warning(f"Ignoring unsupported index of {filepath}.")
+        return None
+
+    return index
+
+
+def write_indexed_avro_file(
+    page_data: Iterable[Dict[str, Any]],
+    schema: Dict[str, Any],
+    filepath: str,
+    block_records: int = DEFAULT_BLOCK_RECORDS,
+    collect_stats: bool = True,
+    storage: StorageBackend | None = None,
+) -> Dict[str, Any]:
+    """
+    Writes an AVRO file together with its sidecar index.
+
+    Args:
+        page_data (Iterable[Dict[str, Any]]): Records to write
+        schema (Dict[str, Any]): AVRO schema of the records
+        filepath (str): Path of the AVRO file
+        block_records (int): Number of records per AVRO block
+        collect_stats (bool): Whether to collect column statistics
+        storage (StorageBackend | None): Backend to write to, the local disk
+            by default
+
+    Returns:
+        Dict[str, Any]: The sidecar index
+
+    Raises:
+        OSError: If the file or its sidecar cannot be written
+    """
+    storage = storage or LocalStorage()
+    # Block offsets come from the file position, so write a local file
+    with storage.open_local_write(filepath) as local_path:
+        with open(local_path, "wb") as f:
+            writer = IndexedAvroWriter(f, schema, block_records, collect_stats)
+            for record in page_data:
+                writer.write(record)
+            index = writer.close()
+
+    save_avro_index(filepath, index, storage)
+    return index
+
+
+def read_avro_blocks(
+    filepath: str, index: Dict[str, Any], blocks: List[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Decodes only the given blocks of an AVRO file.
+
+    The file header is prepended to the raw bytes of the blocks, which makes a
+    valid AVRO stream for fastavro without reading the rest of the file.
+
+    Args:
+        filepath (str): Path of the AVRO file
+        index (Dict[str, Any]): Sidecar index of the file
+        blocks (List[Dict[str, Any]]): Block entries of the index to decode
+
+    Yields:
+        Dict[str, Any]: Decoded records
+    """
+    if not blocks:
+        return
+
+    with open(filepath, "rb") as f:
+        header = f.read(index["header_size"])
+        for block in blocks:
+            f.seek(block["offset"])
+            data = f.read(block["length"])
+            yield from fastavro.reader(io.BytesIO(header + data))
+
+
+def scan_avro_files(
+    filepaths: Iterable[str],
+    predicates: Dict[str, RangePredicate] | None = None,
+    scan_report: Dict[str, int] | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Reads records matching range predicates, skipping files and blocks by stats.
+
+    Files without a sidecar index with statistics are decoded in full.
+
+    Args:
+        filepaths (Iterable[str]): AVRO files to scan
+        predicates (Dict[str, RangePredicate] | None): Inclusive (low, high)
+            bounds per column, e.g. {"purchase_date": ("2022-08-01", None)}
+        scan_report (Dict[str, int] | None): Updated with files_skipped,
+            blocks_skipped and blocks_read counters
+
+    Yields:
+        Dict[str, Any]: Records satisfying every predicate
+    """
+    predicates = predicates or {}
+    report = scan_report if scan_report is not None else {}
+    for counter in ("files_skipped", "blocks_skipped", "blocks_read"):
+        report.setdefault(counter, 0)
+
+    for filepath in filepaths:
+        index = load_avro_index(filepath)
+
+        # Without statistics the whole file has to be decoded
+        if index is None or "stats" not in index:
+            with open(filepath, "rb") as f:
+                for record in fastavro.reader(f):
+                    if record_matches(record, predicates):
+                        yield record
+            continue
+
+        if not stats_may_match(index["stats"], predicates):
+            report["files_skipped"] += 1
+            continue
+
+        blocks = [
+            block
+            for block in index["blocks"]
+            if stats_may_match(block["stats"], predicates)
+        ]
+        report["blocks_skipped"] += len(index["blocks"]) - len(blocks)
+        report["blocks_read"] += len(blocks)
+
+        for record in read_avro_blocks(filepath, index, blocks):
+            if record_matches(record, predicates):
+                yield record
@@ -0,0 +1,242 @@
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, List, Tuple
+
+import fastavro
+
+from lec02.hw.job2.dal.avro_index import load_avro_index
+
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Magic bytes of an AVRO object container file
+AVRO_MAGIC: bytes = b"Obj\x01"
+
+# Size of the sync marker written after the header and after every block
+SYNC_SIZE: int = 16
+
+
+def _read_long(f: BinaryIO) -> int:
+    """Reads a zig-zag encoded AVRO long."""
+    shift = 0
+    result = 0
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise EOFError("Unexpected end of AVRO file")
+        value = byte[0]
+        result |= (value & 0x7F) << shift
+        if not value & 0x80:
+            return (result >> 1) ^ -(result & 1)
+        shift += 7
+
+
+def _skip_header(f: BinaryIO) -> bytes:
+    """Skips the header of an AVRO file and returns its sync marker."""
+    if f.read(4) != AVRO_MAGIC:
+        raise ValueError("Not an AVRO object container file")
+
+    # Metadata map: blocks of key/value pairs terminated by a zero count
+    while True:
+        count = _read_long(f)
+        if count == 0:
+            break
+        if count < 0:
+            _read_long(f)  # byte size of the block
+            count = -count
+        for _ in range(count):
+            f.seek(_read_long(f), os.SEEK_CUR)  # key
+            f.seek(_read_long(f), os.SEEK_CUR)  # value
+
+    return f.read(SYNC_SIZE)
+
+
+def scan_avro_blocks(filepath: str) -> Dict[str, Any]:
+    """
+    Finds the offset, length and record count of every block of an AVRO file.
+
+    Only block headers are read: block data is skipped and every block must be
+    followed by the file's sync marker.
+
+    Args:
+        filepath (str): Path of the AVRO file
+
+    Returns:
+        Dict[str, Any]: Index with header_size, sync_marker and blocks, in the
+        format of the sidecar index
+
+    Raises:
+        ValueError: If the file is not an AVRO file or a sync marker is wrong
+    """
+    blocks: List[Dict[str, Any]] = []
+    file_size = os.path.getsize(filepath)
+
+    with open(filepath, "rb") as f:
+        sync_marker = _skip_header(f)
+        header_size = f.tell()
+
+        while f.tell() < file_size:
+            offset = f.tell()
+            records = _read_long(f)
+            f.seek(_read_long(f), os.SEEK_CUR)
+            if f.read(SYNC_SIZE) != sync_marker:
+                raise ValueError(f"Invalid sync marker after block at offset {offset}")
+            blocks.append(
+                {"offset": offset, "length": f.tell() - offset, "records": records}
+            )
+
+    return {
+        "header_size": header_size,
+        "sync_marker": sync_marker.hex(),
+        "records": sum(block["records"] for block in blocks),
+        "blocks": blocks,
+    }
+
+
+def split_avro_file(filepath: str, num_splits: int) -> List[Tuple[int, int]]:
+    """
+    Splits an AVRO file into byte ranges aligned to sync markers.
+
+    Block offsets come from the sidecar index when present, otherwise from
+    scan_avro_blocks. Consecutive blocks are grouped into at most num_splits
+    ranges of roughly equal byte size.
+
+    Args:
+        filepath (str): Path of the AVRO file
+        num_splits (int): Maximum number of ranges
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) byte ranges, each starting right
+        after a sync marker and ending right after one
+
+    Raises:
+        ValueError: If num_splits is not positive
+    """
+    if num_splits < 1:
+        raise ValueError("num_splits must be positive")
+
+    index = load_avro_index(filepath) or scan_avro_blocks(filepath)
+    blocks = index["blocks"]
+    if not blocks:
+        return []
+
+    start = blocks[0]["offset"]
+    end = blocks[-1]["offset"] + blocks[-1]["length"]
+    target_size = (end - start) / min(num_splits, len(blocks))
+
+    splits: List[Tuple[int, int]] = []
+    split_start = start
+    for block in blocks:
+        block_end = block["offset"] + block["length"]
+        if block_end - split_start >= target_size and len(splits) < num_splits - 1:
+            splits.append((split_start, block_end))
+            split_start = block_end
+    if split_start < end:
+        splits.append((split_start, end))
+
+    return splits
+
+
+def read_avro_header(filepath: str) -> bytes:
+    """Returns the raw header bytes (including the sync marker) of an AVRO file."""
+    with open(filepath, "rb") as f:
+        _skip_header(f)
+        header_size = f.tell()
+        f.seek(0)
+        return f.read(header_size)
+
+
+def read_avro_split(
+    filepath: str, start: int, end: int, header: bytes | None = None
+) -> List[Dict[str, Any]]:
+    """
+    Decodes the records of a sync-marker aligned byte range.
+
+    Args:
+        filepath (str): Path of the AVRO file
+        start (int): First byte of the range, at a block boundary
+        end (int): End of the range, at a block boundary
+        header (bytes | None): Header bytes, read from the file if not given
+
+    Returns:
+        List[Dict[str, Any]]: Decoded records
+    """
+    header = header if header is not None else read_avro_header(filepath)
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return list(fastavro.reader(io.BytesIO(header + data)))
+
+
+def _process_split(
+    filepath: str,
+    start: int,
+    end: int,
+    header: bytes,
+    func: Callable[[List[Dict[str, Any]]], Any] | None,
+) -> Any:
+    """Worker entry point: decodes a range and applies func to its records."""
+    records = read_avro_split(filepath, start, end, header)
+    return func(records) if func else records
+
+
+def map_avro_splits(
+    filepath: str,
+    func: Callable[[List[Dict[str, Any]]], Any] | None = None,
+    num_splits: int | None = None,
+    max_workers: int | None = None,
+) -> List[Any]:
+    """
+    Decodes the byte ranges of an AVRO file in parallel worker processes.
+
+    Args:
+        filepath (str): Path of the AVRO file
+        func (Callable | None): Picklable function applied to the records of each
+            range inside the worker, e.g. to count or aggregate without sending
+            records back. If None, the decoded records are returned.
+        num_splits (int | None): Number of ranges, defaults to max_workers
+        max_workers (int | None): Number of worker processes, defaults to the
+            number of CPUs
+
+    Returns:
+        List[Any]: Results of func (or record lists) in file order
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    splits = split_avro_file(filepath, num_splits or max_workers)
+    header = read_avro_header(filepath)
+    logger.info(
+        f"Reading {filepath} in {len(splits)} splits with {max_workers} workers."
+    )
+
+    if len(splits) <= 1 or max_workers == 1:
+        return [_process_split(filepath, s, e, header, func) for s, e in splits]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_process_split, filepath, s, e, header, func)
+            for s, e in splits
+        ]
+        return [future.result() for future in futures]
+
+
+def read_avro_file_parallel(
+    filepath: str, num_splits: int | None = None, max_workers: int | None = None
+) -> List[Dict[str, Any]]:
+    """
+    Reads every record of an AVRO file, decoding its byte ranges in parallel.
+
+    Args:
+        filepath (str): Path of the AVRO file
+        num_splits (int | None): Number of ranges, defaults to max_workers
+        max_workers (int | None): Number of worker processes
+
+    Returns:
+        List[Dict[str, Any]]: Records in file order
+    """
+    records: List[Dict[str, Any]] = []
+    for split_records in map_avro_splits(filepath, None, num_splits, max_workers):
+        records.extend(split_records)
+    return records
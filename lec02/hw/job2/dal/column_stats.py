@@ -0,0 +1,231 @@
+import base64
+import datetime
+import hashlib
+import math
+from typing import Any, Dict, Iterable, Tuple
+
+
+# Columns with min/max statistics
+RANGE_COLUMNS: tuple[str, ...] = ("price", "purchase_date")
+
+# Columns with distinct-count estimates
+DISTINCT_COLUMNS: tuple[str, ...] = ("client", "product")
+
+# Columns with null counts
+NULLABLE_COLUMNS: tuple[str, ...] = ("client", "purchase_date", "product", "price")
+
+# Range predicate: inclusive (low, high) bounds, None meaning unbounded
+RangePredicate = Tuple[Any, Any]
+
+
+class HyperLogLog:
+    """
+    Minimal HyperLogLog sketch for distinct-count estimates.
+
+    Sketches of blocks or files can be merged, so distinct counts can be
+    estimated over any set of files without decoding them.
+    """
+
+    def __init__(self, precision: int = 10) -> None:
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.registers = bytearray(self.num_registers)
+
+    def add(self, value: Any) -> None:
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        index = hashed >> (64 - self.precision)
+        remaining = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> int:
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0**-register for register in self.registers)
+        zeros = self.registers.count(0)
+        # Linear counting is more accurate for small cardinalities
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+    def to_base64(self) -> str:
+        return base64.b64encode(bytes(self.registers)).decode("ascii")
+
+    @classmethod
+    def from_base64(cls, data: str) -> "HyperLogLog":
+        registers = base64.b64decode(data)
+        sketch = cls(precision=int(math.log2(len(registers))))
+        sketch.registers = bytearray(registers)
+        return sketch
+
+
+def _normalize_range_value(column: str, value: Any) -> Any:
+    """Returns a comparable value, or None for nulls and NaN."""
+    if value is None:
+        return None
+    if column == "purchase_date":
+        # Typed schema stores days since epoch, default schema ISO strings
+        if isinstance(value, int):
+            return (
+                datetime.date(1970, 1, 1) + datetime.timedelta(days=value)
+            ).isoformat()
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+        return str(value)
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class ColumnStatsCollector:
+    """
+    Accumulates record count, null counts, min/max and distinct sketches.
+
+    Dates are tracked as ISO strings whatever the schema variant, so range
+    predicates on purchase_date always use "YYYY-MM-DD" bounds.
+    """
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.nulls: Dict[str, int] = {column: 0 for column in NULLABLE_COLUMNS}
+        self.min: Dict[str, Any] = {}
+        self.max: Dict[str, Any] = {}
+        self.sketches: Dict[str, HyperLogLog] = {
+            column: HyperLogLog() for column in DISTINCT_COLUMNS
+        }
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.records += 1
+
+        for column in NULLABLE_COLUMNS:
+            if record.get(column) is None:
+                self.nulls[column] += 1
+
+        for column in RANGE_COLUMNS:
+            value = _normalize_range_value(column, record.get(column))
+            if value is None:
+                continue
+            if column not in self.min or value < self.min[column]:
+                self.min[column] = value
+            if column not in self.max or value > self.max[column]:
+                self.max[column] = value
+
+        for column, sketch in self.sketches.items():
+            value = record.get(column)
+            if value is not None:
+                sketch.add(value)
+
+    def merge(self, other: "ColumnStatsCollector") -> None:
+        self.records += other.records
+        for column, count in other.nulls.items():
+            self.nulls[column] += count
+        for column, value in other.min.items():
+            if column not in self.min or value < self.min[column]:
+                self.min[column] = value
+        for column, value in other.max.items():
+            if column not in self.max or value > self.max[column]:
+                self.max[column] = value
+        for column, sketch in other.sketches.items():
+            self.sketches[column].merge(sketch)
+
+    def to_dict(self, include_sketches: bool = False) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "records": self.records,
+            "nulls": self.nulls,
+            "min": self.min,
+            "max": self.max,
+            "distinct": {
+                column: sketch.estimate() for column, sketch in self.sketches.items()
+            },
+        }
+        if include_sketches:
+            stats["hll"] = {
+                column: sketch.to_base64() for column, sketch in self.sketches.items()
+            }
+        return stats
+
+
+def collect_column_stats(records: Iterable[Dict[str, Any]]) -> ColumnStatsCollector:
+    """
+    Computes column statistics of records.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): Sales records
+
+    Returns:
+        ColumnStatsCollector: Collected statistics
+    """
+    collector = ColumnStatsCollector()
+    for record in records:
+        collector.add(record)
+    return collector
+
+
+def stats_may_match(
+    stats: Dict[str, Any], predicates: Dict[str, RangePredicate]
+) -> bool:
+    """
+    Checks whether a block or file may contain records matching range predicates.
+
+    Args:
+        stats (Dict[str, Any]): Statistics produced by ColumnStatsCollector.to_dict
+        predicates (Dict[str, RangePredicate]): Inclusive (low, high) bounds per
+            column, None meaning unbounded
+
+    Returns:
+        bool: False only if no record can match, so the block or file can be
+        skipped. Predicates on columns without range stats (not in
+        RANGE_COLUMNS) never skip anything.
+    """
+    if not stats.get("records"):
+        return False
+
+    for column, (low, high) in predicates.items():
+        # Only range columns have min/max, others may always match
+        if column not in RANGE_COLUMNS:
+            continue
+
+        column_min = stats.get("min", {}).get(column)
+        column_max = stats.get("max", {}).get(column)
+
+        # Only nulls in this column: nothing can satisfy a range predicate
+        if column_min is None or column_max is None:
+            return False
+
+        if low is not None and column_max < low:
+            return False
+        if high is not None and column_min > high:
+            return False
+
+    return True
+
+
+def record_matches(
+    record: Dict[str, Any], predicates: Dict[str, RangePredicate]
+) -> bool:
+    """
+    Checks whether a record satisfies range predicates.
+
+    Args:
+        record (Dict[str, Any]): Decoded sales record
+        predicates (Dict[str, RangePredicate]): Inclusive (low, high) bounds per column
+
+    Returns:
+        bool: True if every predicate is satisfied
+    """
+    for column, (low, high) in predicates.items():
+        value = _normalize_range_value(column, record.get(column))
+        if value is None:
+            return False
+        if low is not None and value < low:
+            return False
+        if high is not None and value > high:
+            return False
+    return True
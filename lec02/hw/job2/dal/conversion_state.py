@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict
+
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Name of the state file kept in the staging directory
+STATE_FILENAME: str = "_conversion_state.json"
+
+# Chunk size used when hashing input files
+HASH_CHUNK_SIZE: int = 1024 * 1024
+
+
+def compute_file_hash(filepath: str) -> str:
+    """
+    Computes the SHA-256 hash of a file content, reading it in chunks.
+
+    Args:
+        filepath (str): Path to the file to hash
+
+    Returns:
+        str: Hex digest of the file content
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_file_fingerprint(
+    filepath: str, previous: Dict[str, Any] | None = None
+) -> Dict[str, Any]:
+    """
+    Builds the fingerprint (path, size, mtime and content hash) of an input file.
+
+    The content hash is only recomputed when the size or mtime differ from the
+    previous fingerprint, so unchanged inputs are never read.
+
+    Args:
+        filepath (str): Path to the input file
+        previous (Dict[str, Any] | None): Fingerprint recorded by the last run
+
+    Returns:
+        Dict[str, Any]: Fingerprint with keys path, size, mtime_ns and sha256
+
+    Raises:
+        OSError: If the file cannot be stat'ed or read
+    """
+    stat_result = os.stat(filepath)
+    fingerprint: Dict[str, Any] = {
+        "path": filepath,
+        "size": stat_result.st_size,
+        "mtime_ns": stat_result.st_mtime_ns,
+    }
+
+    if (
+        previous
+        and previous.get("size") == fingerprint["size"]
+        and previous.get("mtime_ns") == fingerprint["mtime_ns"]
+        and previous.get("sha256")
+    ):
+        fingerprint["sha256"] = previous["sha256"]
+    else:
+        fingerprint["sha256"] = compute_file_hash(filepath)
+
+    return fingerprint
+
+
+def load_conversion_state(stg_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Loads the conversion state recorded by a previous run.
+
+    Args:
+        stg_dir (str): Staging directory holding the state file
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Mapping of input filename to its fingerprint
+        and output files. Empty if no valid state exists.
+    """
+    state_filepath = os.path.join(stg_dir, STATE_FILENAME)
+
+    try:
+        with open(state_filepath, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        logger.info(f"No conversion state found in {stg_dir}.")
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable conversion state {state_filepath}: {e}")
+        return {}
+
+    if not isinstance(state, dict):
+        logger.warning(f"Ignoring invalid conversion state {state_filepath}.")
+        return {}
+
+    logger.info(f"Loaded conversion state with {len(state)} entries from {stg_dir}.")
+    return state
+
+
+def save_conversion_state(stg_dir: str, state: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Atomically saves the conversion state to the staging directory.
+
+    Args:
+        stg_dir (str): Staging directory holding the state file
+        state (Dict[str, Dict[str, Any]]): Mapping of input filename to its entry
+
+    Raises:
+        IOError: If the state file cannot be written
+    """
+    state_filepath = os.path.join(stg_dir, STATE_FILENAME)
+    tmp_filepath = state_filepath + ".tmp"
+
+    try:
+        with open(tmp_filepath, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=4, sort_keys=True)
+        os.replace(tmp_filepath, state_filepath)
+        logger.info(f"Saved conversion state with {len(state)} entries to {stg_dir}.")
+
+    except (IOError, OSError) as e:
+        # Never leave a partial state file behind
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
+        logger.error(f"Error saving conversion state {state_filepath}: {e}")
+        raise IOError(f"Error saving conversion state {state_filepath}: {e}") from e
+
+
+def is_input_unchanged(
+    previous: Dict[str, Any] | None, current: Dict[str, Any], stg_dir: str
+) -> bool:
+    """
+    Checks whether an input was already converted and has not changed since.
+
+    Args:
+        previous (Dict[str, Any] | None): State entry recorded by the last run
+        current (Dict[str, Any]): Current fingerprint of the input, with the
+            output options of this run under the "options" key
+        stg_dir (str): Staging directory holding the outputs
+
+    Returns:
+        bool: True if the content hash and output options match and every
+        output still exists
+    """
+    if not previous or previous.get("sha256") != current["sha256"]:
+        return False
+
+    if previous.get("options") != current.get("options"):
+        return False
+
+    outputs = previous.get("outputs")
+    return bool(outputs) and all(
+        os.path.exists(os.path.join(stg_dir, output)) for output in outputs
+    )
@@ -0,0 +1,82 @@
+import datetime
+import logging
+import os
+from typing import List
+
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Depth below the root at which the walk stops looking for date directories
+MAX_WALK_DEPTH: int = 3
+
+
+def parse_partition_date(name: str) -> datetime.date | None:
+    """
+    Parses the date of a partition directory name.
+
+    Args:
+        name (str): Directory name, "YYYY-MM-DD" or Hive-style "<key>=YYYY-MM-DD"
+
+    Returns:
+        datetime.date | None: The date, None if the name is not a date
+    """
+    value = name.rpartition("=")[2]
+    if len(value) != 10:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def find_date_partitions(
+    root_dir: str,
+    start_date: datetime.date | None = None,
+    end_date: datetime.date | None = None,
+    max_depth: int = MAX_WALK_DEPTH,
+) -> List[str]:
+    """
+    Finds the date directories under a root directory.
+
+    The tree is walked with os.scandir, whose entries carry their type, so no
+    directory is stat'ed. The walk does not descend into date directories or
+    hidden directories.
+
+    Args:
+        root_dir (str): Root directory, e.g. BASE_DIR/raw/sales
+        start_date (datetime.date | None): First date to include
+        end_date (datetime.date | None): Last date to include
+        max_depth (int): Number of directory levels to search
+
+    Returns:
+        List[str]: Paths of the date directories relative to root_dir, sorted
+        by date
+
+    Raises:
+        FileNotFoundError: If root_dir does not exist
+    """
+    partitions: List[tuple[datetime.date, str]] = []
+    stack: List[tuple[str, str, int]] = [(root_dir, "", 1)]
+
+    while stack:
+        dir_path, rel_path, depth = stack.pop()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if not entry.is_dir() or entry.name.startswith("."):
+                    continue
+
+                entry_rel_path = os.path.join(rel_path, entry.name)
+                date = parse_partition_date(entry.name)
+                if date is None:
+                    if depth < max_depth:
+                        stack.append((entry.path, entry_rel_path, depth + 1))
+                    continue
+
+                if (start_date is None or date >= start_date) and (
+                    end_date is None or date <= end_date
+                ):
+                    partitions.append((date, entry_rel_path))
+
+    logger.info(f"Found {len(partitions)} date partitions under {root_dir}.")
+    return [rel_path for _, rel_path in sorted(partitions)]
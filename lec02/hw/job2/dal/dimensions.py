@@ -0,0 +1,126 @@
+import logging
+import os
+from typing import Any, Dict, List
+
+import fastavro
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Fields stored as integer surrogate keys with dimension files
+DIMENSION_FIELDS: tuple[str, ...] = ("client", "product")
+
+# Directory of the dimension files inside the staging directory; the leading
+# underscore keeps it apart from the fact files
+DIMENSIONS_DIR: str = "_dimensions"
+
+
+def build_dimension_schema(field: str) -> Dict[str, Any]:
+    """
+    Builds the AVRO schema of a dimension file.
+
+    Args:
+        field (str): One of DIMENSION_FIELDS
+
+    Returns:
+        Dict[str, Any]: Schema of records with the surrogate key and the value
+    """
+    return {
+        "type": "record",
+        "name": f"{field.capitalize()}Dimension",
+        "namespace": "lec02.hw.job2.avro",
+        "fields": [
+            {"name": "id", "type": "long"},
+            {"name": "name", "type": "string"},
+        ],
+    }
+
+
+def build_fact_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Derives the fact schema storing surrogate keys instead of dimension values.
+
+    Args:
+        schema (Dict[str, Any]): Sales schema, plain or typed
+
+    Returns:
+        Dict[str, Any]: The schema with "client" and "product" replaced by the
+        nullable long fields "client_id" and "product_id"
+    """
+    fields = [
+        (
+            {"name": f"{field['name']}_id", "type": ["long", "null"]}
+            if field["name"] in DIMENSION_FIELDS
+            else field
+        )
+        for field in schema["fields"]
+    ]
+    return {**schema, "name": f"{schema['name']}Fact", "fields": fields}
+
+
+def get_dimension_filepath(stg_dir: str, field: str) -> str:
+    """Returns the path of the dimension file of a field."""
+    return os.path.join(stg_dir, DIMENSIONS_DIR, f"{field}.avro")
+
+
+def load_dimension(stg_dir: str, field: str) -> List[str]:
+    """
+    Loads the values of a dimension, indexed by surrogate key.
+
+    Args:
+        stg_dir (str): Staging directory holding the dimension files
+        field (str): One of DIMENSION_FIELDS
+
+    Returns:
+        List[str]: Value of every surrogate key, empty if the file is missing
+
+    Raises:
+        ValueError: If the dimension file cannot be decoded or its keys are
+            not contiguous
+    """
+    filepath = get_dimension_filepath(stg_dir, field)
+    if not os.path.exists(filepath):
+        return []
+
+    try:
+        with open(filepath, "rb") as f:
+            records = list(fastavro.reader(f))
+    except (OSError, ValueError, EOFError) as e:
+        logger.error(f"Error reading dimension file {filepath}: {e}")
+        raise ValueError(f"Error reading dimension file {filepath}: {e}") from e
+
+    if [record["id"] for record in records] != list(range(len(records))):
+        logger.error(f"Dimension file {filepath} has non-contiguous keys.")
+        raise ValueError(f"Dimension file {filepath} has non-contiguous keys.")
+
+    return [record["name"] for record in records]
+
+
+def save_dimension(stg_dir: str, field: str, values: List[str]) -> None:
+    """
+    Atomically writes the values of a dimension with their surrogate keys.
+
+    Args:
+        stg_dir (str): Staging directory holding the dimension files
+        field (str): One of DIMENSION_FIELDS
+        values (List[str]): Value of every surrogate key
+
+    Raises:
+        IOError: If the dimension file cannot be written
+    """
+    filepath = get_dimension_filepath(stg_dir, field)
+    tmp_filepath = filepath + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(tmp_filepath, "wb") as f:
+            fastavro.writer(
+                f,
+                build_dimension_schema(field),
+                ({"id": key, "name": value} for key, value in enumerate(values)),
+            )
+        os.replace(tmp_filepath, filepath)
+    except OSError as e:
+        logger.error(f"Error saving dimension file {filepath}: {e}")
+        raise IOError(f"Error saving dimension file {filepath}: {e}") from e
+
+    logger.info(f"Saved {len(values)} {field} values to {filepath}.")
@@ -0,0 +1,362 @@
+import abc
+import ctypes
+import ctypes.util
+import errno
+import json
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Set
+
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Marker written by Job1 once every page of a run has been published
+SUCCESS_MARKER: str = "_SUCCESS"
+
+# Suffix of files still being written, published later by a rename
+TMP_SUFFIX: str = ".tmp"
+
+# Default delay between directory checks of the polling watcher, in seconds
+DEFAULT_POLL_INTERVAL: float = 0.1
+
+# Longest delay the polling watcher backs off to while nothing changes
+MAX_POLL_INTERVAL: float = 1.0
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE: int = 0x00000008
+IN_MOVED_TO: int = 0x00000080
+IN_DELETE_SELF: int = 0x00000400
+IN_MOVE_SELF: int = 0x00000800
+IN_Q_OVERFLOW: int = 0x00004000
+IN_IGNORED: int = 0x00008000
+IN_ONLYDIR: int = 0x01000000
+
+# Header of an inotify event: wd, mask, cookie and name length
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def read_success_marker(dir_path: str) -> Dict[str, Any]:
+    """
+    Reads the completion marker of a raw directory.
+
+    Args:
+        dir_path (str): Raw directory written by Job1
+
+    Returns:
+        Dict[str, Any]: Marker content with the "files" of the run
+
+    Raises:
+        FileNotFoundError: If the marker does not exist
+        ValueError: If the marker is not valid
+    """
+    filepath = os.path.join(dir_path, SUCCESS_MARKER)
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            marker = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid marker {filepath}: {e}") from e
+
+    if not isinstance(marker, dict) or not isinstance(marker.get("files"), list):
+        raise ValueError(f"Invalid marker {filepath}: missing file list")
+
+    return marker
+
+
+class DirectoryWatcher(abc.ABC):
+    """
+    Reports the files published in a directory, each name once.
+
+    Hidden files and *.tmp files are never reported, as writers publish them
+    later under their final name.
+
+    The directory does not need to exist yet. If it is removed and created
+    again, as Job1 does when it starts a run, the files seen so far are
+    forgotten and generation is incremented so callers can reset their state.
+    """
+
+    kind: str = "base"
+
+    def __init__(self, dir_path: str) -> None:
+        self.dir_path = dir_path
+        self.generation = 0
+        self._seen: Set[str] = set()
+
+    @abc.abstractmethod
+    def poll(self, timeout: float) -> List[str]:
+        """
+        Waits up to timeout seconds for new files.
+
+        Args:
+            timeout (float): Maximum time to wait, in seconds
+
+        Returns:
+            List[str]: Names of files not reported before, empty on timeout
+        """
+
+    def close(self) -> None:
+        pass
+
+    def _reset(self) -> None:
+        logger.info(f"Directory {self.dir_path} was replaced, restarting watch.")
+        self._seen.clear()
+        self.generation += 1
+
+    def _scan(self) -> List[str]:
+        try:
+            with os.scandir(self.dir_path) as entries:
+                return [entry.name for entry in entries if entry.is_file()]
+        except FileNotFoundError:
+            return []
+
+    def _new_names(self, names: Iterable[str]) -> List[str]:
+        new_names = []
+        for name in names:
+            if (
+                name not in self._seen
+                and not name.startswith(".")
+                and not name.endswith(TMP_SUFFIX)
+            ):
+                self._seen.add(name)
+                new_names.append(name)
+        return new_names
+
+    def __enter__(self) -> "DirectoryWatcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class PollingWatcher(DirectoryWatcher):
+    """
+    Watches a directory by polling its modification time.
+
+    The directory is only listed when its mtime changed, or at least every
+    max_interval seconds in case two renames fall in the same mtime tick.
+    The delay between checks doubles up to max_interval while nothing happens.
+    Seen files are tracked by inode and mtime, so a recreated directory is
+    detected.
+    """
+
+    kind = "polling"
+
+    def __init__(
+        self,
+        dir_path: str,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL,
+    ) -> None:
+        super().__init__(dir_path)
+        self.poll_interval = poll_interval
+        self.max_interval = max(max_interval, poll_interval)
+        self._dir_id: tuple[int, int] | None = None
+        self._last_scan = 0.0
+        self._file_ids: Dict[str, tuple[int, int]] = {}
+
+    def _reset(self) -> None:
+        super()._reset()
+        self._file_ids.clear()
+
+    def _poll_once(self) -> List[str]:
+        try:
+            stat_result = os.stat(self.dir_path)
+        except FileNotFoundError:
+            if self._seen:
+                self._reset()
+            self._dir_id = None
+            return []
+
+        dir_id = (stat_result.st_ino, stat_result.st_mtime_ns)
+        now = time.monotonic()
+        if dir_id == self._dir_id and now - self._last_scan < self.max_interval:
+            return []
+
+        if self._dir_id and dir_id[0] != self._dir_id[0]:
+            self._reset()
+        self._dir_id = dir_id
+        self._last_scan = now
+
+        try:
+            with os.scandir(self.dir_path) as entries:
+                file_ids = {
+                    entry.name: (entry.inode(), entry.stat().st_mtime_ns)
+                    for entry in entries
+                    if entry.is_file()
+                }
+        except FileNotFoundError:
+            return []
+
+        # A seen file missing or replaced means the directory was rewritten,
+        # even if the new directory reuses the inode of the old one
+        if any(
+            file_ids.get(name) != file_id for name, file_id in self._file_ids.items()
+        ):
+            self._reset()
+
+        names = self._new_names(sorted(file_ids))
+        self._file_ids.update((name, file_ids[name]) for name in names)
+        return names
+
+    def poll(self, timeout: float) -> List[str]:
+        deadline = time.monotonic() + timeout
+        interval = self.poll_interval
+        while True:
+            names = self._poll_once()
+            remaining = deadline - time.monotonic()
+            if names or remaining <= 0:
+                return names
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, self.max_interval)
+
+
+class InotifyWatcher(DirectoryWatcher):
+    """
+    Watches a directory with Linux inotify, through ctypes.
+
+    Files are reported when they are renamed into the directory (atomic
+    publication) or closed after writing. The directory is listed once when
+    the watch is attached, to report files published before that.
+    """
+
+    kind = "inotify"
+
+    WATCH_MASK: int = (
+        IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    )
+
+    def __init__(
+        self, dir_path: str, poll_interval: float = DEFAULT_POLL_INTERVAL
+    ) -> None:
+        super().__init__(dir_path)
+        self.poll_interval = poll_interval
+
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not supported by the C library")
+
+        libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._libc = libc
+
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error_code = ctypes.get_errno()
+            raise OSError(
+                error_code, f"inotify_init1 failed: {os.strerror(error_code)}"
+            )
+        self._wd: int | None = None
+
+    def _attach(self) -> bool:
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(self.dir_path), self.WATCH_MASK
+        )
+        if wd < 0:
+            error_code = ctypes.get_errno()
+            # The directory does not exist yet
+            if error_code == errno.ENOENT:
+                return False
+            raise OSError(
+                error_code, f"inotify_add_watch failed: {os.strerror(error_code)}"
+            )
+        self._wd = wd
+        return True
+
+    def _detach(self) -> None:
+        if self._wd is not None:
+            self._libc.inotify_rm_watch(self._fd, self._wd)
+            self._wd = None
+
+    def _read_events(self) -> List[str]:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        names: List[str] = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: fall back to listing the directory
+                names.extend(self._scan())
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                self._detach()
+                self._reset()
+                names = []
+            elif mask & IN_IGNORED:
+                if wd == self._wd:
+                    self._wd = None
+            elif wd == self._wd and name:
+                names.append(os.fsdecode(name))
+
+        return self._new_names(names)
+
+    def poll(self, timeout: float) -> List[str]:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+
+            if self._wd is None:
+                if self._attach():
+                    names = self._new_names(sorted(self._scan()))
+                    if names:
+                        return names
+                elif remaining <= 0:
+                    return []
+                else:
+                    time.sleep(min(self.poll_interval, remaining))
+                    continue
+
+            ready, _, _ = select.select([self._fd], [], [], max(remaining, 0))
+            if ready:
+                names = self._read_events()
+                if names:
+                    return names
+            if time.monotonic() >= deadline:
+                return []
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+            self._wd = None
+
+
+def create_dir_watcher(
+    dir_path: str, poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> DirectoryWatcher:
+    """
+    Creates the most efficient watcher available for a directory.
+
+    Args:
+        dir_path (str): Directory to watch, which may not exist yet
+        poll_interval (float): Delay between checks while the directory does
+            not exist, and initial delay of the polling fallback
+
+    Returns:
+        DirectoryWatcher: An InotifyWatcher on Linux, a PollingWatcher otherwise
+    """
+    try:
+        watcher: DirectoryWatcher = InotifyWatcher(dir_path, poll_interval)
+    except OSError as e:
+        logger.info(f"inotify unavailable ({e}), polling {dir_path} instead.")
+        watcher = PollingWatcher(dir_path, poll_interval)
+
+    logger.info(f"Watching {dir_path} with {watcher.kind} watcher.")
+    return watcher
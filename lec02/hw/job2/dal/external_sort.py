@@ -0,0 +1,193 @@
+import heapq
+import logging
+import os
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import fastavro
+
+from lec02.hw.job2.dal.avro_index import write_indexed_avro_file, DEFAULT_BLOCK_RECORDS
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Supported sort keys of the staging output and the fields they order by
+SORT_KEYS: Dict[str, tuple[str, ...]] = {
+    "purchase_date": ("purchase_date", "client"),
+    "client": ("client", "purchase_date"),
+}
+
+# Directory of the sorted runs, inside the staging directory
+SORT_RUNS_DIR: str = ".sort-runs"
+
+# Name of the sorted output file in the staging directory
+SORTED_FILENAME: str = "sales_sorted.avro"
+
+# Maximum number of runs merged at once, bounding open files
+MAX_MERGE_FANIN: int = 64
+
+
+def get_sort_key(sort_by: str) -> Callable[[Dict[str, Any]], Tuple[Any, ...]]:
+    """
+    Returns the key function ordering records by a sort key.
+
+    Missing values sort first, so records with and without a value can be
+    compared.
+
+    Args:
+        sort_by (str): One of SORT_KEYS
+
+    Returns:
+        Callable[[Dict[str, Any]], Tuple[Any, ...]]: Key function of a record
+
+    Raises:
+        ValueError: If sort_by is not supported
+    """
+    if sort_by not in SORT_KEYS:
+        raise ValueError(
+            f"Unsupported sort key {sort_by}, expected one of {tuple(SORT_KEYS)}"
+        )
+
+    fields = SORT_KEYS[sort_by]
+
+    def sort_key(record: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(
+            (record.get(field) is not None, record.get(field)) for field in fields
+        )
+
+    return sort_key
+
+
+def write_sorted_run(
+    page_data: List[Dict[str, Any]],
+    schema: Dict[str, Any],
+    filepath: str,
+    sort_by: str,
+) -> None:
+    """
+    Sorts records in memory and writes them as an AVRO run.
+
+    Args:
+        page_data (List[Dict[str, Any]]): Records to sort, sorted in place
+        schema (Dict[str, Any]): AVRO schema of the records
+        filepath (str): Path of the run file to create
+        sort_by (str): One of SORT_KEYS
+
+    Raises:
+        IOError: If the run cannot be written
+    """
+    page_data.sort(key=get_sort_key(sort_by))
+    try:
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "wb") as f:
+            fastavro.writer(f, schema, page_data)
+    except OSError as e:
+        logger.error(f"Error writing sorted run {filepath}: {e}")
+        raise IOError(f"Error writing sorted run {filepath}: {e}") from e
+
+
+def _merge_runs(run_filepaths: List[str], sort_by: str) -> Iterator[Dict[str, Any]]:
+    """Yields the records of sorted runs in order, with a k-way heap merge."""
+    with ExitStack() as stack:
+        readers = [
+            fastavro.reader(stack.enter_context(open(filepath, "rb")))
+            for filepath in run_filepaths
+        ]
+        yield from heapq.merge(*readers, key=get_sort_key(sort_by))
+
+
+def merge_sorted_runs(
+    run_filepaths: List[str],
+    schema: Dict[str, Any],
+    output_filepath: str,
+    sort_by: str,
+    block_stats: bool = False,
+    block_index: bool = False,
+    block_records: int = DEFAULT_BLOCK_RECORDS,
+    max_fanin: int = MAX_MERGE_FANIN,
+) -> int:
+    """
+    Merges sorted AVRO runs into one sorted AVRO file.
+
+    Records are streamed, so only one block per run is held in memory and
+    the output may be larger than RAM. With more runs than max_fanin, groups
+    of runs are first merged into intermediate runs next to the inputs. The
+    input runs are removed once merged.
+
+    Args:
+        run_filepaths (List[str]): Paths of the sorted runs
+        schema (Dict[str, Any]): AVRO schema of the records
+        output_filepath (str): Path of the sorted output file
+        sort_by (str): Sort key the runs are ordered by
+        block_stats (bool): Write a sidecar index with block statistics
+        block_index (bool): Write a sidecar index of the block offsets
+        block_records (int): Number of records per AVRO block with block_stats
+            or block_index
+        max_fanin (int): Maximum number of runs merged at once
+
+    Returns:
+        int: Number of records written
+
+    Raises:
+        IOError: If a run or the output cannot be read or written
+    """
+    if max_fanin < 2:
+        raise ValueError("max_fanin must be at least 2.")
+
+    runs = list(run_filepaths)
+    merge_pass = 0
+    try:
+        # Merge groups of runs until a single merge can produce the output
+        while len(runs) > max_fanin:
+            merge_pass += 1
+            merged_runs = []
+            for start in range(0, len(runs), max_fanin):
+                group = runs[start : start + max_fanin]
+                merged_filepath = os.path.join(
+                    os.path.dirname(group[0]),
+                    f"merge-{merge_pass:02d}-{start // max_fanin:05d}.avro",
+                )
+                with open(merged_filepath, "wb") as f:
+                    fastavro.writer(f, schema, _merge_runs(group, sort_by))
+                for filepath in group:
+                    os.remove(filepath)
+                merged_runs.append(merged_filepath)
+            logger.info(
+                f"Merge pass {merge_pass} reduced {len(runs)} runs "
+                f"to {len(merged_runs)}."
+            )
+            runs = merged_runs
+
+        records_count = 0
+
+        def counted(records: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            nonlocal records_count
+            for record in records:
+                records_count += 1
+                yield record
+
+        merged = counted(_merge_runs(runs, sort_by))
+        if block_stats or block_index:
+            write_indexed_avro_file(
+                merged,
+                schema,
+                output_filepath,
+                block_records,
+                collect_stats=block_stats,
+            )
+        else:
+            with open(output_filepath, "wb") as f:
+                fastavro.writer(f, schema, merged)
+
+        for filepath in runs:
+            os.remove(filepath)
+
+    except OSError as e:
+        logger.error(f"Error merging sorted runs into {output_filepath}: {e}")
+        raise IOError(f"Error merging sorted runs into {output_filepath}: {e}") from e
+
+    logger.info(
+        f"Merged {len(run_filepaths)} sorted runs into {output_filepath} "
+        f"with {records_count} records."
+    )
+    return records_count
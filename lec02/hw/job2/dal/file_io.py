@@ -1,8 +1,10 @@
 import json
 import logging
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 import fastavro
 
+from lec02.hw.common.storage import LocalStorage, StorageBackend
+from lec02.hw.job2.dal.avro_index import write_indexed_avro_file, DEFAULT_BLOCK_RECORDS
 
 # Get a logger specific to this module
 logger: logging.Logger = logging.getLogger(__name__)
@@ -21,13 +23,71 @@ SALES_AVRO_SCHEMA: Dict[str, Any] = {
     ],
 }
 
+# Supported price encodings of the typed schema variant
+TYPED_PRICE_TYPES: tuple[str, ...] = ("double", "cents")
 
-def read_json_file(filepath: str) -> List[Dict[str, Any]]:
+
+def build_typed_sales_schema(price_type: str = "double") -> Dict[str, Any]:
+    """
+    Builds the typed fast-path variant of the sales AVRO schema.
+
+    Unlike SALES_AVRO_SCHEMA, price and purchase_date are not unions, so no
+    branch has to be resolved per value: purchase_date uses the AVRO date
+    logical type (days since epoch) and price is either a double or a long
+    holding the price in cents.
+
+    Args:
+        price_type (str): Either "double" or "cents"
+
+    Returns:
+        Dict[str, Any]: The typed AVRO schema
+
+    Raises:
+        ValueError: If price_type is not supported
+    """
+    if price_type not in TYPED_PRICE_TYPES:
+        raise ValueError(
+            f"Unsupported price type {price_type}, expected one of {TYPED_PRICE_TYPES}"
+        )
+
+    price_field: Dict[str, Any] = (
+        {"name": "price", "type": "double"}
+        if price_type == "double"
+        else {"name": "price", "type": "long", "doc": "Price in cents"}
+    )
+
+    return {
+        "type": "record",
+        "name": "TypedSale",
+        "namespace": "lec02.hw.job2.avro",
+        "fields": [
+            {"name": "client", "type": ["string", "null"]},
+            {"name": "purchase_date", "type": {"type": "int", "logicalType": "date"}},
+            {"name": "product", "type": ["string", "null"]},
+            price_field,
+        ],
+    }
+
+
+# Typed schema variants for the fast path
+TYPED_SALES_AVRO_SCHEMA: Dict[str, Any] = build_typed_sales_schema("double")
+TYPED_CENTS_SALES_AVRO_SCHEMA: Dict[str, Any] = build_typed_sales_schema("cents")
+
+
+def read_json_file(
+    filepath: str,
+    object_hook: Callable[[Dict[str, Any]], Any] | None = None,
+    storage: StorageBackend | None = None,
+) -> List[Dict[str, Any]]:
     """
     Reads and parses a JSON file containing a list of dictionaries.
 
     Args:
         filepath (str): Path to the JSON file to read
+        object_hook (Callable[[Dict[str, Any]], Any] | None): Called with every
+            decoded object while parsing, its result replacing the object
+        storage (StorageBackend | None): Backend to read from, the local disk
+            by default
 
     Returns:
         List[Dict[str, Any]]: List of dictionaries parsed from the JSON file
@@ -37,52 +97,89 @@ def read_json_file(filepath: str) -> List[Dict[str, Any]]:
         ValueError: If the JSON data is not a list or cannot be decoded
         Exception: For any other unexpected errors
     """
-    logger.info(f"Reading JSON file {filepath}...")
-
+    storage = storage or LocalStorage()
     try:
-        # Open and read the JSON file with UTF-8 encoding
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # Open and read the JSON file, decoded as UTF-8 by json.load
+        with storage.open_read(filepath) as f:
+            data = json.load(f, object_hook=object_hook)
 
         # Validate that the parsed data is a list
         if not isinstance(data, list):
-            logger.error(f"Data is not a list: {data}")
+            logger.error("Data is not a list: %s", data)
             raise ValueError(f"Data is not a list: {data}")
 
-        # Log success and return the data
-        logger.info(f"JSON file {filepath} read successfully with {len(data)} records.")
+        logger.debug(
+            "JSON file %s read successfully with %d records.", filepath, len(data)
+        )
         return data
 
     except FileNotFoundError as e:
         # Handle missing file error
-        logger.error(f"File {filepath} not found: {e}")
+        logger.error("File %s not found: %s", filepath, e)
         raise FileNotFoundError(f"File {filepath} not found: {e}") from e
 
     except json.JSONDecodeError as e:
         # Handle JSON parsing errors
-        logger.error(f"Error decoding JSON from file {filepath}: {e}")
+        logger.error("Error decoding JSON from file %s: %s", filepath, e)
         raise ValueError(f"Error decoding JSON from file {filepath}: {e}") from e
 
     except Exception as e:
         # Handle any other unexpected errors
-        logger.exception(f"An unexpected error occurred: {e}")
+        logger.exception("An unexpected error occurred: %s", e)
         raise Exception(f"An unexpected error occurred: {e}") from e
 
 
 def write_avro_file(
-    page_data: List[Dict[str, Any]], schema: Dict[str, Any], filepath: str
+    page_data: List[Dict[str, Any]],
+    schema: Dict[str, Any],
+    filepath: str,
+    block_stats: bool = False,
+    block_records: int = DEFAULT_BLOCK_RECORDS,
+    block_index: bool = False,
+    storage: StorageBackend | None = None,
 ) -> None:
-    logger.info(f"Writing {len(page_data)} records to {filepath}...")
+    """
+    Writes a list of dictionaries to an AVRO file.
 
-    try:
-        with open(filepath, "wb") as f:
-            fastavro.writer(f, schema, page_data)
+    Args:
+        page_data (List[Dict[str, Any]]): Records to write
+        schema (Dict[str, Any]): AVRO schema of the records
+        filepath (str): Path of the AVRO file to create
+        block_stats (bool): Write blocks of block_records records and a sidecar
+            index with per-block and per-file column statistics
+        block_records (int): Number of records per block with block_stats or
+            block_index
+        block_index (bool): Write blocks of block_records records and a sidecar
+            index with the offset and record count of every block, without
+            column statistics
+        storage (StorageBackend | None): Backend to write to, the local disk
+            by default. Files are written locally, then uploaded.
 
-        logger.info(f"{len(page_data)} records written to file Avro" f" {filepath}.")
+    Raises:
+        IOError: If there are I/O errors while writing the file
+        Exception: For any other unexpected errors
+    """
+    storage = storage or LocalStorage()
+    try:
+        if block_stats or block_index:
+            write_indexed_avro_file(
+                page_data,
+                schema,
+                filepath,
+                block_records,
+                collect_stats=block_stats,
+                storage=storage,
+            )
+        else:
+            with storage.open_local_write(filepath) as local_path:
+                with open(local_path, "wb") as f:
+                    fastavro.writer(f, schema, page_data)
+
+        logger.debug("%d records written to file Avro %s.", len(page_data), filepath)
 
     except IOError as e:
-        logger.error(f"Error saving to file Avro {filepath}: {e}", exc_info=True)
+        logger.error("Error saving to file Avro %s: %s", filepath, e, exc_info=True)
         raise IOError(f"Error saving to file Avro {filepath}: {e}") from e
     except Exception as e:
-        logger.exception(f"An unexpected error occurred: {e}")
+        logger.exception("An unexpected error occurred: %s", e)
         raise Exception(f"An unexpected error occurred: {e}") from e
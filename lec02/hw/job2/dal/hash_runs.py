@@ -0,0 +1,80 @@
+import logging
+import mmap
+from typing import Iterable
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Size in bytes of the record digests stored in a run
+DIGEST_SIZE: int = 16
+
+
+def write_hash_run(filepath: str, digests: Iterable[bytes]) -> int:
+    """
+    Writes sorted record digests to a run file.
+
+    A run is the concatenation of fixed-size digests in ascending order, so
+    it can be searched without an index.
+
+    Args:
+        filepath (str): Path of the run file to create
+        digests (Iterable[bytes]): Digests of DIGEST_SIZE bytes
+
+    Returns:
+        int: Number of digests written
+
+    Raises:
+        IOError: If the run file cannot be written
+    """
+    sorted_digests = sorted(digests)
+    try:
+        with open(filepath, "wb") as f:
+            f.write(b"".join(sorted_digests))
+    except OSError as e:
+        logger.error(f"Error writing hash run {filepath}: {e}")
+        raise IOError(f"Error writing hash run {filepath}: {e}") from e
+
+    logger.info(f"Spilled {len(sorted_digests)} record hashes to {filepath}.")
+    return len(sorted_digests)
+
+
+class HashRun:
+    """
+    Read-only view of a run file, searched in place through mmap.
+    """
+
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+        self._file = open(filepath, "rb")
+        self.size = 0
+        self._map: mmap.mmap | None = None
+
+        file_size = self._file.seek(0, 2)
+        if file_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.size = file_size // DIGEST_SIZE
+
+    def __contains__(self, digest: bytes) -> bool:
+        """Binary-searches the run for a digest."""
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            offset = middle * DIGEST_SIZE
+            value = self._map[offset : offset + DIGEST_SIZE]
+            if value == digest:
+                return True
+            if value < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def __len__(self) -> int:
+        return self.size
+
+    def close(self) -> None:
+        """Unmaps and closes the run file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
@@ -0,0 +1,57 @@
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+MAXRSS_UNIT: int = 1 if sys.platform == "darwin" else 1024
+
+
+def get_rss_bytes(pid: int | None = None) -> int | None:
+    """
+    Returns the current resident set size of a process.
+
+    Args:
+        pid (int | None): Process id, the current process if None
+
+    Returns:
+        int | None: RSS in bytes, None if it cannot be measured (no /proc, or
+        the process has exited)
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def get_process_tree_rss_bytes() -> int | None:
+    """
+    Returns the RSS of the current process plus its live worker processes.
+
+    Returns:
+        int | None: Total RSS in bytes, None if RSS cannot be measured here
+    """
+    total = get_rss_bytes()
+    if total is None:
+        return None
+
+    for child in multiprocessing.active_children():
+        total += get_rss_bytes(child.pid) or 0
+    return total
+
+
+def get_peak_rss_bytes() -> int:
+    """
+    Returns the peak RSS of the current process since it started.
+
+    Returns:
+        int: High-water mark of the RSS in bytes
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_UNIT
@@ -0,0 +1,204 @@
+import logging
+import os
+import zlib
+from typing import Any, Dict, IO, List
+from urllib.parse import quote
+
+import fastavro
+from fastavro.write import Writer
+
+from lec02.hw.job2.dal.avro_index import (
+    IndexedAvroWriter,
+    save_avro_index,
+    DEFAULT_BLOCK_RECORDS,
+)
+
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Fields that can be used as partition key
+PARTITION_FIELDS: tuple[str, ...] = ("client", "product", "purchase_date")
+
+# Directory value used for records with a missing partition key (Hive convention)
+NULL_PARTITION: str = "__HIVE_DEFAULT_PARTITION__"
+
+
+def get_partition_dir(
+    record: Dict[str, Any], partition_by: str, num_buckets: int | None = None
+) -> str:
+    """
+    Returns the Hive-style partition directory of a record.
+
+    Args:
+        record (Dict[str, Any]): Sales record
+        partition_by (str): Field used as partition key
+        num_buckets (int | None): If set, the field value is hashed into this many
+            buckets, giving "<field>_bucket=<n>" instead of "<field>=<value>"
+
+    Returns:
+        str: Partition directory name, e.g. "product=TV" or "client_bucket=0007"
+    """
+    value = record.get(partition_by)
+
+    if num_buckets:
+        # crc32 is stable across processes, unlike the salted built-in hash()
+        bucket = zlib.crc32(str(value).encode("utf-8")) % num_buckets
+        return f"{partition_by}_bucket={bucket:04d}"
+
+    if value is None or value == "":
+        return f"{partition_by}={NULL_PARTITION}"
+
+    return f"{partition_by}={quote(str(value), safe='')}"
+
+
+class PartitionedAvroWriter:
+    """
+    Routes records to one AVRO file per partition in a single pass.
+
+    One fastavro Writer is opened lazily per partition and kept open until
+    close(), so each record is encoded exactly once. With block_stats, each
+    partition file also gets a sidecar index with column statistics.
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        filename: str,
+        schema: Dict[str, Any],
+        partition_by: str,
+        num_buckets: int | None = None,
+        block_stats: bool = False,
+        block_records: int = DEFAULT_BLOCK_RECORDS,
+        block_index: bool = False,
+    ) -> None:
+        self.base_dir = base_dir
+        self.filename = filename
+        self.schema = fastavro.parse_schema(schema)
+        self.partition_by = partition_by
+        self.num_buckets = num_buckets
+        self.block_stats = block_stats
+        self.block_records = block_records
+        self.block_index = block_index
+        self._files: Dict[str, IO[bytes]] = {}
+        self._writers: Dict[str, Writer | IndexedAvroWriter] = {}
+        self.records_written: Dict[str, int] = {}
+
+    def _get_writer(self, partition_dir: str) -> Writer | IndexedAvroWriter:
+        writer = self._writers.get(partition_dir)
+        if writer is None:
+            dir_path = os.path.join(self.base_dir, partition_dir)
+            os.makedirs(dir_path, exist_ok=True)
+            f = open(os.path.join(dir_path, self.filename), "wb")
+            writer = (
+                IndexedAvroWriter(
+                    f, self.schema, self.block_records, collect_stats=self.block_stats
+                )
+                if self.block_stats or self.block_index
+                else Writer(f, self.schema)
+            )
+            self._files[partition_dir] = f
+            self._writers[partition_dir] = writer
+            self.records_written[partition_dir] = 0
+        return writer
+
+    def write(self, record: Dict[str, Any]) -> None:
+        partition_dir = get_partition_dir(record, self.partition_by, self.num_buckets)
+        self._get_writer(partition_dir).write(record)
+        self.records_written[partition_dir] += 1
+
+    def close(self) -> None:
+        for partition_dir, writer in self._writers.items():
+            if isinstance(writer, IndexedAvroWriter):
+                index = writer.close()
+                self._files[partition_dir].close()
+                save_avro_index(self._files[partition_dir].name, index)
+            else:
+                writer.flush()
+                self._files[partition_dir].close()
+        self._writers.clear()
+        self._files.clear()
+
+    @property
+    def outputs(self) -> List[str]:
+        """Output files relative to base_dir."""
+        return sorted(
+            os.path.join(partition_dir, self.filename)
+            for partition_dir in self.records_written
+        )
+
+    def __enter__(self) -> "PartitionedAvroWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def write_partitioned_avro_file(
+    page_data: List[Dict[str, Any]],
+    schema: Dict[str, Any],
+    base_dir: str,
+    filename: str,
+    partition_by: str,
+    num_buckets: int | None = None,
+    block_stats: bool = False,
+    block_records: int = DEFAULT_BLOCK_RECORDS,
+    block_index: bool = False,
+) -> List[str]:
+    """
+    Writes records to Hive-style partition directories under base_dir.
+
+    Args:
+        page_data (List[Dict[str, Any]]): Records to write
+        schema (Dict[str, Any]): AVRO schema of the records
+        base_dir (str): Staging directory holding the partition directories
+        filename (str): Name of the AVRO file written in each partition
+        partition_by (str): Field used as partition key
+        num_buckets (int | None): Number of hash buckets, None to partition by value
+        block_stats (bool): Write a sidecar index with column statistics per file
+        block_records (int): Number of records per block with block_stats or
+            block_index
+        block_index (bool): Write a sidecar index with block offsets only
+
+    Returns:
+        List[str]: Written files relative to base_dir
+
+    Raises:
+        IOError: If a partition file cannot be written
+        Exception: For any other unexpected errors
+    """
+    logger.debug(
+        "Writing %d records to %s partitioned by %s...",
+        len(page_data),
+        base_dir,
+        partition_by,
+    )
+
+    try:
+        with PartitionedAvroWriter(
+            base_dir,
+            filename,
+            schema,
+            partition_by,
+            num_buckets,
+            block_stats,
+            block_records,
+            block_index,
+        ) as writer:
+            for record in page_data:
+                writer.write(record)
+
+        logger.debug(
+            "%d records written to %d partitions in %s.",
+            len(page_data),
+            len(writer.outputs),
+            base_dir,
+        )
+        return writer.outputs
+
+    except IOError as e:
+        logger.error(f"Error saving partitioned Avro to {base_dir}: {e}", exc_info=True)
+        raise IOError(f"Error saving partitioned Avro to {base_dir}: {e}") from e
+    except Exception as e:
+        logger.exception(f"An unexpected error occurred: {e}")
+        raise Exception(f"An unexpected error occurred: {e}") from e
@@ -1,4 +1,6 @@
+import datetime
 import logging
+import math
 from flask import Flask, request
 from dotenv import load_dotenv
 from typing import Any, Dict, Tuple
@@ -10,12 +12,38 @@ load_dotenv()
 
 # Try importing process_sales_data using an absolute path first
 try:
-    from lec02.hw.job2.bll.process_sales import process_sales_data
+    from lec02.hw.common.admission import AdmissionController, AdmissionError
+    from lec02.hw.common.circuit_breaker import CircuitOpenError
+    from lec02.hw.common.logging_setup import configure_logging
+    from lec02.hw.common.memory_tracing import (
+        get_memory_report,
+        get_trace_top,
+        run_traced,
+    )
+    from lec02.hw.common.profiling import get_profile_top, run_profiled
+    from lec02.hw.common.serving import serve
+    from lec02.hw.common.single_flight import SingleFlight, make_request_key
+    from lec02.hw.common.storage import get_storage
+    from lec02.hw.job2.bll.conversion_options import ConversionOptions
+    from lec02.hw.job2.bll.extract_sales import extract_sales_to_avro
+    from lec02.hw.job2.bll.process_sales import process_sales_data, process_sales_tree
+    from lec02.hw.job2.bll.watch_sales import watch_sales_data
 except ImportError:
     logging.error("ImportError: import absolute path to module")
     # Fallback to relative import if absolute import fails
     try:
-        from bll.process_sales import process_sales_data
+        from common.admission import AdmissionController, AdmissionError
+        from common.circuit_breaker import CircuitOpenError
+        from common.logging_setup import configure_logging
+        from common.memory_tracing import get_memory_report, get_trace_top, run_traced
+        from common.profiling import get_profile_top, run_profiled
+        from common.serving import serve
+        from common.single_flight import SingleFlight, make_request_key
+        from common.storage import get_storage
+        from bll.conversion_options import ConversionOptions
+        from bll.extract_sales import extract_sales_to_avro
+        from bll.process_sales import process_sales_data, process_sales_tree
+        from bll.watch_sales import watch_sales_data
     except ImportError:
         logging.error("ImportError: import module from parent directory")
     # Use critical logger if available, otherwise use print
@@ -28,14 +56,8 @@ except ImportError:
     exit(1)
 
 
-# Configure logging to output to the console (stdout/stderr)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    # filename=str(os.path.basename(__file__).replace(".py", ".log")),
-    # filemode="a", # Append mode for a log file
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+# Configure logging to output to the console (stdout/stderr), see LOG_* variables
+configure_logging()
 
 
 # Get a logger specific to this module
@@ -44,9 +66,160 @@ logger = logging.getLogger(__name__)
 # Initialize Flask application
 app = Flask(__name__)
 
+# Bound the jobs running at once and waiting, see JOB_* variables
+admission = AdmissionController.from_env()
+
+# Run identical concurrent requests once, see JOB_RESULT_TTL
+jobs_in_flight = SingleFlight.from_env()
+
+
+def _get_bool_option(input_data: Dict[str, Any], name: str) -> bool | None:
+    """Returns an optional boolean parameter, raising ValueError if invalid."""
+    value = input_data.get(name)
+    if value is not None and not isinstance(value, bool):
+        raise ValueError(f"Parameter '{name}' must be a boolean.")
+    return value
+
+
+def _get_int_option(
+    input_data: Dict[str, Any], name: str, minimum: int = 1
+) -> int | None:
+    """Returns an optional integer parameter, raising ValueError if invalid."""
+    value = input_data.get(name)
+    if value is not None and (
+        isinstance(value, bool) or not isinstance(value, int) or value < minimum
+    ):
+        raise ValueError(f"Parameter '{name}' must be an integer >= {minimum}.")
+    return value
+
+
+def _get_date_option(input_data: Dict[str, Any], name: str) -> str | None:
+    """Returns an optional YYYY-MM-DD parameter, raising ValueError if invalid."""
+    value = input_data.get(name)
+    if value is not None:
+        try:
+            datetime.date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Parameter '{name}' must be a date (YYYY-MM-DD).")
+    return value
+
+
+def _get_str_option(input_data: Dict[str, Any], name: str) -> str | None:
+    """Returns an optional string parameter, raising ValueError if invalid."""
+    value = input_data.get(name)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"Parameter '{name}' must be a string.")
+    return value
+
+
+def _get_storage_option(input_data: Dict[str, Any]) -> Any:
+    """Returns the storage backend of an optional URL, raising ValueError."""
+    url = input_data.get("storage")
+    if url is None:
+        return None
+    if not isinstance(url, str):
+        raise ValueError("Parameter 'storage' must be a storage URL.")
+    try:
+        return get_storage(url)
+    except (ValueError, ImportError) as e:
+        raise ValueError(f"Invalid 'storage' parameter: {e}") from e
+
+
+def _parse_job_options(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extracts the optional parameters of the conversion from the request.
+
+    Args:
+        input_data (Dict[str, Any]): JSON payload of the request
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for the parameters that were provided,
+        "watch" selecting watch_sales_data instead of process_sales_data;
+        start_date and end_date require raw_root (process_sales_tree), and
+        "storage" is only supported by process_sales_data
+
+    Raises:
+        ValueError: If a parameter has an invalid value
+    """
+    job_options: Dict[str, Any] = {
+        "incremental": _get_bool_option(input_data, "incremental"),
+        "typed_schema": _get_str_option(input_data, "typed_schema"),
+        "partition_by": _get_str_option(input_data, "partition_by"),
+        "num_buckets": _get_int_option(input_data, "num_buckets"),
+        "block_stats": _get_bool_option(input_data, "block_stats"),
+        "block_index": _get_bool_option(input_data, "block_index"),
+        "block_records": _get_int_option(input_data, "block_records"),
+        "workers": _get_int_option(input_data, "workers"),
+        "memory_limit_mb": _get_int_option(input_data, "memory_limit_mb"),
+        "watch": _get_bool_option(input_data, "watch"),
+        "watch_timeout": _get_int_option(input_data, "watch_timeout"),
+        "run_id": _get_str_option(input_data, "run_id"),
+        "start_date": _get_date_option(input_data, "start_date"),
+        "end_date": _get_date_option(input_data, "end_date"),
+        "dedup": _get_bool_option(input_data, "dedup"),
+        "dedup_memory_mb": _get_int_option(input_data, "dedup_memory_mb"),
+        "sort_by": _get_str_option(input_data, "sort_by"),
+        "dimensions": _get_bool_option(input_data, "dimensions"),
+        "storage": _get_storage_option(input_data),
+    }
+    tree_mode = "raw_root" in input_data
+
+    # Check the values and combinations once, as the jobs do
+    ConversionOptions(
+        **{
+            name: value
+            for name, value in job_options.items()
+            if value is not None and name not in ("start_date", "end_date")
+        },
+        tree=tree_mode,
+    ).validate()
+    for name in ("start_date", "end_date"):
+        if job_options[name] is not None and not tree_mode:
+            raise ValueError(f"Parameter '{name}' requires 'raw_root'.")
+
+    return {name: value for name, value in job_options.items() if value is not None}
+
+
+def _run_job(
+    job: Any,
+    job_args: Dict[str, Any],
+    job_options: Dict[str, Any],
+    stg_dir: str,
+    profile_top: int | None,
+    trace_top: int | None,
+) -> Dict[str, Any]:
+    """Runs a conversion job in a job slot and returns the response body."""
+    # Wait for a job slot, or get rejected when the server is saturated
+    with admission.admit():
+        response: Dict[str, Any] = {"message": "Job completed successfully."}
+        if profile_top is not None:
+            # Run under cProfile, saving the profile next to the AVRO files
+            report, response["profile"] = run_profiled(
+                job, stg_dir, profile_top, **job_args, **job_options
+            )
+        elif trace_top is not None:
+            # Run with tracemalloc, adding the allocation sites to the report
+            report, memory = run_traced(job, trace_top, **job_args, **job_options)
+            report = {**report, "memory": memory}
+        else:
+            report = job(**job_args, **job_options)
+        response["report"] = report
+        return response
+
+
+def _run_extract(
+    date: str, stg_dir: str, job_options: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Runs a fused extraction in a job slot and returns its report."""
+    # Wait for a job slot, or get rejected when the server is saturated
+    with admission.admit():
+        return extract_sales_to_avro(date=date, stg_dir=stg_dir, **job_options)
+
 
 @app.route("/", methods=["POST"])
-def run_job2_endpoint() -> Tuple[Dict[str, Any], int] | None:
+def run_job2_endpoint() -> (
+    Tuple[Dict[str, Any], int] | Tuple[Dict[str, Any], int, Dict[str, str]] | None
+):
     """
     Process POST request to run sales data conversion job.
 
@@ -62,27 +235,75 @@ def run_job2_endpoint() -> Tuple[Dict[str, Any], int] | None:
         logger.error("No input data received.")
         return {"error": "No input data received."}, 400
 
-    # Extract required parameters
-    raw_dir = input_data.get("raw_dir")
-    stg_dir = input_data.get("stg_dir")
+    # Extract required parameters, raw_root and stg_root selecting the
+    # multi-date mode
+    tree_mode = "raw_root" in input_data
+    raw_param, stg_param = (
+        ("raw_root", "stg_root") if tree_mode else ("raw_dir", "stg_dir")
+    )
+    raw_dir = input_data.get(raw_param)
+    stg_dir = input_data.get(stg_param)
 
     # Validate raw_dir parameter
     if not raw_dir:
-        logger.error("Missing 'raw_dir' parameter in input data.")
-        return {"error": "Missing 'raw_dir' parameter in input data."}, 400
+        logger.error(f"Missing '{raw_param}' parameter in input data.")
+        return {"error": f"Missing '{raw_param}' parameter in input data."}, 400
 
     # Validate stg_dir parameter
     if not stg_dir:
-        logger.error("Missing 'stg_dir' parameter in input data.")
-        return {"error": "Missing 'stg_dir' parameter in input data."}, 400
+        logger.error(f"Missing '{stg_param}' parameter in input data.")
+        return {"error": f"Missing '{stg_param}' parameter in input data."}, 400
+
+    # Validate optional job parameters, passing only the ones provided
+    try:
+        job_options = _parse_job_options(input_data)
+        profile_top = get_profile_top(input_data, request.headers)
+        trace_top = get_trace_top(input_data, request.headers)
+        if profile_top is not None and trace_top is not None:
+            raise ValueError(
+                "Parameter 'trace_memory' cannot be combined with 'profile'."
+            )
+    except ValueError as e:
+        logger.error(str(e))
+        return {"error": str(e)}, 400
 
     # Log job execution details
     logger.info(f"Running job for raw_dir {raw_dir} and stg_dir {stg_dir}.")
     try:
-        # Execute a job to process sales data
-        process_sales_data(raw_dir=raw_dir, stg_dir=stg_dir)
+        # Execute a job to process sales data: every date under a root, or
+        # one directory, converting pages as they land in watch mode
+        if tree_mode:
+            job, job_args = process_sales_tree, {
+                "raw_root": raw_dir,
+                "stg_root": stg_dir,
+            }
+        elif job_options.pop("watch", False):
+            job, job_args = watch_sales_data, {"raw_dir": raw_dir, "stg_dir": stg_dir}
+        else:
+            job, job_args = process_sales_data, {"raw_dir": raw_dir, "stg_dir": stg_dir}
+
+        # Attach to an identical job in flight, or to its recent result
+        key = make_request_key(
+            "job2",
+            {**input_data, "profile_top": profile_top, "trace_top": trace_top},
+            path_fields=("raw_dir", "stg_dir", "raw_root", "stg_root"),
+        )
+        response, shared = jobs_in_flight.do(
+            key, _run_job, job, job_args, job_options, stg_dir, profile_top, trace_top
+        )
+        if shared:
+            response = {**response, "coalesced": True}
         logger.info(">>> Job completed successfully.")
-        return {"message": "Job completed successfully."}, 201
+        return response, 201
+
+    # Reject the job while the server is saturated
+    except AdmissionError as e:
+        logger.warning(f"Job rejected: {e}")
+        return (
+            {"error": f"Job rejected: {e}"},
+            e.status_code,
+            {"Retry-After": str(e.retry_after)},
+        )
 
     # Handle expected errors
     except (
@@ -102,7 +323,130 @@ def run_job2_endpoint() -> Tuple[Dict[str, Any], int] | None:
         return {"error": f"An unexpected error occurred: {e}"}, 500
 
 
+@app.route("/extract", methods=["POST"])
+def run_extract_endpoint() -> (
+    Tuple[Dict[str, Any], int] | Tuple[Dict[str, Any], int, Dict[str, str]]
+):
+    """
+    Process POST request to fetch sales data from the API straight to AVRO.
+
+    Returns:
+        Tuple containing response dict and HTTP status code
+    """
+    # Log receipt of request
+    logger.info("Received request to run fused extraction.")
+    input_data = request.get_json()
+
+    # Validate input data exists
+    if not input_data:
+        logger.error("No input data received.")
+        return {"error": "No input data received."}, 400
+
+    # Validate required parameters
+    for name in ("date", "stg_dir"):
+        if not input_data.get(name):
+            logger.error(f"Missing '{name}' parameter in input data.")
+            return {"error": f"Missing '{name}' parameter in input data."}, 400
+
+    # Validate optional parameters, only output layout options are supported
+    try:
+        output_options = {
+            "typed_schema": _get_str_option(input_data, "typed_schema"),
+            "partition_by": _get_str_option(input_data, "partition_by"),
+            "num_buckets": _get_int_option(input_data, "num_buckets"),
+            "block_stats": _get_bool_option(input_data, "block_stats"),
+            "block_index": _get_bool_option(input_data, "block_index"),
+            "block_records": _get_int_option(input_data, "block_records"),
+        }
+        output_options = {
+            name: value for name, value in output_options.items() if value
+        }
+        ConversionOptions(**output_options).validate()
+    except ValueError as e:
+        logger.error(str(e))
+        return {"error": str(e)}, 400
+    job_options = {**output_options}
+    if input_data.get("raw_dir"):
+        job_options["raw_dir"] = input_data["raw_dir"]
+
+    logger.info(f"Running fused extraction for date {input_data['date']}.")
+    try:
+        # Attach to an identical extraction in flight, or to its recent result
+        key = make_request_key(
+            "job2/extract", input_data, path_fields=("raw_dir", "stg_dir")
+        )
+        report, shared = jobs_in_flight.do(
+            key, _run_extract, input_data["date"], input_data["stg_dir"], job_options
+        )
+        logger.info(">>> Job completed successfully.")
+        return {
+            "message": "Job completed successfully.",
+            "report": report,
+            **({"coalesced": True} if shared else {}),
+        }, 201
+
+    # Reject the job while the server is saturated
+    except AdmissionError as e:
+        logger.warning(f"Job rejected: {e}")
+        return (
+            {"error": f"Job rejected: {e}"},
+            e.status_code,
+            {"Retry-After": str(e.retry_after)},
+        )
+
+    # Fail fast while the sales API circuit is open
+    except CircuitOpenError as e:
+        logger.warning(f"Sales API unavailable: {e}")
+        return (
+            {"error": f"Sales API unavailable: {e}"},
+            503,
+            {"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        )
+
+    # Handle expected errors
+    except (ValueError, ConnectionError, OSError, IOError, TypeError) as e:
+        logger.error(f"An error occurred while running job: {e}", exc_info=True)
+        return {"error": f"An error occurred while running job: {e}"}, 500
+
+    # Handle unexpected errors
+    except Exception as e:
+        logger.exception(f"An unexpected error occurred: {e}", exc_info=True)
+        return {"error": f"An unexpected error occurred: {e}"}, 500
+
+
+@app.route("/debug/queue", methods=["GET"])
+def debug_queue_endpoint() -> Tuple[Dict[str, Any], int]:
+    """
+    Return the running and queued jobs, limits and wait times of the server.
+
+    Returns:
+        Tuple containing the queue statistics and HTTP status code
+    """
+    return {**admission.stats(), "coalesced": jobs_in_flight.coalesced}, 200
+
+
+@app.route("/debug/memory", methods=["GET"])
+def debug_memory_endpoint() -> Tuple[Dict[str, Any], int]:
+    """
+    Return the memory report of the last traced run and, while tracemalloc
+    is running, the live allocation sites.
+
+    Returns:
+        Tuple containing the memory report and HTTP status code
+    """
+    top_n = request.args.get("top", default=10, type=int)
+    return get_memory_report(max(1, top_n)), 200
+
+
 # Main function to start the Flask server
 if __name__ == "__main__":
-    logger.info("Flask server startup for Job 1...")
-    app.run(debug=True, host="0.0.0.0", port=8082)
+    logger.info("Flask server startup for Job 2...")
+    # Serve on gunicorn or waitress if installed, see JOB_SERVER; requests
+    # beyond the running and queued jobs are rejected, so keep threads for them.
+    # Admission, in-flight jobs and circuits live in this process: one worker
+    serve(
+        app,
+        port=8082,
+        threads=admission.max_running + admission.max_queued + 2,
+        single_worker=True,
+    )
@@ -0,0 +1,63 @@
+import pytest
+
+from lec02.hw.common.storage import MemoryStorage
+from lec02.hw.job2.bll.conversion_options import ConversionOptions
+from lec02.hw.job2.dal.file_io import SALES_AVRO_SCHEMA
+
+
+def test_conversion_options_valid():
+    """Test ConversionOptions accepts the defaults and compatible options."""
+
+    # Setup options of every mode
+    options = [
+        ConversionOptions(),
+        ConversionOptions(incremental=True, partition_by="client", num_buckets=4),
+        ConversionOptions(dedup=True, dedup_memory_mb=8, sort_by="client"),
+        ConversionOptions(watch=True, watch_timeout=30, run_id="r1"),
+        ConversionOptions(storage=MemoryStorage(), workers=1, dedup=True),
+        ConversionOptions(tree=True, workers=4, memory_limit_mb=512),
+    ]
+
+    # Call function under test, which must not raise
+    for option in options:
+        option.validate()
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"typed_schema": "float"}, "Unsupported price type float"),
+        ({"partition_by": "price"}, "Unsupported partition key price"),
+        ({"num_buckets": 4}, "num_buckets requires partition_by"),
+        ({"block_records": 0}, "block_records must be positive."),
+        ({"sort_by": "client", "incremental": True}, "sort_by cannot be combined"),
+        ({"dimensions": True, "workers": 2}, "dimensions cannot be combined with"),
+        ({"dedup": True, "workers": 2}, "dedup cannot be combined with several"),
+        ({"storage": MemoryStorage(), "tree": True}, "storage cannot be combined"),
+        ({"run_id": "r1"}, "run_id requires watch."),
+        ({"watch": True, "tree": True}, "watch cannot be combined with raw_root."),
+        ({"watch": True, "dedup": True}, "dedup cannot be combined with watch."),
+    ],
+)
+def test_conversion_options_invalid(options, error):
+    """Test ConversionOptions.validate rejects invalid values and combinations."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        ConversionOptions(**options).validate()
+
+
+def test_conversion_options_output_settings():
+    """Test get_output_settings selects the schema and block arguments."""
+
+    # Call function under test
+    plain_schema, plain_blocks = ConversionOptions().get_output_settings()
+    typed_schema, blocks = ConversionOptions(
+        typed_schema="cents", block_index=True, block_records=10
+    ).get_output_settings()
+
+    # Assert plain files keep the default schema and write path
+    assert plain_schema is SALES_AVRO_SCHEMA
+    assert plain_blocks == {}
+    assert typed_schema is not SALES_AVRO_SCHEMA
+    assert blocks == {"block_stats": False, "block_index": True, "block_records": 10}
@@ -0,0 +1,119 @@
+import os
+
+import pytest
+
+from lec02.hw.job2.bll.dedup_sales import (
+    get_record_digest,
+    BloomFilter,
+    RecordDeduplicator,
+    EXACT_ENTRY_BYTES,
+)
+
+
+def _record(client, price=100, product="TV", purchase_date="2022-08-09"):
+    """Helper building a raw sales record."""
+    return {
+        "client": client,
+        "purchase_date": purchase_date,
+        "product": product,
+        "price": price,
+    }
+
+
+def test_get_record_digest_normalizes_fields():
+    """Test get_record_digest ignores surrounding spaces and numeric price types."""
+
+    # Assert equivalent records share a digest
+    assert get_record_digest(_record("Anna ", 100)) == get_record_digest(
+        _record("Anna", 100.0)
+    )
+
+    # Assert distinct records do not
+    assert get_record_digest(_record("Anna")) != get_record_digest(_record("Anna", 101))
+    assert get_record_digest(_record(None)) != get_record_digest(_record(""))
+
+
+def test_bloom_filter():
+    """Test BloomFilter reports every added digest."""
+
+    # Setup filter with some digests
+    bloom = BloomFilter(num_bits=8192)
+    added = [get_record_digest(_record(f"Client {i}")) for i in range(100)]
+    for digest in added:
+        bloom.add(digest)
+
+    # Assert no false negatives and few false positives
+    assert all(digest in bloom for digest in added)
+    others = [get_record_digest(_record(f"Other {i}")) for i in range(1000)]
+    assert sum(digest in bloom for digest in others) < 50
+
+
+def test_record_deduplicator_exact():
+    """Test RecordDeduplicator drops repeated records within and across pages."""
+
+    # Setup deduplicator and overlapping pages
+    with RecordDeduplicator() as deduplicator:
+        first_page = [_record("Anna"), _record("Bob"), _record("Anna")]
+        second_page = [_record("Bob "), _record("Carl")]
+
+        # Call function under test
+        first = deduplicator.filter_records(first_page)
+        second = deduplicator.filter_records(second_page)
+
+        # Assert first occurrences are kept in order
+        assert first == [_record("Anna"), _record("Bob")]
+        assert second == [_record("Carl")]
+        assert deduplicator.get_report() == {
+            "duplicates_removed": 2,
+            "dedup_spills": 0,
+        }
+
+
+def test_record_deduplicator_spills(tmp_path):
+    """Test RecordDeduplicator stays exact after spilling hashes to disk."""
+
+    # Setup deduplicator holding 10 keys in memory
+    deduplicator = RecordDeduplicator(
+        memory_limit_bytes=20 * EXACT_ENTRY_BYTES, spill_dir=str(tmp_path)
+    )
+    records = [_record(f"Client {i}") for i in range(35)]
+
+    # Call function under test with every record twice
+    unique = deduplicator.filter_records(records)
+    repeated = deduplicator.filter_records(list(reversed(records)))
+
+    # Assert results and spilled runs
+    assert unique == records
+    assert repeated == []
+    report = deduplicator.get_report()
+    assert report["duplicates_removed"] == 35
+    assert report["dedup_spills"] == 3
+    assert len(os.listdir(tmp_path)) == 3
+
+    # Assert the runs are kept in a given spill directory
+    deduplicator.close()
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_record_deduplicator_removes_own_spill_dir():
+    """Test RecordDeduplicator removes the spill directory it created."""
+
+    # Setup deduplicator spilling to a temporary directory
+    deduplicator = RecordDeduplicator(memory_limit_bytes=4 * EXACT_ENTRY_BYTES)
+    deduplicator.filter_records([_record(f"Client {i}") for i in range(5)])
+    spill_dir = deduplicator.spill_dir
+
+    # Call function under test
+    deduplicator.close()
+
+    # Assert spill directory is gone
+    assert spill_dir is not None
+    assert not os.path.exists(spill_dir)
+
+
+def test_record_deduplicator_invalid_budget():
+    """Test RecordDeduplicator rejects a non-positive memory budget."""
+
+    # Test that the constructor raises ValueError
+    with pytest.raises(ValueError, match="memory_limit_bytes must be positive."):
+        RecordDeduplicator(memory_limit_bytes=0)
@@ -0,0 +1,51 @@
+import json
+
+from lec02.hw.job2.bll.dictionary_encoding import DictionaryEncoder
+
+
+def test_intern_record_shares_values():
+    """Test intern_record makes repeated values share one object while parsing."""
+
+    # Setup JSON page with repeated values built at runtime
+    encoder = DictionaryEncoder()
+    page = json.dumps(
+        [
+            {"client": "Anna", "product": "TV", "price": 1},
+            {"client": "Anna", "product": "TV", "price": 2},
+        ]
+    )
+
+    # Call function under test as the decoder object hook
+    records = json.loads(page, object_hook=encoder.intern_record)
+
+    # Assert values are equal and identical objects
+    assert records[0] == {"client": "Anna", "product": "TV", "price": 1}
+    assert records[0]["client"] is records[1]["client"]
+    assert records[0]["product"] is records[1]["product"]
+    assert encoder.with_dimensions is False
+
+
+def test_encode_records():
+    """Test encode_records assigns surrogate keys in order of first appearance."""
+
+    # Setup encoder with keys from an earlier run
+    encoder = DictionaryEncoder({"client": ["Bob"], "product": []})
+    records = [
+        {"client": "Anna", "purchase_date": "2022-08-09", "product": "TV", "price": 1},
+        {"client": "Bob", "purchase_date": "2022-08-09", "product": None, "price": 2},
+        {"client": "Anna", "purchase_date": "2022-08-09", "product": "TV", "price": 3},
+    ]
+
+    # Call function under test
+    facts = encoder.encode_records(records)
+
+    # Assert keys, dimension values and untouched input
+    assert [(fact["client_id"], fact["product_id"]) for fact in facts] == [
+        (1, 0),
+        (0, None),
+        (1, 0),
+    ]
+    assert "client" not in facts[0]
+    assert encoder.values == {"client": ["Bob", "Anna"], "product": ["TV"]}
+    assert encoder.new_values == 2
+    assert records[0]["client"] == "Anna"
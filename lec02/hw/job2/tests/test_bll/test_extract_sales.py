@@ -0,0 +1,91 @@
+from unittest import mock
+import json
+
+import fastavro
+import pytest
+
+from lec02.hw.job2.bll.extract_sales import extract_sales_to_avro
+
+PAGES = [
+    [
+        {"client": "Anna", "purchase_date": "2022-08-09", "product": "TV", "price": 1},
+        {"client": "Bob", "purchase_date": "2022-08-09", "product": "TV", "price": 2.5},
+    ],
+    [{"client": "Carl", "purchase_date": "2022-08-09", "product": "PC", "price": 3}],
+]
+
+
+def _get_page(date, page):
+    """Returns the test pages like get_sales_per_page, None past the last one."""
+    return PAGES[page - 1] if page <= len(PAGES) else None
+
+
+@mock.patch(
+    "lec02.hw.job2.bll.extract_sales.sales_api.get_sales_per_page",
+    side_effect=_get_page,
+)
+def test_extract_sales_to_avro(mock_get_sales_per_page, tmp_path):
+    """Test extract_sales_to_avro writes every API page as an AVRO file."""
+
+    # Call function under test
+    report = extract_sales_to_avro("2022-08-09", str(tmp_path / "stg"))
+
+    # Assert report, AVRO files and that no raw zone was written
+    assert report == {"files_processed": 2, "records_processed": 3}
+    for page, page_data in enumerate(PAGES, start=1):
+        with open(tmp_path / "stg" / f"sales_2022-08-09_{page}.avro", "rb") as f:
+            assert list(fastavro.reader(f)) == page_data
+    assert not (tmp_path / "raw").exists()
+    assert mock_get_sales_per_page.call_count == 3
+
+
+@mock.patch(
+    "lec02.hw.job2.bll.extract_sales.sales_api.get_sales_per_page",
+    side_effect=_get_page,
+)
+def test_extract_sales_to_avro_archives_raw_pages(mock_get_sales_per_page, tmp_path):
+    """Test extract_sales_to_avro archives the JSON pages like Job1 with raw_dir."""
+
+    # Setup a stale file in the raw directory
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    (raw_dir / "sales_2022-08-09_9.json").write_text("[]")
+
+    # Call function under test with the typed schema
+    report = extract_sales_to_avro(
+        "2022-08-09", str(tmp_path / "stg"), raw_dir=str(raw_dir), typed_schema="cents"
+    )
+
+    # Assert the raw pages are the original records with a _SUCCESS marker
+    assert report["files_archived"] == 2
+    assert sorted(p.name for p in raw_dir.iterdir()) == [
+        "_SUCCESS",
+        "sales_2022-08-09_1.json",
+        "sales_2022-08-09_2.json",
+    ]
+    with open(raw_dir / "sales_2022-08-09_1.json", encoding="utf-8") as f:
+        assert json.load(f) == PAGES[0]
+    with open(raw_dir / "_SUCCESS", encoding="utf-8") as f:
+        assert json.load(f)["records"] == 3
+
+    # Assert the AVRO files use the typed schema
+    with open(tmp_path / "stg" / "sales_2022-08-09_1.avro", "rb") as f:
+        assert [record["price"] for record in fastavro.reader(f)] == [100, 250]
+
+
+@mock.patch("lec02.hw.job2.bll.extract_sales.sales_api.get_sales_per_page")
+def test_extract_sales_to_avro_api_error(mock_get_sales_per_page, tmp_path):
+    """Test extract_sales_to_avro leaves the raw zone unmarked when the API fails."""
+
+    # Setup an API failing on the second page
+    mock_get_sales_per_page.side_effect = [PAGES[0], ConnectionError("API down")]
+
+    # Test that the function raises ConnectionError
+    with pytest.raises(ConnectionError, match="API down"):
+        extract_sales_to_avro(
+            "2022-08-09", str(tmp_path / "stg"), raw_dir=str(tmp_path / "raw")
+        )
+
+    # Assert the first page was archived but not marked complete
+    assert (tmp_path / "raw" / "sales_2022-08-09_1.json").exists()
+    assert not (tmp_path / "raw" / "_SUCCESS").exists()
@@ -0,0 +1,71 @@
+from unittest import mock
+
+import pytest
+
+from lec02.hw.job2.bll.memory_budget import (
+    plan_workers,
+    MemoryGuard,
+    MIB,
+    WORKER_BASELINE_BYTES,
+)
+
+
+@pytest.mark.parametrize(
+    "limit_mb, page_costs, max_workers, expected",
+    [
+        (1024, [16 * MIB, 8 * MIB], 8, 8),  # budget for 11 workers, capped by CPUs
+        (512, [16 * MIB], 8, 5),  # (512 - 100) // (64 + 16)
+        (512, [400 * MIB], 8, 1),  # a single large page still gets a worker
+        (64, [], 4, 1),  # budget below the baseline
+    ],
+)
+def test_plan_workers(limit_mb, page_costs, max_workers, expected):
+    """Test plan_workers fits workers and their largest page into the budget."""
+
+    # Call function under test with 100 MiB already in use
+    workers = plan_workers(limit_mb * MIB, 100 * MIB, page_costs, max_workers)
+
+    # Assert number of workers
+    assert WORKER_BASELINE_BYTES == 64 * MIB
+    assert workers == expected
+
+
+@mock.patch("lec02.hw.job2.bll.memory_budget.get_process_tree_rss_bytes")
+def test_memory_guard_throttles_over_limit(mock_get_rss):
+    """Test MemoryGuard holds back work that would exceed the limit."""
+
+    # Setup guard with 100 MiB budget, 60 MiB measured
+    mock_get_rss.return_value = 60 * MIB
+    guard = MemoryGuard(100 * MIB, base_bytes=50 * MIB)
+
+    # Assert work fitting the budget is admitted
+    assert guard.try_acquire(30 * MIB, in_flight=1)
+
+    # Assert reserved work counts until loaded: 50 + 30 reserved + 30 > 100
+    mock_get_rss.return_value = 55 * MIB
+    assert not guard.try_acquire(30 * MIB, in_flight=2)
+    assert guard.throttled == 1
+
+    # Assert measured RSS above the estimate throttles as well
+    guard.release(30 * MIB)
+    mock_get_rss.return_value = 90 * MIB
+    assert not guard.try_acquire(20 * MIB, in_flight=1)
+
+    # Assert work is admitted when nothing else runs, even over the limit
+    assert guard.try_acquire(20 * MIB, in_flight=0)
+    assert guard.peak_rss == 90 * MIB
+
+
+@mock.patch("lec02.hw.job2.bll.memory_budget.get_process_tree_rss_bytes")
+def test_memory_guard_without_limit(mock_get_rss):
+    """Test MemoryGuard without limit only tracks the peak RSS."""
+
+    # Setup guard without limit
+    guard = MemoryGuard()
+
+    # Assert every work is admitted and the peak is recorded
+    for rss in (10 * MIB, 30 * MIB, 20 * MIB):
+        mock_get_rss.return_value = rss
+        assert guard.try_acquire(1024 * MIB, in_flight=4)
+    assert guard.throttled == 0
+    assert guard.peak_rss == 30 * MIB
@@ -0,0 +1,102 @@
+import io
+import datetime
+import pytest
+import fastavro
+
+from lec02.hw.job2.bll.normalize_sales import normalize_sales_records
+from lec02.hw.job2.dal.file_io import build_typed_sales_schema
+
+
+def test_normalize_sales_records_double():
+    """Test normalize_sales_records function behavior with the double price type."""
+
+    # Setup test data with int and float prices
+    test_data = [
+        {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": 100},
+        {"client": "B", "purchase_date": "1970-01-02", "product": None, "price": 9.5},
+    ]
+
+    # Call function under test
+    result = normalize_sales_records(test_data, "double")
+
+    # Assert dates are days since epoch and prices are floats
+    assert result[0] == {
+        "client": "A",
+        "purchase_date": 19213,
+        "product": "TV",
+        "price": 100.0,
+    }
+    assert result[1]["purchase_date"] == 1
+    assert result[1]["price"] == 9.5
+    assert result[1]["product"] is None
+
+
+def test_normalize_sales_records_cents():
+    """Test normalize_sales_records function behavior with the cents price type."""
+
+    # Setup test data
+    test_data = [
+        {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": 19.99},
+        {"client": "B", "purchase_date": "2022-08-09", "product": "PC", "price": 7},
+    ]
+
+    # Call function under test
+    result = normalize_sales_records(test_data, "cents")
+
+    # Assert prices are rounded to integer cents
+    assert [record["price"] for record in result] == [1999, 700]
+    assert all(isinstance(record["price"], int) for record in result)
+
+
+def test_normalize_sales_records_errors():
+    """Test normalize_sales_records function behavior with values that cannot be coerced."""
+
+    # Assert missing date raises ValueError
+    with pytest.raises(ValueError, match="no purchase_date"):
+        normalize_sales_records([{"purchase_date": None, "price": 1}])
+
+    # Assert invalid date raises ValueError
+    with pytest.raises(ValueError, match="Invalid purchase_date"):
+        normalize_sales_records([{"purchase_date": "not a date", "price": 1}])
+
+    # Assert invalid price raises ValueError
+    with pytest.raises(ValueError, match="Invalid price"):
+        normalize_sales_records([{"purchase_date": "2022-08-09", "price": "abc"}])
+
+    # Assert numeric strings and bools are rejected, not coerced
+    for price in ("12.5", True):
+        with pytest.raises(ValueError, match=f"Invalid price value: {price!r}"):
+            normalize_sales_records([{"purchase_date": "2022-08-09", "price": price}])
+
+    # Assert missing price raises ValueError for both price types
+    for price_type in ("double", "cents"):
+        with pytest.raises(ValueError, match="no price"):
+            normalize_sales_records([{"purchase_date": "2022-08-09"}], price_type)
+
+    # Assert unsupported price type raises ValueError
+    with pytest.raises(ValueError, match="Unsupported price type"):
+        normalize_sales_records([], "decimal")
+
+
+@pytest.mark.parametrize("price_type", ["double", "cents"])
+def test_normalized_records_round_trip(price_type):
+    """Test normalized records can be written and read with the typed schema."""
+
+    # Setup test data
+    test_data = [
+        {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": 12.5}
+    ]
+
+    # Write and read back with the typed schema
+    buffer = io.BytesIO()
+    fastavro.writer(
+        buffer,
+        build_typed_sales_schema(price_type),
+        normalize_sales_records(test_data, price_type),
+    )
+    buffer.seek(0)
+    records = list(fastavro.reader(buffer))
+
+    # Assert purchase_date is decoded as a date logical type
+    assert records[0]["purchase_date"] == datetime.date(2022, 8, 9)
+    assert records[0]["price"] == (12.5 if price_type == "double" else 1250)
@@ -1,8 +1,15 @@
 from unittest import mock
 import pytest
 import os
+import json
 
-from lec02.hw.job2.bll.process_sales import process_sales_data
+import fastavro
+
+from lec02.hw.common.storage import MemoryStorage
+from lec02.hw.job2.bll import process_sales
+from lec02.hw.job2.bll.process_sales import process_sales_data, process_sales_tree
+from lec02.hw.job2.dal.file_io import build_typed_sales_schema
+from lec02.hw.job2.dal.avro_index import load_avro_index
 
 
 @mock.patch("lec02.hw.job2.bll.process_sales.os.path.isdir")
@@ -66,8 +73,8 @@ def test_process_sales_data_success(
     assert mock_read_json_file.call_count == 2
     mock_read_json_file.assert_has_calls(
         [
-            mock.call(os.path.join(test_raw_dir, "file1.json")),
-            mock.call(os.path.join(test_raw_dir, "file2.json")),
+            mock.call(os.path.join(test_raw_dir, "file1.json"), object_hook=mock.ANY),
+            mock.call(os.path.join(test_raw_dir, "file2.json"), object_hook=mock.ANY),
         ]
     )
 
@@ -88,10 +95,9 @@ def test_process_sales_data_success(
         ]
     )
 
-    # Assert appropriate log messages were recorded
-    assert (
-        mock_logger_info.call_count >= 7
-    )  # At least 7 log messages should be recorded
+    # Assert only run-level messages were logged at INFO, files being at DEBUG
+    assert mock_logger_info.call_count == 3
+    mock_logger_info.assert_any_call("Processed 2 files with 2 records.")
 
 
 @mock.patch("lec02.hw.job2.bll.process_sales.os.path.isdir")
@@ -185,7 +191,8 @@ def test_process_sales_data_read_json_file_error(
     mock_os_path_isdir.return_value = True
     mock_os_listdir.return_value = [test_filename]
     error_msg = "Invalid JSON format"
-    mock_read_json_file.side_effect = ValueError(error_msg)
+    error = ValueError(error_msg)
+    mock_read_json_file.side_effect = error
 
     # Test that the function raises Exception
     with pytest.raises(Exception) as excinfo:
@@ -204,14 +211,12 @@ def test_process_sales_data_read_json_file_error(
     mock_os_listdir.assert_called_once_with(test_raw_dir)
 
     # Assert read_json_file was called
-    mock_read_json_file.assert_called_once_with(test_filepath)
+    mock_read_json_file.assert_called_once_with(test_filepath, object_hook=mock.ANY)
 
     # Assert error logging was called with both messages
     mock_logger_error.assert_has_calls(
         [
-            mock.call(
-                f"Error reading file {test_filepath}: {error_msg}", exc_info=True
-            ),
+            mock.call("Error reading file %s: %s", test_filepath, error, exc_info=True),
             mock.call(f"An unexpected error occurred: {error_msg}", exc_info=True),
         ]
     )
@@ -255,7 +260,8 @@ def test_process_sales_data_write_avro_file_error(
     ]
     mock_read_json_file.return_value = test_data
     error_msg = "Disk full"
-    mock_write_avro_file.side_effect = IOError(error_msg)
+    error = IOError(error_msg)
+    mock_write_avro_file.side_effect = error
 
     # Test that the function raises Exception
     with pytest.raises(Exception) as excinfo:
@@ -274,7 +280,9 @@ def test_process_sales_data_write_avro_file_error(
     mock_os_listdir.assert_called_once_with(test_raw_dir)
 
     # Assert read_json_file was called
-    mock_read_json_file.assert_called_once_with(test_input_filepath)
+    mock_read_json_file.assert_called_once_with(
+        test_input_filepath, object_hook=mock.ANY
+    )
 
     # Assert write_avro_file was called
     mock_write_avro_file.assert_called_once()
@@ -283,7 +291,7 @@ def test_process_sales_data_write_avro_file_error(
     mock_logger_error.assert_has_calls(
         [
             mock.call(
-                f"Error saving file {test_output_filepath}: {error_msg}", exc_info=True
+                "Error saving file %s: %s", test_output_filepath, error, exc_info=True
             ),
             mock.call(f"An unexpected error occurred: {error_msg}", exc_info=True),
         ]
@@ -333,3 +341,653 @@ def test_process_sales_data_unexpected_error(
     mock_logger_exception.assert_called_once_with(
         f"An unexpected error occurred: {error_msg}"
     )
+
+
+def _write_json(dir_path, filename, data):
+    """Helper writing a raw JSON page the way job1 does."""
+    with open(os.path.join(dir_path, filename), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+
+
+@mock.patch("lec02.hw.job2.bll.process_sales.write_avro_file")
+def test_process_sales_data_incremental(mock_write_avro_file, tmp_path):
+    """Test process_sales_data converts only new or changed inputs and removes stale outputs."""
+
+    # Setup raw and staging directories
+    raw_dir = tmp_path / "raw"
+    stg_dir = tmp_path / "stg"
+    raw_dir.mkdir()
+    record = {
+        "client": "Client 1",
+        "purchase_date": "2024-05-07",
+        "product": "Product A",
+        "price": 100,
+    }
+    _write_json(raw_dir, "sales_1.json", [record])
+    _write_json(raw_dir, "sales_2.json", [record, record])
+
+    # Write output files as the real writer would
+    mock_write_avro_file.side_effect = lambda page_data, schema, filepath: open(
+        filepath, "wb"
+    ).close()
+
+    # First run converts every input
+    report = process_sales_data(str(raw_dir), str(stg_dir), incremental=True)
+    assert report["files_processed"] == 2
+    assert report["records_processed"] == 3
+    assert report["files_skipped"] == 0
+
+    # Second run without changes converts nothing
+    mock_write_avro_file.reset_mock()
+    report = process_sales_data(str(raw_dir), str(stg_dir), incremental=True)
+    assert report["files_processed"] == 0
+    assert report["files_skipped"] == 2
+    mock_write_avro_file.assert_not_called()
+
+    # Change one input, remove the other
+    _write_json(raw_dir, "sales_1.json", [record, record, record])
+    os.remove(raw_dir / "sales_2.json")
+    report = process_sales_data(str(raw_dir), str(stg_dir), incremental=True)
+
+    # Assert only the changed input was converted and the stale output removed
+    assert report["files_processed"] == 1
+    assert report["records_processed"] == 3
+    assert report["files_deleted"] == 1
+    assert not (stg_dir / "sales_2.avro").exists()
+    mock_write_avro_file.assert_called_once_with(
+        page_data=[record, record, record],
+        schema=mock.ANY,
+        filepath=os.path.join(str(stg_dir), "sales_1.avro"),
+    )
+
+
+def test_process_sales_data_incremental_failure_keeps_progress(tmp_path):
+    """Test process_sales_data saves the state of the files converted before a failure."""
+
+    # Setup raw directory whose last page is invalid
+    raw_dir = tmp_path / "raw"
+    stg_dir = tmp_path / "stg"
+    raw_dir.mkdir()
+    record = {"client": "A", "purchase_date": "2022-08-09", "product": "TV"}
+    _write_json(raw_dir, "sales_1.json", [{**record, "price": 1}])
+    _write_json(raw_dir, "sales_2.json", [{**record, "price": 2}])
+    (raw_dir / "sales_3.json").write_text("[{", encoding="utf-8")
+
+    # Call function under test, failing on the last page
+    with pytest.raises(Exception, match="Error decoding JSON"):
+        process_sales_data(str(raw_dir), str(stg_dir), incremental=True)
+
+    # Assert the converted pages were recorded
+    state = json.loads((stg_dir / "_conversion_state.json").read_text())
+    assert sorted(state) == ["sales_1.json", "sales_2.json"]
+
+    # Fix the page, the rerun only converts it
+    _write_json(raw_dir, "sales_3.json", [{**record, "price": 3}])
+    report = process_sales_data(str(raw_dir), str(stg_dir), incremental=True)
+    assert report["files_processed"] == 1
+    assert report["files_skipped"] == 2
+
+
+@mock.patch("lec02.hw.job2.bll.process_sales.STATE_CHECKPOINT_FILES", 2)
+@mock.patch("lec02.hw.job2.bll.process_sales.save_conversion_state")
+def test_process_sales_data_incremental_checkpoints(mock_save_state, tmp_path):
+    """Test process_sales_data saves the conversion state every few converted files."""
+
+    # Setup raw directory with three pages
+    raw_dir = tmp_path / "raw"
+    stg_dir = tmp_path / "stg"
+    raw_dir.mkdir()
+    record = {"client": "A", "purchase_date": "2022-08-09", "product": "TV"}
+    for i in range(1, 4):
+        _write_json(raw_dir, f"sales_{i}.json", [{**record, "price": i}])
+
+    # Call function under test
+    process_sales_data(str(raw_dir), str(stg_dir), incremental=True)
+
+    # Assert one checkpoint after two files, without the pending one, then the final save
+    assert mock_save_state.call_count == 2
+    checkpoint = mock_save_state.call_args_list[0].args[1]
+    assert sorted(checkpoint) == ["sales_1.json", "sales_2.json"]
+    assert checkpoint["sales_1.json"]["outputs"] == ["sales_1.avro"]
+    assert len(mock_save_state.call_args_list[1].args[1]) == 3
+
+
+@mock.patch("lec02.hw.job2.bll.process_sales.write_avro_file")
+def test_process_sales_data_typed_schema(mock_write_avro_file, tmp_path):
+    """Test process_sales_data coerces records and writes the typed schema."""
+
+    # Setup raw directory with one page
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    _write_json(
+        raw_dir,
+        "sales_1.json",
+        [{"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": 5}],
+    )
+
+    # Call function under test
+    process_sales_data(str(raw_dir), str(tmp_path / "stg"), typed_schema="cents")
+
+    # Assert normalized records were written with the typed schema
+    mock_write_avro_file.assert_called_once_with(
+        page_data=[
+            {"client": "A", "purchase_date": 19213, "product": "TV", "price": 500}
+        ],
+        schema=build_typed_sales_schema("cents"),
+        filepath=os.path.join(str(tmp_path / "stg"), "sales_1.avro"),
+    )
+
+
+def test_process_sales_data_partitioned_incremental(tmp_path):
+    """Test process_sales_data partitioned output and cleanup of partitions no longer written."""
+
+    # Setup raw directory with one page covering two products
+    raw_dir = tmp_path / "raw"
+    stg_dir = tmp_path / "stg"
+    raw_dir.mkdir()
+    tv = {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": 1}
+    pc = {"client": "B", "purchase_date": "2022-08-09", "product": "PC", "price": 2}
+    _write_json(raw_dir, "sales_1.json", [tv, pc])
+
+    # First run writes both partitions
+    report = process_sales_data(
+        str(raw_dir), str(stg_dir), incremental=True, partition_by="product"
+    )
+    assert report["files_processed"] == 1
+    assert (stg_dir / "product=TV" / "sales_1.avro").exists()
+    assert (stg_dir / "product=PC" / "sales_1.avro").exists()
+
+    # Page changes and no longer contains PC sales
+    _write_json(raw_dir, "sales_1.json", [tv, tv])
+    report = process_sales_data(
+        str(raw_dir), str(stg_dir), incremental=True, partition_by="product"
+    )
+
+    # Assert the PC partition was removed
+    assert report["files_deleted"] == 1
+    assert not (stg_dir / "product=PC").exists()
+    assert (stg_dir / "product=TV" / "sales_1.avro").exists()
+
+
+def test_process_sales_data_invalid_partition_options(tmp_path):
+    """Test process_sales_data function behavior with invalid partitioning options."""
+
+    # Assert unsupported partition key raises ValueError
+    with pytest.raises(ValueError, match="Unsupported partition key"):
+        process_sales_data(str(tmp_path), str(tmp_path), partition_by="price")
+
+    # Assert num_buckets without partition_by raises ValueError
+    with pytest.raises(ValueError, match="num_buckets requires partition_by"):
+        process_sales_data(str(tmp_path), str(tmp_path), num_buckets=4)
+
+
+def test_process_sales_data_block_stats(tmp_path):
+    """Test process_sales_data writes sidecar indexes for flat and partitioned output."""
+
+    # Setup raw directory with one page
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    records = [
+        {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": i}
+        for i in range(5)
+    ]
+    _write_json(raw_dir, "sales_1.json", records)
+
+    # Call function under test for flat and partitioned output
+    process_sales_data(
+        str(raw_dir), str(tmp_path / "flat"), block_stats=True, block_records=2
+    )
+    process_sales_data(
+        str(raw_dir),
+        str(tmp_path / "part"),
+        block_stats=True,
+        partition_by="product",
+    )
+
+    # Assert sidecar indexes with statistics were written
+    flat_index = load_avro_index(str(tmp_path / "flat" / "sales_1.avro"))
+    assert len(flat_index["blocks"]) == 3
+    assert flat_index["stats"]["max"]["price"] == 4
+    part_index = load_avro_index(str(tmp_path / "part" / "product=TV" / "sales_1.avro"))
+    assert part_index["stats"]["records"] == 5
+
+
+@pytest.mark.parametrize("options", [{"workers": 2}, {"memory_limit_mb": 4096}])
+def test_process_sales_data_parallel(tmp_path, options):
+    """Test process_sales_data converts files in worker processes."""
+
+    # Setup raw directory with several pages
+    raw_dir = tmp_path / "raw"
+    stg_dir = tmp_path / "stg"
+    raw_dir.mkdir()
+    pages = {
+        f"sales_{page}.json": [
+            {
+                "client": f"Client {page}-{i}",
+                "purchase_date": "2022-08-09",
+                "product": "TV",
+                "price": i,
+            }
+            for i in range(10)
+        ]
+        for page in range(1, 5)
+    }
+    for filename, page_data in pages.items():
+        _write_json(raw_dir, filename, page_data)
+
+    # Call function under test
+    report = process_sales_data(str(raw_dir), str(stg_dir), **options)
+
+    # Assert report and that every page was converted
+    assert report["files_processed"] == 4
+    assert report["records_processed"] == 40
+    assert report["workers"] >= 1
+    assert report["peak_rss_mb"] > 0
+    for filename, page_data in pages.items():
+        with open(stg_dir / filename.replace(".json", ".avro"), "rb") as f:
+            assert list(fastavro.reader(f)) == page_data
+
+
+def test_process_sales_data_memory_limit_caps_workers(tmp_path):
+    """Test process_sales_data falls back to one worker under a tiny memory limit."""
+
+    # Setup raw directory with two pages
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    _write_json(raw_dir, "sales_1.json", [])
+    _write_json(raw_dir, "sales_2.json", [])
+
+    # Call function under test
+    report = process_sales_data(
+        str(raw_dir), str(tmp_path / "stg"), workers=8, memory_limit_mb=1
+    )
+
+    # Assert the run was serial
+    assert report["workers"] == 1
+    assert report["files_processed"] == 2
+
+
+def test_process_sales_data_memory_limit_serial(tmp_path, caplog):
+    """Test process_sales_data checks every file against the budget in serial mode."""
+
+    # Setup raw directory with two pages
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    _write_json(raw_dir, "sales_1.json", [])
+    _write_json(raw_dir, "sales_2.json", [])
+
+    # Call function under test with a budget below the RSS of the process
+    with caplog.at_level("WARNING", logger="lec02.hw.job2.bll.memory_budget"):
+        report = process_sales_data(
+            str(raw_dir), str(tmp_path / "stg"), workers=1, memory_limit_mb=1
+        )
+
+    # Assert both files were converted, each with an over-budget warning
+    assert report["workers"] == 1
+    assert report["files_processed"] == 2
+    warnings = [r for r in caplog.records if "over the memory limit" in r.message]
+    assert len(warnings) == 2
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"workers": 0}, "workers must be positive."),
+        ({"memory_limit_mb": 0}, "memory_limit_mb must be positive."),
+    ],
+)
+def test_process_sales_data_invalid_parallel_options(tmp_path, options, error):
+    """Test process_sales_data rejects invalid parallelism options."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        process_sales_data(str(tmp_path), str(tmp_path / "stg"), **options)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_process_sales_tree(tmp_path, workers):
+    """Test process_sales_tree converts the dates in range into mirrored directories."""
+
+    # Setup raw tree with three dates
+    raw_root = tmp_path / "raw" / "sales"
+    stg_root = tmp_path / "stg" / "sales"
+    for day in ("2022-08-09", "2022-08-10", "2022-08-11"):
+        (raw_root / day).mkdir(parents=True)
+        for page in (1, 2):
+            record = {
+                "client": f"Client {page}",
+                "purchase_date": day,
+                "product": "TV",
+                "price": page,
+            }
+            _write_json(raw_root / day, f"sales_{day}_{page}.json", [record])
+
+    # Call function under test
+    report = process_sales_tree(
+        str(raw_root),
+        str(stg_root),
+        start_date="2022-08-10",
+        end_date="2022-08-11",
+        workers=workers,
+    )
+
+    # Assert report and mirrored outputs
+    assert report["dates"] == ["2022-08-10", "2022-08-11"]
+    assert report["files_processed"] == 4
+    assert report["records_processed"] == 4
+    assert report["workers"] == workers
+    assert sorted(os.listdir(stg_root)) == ["2022-08-10", "2022-08-11"]
+    with open(stg_root / "2022-08-11" / "sales_2022-08-11_2.avro", "rb") as f:
+        assert [record["price"] for record in fastavro.reader(f)] == [2]
+
+
+@pytest.mark.parametrize(
+    "dates, error",
+    [
+        ({"start_date": "2022-08-32"}, "Invalid date range"),
+        (
+            {"start_date": "2022-08-11", "end_date": "2022-08-10"},
+            "Start date 2022-08-11 is after end date 2022-08-10.",
+        ),
+    ],
+)
+def test_process_sales_tree_invalid_dates(tmp_path, dates, error):
+    """Test process_sales_tree rejects invalid date ranges."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        process_sales_tree(str(tmp_path), str(tmp_path / "stg"), **dates)
+
+
+def test_process_sales_data_dedup(tmp_path):
+    """Test process_sales_data drops records repeated across files with dedup."""
+
+    # Setup raw pages overlapping with each other
+    raw_dir = tmp_path / "raw"
+    stg_dir = tmp_path / "stg"
+    raw_dir.mkdir()
+    anna = {
+        "client": "Anna",
+        "purchase_date": "2022-08-09",
+        "product": "TV",
+        "price": 1,
+    }
+    bob = {"client": "Bob", "purchase_date": "2022-08-09", "product": "TV", "price": 2}
+    _write_json(raw_dir, "sales_2022-08-09_1.json", [anna, bob, anna])
+    _write_json(raw_dir, "sales_2022-08-09_2.json", [{**bob, "price": 2.0}])
+
+    # Call function under test
+    report = process_sales_data(str(raw_dir), str(stg_dir), dedup=True)
+
+    # Assert report and written records
+    assert report["records_processed"] == 2
+    assert report["duplicates_removed"] == 2
+    assert report["dedup_spills"] == 0
+    with open(stg_dir / "sales_2022-08-09_1.avro", "rb") as f:
+        assert list(fastavro.reader(f)) == [anna, bob]
+    with open(stg_dir / "sales_2022-08-09_2.avro", "rb") as f:
+        assert list(fastavro.reader(f)) == []
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"dedup_memory_mb": 8}, "dedup_memory_mb requires dedup."),
+        (
+            {"dedup": True, "incremental": True},
+            "dedup cannot be combined with incremental.",
+        ),
+        (
+            {"dedup": True, "workers": 2},
+            "dedup cannot be combined with several workers.",
+        ),
+    ],
+)
+def test_process_sales_data_invalid_dedup_options(tmp_path, options, error):
+    """Test process_sales_data rejects invalid deduplication options."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        process_sales_data(str(tmp_path), str(tmp_path / "stg"), **options)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_process_sales_data_sort_by(tmp_path, workers):
+    """Test process_sales_data writes one sorted file with sort_by."""
+
+    # Setup raw pages in random client order
+    raw_dir = tmp_path / "raw"
+    stg_dir = tmp_path / "stg"
+    raw_dir.mkdir()
+    clients = [["Dan", "Anna"], ["Carl", "Bob", "Eve"]]
+    for page, page_clients in enumerate(clients, start=1):
+        records = [
+            {
+                "client": client,
+                "purchase_date": "2022-08-09",
+                "product": "TV",
+                "price": 1,
+            }
+            for client in page_clients
+        ]
+        _write_json(raw_dir, f"sales_2022-08-09_{page}.json", records)
+
+    # Call function under test
+    report = process_sales_data(
+        str(raw_dir), str(stg_dir), sort_by="client", workers=workers
+    )
+
+    # Assert a single sorted output and no leftover runs
+    assert report["files_processed"] == 2
+    assert report["records_processed"] == 5
+    assert os.listdir(stg_dir) == ["sales_sorted.avro"]
+    with open(stg_dir / "sales_sorted.avro", "rb") as f:
+        assert [record["client"] for record in fastavro.reader(f)] == [
+            "Anna",
+            "Bob",
+            "Carl",
+            "Dan",
+            "Eve",
+        ]
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"sort_by": "price"}, "Unsupported sort key price"),
+        (
+            {"sort_by": "client", "partition_by": "client"},
+            "sort_by cannot be combined with partition_by.",
+        ),
+        (
+            {"sort_by": "client", "incremental": True},
+            "sort_by cannot be combined with incremental.",
+        ),
+    ],
+)
+def test_process_sales_data_invalid_sort_options(tmp_path, options, error):
+    """Test process_sales_data rejects invalid sort options."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        process_sales_data(str(tmp_path), str(tmp_path / "stg"), **options)
+
+
+def test_process_sales_data_dimensions(tmp_path):
+    """Test process_sales_data writes surrogate keys and stable dimension files."""
+
+    # Setup raw page
+    raw_dir = tmp_path / "raw"
+    stg_dir = tmp_path / "stg"
+    raw_dir.mkdir()
+    records = [
+        {"client": "Anna", "purchase_date": "2022-08-09", "product": "TV", "price": 1},
+        {"client": "Bob", "purchase_date": "2022-08-09", "product": "TV", "price": 2},
+    ]
+    _write_json(raw_dir, "sales_2022-08-09_1.json", records)
+
+    # Call function under test
+    report = process_sales_data(str(raw_dir), str(stg_dir), dimensions=True)
+
+    # Assert report, fact records and dimensions
+    assert report["dimensions"] == {"client": 2, "product": 1}
+    with open(stg_dir / "sales_2022-08-09_1.avro", "rb") as f:
+        assert [(r["client_id"], r["product_id"]) for r in fastavro.reader(f)] == [
+            (0, 0),
+            (1, 0),
+        ]
+
+    # Rerun with a new client first, keeping earlier keys
+    _write_json(raw_dir, "sales_2022-08-09_1.json", [{**records[0], "client": "Carl"}])
+    process_sales_data(str(raw_dir), str(stg_dir), dimensions=True)
+    with open(stg_dir / "_dimensions" / "client.avro", "rb") as f:
+        assert [(r["id"], r["name"]) for r in fastavro.reader(f)] == [
+            (0, "Anna"),
+            (1, "Bob"),
+            (2, "Carl"),
+        ]
+
+
+def test_process_sales_data_incremental_switching_dimensions(tmp_path):
+    """Test switching dimensions on between incremental runs reconverts every file."""
+
+    # Setup raw pages converted incrementally without dimensions
+    raw_dir = tmp_path / "raw"
+    stg_dir = tmp_path / "stg"
+    raw_dir.mkdir()
+    record = {"client": "Anna", "purchase_date": "2022-08-09", "product": "TV"}
+    for page in (1, 2):
+        _write_json(raw_dir, f"sales_{page}.json", [{**record, "price": page}])
+    process_sales_data(str(raw_dir), str(stg_dir), incremental=True)
+
+    # Call function under test
+    report = process_sales_data(
+        str(raw_dir), str(stg_dir), incremental=True, dimensions=True
+    )
+
+    # Assert every file was rewritten with surrogate keys
+    assert report["files_processed"] == 2
+    assert report["files_skipped"] == 0
+    for page in (1, 2):
+        with open(stg_dir / f"sales_{page}.avro", "rb") as f:
+            assert [r["client_id"] for r in fastavro.reader(f)] == [0]
+
+
+def test_process_sales_data_without_dimensions_no_encoders(tmp_path):
+    """Test process_sales_data passes no encoders to the conversions without dimensions."""
+
+    # Setup raw page
+    raw_dir = tmp_path / "raw"
+    stg_dir = tmp_path / "stg"
+    raw_dir.mkdir()
+    record = {"client": "Anna", "purchase_date": "2022-08-09", "product": "TV"}
+    _write_json(raw_dir, "sales_2022-08-09_1.json", [{**record, "price": 1}])
+
+    # Call function under test, recording the options of the conversions
+    with mock.patch(
+        "lec02.hw.job2.bll.process_sales._run_conversions",
+        wraps=process_sales._run_conversions,
+    ) as mock_run_conversions:
+        report = process_sales_data(str(raw_dir), str(stg_dir))
+
+    # Assert no encoder is shipped with the tasks, and the file is converted
+    assert mock_run_conversions.call_args.args[1]["encoders"] is None
+    assert report["records_processed"] == 1
+    assert "dimensions" not in report
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        (
+            {"partition_by": "client"},
+            "dimensions cannot be combined with partition_by.",
+        ),
+        ({"block_stats": True}, "dimensions cannot be combined with block_stats."),
+        ({"workers": 2}, "dimensions cannot be combined with several workers."),
+    ],
+)
+def test_process_sales_data_invalid_dimension_options(tmp_path, options, error):
+    """Test process_sales_data rejects invalid dimension options."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        process_sales_data(
+            str(tmp_path), str(tmp_path / "stg"), dimensions=True, **options
+        )
+
+
+def test_process_sales_data_storage():
+    """Test process_sales_data converts pages held by a storage backend."""
+
+    # Setup raw pages in an in-memory backend
+    storage = MemoryStorage()
+    records = [
+        {"client": "Anna", "purchase_date": "2022-08-09", "product": "TV", "price": 1},
+        {"client": "Bob", "purchase_date": "2022-08-09", "product": "TV", "price": 2},
+    ]
+    storage.write_bytes("raw/sales_2022-08-09_1.json", json.dumps(records).encode())
+    storage.write_bytes("raw/_SUCCESS", b"{}")
+    storage.write_bytes("raw/nested/sales_2022-08-09_2.json", b"[]")
+
+    # Call function under test
+    report = process_sales_data("raw", "stg", storage=storage)
+
+    # Assert only the direct JSON children were converted, in the backend
+    assert report["files_processed"] == 1
+    assert report["records_processed"] == 2
+    assert storage.list("stg") == ["stg/sales_2022-08-09_1.avro"]
+    with storage.open_read("stg/sales_2022-08-09_1.avro") as f:
+        assert list(fastavro.reader(f)) == records
+
+
+def test_process_sales_data_with_storage_block_stats():
+    """Test process_sales_data stores indexed AVRO files and their sidecars in a backend."""
+
+    # Setup a backend holding a raw page
+    storage = MemoryStorage()
+    records = [
+        {"client": "Ann", "purchase_date": "2022-08-09", "product": "TV", "price": 1},
+        {"client": "Bob", "purchase_date": "2022-08-09", "product": "TV", "price": 2},
+    ]
+    storage.write_bytes("raw/sales_2022-08-09_1.json", json.dumps(records).encode())
+
+    # Call function under test
+    process_sales_data("raw", "stg", block_stats=True, storage=storage)
+
+    # Assert the AVRO file and its sidecar index are stored in the backend
+    assert storage.list("stg") == [
+        "stg/sales_2022-08-09_1.avro",
+        "stg/sales_2022-08-09_1.avro.index.json",
+    ]
+    index = json.loads(storage.read_bytes("stg/sales_2022-08-09_1.avro.index.json"))
+    assert index["records"] == 2
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"incremental": True}, "storage cannot be combined with incremental."),
+        ({"partition_by": "product"}, "storage cannot be combined with partition_by."),
+        ({"workers": 2}, "storage cannot be combined with workers."),
+        ({"sort_by": "client"}, "storage cannot be combined with sort_by."),
+    ],
+)
+def test_process_sales_data_invalid_storage_options(options, error):
+    """Test process_sales_data rejects options needing the local disk."""
+
+    # Setup a backend holding a raw page
+    storage = MemoryStorage()
+    storage.write_bytes("raw/sales_2022-08-09_1.json", b"[]")
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match=error):
+        process_sales_data("raw", "stg", storage=storage, **options)
+
+
+def test_process_sales_data_storage_raw_dir_not_found():
+    """Test process_sales_data reports a raw_dir missing from the backend."""
+
+    # Test that the function raises FileNotFoundError
+    with pytest.raises(FileNotFoundError, match="Raw directory raw does not exist"):
+        process_sales_data("raw", "stg", storage=MemoryStorage())
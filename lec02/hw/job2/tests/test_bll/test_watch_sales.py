@@ -0,0 +1,157 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+import fastavro
+import pytest
+
+from lec02.hw.job2.bll.watch_sales import watch_sales_data
+
+
+def _publish(dir_path, filename, content):
+    """Helper publishing a JSON file atomically, as Job1 does."""
+    tmp_filepath = os.path.join(dir_path, filename + ".tmp")
+    with open(tmp_filepath, "w", encoding="utf-8") as f:
+        json.dump(content, f)
+    os.replace(tmp_filepath, os.path.join(dir_path, filename))
+
+
+def _make_page(page):
+    """Helper building a page of sales records."""
+    return [
+        {
+            "client": f"Client {page}-{i}",
+            "purchase_date": "2022-08-09",
+            "product": "TV",
+            "price": 100 + i,
+        }
+        for i in range(3)
+    ]
+
+
+def _run_job1(raw_dir, pages, delay, run_id=None):
+    """Helper publishing pages and the completion marker like Job1."""
+    os.makedirs(raw_dir, exist_ok=True)
+    filenames = []
+    for page in range(1, pages + 1):
+        time.sleep(delay)
+        filename = f"sales_2022-08-09_{page}.json"
+        _publish(raw_dir, filename, _make_page(page))
+        filenames.append(filename)
+    marker = {"files": filenames, "records": pages * 3}
+    if run_id is not None:
+        marker["run_id"] = run_id
+    _publish(raw_dir, "_SUCCESS", marker)
+
+
+def test_watch_sales_data_converts_pages_as_they_land(tmp_path):
+    """Test watch_sales_data converts every page published while it watches."""
+
+    # Setup Job1 publishing pages in the background
+    raw_dir = str(tmp_path / "raw")
+    stg_dir = str(tmp_path / "stg")
+    producer = threading.Thread(target=_run_job1, args=(raw_dir, 3, 0.05))
+    producer.start()
+
+    # Call function under test
+    try:
+        report = watch_sales_data(
+            raw_dir, stg_dir, watch_timeout=10, poll_interval=0.01
+        )
+    finally:
+        producer.join()
+
+    # Assert report and outputs
+    assert report["files_processed"] == 3
+    assert report["records_processed"] == 9
+    assert report["watcher"] in ("inotify", "polling")
+    assert sorted(os.listdir(stg_dir)) == [
+        f"sales_2022-08-09_{page}.avro" for page in (1, 2, 3)
+    ]
+    with open(os.path.join(stg_dir, "sales_2022-08-09_2.avro"), "rb") as f:
+        assert list(fastavro.reader(f)) == _make_page(2)
+
+
+def test_watch_sales_data_with_completed_run(tmp_path):
+    """Test watch_sales_data finishes at once when Job1 already completed."""
+
+    # Setup completed raw directory
+    raw_dir = str(tmp_path / "raw")
+    _run_job1(raw_dir, 2, 0)
+
+    # Call function under test
+    report = watch_sales_data(
+        raw_dir, str(tmp_path / "stg"), watch_timeout=5, partition_by="client"
+    )
+
+    # Assert report
+    assert report["files_processed"] == 2
+    assert report["records_processed"] == 6
+
+
+def test_watch_sales_data_ignores_previous_run(tmp_path):
+    """Test watch_sales_data waits for the marker of its run, not a stale one."""
+
+    # Setup a completed previous run, then Job1 recreating raw_dir for the
+    # new run once the watch started
+    raw_dir = str(tmp_path / "raw")
+    stg_dir = str(tmp_path / "stg")
+    _run_job1(raw_dir, 3, 0, run_id="previous")
+
+    def rerun_job1():
+        time.sleep(0.2)
+        shutil.rmtree(raw_dir)
+        _run_job1(raw_dir, 2, 0.05, run_id="current")
+
+    producer = threading.Thread(target=rerun_job1)
+    producer.start()
+
+    # Call function under test
+    try:
+        report = watch_sales_data(
+            raw_dir, stg_dir, watch_timeout=10, poll_interval=0.01, run_id="current"
+        )
+    finally:
+        producer.join()
+
+    # Assert only the pages of the current run were converted
+    assert report["files_processed"] == 2
+    assert sorted(os.listdir(stg_dir)) == [
+        f"sales_2022-08-09_{page}.avro" for page in (1, 2)
+    ]
+
+
+def test_watch_sales_data_timeout(tmp_path):
+    """Test watch_sales_data raises TimeoutError without completion marker."""
+
+    # Setup raw directory without marker
+    raw_dir = str(tmp_path / "raw")
+    os.makedirs(raw_dir)
+    _publish(raw_dir, "sales_2022-08-09_1.json", _make_page(1))
+
+    # Test that the function raises TimeoutError
+    with pytest.raises(TimeoutError, match="1 files converted"):
+        watch_sales_data(raw_dir, str(tmp_path / "stg"), watch_timeout=0.3)
+
+
+def test_watch_sales_data_missing_page(tmp_path):
+    """Test watch_sales_data fails when the marker lists a page that does not exist."""
+
+    # Setup marker listing a missing page
+    raw_dir = str(tmp_path / "raw")
+    os.makedirs(raw_dir)
+    _publish(raw_dir, "_SUCCESS", {"files": ["sales_2022-08-09_1.json"]})
+
+    # Test that the function raises FileNotFoundError
+    with pytest.raises(FileNotFoundError):
+        watch_sales_data(raw_dir, str(tmp_path / "stg"), watch_timeout=5)
+
+
+def test_watch_sales_data_invalid_options(tmp_path):
+    """Test watch_sales_data validates output options before watching."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match="Unsupported partition key"):
+        watch_sales_data(str(tmp_path), str(tmp_path / "stg"), partition_by="price")
@@ -0,0 +1,145 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from lec02.hw.job2.__main__ import main, parse_args
+
+# Directory holding the lec02 package
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), *[".."] * 4))
+
+PAGE = [
+    {
+        "client": "Anna",
+        "purchase_date": "2022-08-09",
+        "product": "TV",
+        "price": 100,
+    }
+]
+
+
+def _write_page(raw_root, date):
+    """Helper writing a raw JSON page of a date the way job1 does."""
+    raw_dir = os.path.join(raw_root, date)
+    os.makedirs(raw_dir)
+    with open(os.path.join(raw_dir, f"sales_{date}_1.json"), "w") as f:
+        json.dump(PAGE, f)
+
+
+def test_main_converts_date_range(tmp_path, capsys):
+    """Test main converts the dates of the range in-process and prints the report."""
+
+    # Setup three dates of raw pages
+    raw_root, stg_root = str(tmp_path / "raw"), str(tmp_path / "stg")
+    for date in ("2022-08-08", "2022-08-09", "2022-08-10"):
+        _write_page(raw_root, date)
+
+    # Call function under test on two of them
+    status = main(
+        [
+            "2022-08-09",
+            "2022-08-10",
+            "--raw-root",
+            raw_root,
+            "--stg-root",
+            stg_root,
+            "--workers",
+            "1",
+            "--typed-schema",
+            "cents",
+        ]
+    )
+
+    # Assert the report and the outputs
+    report = json.loads(capsys.readouterr().out)
+    assert status == 0
+    assert report["mode"] == "tree"
+    assert report["report"]["files_processed"] == 2
+    assert sorted(os.listdir(stg_root)) == ["2022-08-09", "2022-08-10"]
+
+
+def test_main_reports_invalid_option(tmp_path, capsys):
+    """Test main reports an option rejected by the job and exits with 1."""
+
+    # Setup a raw directory
+    _write_page(str(tmp_path), "2022-08-09")
+
+    # Call function under test with an unsupported sort key
+    status = main(
+        [
+            "--raw-dir",
+            str(tmp_path / "2022-08-09"),
+            "--stg-dir",
+            str(tmp_path / "stg"),
+            "--sort-by",
+            "price",
+        ]
+    )
+
+    # Assert the failure report
+    report = json.loads(capsys.readouterr().out)
+    assert status == 1
+    assert report["status"] == "failed"
+    assert "Unsupported sort key price" in report["error"]
+
+
+@pytest.mark.parametrize(
+    "argv, error",
+    [
+        (
+            ["--raw-dir", "raw", "--stg-dir", "stg", "--watch", "--workers", "2"],
+            "--workers cannot be combined with --watch",
+        ),
+        (["--raw-dir", "raw"], "--raw-dir and --stg-dir must be given together"),
+        (
+            ["--raw-root", "raw", "--stg-root", "stg", "--watch"],
+            "--watch requires --raw-dir",
+        ),
+        (
+            ["--raw-dir", "raw", "--stg-dir", "stg", "--watch-timeout", "5"],
+            "--watch-timeout requires --watch",
+        ),
+    ],
+)
+def test_parse_args_invalid(argv, error, capsys):
+    """Test parse_args rejects combinations the jobs do not support."""
+
+    # Test that the parser exits with a usage error
+    with pytest.raises(SystemExit) as exc_info:
+        parse_args(argv)
+    assert exc_info.value.code == 2
+    assert error in capsys.readouterr().err
+
+
+def test_parse_args_keeps_set_options():
+    """Test only the options given on the command line are passed to the job."""
+
+    # Call function under test
+    args = parse_args(
+        ["--raw-root", "raw", "--stg-root", "stg", "--dedup", "--workers", "1"]
+    )
+
+    # Assert the job options
+    assert args.job_options == {"dedup": True, "workers": 1}
+
+
+def test_parse_args_imports_no_job_modules():
+    """Test parsing the command line does not import the heavy modules."""
+
+    # Setup a fresh interpreter parsing the arguments
+    code = (
+        "import sys\n"
+        "from lec02.hw.job2.__main__ import parse_args\n"
+        "parse_args(['--raw-root', 'raw', '--stg-root', 'stg', '--workers', '4'])\n"
+        "print([m for m in ('requests', 'fastavro', 'flask') if m in sys.modules])\n"
+    )
+
+    # Call function under test
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+
+    # Assert nothing heavy was imported
+    assert result.stdout.strip() == "[]", result.stderr
@@ -0,0 +1,148 @@
+import os
+import fastavro
+import pytest
+
+from lec02.hw.job2.dal.avro_index import (
+    get_index_filepath,
+    load_avro_index,
+    read_avro_blocks,
+    scan_avro_files,
+    write_indexed_avro_file,
+)
+from lec02.hw.job2.dal.file_io import SALES_AVRO_SCHEMA
+
+
+def _make_records(count, day):
+    """Helper building sales records with increasing prices."""
+    return [
+        {
+            "client": f"Client {i % 7}",
+            "purchase_date": f"2022-08-{day:02d}",
+            "product": f"Product {i % 3}",
+            "price": i,
+        }
+        for i in range(count)
+    ]
+
+
+def test_write_indexed_avro_file(tmp_path):
+    """Test write_indexed_avro_file writes a readable file with a block index."""
+
+    # Setup test data
+    test_filepath = str(tmp_path / "sales_1.avro")
+    test_data = _make_records(10, 9)
+
+    # Call function under test
+    index = write_indexed_avro_file(
+        test_data, SALES_AVRO_SCHEMA, test_filepath, block_records=4
+    )
+
+    # Assert the AVRO file is valid and complete
+    with open(test_filepath, "rb") as f:
+        assert list(fastavro.reader(f)) == test_data
+
+    # Assert blocks are contiguous and cover the whole file
+    assert [block["records"] for block in index["blocks"]] == [4, 4, 2]
+    assert index["blocks"][0]["offset"] == index["header_size"]
+    for block, next_block in zip(index["blocks"], index["blocks"][1:]):
+        assert block["offset"] + block["length"] == next_block["offset"]
+    last_block = index["blocks"][-1]
+    assert last_block["offset"] + last_block["length"] == os.path.getsize(test_filepath)
+
+    # Assert per-block and per-file statistics
+    assert index["blocks"][1]["stats"]["min"]["price"] == 4
+    assert index["blocks"][1]["stats"]["max"]["price"] == 7
+    assert index["stats"]["records"] == 10
+    assert index["stats"]["distinct"] == {"client": 7, "product": 3}
+
+    # Assert the sidecar was saved next to the file
+    assert load_avro_index(test_filepath) == index
+
+
+def test_read_avro_blocks(tmp_path):
+    """Test read_avro_blocks decodes only the requested blocks."""
+
+    # Setup indexed file
+    test_filepath = str(tmp_path / "sales_1.avro")
+    test_data = _make_records(10, 9)
+    index = write_indexed_avro_file(
+        test_data, SALES_AVRO_SCHEMA, test_filepath, block_records=4
+    )
+
+    # Call function under test for the last block
+    records = list(read_avro_blocks(test_filepath, index, index["blocks"][2:]))
+
+    # Assert only the last block was decoded
+    assert records == test_data[8:]
+
+
+def test_scan_avro_files_skips_files_and_blocks(tmp_path):
+    """Test scan_avro_files skips files and blocks using sidecar statistics."""
+
+    # Setup one indexed file per day and one file without index
+    filepaths = []
+    for day in (7, 8, 9):
+        filepath = str(tmp_path / f"sales_{day}.avro")
+        write_indexed_avro_file(
+            _make_records(12, day), SALES_AVRO_SCHEMA, filepath, block_records=4
+        )
+        filepaths.append(filepath)
+    plain_filepath = str(tmp_path / "plain.avro")
+    with open(plain_filepath, "wb") as f:
+        fastavro.writer(f, SALES_AVRO_SCHEMA, _make_records(12, 9))
+    filepaths.append(plain_filepath)
+
+    # Call function under test
+    scan_report = {}
+    records = list(
+        scan_avro_files(
+            filepaths,
+            {"purchase_date": ("2022-08-09", None), "price": (9, 10)},
+            scan_report,
+        )
+    )
+
+    # Assert results are exact and irrelevant files and blocks were skipped
+    assert [record["price"] for record in records] == [9, 10, 9, 10]
+    assert scan_report == {"files_skipped": 2, "blocks_skipped": 2, "blocks_read": 1}
+
+
+def test_scan_avro_files_column_without_range_stats(tmp_path):
+    """Test scan_avro_files reads every block for a predicate on a column without stats."""
+
+    # Setup indexed file
+    filepath = str(tmp_path / "sales_9.avro")
+    write_indexed_avro_file(
+        _make_records(12, 9), SALES_AVRO_SCHEMA, filepath, block_records=4
+    )
+
+    # Call function under test
+    scan_report = {}
+    records = list(
+        scan_avro_files([filepath], {"client": ("Client 1", "Client 1")}, scan_report)
+    )
+
+    # Assert matching records are found without skipping anything
+    assert [record["price"] for record in records] == [1, 8]
+    assert scan_report == {"files_skipped": 0, "blocks_skipped": 0, "blocks_read": 3}
+
+
+def test_load_avro_index_missing_or_invalid(tmp_path):
+    """Test load_avro_index function returns None for missing or invalid sidecars."""
+
+    # Assert missing sidecar
+    test_filepath = str(tmp_path / "sales_1.avro")
+    assert load_avro_index(test_filepath) is None
+
+    # Assert sidecar with unsupported version
+    with open(get_index_filepath(test_filepath), "w") as f:
+        f.write('{"version": 999}')
+    assert load_avro_index(test_filepath) is None
+
+
+def test_write_indexed_avro_file_invalid_block_records(tmp_path):
+    """Test write_indexed_avro_file function behavior with invalid block size."""
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError):
+        write_indexed_avro_file([], SALES_AVRO_SCHEMA, str(tmp_path / "f.avro"), 0)
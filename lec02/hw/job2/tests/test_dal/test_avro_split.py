@@ -0,0 +1,128 @@
+import fastavro
+import pytest
+
+from lec02.hw.job2.dal.avro_index import write_indexed_avro_file
+from lec02.hw.job2.dal.avro_split import (
+    map_avro_splits,
+    read_avro_file_parallel,
+    read_avro_split,
+    scan_avro_blocks,
+    split_avro_file,
+)
+from lec02.hw.job2.dal.file_io import SALES_AVRO_SCHEMA
+
+
+def _make_records(count):
+    """Helper building sales records."""
+    return [
+        {
+            "client": f"Client {i}",
+            "purchase_date": "2022-08-09",
+            "product": "TV",
+            "price": i,
+        }
+        for i in range(count)
+    ]
+
+
+def _write_plain_avro(filepath, records, sync_interval):
+    """Helper writing an AVRO file without sidecar index."""
+    with open(filepath, "wb") as f:
+        fastavro.writer(f, SALES_AVRO_SCHEMA, records, sync_interval=sync_interval)
+
+
+def test_scan_avro_blocks_matches_sidecar_index(tmp_path):
+    """Test scan_avro_blocks finds the same blocks as recorded by the writer."""
+
+    # Setup indexed file
+    test_filepath = str(tmp_path / "sales_1.avro")
+    index = write_indexed_avro_file(
+        _make_records(100), SALES_AVRO_SCHEMA, test_filepath, block_records=16
+    )
+
+    # Call function under test
+    scanned = scan_avro_blocks(test_filepath)
+
+    # Assert block boundaries, header and sync marker match the sidecar
+    assert scanned["blocks"] == [
+        {key: block[key] for key in ("offset", "length", "records")}
+        for block in index["blocks"]
+    ]
+    assert scanned["header_size"] == index["header_size"]
+    assert scanned["sync_marker"] == index["sync_marker"]
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+def test_split_avro_file_covers_every_record(tmp_path, indexed):
+    """Test split_avro_file ranges are aligned and decode every record exactly once."""
+
+    # Setup file with or without sidecar index
+    test_filepath = str(tmp_path / "sales_1.avro")
+    test_data = _make_records(1000)
+    if indexed:
+        write_indexed_avro_file(
+            test_data, SALES_AVRO_SCHEMA, test_filepath, block_records=50
+        )
+    else:
+        _write_plain_avro(test_filepath, test_data, sync_interval=1000)
+
+    # Call function under test
+    splits = split_avro_file(test_filepath, 4)
+
+    # Assert ranges are contiguous and decode to the original records
+    assert len(splits) == 4
+    for (_, end), (next_start, _) in zip(splits, splits[1:]):
+        assert end == next_start
+    records = []
+    for start, end in splits:
+        records.extend(read_avro_split(test_filepath, start, end))
+    assert records == test_data
+
+
+def test_split_avro_file_fewer_blocks_than_splits(tmp_path):
+    """Test split_avro_file never returns more ranges than blocks."""
+
+    # Setup file with a single block
+    test_filepath = str(tmp_path / "sales_1.avro")
+    _write_plain_avro(test_filepath, _make_records(10), sync_interval=16000)
+
+    # Assert a single range is returned
+    assert len(split_avro_file(test_filepath, 8)) == 1
+
+    # Assert num_splits must be positive
+    with pytest.raises(ValueError):
+        split_avro_file(test_filepath, 0)
+
+
+def test_read_avro_file_parallel(tmp_path):
+    """Test read_avro_file_parallel decodes ranges in worker processes in order."""
+
+    # Setup indexed file
+    test_filepath = str(tmp_path / "sales_1.avro")
+    test_data = _make_records(2000)
+    write_indexed_avro_file(
+        test_data, SALES_AVRO_SCHEMA, test_filepath, block_records=100
+    )
+
+    # Call functions under test
+    records = read_avro_file_parallel(test_filepath, num_splits=4, max_workers=2)
+    counts = map_avro_splits(test_filepath, len, num_splits=4, max_workers=2)
+
+    # Assert records are complete and in file order
+    assert records == test_data
+    assert sum(counts) == 2000
+
+
+def test_scan_avro_blocks_invalid_sync_marker(tmp_path):
+    """Test scan_avro_blocks function behavior with a corrupted sync marker."""
+
+    # Setup file and corrupt the last byte of its last sync marker
+    test_filepath = tmp_path / "sales_1.avro"
+    _write_plain_avro(str(test_filepath), _make_records(10), sync_interval=16000)
+    data = bytearray(test_filepath.read_bytes())
+    data[-1] ^= 0xFF
+    test_filepath.write_bytes(bytes(data))
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match="Invalid sync marker"):
+        scan_avro_blocks(str(test_filepath))
@@ -0,0 +1,92 @@
+import math
+
+from lec02.hw.job2.dal.column_stats import (
+    HyperLogLog,
+    collect_column_stats,
+    record_matches,
+    stats_may_match,
+)
+
+
+def test_hyperloglog_estimate_and_merge():
+    """Test HyperLogLog estimates and merged estimates stay close to exact counts."""
+
+    # Setup two overlapping sketches
+    first, second = HyperLogLog(), HyperLogLog()
+    for i in range(3000):
+        first.add(f"Client {i}")
+    for i in range(2000, 5000):
+        second.add(f"Client {i}")
+
+    # Assert estimates are within 10% of the exact distinct counts
+    assert abs(first.estimate() - 3000) < 300
+    first.merge(second)
+    assert abs(first.estimate() - 5000) < 500
+
+    # Assert serialized sketches round trip
+    assert HyperLogLog.from_base64(first.to_base64()).estimate() == first.estimate()
+
+
+def test_collect_column_stats():
+    """Test collect_column_stats function computes counts, nulls and min/max."""
+
+    # Setup test data with nulls, NaN and typed dates
+    test_data = [
+        {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": 10},
+        {"client": "A", "purchase_date": 19210, "product": None, "price": 2.5},
+        {"client": None, "purchase_date": None, "product": "PC", "price": math.nan},
+    ]
+
+    # Call function under test
+    stats = collect_column_stats(test_data).to_dict()
+
+    # Assert statistics
+    assert stats["records"] == 3
+    assert stats["nulls"] == {
+        "client": 1,
+        "purchase_date": 1,
+        "product": 1,
+        "price": 0,
+    }
+    assert stats["min"] == {"price": 2.5, "purchase_date": "2022-08-06"}
+    assert stats["max"] == {"price": 10, "purchase_date": "2022-08-09"}
+    assert stats["distinct"] == {"client": 1, "product": 2}
+
+
+def test_stats_may_match():
+    """Test stats_may_match function with overlapping and disjoint ranges."""
+
+    # Setup test statistics
+    stats = {
+        "records": 10,
+        "min": {"price": 100, "purchase_date": "2022-08-01"},
+        "max": {"price": 500, "purchase_date": "2022-08-09"},
+    }
+
+    # Assert overlapping and unbounded ranges may match
+    assert stats_may_match(stats, {})
+    assert stats_may_match(stats, {"price": (400, None)})
+    assert stats_may_match(stats, {"purchase_date": ("2022-08-09", "2022-08-31")})
+
+    # Assert disjoint ranges, empty blocks and null-only columns are skipped
+    assert not stats_may_match(stats, {"price": (501, None)})
+    assert not stats_may_match(stats, {"purchase_date": (None, "2022-07-31")})
+    assert not stats_may_match({"records": 0}, {})
+    assert not stats_may_match({"records": 1, "min": {}, "max": {}}, {"price": (1, 2)})
+
+    # Assert columns without range stats never skip a block
+    assert stats_may_match(stats, {"client": ("A", "A")})
+
+
+def test_record_matches():
+    """Test record_matches function with inclusive bounds and nulls."""
+
+    # Setup test predicates
+    predicates = {"price": (100, 200), "purchase_date": ("2022-08-09", None)}
+
+    # Assert matching and non-matching records
+    assert record_matches({"price": 100, "purchase_date": "2022-08-09"}, predicates)
+    assert not record_matches({"price": 201, "purchase_date": "2022-08-09"}, predicates)
+    assert not record_matches(
+        {"price": None, "purchase_date": "2022-08-09"}, predicates
+    )
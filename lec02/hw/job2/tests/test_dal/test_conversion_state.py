@@ -0,0 +1,144 @@
+from unittest import mock
+import os
+import pytest
+
+from lec02.hw.job2.dal.conversion_state import (
+    STATE_FILENAME,
+    compute_file_hash,
+    get_file_fingerprint,
+    is_input_unchanged,
+    load_conversion_state,
+    save_conversion_state,
+)
+
+
+def test_get_file_fingerprint_computes_hash(tmp_path):
+    """Test get_file_fingerprint function behavior for a file seen for the first time."""
+
+    # Setup test file
+    test_filepath = tmp_path / "sales_1.json"
+    test_filepath.write_text('[{"client": "Client 1"}]', encoding="utf-8")
+
+    # Call function under test
+    fingerprint = get_file_fingerprint(str(test_filepath))
+
+    # Assert fingerprint content
+    assert fingerprint["path"] == str(test_filepath)
+    assert fingerprint["size"] == test_filepath.stat().st_size
+    assert fingerprint["mtime_ns"] == test_filepath.stat().st_mtime_ns
+    assert fingerprint["sha256"] == compute_file_hash(str(test_filepath))
+
+
+@mock.patch("lec02.hw.job2.dal.conversion_state.compute_file_hash")
+def test_get_file_fingerprint_reuses_hash(mock_compute_file_hash, tmp_path):
+    """Test get_file_fingerprint function does not re-read a file with same size and mtime."""
+
+    # Setup test file and previous fingerprint
+    test_filepath = tmp_path / "sales_1.json"
+    test_filepath.write_text("[]", encoding="utf-8")
+    stat_result = test_filepath.stat()
+    previous = {
+        "size": stat_result.st_size,
+        "mtime_ns": stat_result.st_mtime_ns,
+        "sha256": "previous-hash",
+    }
+
+    # Call function under test
+    fingerprint = get_file_fingerprint(str(test_filepath), previous)
+
+    # Assert the previous hash was reused without hashing the file
+    assert fingerprint["sha256"] == "previous-hash"
+    mock_compute_file_hash.assert_not_called()
+
+
+def test_save_and_load_conversion_state(tmp_path):
+    """Test save_conversion_state and load_conversion_state round trip."""
+
+    # Setup test state
+    test_state = {"sales_1.json": {"sha256": "abc", "outputs": ["sales_1.avro"]}}
+
+    # Call functions under test
+    save_conversion_state(str(tmp_path), test_state)
+    result = load_conversion_state(str(tmp_path))
+
+    # Assert state was persisted without leftovers
+    assert result == test_state
+    assert sorted(os.listdir(tmp_path)) == [STATE_FILENAME]
+
+
+@mock.patch("lec02.hw.job2.dal.conversion_state.logger.warning")
+def test_load_conversion_state_invalid_json(mock_logger_warning, tmp_path):
+    """Test load_conversion_state function behavior with a corrupted state file."""
+
+    # Setup corrupted state file
+    (tmp_path / STATE_FILENAME).write_text("not json", encoding="utf-8")
+
+    # Call function under test
+    result = load_conversion_state(str(tmp_path))
+
+    # Assert state is ignored
+    assert result == {}
+    mock_logger_warning.assert_called_once()
+
+
+@mock.patch("lec02.hw.job2.dal.conversion_state.open")
+@mock.patch("lec02.hw.job2.dal.conversion_state.logger.error")
+def test_save_conversion_state_io_error(mock_logger_error, mock_open):
+    """Test save_conversion_state function behavior when the file cannot be written."""
+
+    # Configure mock behavior
+    mock_open.side_effect = IOError("Disk full")
+
+    # Test that the function raises IOError
+    with pytest.raises(IOError) as excinfo:
+        save_conversion_state("test/stg/dir", {})
+
+    # Assert error message contains expected information
+    assert "Error saving conversion state" in str(excinfo.value)
+    mock_logger_error.assert_called_once()
+
+
+def test_is_input_unchanged(tmp_path):
+    """Test is_input_unchanged function for matching, changed and missing outputs."""
+
+    # Setup previous state entry and its output
+    (tmp_path / "sales_1.avro").write_bytes(b"avro")
+    previous = {"sha256": "abc", "outputs": ["sales_1.avro"]}
+
+    # Assert unchanged when hash matches and output exists
+    assert is_input_unchanged(previous, {"sha256": "abc"}, str(tmp_path))
+
+    # Assert changed when hash differs
+    assert not is_input_unchanged(previous, {"sha256": "def"}, str(tmp_path))
+
+    # Assert changed when the output options differ
+    assert not is_input_unchanged(
+        previous, {"sha256": "abc", "options": {"typed_schema": "cents"}}, str(tmp_path)
+    )
+
+    # Assert changed when the input was never converted
+    assert not is_input_unchanged(None, {"sha256": "abc"}, str(tmp_path))
+
+    # Assert changed when the output has been removed
+    os.remove(tmp_path / "sales_1.avro")
+    assert not is_input_unchanged(previous, {"sha256": "abc"}, str(tmp_path))
+
+
+@mock.patch("lec02.hw.job2.dal.conversion_state.logger.error")
+def test_save_conversion_state_removes_tmp_file(mock_logger_error, tmp_path):
+    """Test save_conversion_state keeps the previous state when the replace fails."""
+
+    # Setup previous state
+    save_conversion_state(str(tmp_path), {"sales_1.json": {"sha256": "a"}})
+
+    # Test that the function raises IOError when the file cannot be replaced
+    with mock.patch(
+        "lec02.hw.job2.dal.conversion_state.os.replace",
+        side_effect=OSError("Permission denied"),
+    ):
+        with pytest.raises(IOError):
+            save_conversion_state(str(tmp_path), {})
+
+    # Assert the temporary file is removed and the previous state kept
+    assert os.listdir(tmp_path) == [STATE_FILENAME]
+    assert load_conversion_state(str(tmp_path)) == {"sales_1.json": {"sha256": "a"}}
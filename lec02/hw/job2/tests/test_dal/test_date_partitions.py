@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+
+from lec02.hw.job2.dal.date_partitions import (
+    find_date_partitions,
+    parse_partition_date,
+)
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("2022-08-09", datetime.date(2022, 8, 9)),
+        ("date=2022-08-09", datetime.date(2022, 8, 9)),
+        ("2022-13-01", None),
+        ("sales", None),
+        ("20220809", None),
+    ],
+)
+def test_parse_partition_date(name, expected):
+    """Test parse_partition_date accepts plain and Hive-style date names."""
+
+    # Assert parsed date
+    assert parse_partition_date(name) == expected
+
+
+def test_find_date_partitions(tmp_path):
+    """Test find_date_partitions walks the tree and filters by date range."""
+
+    # Setup tree with flat, nested, hidden and non-date directories
+    for rel_path in (
+        "2022-08-10",
+        "2022-08-09",
+        "2022-08-11",
+        "eu/2022-08-09",
+        ".trash/2022-08-09",
+        "misc",
+    ):
+        (tmp_path / rel_path).mkdir(parents=True)
+    (tmp_path / "2022-08-12").write_text("not a directory")
+
+    # Assert every date directory is found, sorted by date
+    assert find_date_partitions(str(tmp_path)) == [
+        "2022-08-09",
+        "eu/2022-08-09",
+        "2022-08-10",
+        "2022-08-11",
+    ]
+
+    # Assert date range is inclusive
+    assert find_date_partitions(
+        str(tmp_path), datetime.date(2022, 8, 10), datetime.date(2022, 8, 11)
+    ) == ["2022-08-10", "2022-08-11"]
+
+    # Assert depth limits the walk
+    assert "eu/2022-08-09" not in find_date_partitions(str(tmp_path), max_depth=1)
+
+
+def test_find_date_partitions_missing_root(tmp_path):
+    """Test find_date_partitions raises FileNotFoundError for a missing root."""
+
+    # Test that the function raises FileNotFoundError
+    with pytest.raises(FileNotFoundError):
+        find_date_partitions(str(tmp_path / "missing"))
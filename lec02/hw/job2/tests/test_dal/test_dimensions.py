@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from lec02.hw.job2.dal.dimensions import (
+    build_fact_schema,
+    get_dimension_filepath,
+    load_dimension,
+    save_dimension,
+)
+from lec02.hw.job2.dal.file_io import SALES_AVRO_SCHEMA
+
+
+def test_build_fact_schema():
+    """Test build_fact_schema replaces client and product by surrogate keys."""
+
+    # Call function under test
+    schema = build_fact_schema(SALES_AVRO_SCHEMA)
+
+    # Assert field names and types
+    assert [field["name"] for field in schema["fields"]] == [
+        "client_id",
+        "purchase_date",
+        "product_id",
+        "price",
+    ]
+    assert schema["fields"][0]["type"] == ["long", "null"]
+    assert schema["name"] == "SaleFact"
+
+
+def test_save_and_load_dimension(tmp_path):
+    """Test save_dimension writes values that load_dimension reads back by key."""
+
+    # Call functions under test
+    save_dimension(str(tmp_path), "product", ["TV", "Phone"])
+
+    # Assert values and no temporary file left
+    assert load_dimension(str(tmp_path), "product") == ["TV", "Phone"]
+    assert os.listdir(tmp_path / "_dimensions") == ["product.avro"]
+
+
+def test_load_dimension_missing(tmp_path):
+    """Test load_dimension returns no values without a dimension file."""
+
+    # Assert empty dimension
+    assert load_dimension(str(tmp_path), "client") == []
+
+
+def test_load_dimension_invalid(tmp_path):
+    """Test load_dimension raises ValueError for an unreadable dimension file."""
+
+    # Setup corrupt dimension file
+    filepath = get_dimension_filepath(str(tmp_path), "client")
+    os.makedirs(os.path.dirname(filepath))
+    with open(filepath, "wb") as f:
+        f.write(b"not avro")
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match="Error reading dimension file"):
+        load_dimension(str(tmp_path), "client")
@@ -0,0 +1,149 @@
+import json
+import os
+import shutil
+from unittest import mock
+
+import pytest
+
+from lec02.hw.job2.dal.dir_watcher import (
+    create_dir_watcher,
+    read_success_marker,
+    DirectoryWatcher,
+    InotifyWatcher,
+    PollingWatcher,
+)
+
+
+def _publish(dir_path, filename, content="[]"):
+    """Helper publishing a file atomically, as Job1 does."""
+    tmp_filepath = os.path.join(dir_path, filename + ".tmp")
+    with open(tmp_filepath, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_filepath, os.path.join(dir_path, filename))
+
+
+def _inotify_watcher(dir_path):
+    """Helper creating an InotifyWatcher, skipping where inotify is unavailable."""
+    try:
+        return InotifyWatcher(dir_path, poll_interval=0.01)
+    except OSError as e:
+        pytest.skip(f"inotify unavailable: {e}")
+
+
+@pytest.fixture(params=["polling", "inotify"])
+def make_watcher(request):
+    """Fixture building a watcher of each kind."""
+    watchers = []
+
+    def factory(dir_path):
+        if request.param == "polling":
+            watcher = PollingWatcher(dir_path, poll_interval=0.01, max_interval=0.05)
+        else:
+            watcher = _inotify_watcher(dir_path)
+        watchers.append(watcher)
+        return watcher
+
+    yield factory
+    for watcher in watchers:
+        watcher.close()
+
+
+def test_watcher_reports_existing_and_new_files_once(tmp_path, make_watcher):
+    """Test a watcher reports files present at start, then new ones, each once."""
+
+    # Setup directory with a page already published
+    _publish(str(tmp_path), "sales_1.json")
+    watcher = make_watcher(str(tmp_path))
+
+    # Assert existing file is reported first
+    assert watcher.poll(1) == ["sales_1.json"]
+
+    # Publish a new page and assert only it is reported
+    _publish(str(tmp_path), "sales_2.json")
+    assert watcher.poll(1) == ["sales_2.json"]
+
+    # Assert nothing else is reported before the timeout
+    assert watcher.poll(0.1) == []
+
+
+def test_watcher_waits_for_missing_directory(tmp_path, make_watcher):
+    """Test a watcher on a directory that does not exist yet."""
+
+    # Setup watcher on missing directory
+    dir_path = str(tmp_path / "raw")
+    watcher = make_watcher(dir_path)
+
+    # Assert nothing is reported while the directory is missing
+    assert watcher.poll(0.05) == []
+
+    # Create directory and publish a page
+    os.makedirs(dir_path)
+    _publish(dir_path, "sales_1.json")
+
+    # Assert the page is reported
+    assert watcher.poll(1) == ["sales_1.json"]
+
+
+def test_watcher_resets_when_directory_is_recreated(tmp_path, make_watcher):
+    """Test a watcher forgets seen files when the directory is recreated."""
+
+    # Setup directory with a page
+    dir_path = str(tmp_path / "raw")
+    os.makedirs(dir_path)
+    _publish(dir_path, "sales_1.json")
+    watcher = make_watcher(dir_path)
+    assert watcher.poll(1) == ["sales_1.json"]
+
+    # Recreate the directory as Job1 does and publish the same page
+    shutil.rmtree(dir_path)
+    os.makedirs(dir_path)
+    _publish(dir_path, "sales_1.json")
+
+    # Assert the page is reported again in a new generation
+    names = []
+    for _ in range(5):
+        names += watcher.poll(0.2)
+        if names:
+            break
+    assert names == ["sales_1.json"]
+    assert watcher.generation == 1
+
+
+def test_create_dir_watcher_falls_back_to_polling(tmp_path):
+    """Test create_dir_watcher uses polling when inotify cannot be used."""
+
+    # Setup inotify failure
+    with mock.patch(
+        "lec02.hw.job2.dal.dir_watcher.InotifyWatcher",
+        side_effect=OSError("not supported"),
+    ):
+        # Call function under test
+        watcher = create_dir_watcher(str(tmp_path))
+
+    # Assert polling watcher is used
+    assert isinstance(watcher, PollingWatcher)
+    assert watcher.kind == "polling"
+
+
+def test_directory_watcher_is_abstract(tmp_path):
+    """Test DirectoryWatcher cannot be created without a poll method."""
+
+    # Test that the base class raises TypeError
+    with pytest.raises(TypeError, match="abstract"):
+        DirectoryWatcher(str(tmp_path))
+
+
+def test_read_success_marker(tmp_path):
+    """Test read_success_marker returns the marker and rejects invalid ones."""
+
+    # Setup valid marker
+    marker = {"files": ["sales_1.json"], "records": 3}
+    (tmp_path / "_SUCCESS").write_text(json.dumps(marker), encoding="utf-8")
+
+    # Assert valid marker is returned
+    assert read_success_marker(str(tmp_path)) == marker
+
+    # Assert marker without file list is rejected
+    (tmp_path / "_SUCCESS").write_text("{}", encoding="utf-8")
+    with pytest.raises(ValueError, match="missing file list"):
+        read_success_marker(str(tmp_path))
@@ -0,0 +1,133 @@
+import os
+
+import fastavro
+import pytest
+
+from lec02.hw.job2.dal.external_sort import (
+    get_sort_key,
+    merge_sorted_runs,
+    write_sorted_run,
+)
+from lec02.hw.job2.dal.avro_index import load_avro_index
+from lec02.hw.job2.dal.file_io import SALES_AVRO_SCHEMA
+
+
+def _record(client, purchase_date, price=1):
+    """Helper building a raw sales record."""
+    return {
+        "client": client,
+        "purchase_date": purchase_date,
+        "product": "TV",
+        "price": price,
+    }
+
+
+def _read(filepath):
+    """Helper reading the records of an AVRO file."""
+    with open(filepath, "rb") as f:
+        return list(fastavro.reader(f))
+
+
+def test_get_sort_key():
+    """Test get_sort_key orders by the key fields with missing values first."""
+
+    # Setup records
+    records = [
+        _record("Bob", "2022-08-09"),
+        _record("Anna", "2022-08-10"),
+        _record(None, "2022-08-10"),
+        _record("Anna", None),
+    ]
+
+    # Assert orders by both sort keys
+    assert sorted(records, key=get_sort_key("purchase_date")) == [
+        records[3],
+        records[0],
+        records[2],
+        records[1],
+    ]
+    assert sorted(records, key=get_sort_key("client")) == [
+        records[2],
+        records[3],
+        records[1],
+        records[0],
+    ]
+
+    # Test that an unsupported key raises ValueError
+    with pytest.raises(ValueError, match="Unsupported sort key"):
+        get_sort_key("price")
+
+
+@pytest.mark.parametrize("max_fanin", [2, 64])
+def test_merge_sorted_runs(tmp_path, max_fanin):
+    """Test merge_sorted_runs merges runs into one sorted file, in several passes if needed."""
+
+    # Setup five sorted runs
+    run_filepaths = []
+    expected = []
+    for run in range(5):
+        page = [
+            _record(f"Client {(run * 7 + i) % 10}", f"2022-08-{10 + i % 3}", run)
+            for i in range(6)
+        ]
+        expected.extend(page)
+        filepath = str(tmp_path / "runs" / f"run-{run}.avro")
+        write_sorted_run(page, SALES_AVRO_SCHEMA, filepath, "purchase_date")
+        run_filepaths.append(filepath)
+    output_filepath = str(tmp_path / "sorted.avro")
+
+    # Call function under test
+    records_count = merge_sorted_runs(
+        run_filepaths,
+        SALES_AVRO_SCHEMA,
+        output_filepath,
+        "purchase_date",
+        max_fanin=max_fanin,
+    )
+
+    # Assert output is sorted, complete, and runs are removed
+    records = _read(output_filepath)
+    assert records_count == len(records) == 30
+    keys = [get_sort_key("purchase_date")(record) for record in records]
+    assert keys == sorted(keys)
+    assert sorted(records, key=repr) == sorted(expected, key=repr)
+    assert os.listdir(tmp_path / "runs") == []
+
+
+def test_merge_sorted_runs_block_stats(tmp_path):
+    """Test merge_sorted_runs writes a sidecar index with narrow block ranges."""
+
+    # Setup two runs
+    run_filepaths = []
+    for run in range(2):
+        page = [_record("Anna", f"2022-08-{10 + i}") for i in range(run, 20, 2)]
+        filepath = str(tmp_path / f"run-{run}.avro")
+        write_sorted_run(page, SALES_AVRO_SCHEMA, filepath, "purchase_date")
+        run_filepaths.append(filepath)
+    output_filepath = str(tmp_path / "sorted.avro")
+
+    # Call function under test
+    merge_sorted_runs(
+        run_filepaths,
+        SALES_AVRO_SCHEMA,
+        output_filepath,
+        "purchase_date",
+        block_stats=True,
+        block_records=5,
+    )
+
+    # Assert blocks cover disjoint date ranges
+    index = load_avro_index(output_filepath)
+    ranges = [
+        (
+            block["stats"]["min"]["purchase_date"],
+            block["stats"]["max"]["purchase_date"],
+        )
+        for block in index["blocks"]
+    ]
+    assert ranges == [
+        ("2022-08-10", "2022-08-14"),
+        ("2022-08-15", "2022-08-19"),
+        ("2022-08-20", "2022-08-24"),
+        ("2022-08-25", "2022-08-29"),
+    ]
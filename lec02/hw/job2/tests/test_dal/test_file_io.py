@@ -3,16 +3,23 @@ import pytest
 import json
 import fastavro
 
-from lec02.hw.job2.dal.file_io import read_json_file, write_avro_file, SALES_AVRO_SCHEMA
+from lec02.hw.common.storage import MemoryStorage
+from lec02.hw.job2.dal.avro_index import load_avro_index
+from lec02.hw.job2.dal.file_io import (
+    read_json_file,
+    write_avro_file,
+    build_typed_sales_schema,
+    SALES_AVRO_SCHEMA,
+)
 
 
 @mock.patch(
-    "lec02.hw.job2.dal.file_io.open",
+    "lec02.hw.common.storage.local.open",
     mock.mock_open(read_data='[{"client": "Test Client", "price": 100}]'),
 )
 @mock.patch("lec02.hw.job2.dal.file_io.json.load")
-@mock.patch("lec02.hw.job2.dal.file_io.logger.info")
-def test_read_json_file_success(mock_logger_info, mock_json_load):
+@mock.patch("lec02.hw.job2.dal.file_io.logger.debug")
+def test_read_json_file_success(mock_logger_debug, mock_json_load):
     """Test read_json_file function behavior when successfully reading a JSON file."""
 
     # Setup test data
@@ -38,18 +45,15 @@ def test_read_json_file_success(mock_logger_info, mock_json_load):
     # Assert json.load was called once
     mock_json_load.assert_called_once()
 
-    # Assert logging messages
-    mock_logger_info.assert_has_calls(
-        [
-            mock.call(f"Reading JSON file {test_filepath}..."),
-            mock.call(
-                f"JSON file {test_filepath} read successfully with {len(test_data)} records."
-            ),
-        ]
+    # Assert the file was logged lazily at DEBUG level
+    mock_logger_debug.assert_called_once_with(
+        "JSON file %s read successfully with %d records.",
+        test_filepath,
+        len(test_data),
     )
 
 
-@mock.patch("lec02.hw.job2.dal.file_io.open")
+@mock.patch("lec02.hw.common.storage.local.open")
 @mock.patch("lec02.hw.job2.dal.file_io.logger.info")
 @mock.patch("lec02.hw.job2.dal.file_io.logger.error")
 def test_read_json_file_file_not_found(mock_logger_error, mock_logger_info, mock_open):
@@ -60,7 +64,8 @@ def test_read_json_file_file_not_found(mock_logger_error, mock_logger_info, mock
 
     # Configure mock behavior
     error_msg = "No such file or directory"
-    mock_open.side_effect = FileNotFoundError(error_msg)
+    error = FileNotFoundError(error_msg)
+    mock_open.side_effect = error
 
     # Test that the function raises FileNotFoundError
     with pytest.raises(FileNotFoundError) as excinfo:
@@ -68,16 +73,17 @@ def test_read_json_file_file_not_found(mock_logger_error, mock_logger_info, mock
 
     # Assert error message contains expected information
     assert f"File {test_filepath} not found" in str(excinfo.value)
+    assert excinfo.value.__cause__.__cause__ is error
 
-    # Assert logging messages
-    mock_logger_info.assert_called_once_with(f"Reading JSON file {test_filepath}...")
+    # Assert no file was logged at INFO level
+    mock_logger_info.assert_not_called()
     mock_logger_error.assert_called_once_with(
-        f"File {test_filepath} not found: {error_msg}"
+        "File %s not found: %s", test_filepath, excinfo.value.__cause__
     )
 
 
 @mock.patch(
-    "lec02.hw.job2.dal.file_io.open",
+    "lec02.hw.common.storage.local.open",
     mock.mock_open(read_data='{"invalid": "not a list"}'),
 )
 @mock.patch("lec02.hw.job2.dal.file_io.json.load")
@@ -102,21 +108,22 @@ def test_read_json_file_not_a_list(mock_logger_error, mock_logger_info, mock_jso
         excinfo.value
     )
 
-    # Assert logging messages
-    mock_logger_info.assert_called_once_with(f"Reading JSON file {test_filepath}...")
+    # Assert no file was logged at INFO level
+    mock_logger_info.assert_not_called()
     # Check that both error logs were called
     mock_logger_error.assert_has_calls(
         [
-            mock.call(f"Data is not a list: {test_data}"),
-            mock.call(
-                f"An unexpected error occurred: Data is not a list: {test_data}",
-                exc_info=True,
-            ),
+            mock.call("Data is not a list: %s", test_data),
+            mock.call("An unexpected error occurred: %s", mock.ANY, exc_info=True),
         ]
     )
+    error = mock_logger_error.call_args_list[1][0][1]
+    assert str(error) == f"Data is not a list: {test_data}"
 
 
-@mock.patch("lec02.hw.job2.dal.file_io.open", mock.mock_open(read_data="invalid json"))
+@mock.patch(
+    "lec02.hw.common.storage.local.open", mock.mock_open(read_data="invalid json")
+)
 @mock.patch("lec02.hw.job2.dal.file_io.json.load")
 @mock.patch("lec02.hw.job2.dal.file_io.logger.info")
 @mock.patch("lec02.hw.job2.dal.file_io.logger.error")
@@ -139,20 +146,25 @@ def test_read_json_file_json_decode_error(
     # Assert error message contains expected information
     assert f"Error decoding JSON from file {test_filepath}" in str(excinfo.value)
 
-    # Assert logging messages
-    mock_logger_info.assert_called_once_with(f"Reading JSON file {test_filepath}...")
+    # Assert no file was logged at INFO level
+    mock_logger_info.assert_not_called()
     # Check that error was logged (without checking exact message format)
     mock_logger_error.assert_called_once()
     # Verify the error message contains the expected information
-    error_call_args = mock_logger_error.call_args[0][0]
-    assert f"Error decoding JSON from file {test_filepath}" in error_call_args
-    assert error_msg in error_call_args
+    error_call_args = mock_logger_error.call_args[0]
+    message = error_call_args[0] % error_call_args[1:]
+    assert f"Error decoding JSON from file {test_filepath}" in message
+    assert error_msg in message
 
 
 @mock.patch("lec02.hw.job2.dal.file_io.open", mock.mock_open())
+@mock.patch("lec02.hw.common.storage.local.os.makedirs")
+@mock.patch("lec02.hw.common.storage.local.os.replace")
 @mock.patch("lec02.hw.job2.dal.file_io.fastavro.writer")
-@mock.patch("lec02.hw.job2.dal.file_io.logger.info")
-def test_write_avro_file_success(mock_logger_info, mock_fastavro_writer):
+@mock.patch("lec02.hw.job2.dal.file_io.logger.debug")
+def test_write_avro_file_success(
+    mock_logger_debug, mock_fastavro_writer, mock_os_replace, mock_os_makedirs
+):
     """Test write_avro_file function behavior when successfully writing an AVRO file."""
 
     # Setup test data
@@ -175,18 +187,17 @@ def test_write_avro_file_success(mock_logger_info, mock_fastavro_writer):
     assert args[1] == SALES_AVRO_SCHEMA
     assert args[2] == test_data
 
-    # Assert logging messages
-    mock_logger_info.assert_has_calls(
-        [
-            mock.call(f"Writing {len(test_data)} records to {test_filepath}..."),
-            mock.call(
-                f"{len(test_data)} records written to file Avro {test_filepath}."
-            ),
-        ]
+    # Assert the file was written to a temporary file and renamed into place
+    mock_os_replace.assert_called_once_with(mock.ANY, test_filepath)
+
+    # Assert the file was logged lazily at DEBUG level
+    mock_logger_debug.assert_called_once_with(
+        "%d records written to file Avro %s.", len(test_data), test_filepath
     )
 
 
 @mock.patch("lec02.hw.job2.dal.file_io.open")
+@mock.patch("lec02.hw.common.storage.local.os.makedirs", mock.Mock())
 @mock.patch("lec02.hw.job2.dal.file_io.logger.info")
 @mock.patch("lec02.hw.job2.dal.file_io.logger.error")
 def test_write_avro_file_io_error(mock_logger_error, mock_logger_info, mock_open):
@@ -205,7 +216,8 @@ def test_write_avro_file_io_error(mock_logger_error, mock_logger_info, mock_open
 
     # Configure mock behavior
     error_msg = "Permission denied"
-    mock_open.side_effect = IOError(error_msg)
+    error = IOError(error_msg)
+    mock_open.side_effect = error
 
     # Test that the function raises IOError
     with pytest.raises(IOError) as excinfo:
@@ -216,16 +228,15 @@ def test_write_avro_file_io_error(mock_logger_error, mock_logger_info, mock_open
         excinfo.value
     )
 
-    # Assert logging messages
-    mock_logger_info.assert_called_once_with(
-        f"Writing {len(test_data)} records to {test_filepath}..."
-    )
+    # Assert no file was logged at INFO level
+    mock_logger_info.assert_not_called()
     mock_logger_error.assert_called_once_with(
-        f"Error saving to file Avro {test_filepath}: {error_msg}", exc_info=True
+        "Error saving to file Avro %s: %s", test_filepath, error, exc_info=True
     )
 
 
 @mock.patch("lec02.hw.job2.dal.file_io.open", mock.mock_open())
+@mock.patch("lec02.hw.common.storage.local.os.makedirs", mock.Mock())
 @mock.patch("lec02.hw.job2.dal.file_io.fastavro.writer")
 @mock.patch("lec02.hw.job2.dal.file_io.logger.info")
 @mock.patch("lec02.hw.job2.dal.file_io.logger.exception")
@@ -247,7 +258,8 @@ def test_write_avro_file_unexpected_error(
 
     # Configure mock behavior
     error_msg = "Unexpected error"
-    mock_fastavro_writer.side_effect = Exception(error_msg)
+    error = Exception(error_msg)
+    mock_fastavro_writer.side_effect = error
 
     # Test that the function raises Exception
     with pytest.raises(Exception) as excinfo:
@@ -256,10 +268,115 @@ def test_write_avro_file_unexpected_error(
     # Assert error message contains expected information
     assert f"An unexpected error occurred: {error_msg}" in str(excinfo.value)
 
-    # Assert logging messages
-    mock_logger_info.assert_called_once_with(
-        f"Writing {len(test_data)} records to {test_filepath}..."
-    )
+    # Assert no file was logged at INFO level
+    mock_logger_info.assert_not_called()
     mock_logger_exception.assert_called_once_with(
-        f"An unexpected error occurred: {error_msg}"
+        "An unexpected error occurred: %s", error
+    )
+
+
+def test_build_typed_sales_schema():
+    """Test build_typed_sales_schema function for both price types."""
+
+    # Call function under test
+    double_schema = build_typed_sales_schema("double")
+    cents_schema = build_typed_sales_schema("cents")
+
+    # Assert price and purchase_date are not unions
+    double_fields = {field["name"]: field["type"] for field in double_schema["fields"]}
+    cents_fields = {field["name"]: field["type"] for field in cents_schema["fields"]}
+    assert double_fields["price"] == "double"
+    assert cents_fields["price"] == "long"
+    assert double_fields["purchase_date"] == {"type": "int", "logicalType": "date"}
+
+    # Assert schemas are valid AVRO schemas
+    fastavro.parse_schema(double_schema)
+    fastavro.parse_schema(cents_schema)
+
+    # Assert unsupported price type raises ValueError
+    with pytest.raises(ValueError):
+        build_typed_sales_schema("decimal")
+
+
+def test_write_avro_file_block_index(tmp_path):
+    """Test write_avro_file writes a sidecar with block offsets and no statistics."""
+
+    # Setup test data
+    test_filepath = str(tmp_path / "sales_1.avro")
+    test_data = [
+        {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": i}
+        for i in range(10)
+    ]
+
+    # Call function under test
+    write_avro_file(
+        test_data, SALES_AVRO_SCHEMA, test_filepath, block_records=3, block_index=True
+    )
+
+    # Assert sidecar index records every block without statistics
+    index = load_avro_index(test_filepath)
+    assert [block["records"] for block in index["blocks"]] == [3, 3, 3, 1]
+    assert "stats" not in index
+    with open(test_filepath, "rb") as f:
+        assert list(fastavro.reader(f)) == test_data
+
+
+def test_read_json_file_object_hook(tmp_path):
+    """Test read_json_file passes every decoded object through object_hook."""
+
+    # Setup JSON file
+    filepath = tmp_path / "sales.json"
+    filepath.write_text('[{"client": "A"}, {"client": "B"}]')
+
+    # Call function under test
+    result = read_json_file(str(filepath), object_hook=lambda d: {**d, "seen": True})
+
+    # Assert hook results are returned
+    assert result == [{"client": "A", "seen": True}, {"client": "B", "seen": True}]
+
+
+def test_read_json_and_write_avro_file_with_storage():
+    """Test read_json_file and write_avro_file use a storage backend."""
+
+    # Setup a JSON page in an in-memory backend
+    storage = MemoryStorage()
+    records = [
+        {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": 1}
+    ]
+    storage.write_bytes("raw/sales.json", json.dumps(records).encode())
+
+    # Call functions under test
+    page_data = read_json_file("raw/sales.json", storage=storage)
+    write_avro_file(page_data, SALES_AVRO_SCHEMA, "stg/sales.avro", storage=storage)
+
+    # Assert the AVRO file is stored in the backend
+    with storage.open_read("stg/sales.avro") as f:
+        assert list(fastavro.reader(f)) == records
+
+
+def test_write_avro_file_block_stats_with_storage():
+    """Test write_avro_file stores an indexed AVRO file and its sidecar in a backend."""
+
+    # Setup test data
+    storage = MemoryStorage()
+    records = [
+        {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": i}
+        for i in range(5)
+    ]
+
+    # Call function under test
+    write_avro_file(
+        records,
+        SALES_AVRO_SCHEMA,
+        "stg/sales.avro",
+        block_stats=True,
+        block_records=2,
+        storage=storage,
     )
+
+    # Assert the file and its sidecar index are stored in the backend
+    assert storage.list("stg") == ["stg/sales.avro", "stg/sales.avro.index.json"]
+    with storage.open_read("stg/sales.avro") as f:
+        assert list(fastavro.reader(f)) == records
+    index = json.loads(storage.read_bytes("stg/sales.avro.index.json"))
+    assert [block["records"] for block in index["blocks"]] == [2, 2, 1]
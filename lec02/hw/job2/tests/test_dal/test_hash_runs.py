@@ -0,0 +1,56 @@
+import hashlib
+
+import pytest
+
+from lec02.hw.job2.dal.hash_runs import write_hash_run, HashRun, DIGEST_SIZE
+
+
+def _digest(value):
+    """Helper hashing a value to a run digest."""
+    return hashlib.blake2b(str(value).encode(), digest_size=DIGEST_SIZE).digest()
+
+
+def test_write_hash_run_and_lookup(tmp_path):
+    """Test write_hash_run writes a sorted run that HashRun searches."""
+
+    # Setup test digests
+    filepath = str(tmp_path / "run.bin")
+    digests = {_digest(value) for value in range(100)}
+
+    # Call function under test
+    written = write_hash_run(filepath, digests)
+
+    # Assert run is sorted and every digest is found
+    run = HashRun(filepath)
+    try:
+        assert written == len(run) == 100
+        with open(filepath, "rb") as f:
+            data = f.read()
+        chunks = [data[i : i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+        assert chunks == sorted(digests)
+        assert all(digest in run for digest in digests)
+        assert _digest(100) not in run
+    finally:
+        run.close()
+
+
+def test_hash_run_empty(tmp_path):
+    """Test HashRun handles an empty run."""
+
+    # Setup empty run
+    filepath = str(tmp_path / "run.bin")
+    write_hash_run(filepath, [])
+
+    # Assert nothing is found
+    run = HashRun(filepath)
+    assert len(run) == 0
+    assert _digest(1) not in run
+    run.close()
+
+
+def test_write_hash_run_error(tmp_path):
+    """Test write_hash_run raises IOError if the run cannot be written."""
+
+    # Test that the function raises IOError
+    with pytest.raises(IOError, match="Error writing hash run"):
+        write_hash_run(str(tmp_path / "missing" / "run.bin"), [_digest(1)])
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from lec02.hw.job2.dal.memory import (
+    get_peak_rss_bytes,
+    get_process_tree_rss_bytes,
+    get_rss_bytes,
+)
+
+
+def test_get_rss_bytes():
+    """Test get_rss_bytes measures the current process on Linux."""
+
+    # Call function under test
+    rss = get_rss_bytes()
+    if rss is None:
+        pytest.skip("RSS cannot be measured without /proc")
+
+    # Assert RSS and peak are plausible
+    assert rss > 0
+    assert get_peak_rss_bytes() > 0
+    assert get_rss_bytes(os.getpid()) > 0
+    assert get_process_tree_rss_bytes() >= rss
+
+
+def test_get_rss_bytes_missing_process():
+    """Test get_rss_bytes returns None for a process that does not exist."""
+
+    # Assert no RSS for an invalid pid
+    assert get_rss_bytes(2**22 + 1) is None
@@ -0,0 +1,89 @@
+from unittest import mock
+import os
+import pytest
+import fastavro
+
+from lec02.hw.job2.dal.file_io import SALES_AVRO_SCHEMA
+from lec02.hw.job2.dal.partitioned_writer import (
+    NULL_PARTITION,
+    get_partition_dir,
+    write_partitioned_avro_file,
+)
+
+
+def _read_avro(filepath):
+    """Helper reading every record of an AVRO file."""
+    with open(filepath, "rb") as f:
+        return list(fastavro.reader(f))
+
+
+def test_get_partition_dir_by_value():
+    """Test get_partition_dir function behavior when partitioning by value."""
+
+    # Assert plain, escaped and missing values
+    assert get_partition_dir({"product": "TV"}, "product") == "product=TV"
+    assert get_partition_dir({"product": "a/b c"}, "product") == "product=a%2Fb%20c"
+    assert get_partition_dir({"product": None}, "product") == (
+        f"product={NULL_PARTITION}"
+    )
+
+
+def test_get_partition_dir_by_bucket():
+    """Test get_partition_dir function behavior when partitioning by hash bucket."""
+
+    # Call function under test for many clients
+    buckets = {
+        get_partition_dir({"client": f"Client {i}"}, "client", num_buckets=8)
+        for i in range(200)
+    }
+
+    # Assert every bucket is used and bucket assignment is stable
+    assert buckets == {f"client_bucket={i:04d}" for i in range(8)}
+    assert get_partition_dir({"client": "A"}, "client", 8) == get_partition_dir(
+        {"client": "A"}, "client", 8
+    )
+
+
+def test_write_partitioned_avro_file(tmp_path):
+    """Test write_partitioned_avro_file routes records to one file per partition."""
+
+    # Setup test data
+    test_data = [
+        {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": 1},
+        {"client": "B", "purchase_date": "2022-08-09", "product": "PC", "price": 2},
+        {"client": "C", "purchase_date": "2022-08-09", "product": "TV", "price": 3},
+    ]
+
+    # Call function under test
+    outputs = write_partitioned_avro_file(
+        test_data, SALES_AVRO_SCHEMA, str(tmp_path), "sales_1.avro", "product"
+    )
+
+    # Assert one file per partition holding only its records
+    assert outputs == [
+        os.path.join("product=PC", "sales_1.avro"),
+        os.path.join("product=TV", "sales_1.avro"),
+    ]
+    tv_records = _read_avro(tmp_path / "product=TV" / "sales_1.avro")
+    assert [record["client"] for record in tv_records] == ["A", "C"]
+    pc_records = _read_avro(tmp_path / "product=PC" / "sales_1.avro")
+    assert [record["client"] for record in pc_records] == ["B"]
+
+
+@mock.patch("lec02.hw.job2.dal.partitioned_writer.open")
+@mock.patch("lec02.hw.job2.dal.partitioned_writer.logger.error")
+def test_write_partitioned_avro_file_io_error(mock_logger_error, mock_open, tmp_path):
+    """Test write_partitioned_avro_file function behavior when a file cannot be opened."""
+
+    # Configure mock behavior
+    mock_open.side_effect = IOError("Permission denied")
+
+    # Test that the function raises IOError
+    with pytest.raises(IOError) as excinfo:
+        write_partitioned_avro_file(
+            [{"product": "TV"}], SALES_AVRO_SCHEMA, str(tmp_path), "f.avro", "product"
+        )
+
+    # Assert error message contains expected information
+    assert "Error saving partitioned Avro" in str(excinfo.value)
+    mock_logger_error.assert_called_once()
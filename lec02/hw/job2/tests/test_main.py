@@ -3,6 +3,9 @@ import pytest
 import json
 from flask import Flask
 
+from lec02.hw.common.admission import AdmissionController
+from lec02.hw.common.single_flight import SingleFlight
+from lec02.hw.common.storage import clear_memory_stores, get_storage
 from lec02.hw.job2.main import app, run_job2_endpoint
 
 
@@ -14,6 +17,20 @@ def client():
         yield client
 
 
+@pytest.fixture(autouse=True)
+def jobs_in_flight():
+    """Fixture to isolate the coalescing of identical requests per test."""
+    with mock.patch("lec02.hw.job2.main.jobs_in_flight", SingleFlight()) as flight:
+        yield flight
+
+
+@pytest.fixture(autouse=True)
+def memory_stores():
+    """Fixture to evict the named in-memory stores created by a test."""
+    yield
+    clear_memory_stores()
+
+
 @mock.patch("lec02.hw.job2.main.process_sales_data")
 def test_run_job2_endpoint_success(mock_process_sales_data, client):
     """Test run_job2_endpoint function behavior with valid input data."""
@@ -22,6 +39,10 @@ def test_run_job2_endpoint_success(mock_process_sales_data, client):
     test_raw_dir = "test/raw/dir"
     test_stg_dir = "test/stg/dir"
     test_input = {"raw_dir": test_raw_dir, "stg_dir": test_stg_dir}
+    test_report = {"files_processed": 2, "records_processed": 10}
+
+    # Configure mock behavior
+    mock_process_sales_data.return_value = test_report
 
     # Call endpoint with test data
     response = client.post(
@@ -32,6 +53,7 @@ def test_run_job2_endpoint_success(mock_process_sales_data, client):
     assert response.status_code == 201
     response_data = json.loads(response.data)
     assert response_data["message"] == "Job completed successfully."
+    assert response_data["report"] == test_report
 
     # Assert process_sales_data was called with correct parameters
     mock_process_sales_data.assert_called_once_with(
@@ -39,6 +61,53 @@ def test_run_job2_endpoint_success(mock_process_sales_data, client):
     )
 
 
+@mock.patch("lec02.hw.job2.main.process_sales_data")
+def test_run_job2_endpoint_incremental(mock_process_sales_data, client):
+    """Test run_job2_endpoint function passes the incremental flag through."""
+
+    # Setup test parameters
+    test_input = {
+        "raw_dir": "test/raw/dir",
+        "stg_dir": "test/stg/dir",
+        "incremental": True,
+    }
+
+    # Configure mock behavior
+    mock_process_sales_data.return_value = {"files_skipped": 1}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and process_sales_data call
+    assert response.status_code == 201
+    mock_process_sales_data.assert_called_once_with(
+        raw_dir="test/raw/dir", stg_dir="test/stg/dir", incremental=True
+    )
+
+
+def test_run_job2_endpoint_invalid_incremental(client):
+    """Test run_job2_endpoint function behavior when 'incremental' is not a boolean."""
+
+    # Setup test input with invalid incremental flag
+    test_input = {
+        "raw_dir": "test/raw/dir",
+        "stg_dir": "test/stg/dir",
+        "incremental": "yes",
+    }
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    response_data = json.loads(response.data)
+    assert response_data["error"] == "Parameter 'incremental' must be a boolean."
+
+
 def test_run_job2_endpoint_no_input_data(client):
     """Test run_job2_endpoint function behavior when no input data is provided."""
 
@@ -199,3 +268,558 @@ def test_run_job2_endpoint_unexpected_error(mock_process_sales_data, client):
     mock_process_sales_data.assert_called_once_with(
         raw_dir=test_raw_dir, stg_dir=test_stg_dir
     )
+
+
+def test_run_job2_endpoint_invalid_typed_schema(client):
+    """Test run_job2_endpoint function behavior when 'typed_schema' is not supported."""
+
+    # Setup test input with unsupported typed schema
+    test_input = {
+        "raw_dir": "test/raw/dir",
+        "stg_dir": "test/stg/dir",
+        "typed_schema": "decimal",
+    }
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    response_data = json.loads(response.data)
+    assert "Unsupported price type" in response_data["error"]
+
+
+@mock.patch("lec02.hw.job2.main.process_sales_data")
+def test_run_job2_endpoint_partitioned(mock_process_sales_data, client):
+    """Test run_job2_endpoint function passes partitioning options through."""
+
+    # Setup test input
+    test_input = {
+        "raw_dir": "test/raw/dir",
+        "stg_dir": "test/stg/dir",
+        "partition_by": "client",
+        "num_buckets": 16,
+    }
+    mock_process_sales_data.return_value = {}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and process_sales_data call
+    assert response.status_code == 201
+    mock_process_sales_data.assert_called_once_with(
+        raw_dir="test/raw/dir",
+        stg_dir="test/stg/dir",
+        partition_by="client",
+        num_buckets=16,
+    )
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"num_buckets": 0, "partition_by": "client"}, "must be an integer >= 1"),
+        ({"num_buckets": 4}, "num_buckets requires partition_by and must be positive."),
+        ({"partition_by": "price"}, "Unsupported partition key price"),
+    ],
+)
+def test_run_job2_endpoint_invalid_partition_options(client, options, error):
+    """Test run_job2_endpoint function behavior with invalid partitioning options."""
+
+    # Setup test input
+    test_input = {"raw_dir": "test/raw/dir", "stg_dir": "test/stg/dir", **options}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert error in json.loads(response.data)["error"]
+
+
+@mock.patch("lec02.hw.job2.main.process_sales_data")
+@mock.patch("lec02.hw.job2.main.watch_sales_data")
+def test_run_job2_endpoint_watch(
+    mock_watch_sales_data, mock_process_sales_data, client
+):
+    """Test run_job2_endpoint function runs watch_sales_data in watch mode."""
+
+    # Setup test input
+    test_input = {
+        "raw_dir": "test/raw/dir",
+        "stg_dir": "test/stg/dir",
+        "watch": True,
+        "watch_timeout": 30,
+    }
+    mock_watch_sales_data.return_value = {"files_processed": 2}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response and that only the watch mode ran
+    assert response.status_code == 201
+    assert json.loads(response.data)["report"] == {"files_processed": 2}
+    mock_watch_sales_data.assert_called_once_with(
+        raw_dir="test/raw/dir", stg_dir="test/stg/dir", watch_timeout=30
+    )
+    mock_process_sales_data.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"watch": "yes"}, "Parameter 'watch' must be a boolean."),
+        ({"watch_timeout": 30}, "watch_timeout requires watch."),
+        ({"run_id": "r1"}, "run_id requires watch."),
+        ({"watch": True, "run_id": 1}, "Parameter 'run_id' must be a string."),
+        (
+            {"watch": True, "incremental": True},
+            "incremental cannot be combined with watch.",
+        ),
+        (
+            {"watch": True, "workers": 4},
+            "workers cannot be combined with watch.",
+        ),
+        ({"workers": 0}, "Parameter 'workers' must be an integer >= 1."),
+        ({"memory_limit_mb": "1G"}, "Parameter 'memory_limit_mb' must be an integer"),
+    ],
+)
+def test_run_job2_endpoint_invalid_watch_options(client, options, error):
+    """Test run_job2_endpoint function behavior with invalid watch options."""
+
+    # Setup test input
+    test_input = {"raw_dir": "test/raw/dir", "stg_dir": "test/stg/dir", **options}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert error in json.loads(response.data)["error"]
+
+
+@mock.patch("lec02.hw.job2.main.process_sales_data")
+def test_run_job2_endpoint_memory_budget(mock_process_sales_data, client):
+    """Test run_job2_endpoint function passes parallelism options through."""
+
+    # Setup test input
+    test_input = {
+        "raw_dir": "test/raw/dir",
+        "stg_dir": "test/stg/dir",
+        "workers": 4,
+        "memory_limit_mb": 512,
+    }
+    mock_process_sales_data.return_value = {"workers": 4, "peak_rss_mb": 120.5}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response and process_sales_data call
+    assert response.status_code == 201
+    assert json.loads(response.data)["report"]["peak_rss_mb"] == 120.5
+    mock_process_sales_data.assert_called_once_with(
+        raw_dir="test/raw/dir", stg_dir="test/stg/dir", workers=4, memory_limit_mb=512
+    )
+
+
+@mock.patch("lec02.hw.job2.main.process_sales_tree")
+def test_run_job2_endpoint_tree(mock_process_sales_tree, client):
+    """Test run_job2_endpoint function runs process_sales_tree for a root."""
+
+    # Setup test input
+    test_input = {
+        "raw_root": "test/raw/sales",
+        "stg_root": "test/stg/sales",
+        "start_date": "2022-08-01",
+        "end_date": "2022-08-31",
+        "workers": 8,
+    }
+    mock_process_sales_tree.return_value = {"dates": ["2022-08-09"]}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response and process_sales_tree call
+    assert response.status_code == 201
+    assert json.loads(response.data)["report"] == {"dates": ["2022-08-09"]}
+    mock_process_sales_tree.assert_called_once_with(
+        raw_root="test/raw/sales",
+        stg_root="test/stg/sales",
+        start_date="2022-08-01",
+        end_date="2022-08-31",
+        workers=8,
+    )
+
+
+@pytest.mark.parametrize(
+    "test_input, error",
+    [
+        ({"raw_root": "test/raw/sales"}, "Missing 'stg_root' parameter in input data."),
+        (
+            {"raw_dir": "raw", "stg_dir": "stg", "start_date": "2022-08-01"},
+            "Parameter 'start_date' requires 'raw_root'.",
+        ),
+        (
+            {"raw_root": "raw", "stg_root": "stg", "end_date": "08/31/2022"},
+            "Parameter 'end_date' must be a date (YYYY-MM-DD).",
+        ),
+        (
+            {"raw_root": "raw", "stg_root": "stg", "watch": True},
+            "watch cannot be combined with raw_root.",
+        ),
+    ],
+)
+def test_run_job2_endpoint_invalid_tree_options(client, test_input, error):
+    """Test run_job2_endpoint function behavior with invalid multi-date options."""
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"] == error
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"dedup_memory_mb": 8}, "dedup_memory_mb requires dedup."),
+        (
+            {"dedup": True, "incremental": True},
+            "dedup cannot be combined with incremental.",
+        ),
+        (
+            {"dedup": True, "workers": 2},
+            "dedup cannot be combined with several workers.",
+        ),
+        (
+            {"dedup": True, "watch": True},
+            "dedup cannot be combined with watch.",
+        ),
+    ],
+)
+def test_run_job2_endpoint_invalid_dedup_options(client, options, error):
+    """Test run_job2_endpoint function behavior with invalid deduplication options."""
+
+    # Setup test input
+    test_input = {"raw_dir": "test/raw", "stg_dir": "test/stg", **options}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"] == error
+
+
+@mock.patch("lec02.hw.job2.main.process_sales_data")
+def test_run_job2_endpoint_dedup(mock_process_sales_data, client):
+    """Test run_job2_endpoint function passes deduplication options through."""
+
+    # Setup test input
+    test_input = {
+        "raw_dir": "test/raw/dir",
+        "stg_dir": "test/stg/dir",
+        "dedup": True,
+        "dedup_memory_mb": 16,
+    }
+    mock_process_sales_data.return_value = {"duplicates_removed": 3}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response and process_sales_data call
+    assert response.status_code == 201
+    assert json.loads(response.data)["report"]["duplicates_removed"] == 3
+    mock_process_sales_data.assert_called_once_with(
+        raw_dir="test/raw/dir", stg_dir="test/stg/dir", dedup=True, dedup_memory_mb=16
+    )
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"sort_by": "price"}, "Unsupported sort key price"),
+        (
+            {"sort_by": "client", "partition_by": "client"},
+            "sort_by cannot be combined with partition_by.",
+        ),
+        (
+            {"sort_by": "client", "watch": True},
+            "sort_by cannot be combined with watch.",
+        ),
+    ],
+)
+def test_run_job2_endpoint_invalid_sort_options(client, options, error):
+    """Test run_job2_endpoint function behavior with invalid sort options."""
+
+    # Setup test input
+    test_input = {"raw_dir": "test/raw", "stg_dir": "test/stg", **options}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"].startswith(error)
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        (
+            {"dimensions": True, "sort_by": "client"},
+            "dimensions cannot be combined with sort_by.",
+        ),
+        (
+            {"dimensions": True, "workers": 4},
+            "dimensions cannot be combined with several workers.",
+        ),
+        (
+            {"dimensions": True, "watch": True},
+            "dimensions cannot be combined with watch.",
+        ),
+    ],
+)
+def test_run_job2_endpoint_invalid_dimension_options(client, options, error):
+    """Test run_job2_endpoint function behavior with invalid dimension options."""
+
+    # Setup test input
+    test_input = {"raw_dir": "test/raw", "stg_dir": "test/stg", **options}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"] == error
+
+
+@mock.patch("lec02.hw.job2.main.process_sales_data")
+def test_run_job2_endpoint_storage(mock_process_sales_data, client):
+    """Test run_job2_endpoint passes the backend selected by the storage URL."""
+
+    # Setup test input
+    test_input = {
+        "raw_dir": "test/raw/dir",
+        "stg_dir": "test/stg/dir",
+        "storage": "memory://test-job2",
+    }
+    mock_process_sales_data.return_value = {"files_processed": 1}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert the named in-memory store was passed to the job
+    assert response.status_code == 201
+    mock_process_sales_data.assert_called_once_with(
+        raw_dir="test/raw/dir",
+        stg_dir="test/stg/dir",
+        storage=get_storage("memory://test-job2"),
+    )
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"storage": "ftp://host/dir"}, "Invalid 'storage' parameter"),
+        ({"storage": 1}, "Parameter 'storage' must be a storage URL."),
+        (
+            {"storage": "memory://test", "watch": True},
+            "storage cannot be combined with watch.",
+        ),
+        (
+            {"storage": "memory://test", "incremental": True},
+            "storage cannot be combined with incremental.",
+        ),
+        (
+            {"storage": "file:///tmp/zones", "incremental": True},
+            "storage cannot be combined with incremental.",
+        ),
+        (
+            {"storage": "memory://test", "workers": 2},
+            "storage cannot be combined with workers.",
+        ),
+        (
+            {"storage": "memory://test", "raw_root": "test/raw", "stg_root": "stg"},
+            "storage cannot be combined with raw_root.",
+        ),
+    ],
+)
+def test_run_job2_endpoint_invalid_storage_options(client, options, error):
+    """Test run_job2_endpoint function behavior with invalid storage options."""
+
+    # Setup test input
+    test_input = {"raw_dir": "test/raw", "stg_dir": "test/stg", **options}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"].startswith(error)
+
+
+@mock.patch("lec02.hw.job2.main.process_sales_data")
+def test_run_job2_endpoint_profile_header(mock_process_sales_data, client, tmp_path):
+    """Test run_job2_endpoint profiles the run when the X-Profile header is set."""
+
+    # Setup test input
+    test_input = {"raw_dir": "test/raw", "stg_dir": str(tmp_path), "profile_top": 3}
+    mock_process_sales_data.return_value = {"files_processed": 1}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/",
+        data=json.dumps(test_input),
+        content_type="application/json",
+        headers={"X-Profile": "1"},
+    )
+
+    # Assert report, profile summary and dump next to the AVRO files
+    assert response.status_code == 201
+    response_data = json.loads(response.data)
+    assert response_data["report"] == {"files_processed": 1}
+    assert len(response_data["profile"]["top"]) <= 3
+    assert (tmp_path / "_profile.pstats").exists()
+
+
+def test_run_job2_endpoint_invalid_profile(client):
+    """Test run_job2_endpoint rejects a non-boolean profile parameter."""
+
+    # Setup test input
+    test_input = {"raw_dir": "test/raw", "stg_dir": "test/stg", "profile": "on"}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert (
+        json.loads(response.data)["error"] == "Parameter 'profile' must be a boolean."
+    )
+
+
+@mock.patch("lec02.hw.job2.main.process_sales_data")
+def test_run_job2_endpoint_trace_memory(mock_process_sales_data, client):
+    """Test run_job2_endpoint adds the memory report of a traced run."""
+
+    # Setup test input
+    test_input = {"raw_dir": "test/raw", "stg_dir": "test/stg"}
+    mock_process_sales_data.return_value = {"files_processed": 1}
+
+    # Call endpoints with test data
+    response = client.post(
+        "/",
+        data=json.dumps(test_input),
+        content_type="application/json",
+        headers={"X-Trace-Memory": "1"},
+    )
+    debug_response = client.get("/debug/memory?top=5")
+
+    # Assert the run report includes the memory report
+    assert response.status_code == 201
+    report = json.loads(response.data)["report"]
+    assert report["files_processed"] == 1
+    assert report["memory"]["peak_mb"] >= 0
+    assert json.loads(debug_response.data)["last_run"] == report["memory"]
+
+
+@mock.patch("lec02.hw.job2.main.extract_sales_to_avro")
+def test_run_extract_endpoint(mock_extract_sales_to_avro, client):
+    """Test run_extract_endpoint runs the fused extraction with its options."""
+
+    # Setup test input
+    test_input = {
+        "date": "2022-08-09",
+        "stg_dir": "test/stg",
+        "raw_dir": "test/raw",
+        "typed_schema": "double",
+    }
+    mock_extract_sales_to_avro.return_value = {"files_processed": 2}
+
+    # Call endpoint with test data
+    response = client.post(
+        "/extract", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response and extract_sales_to_avro call
+    assert response.status_code == 201
+    assert json.loads(response.data)["report"] == {"files_processed": 2}
+    mock_extract_sales_to_avro.assert_called_once_with(
+        date="2022-08-09", stg_dir="test/stg", raw_dir="test/raw", typed_schema="double"
+    )
+
+
+@pytest.mark.parametrize(
+    "test_input, error",
+    [
+        ({"stg_dir": "test/stg"}, "Missing 'date' parameter in input data."),
+        ({"date": "2022-08-09"}, "Missing 'stg_dir' parameter in input data."),
+        (
+            {"date": "2022-08-09", "stg_dir": "test/stg", "num_buckets": 4},
+            "num_buckets requires partition_by and must be positive.",
+        ),
+    ],
+)
+def test_run_extract_endpoint_invalid_input(client, test_input, error):
+    """Test run_extract_endpoint function behavior with invalid input data."""
+
+    # Call endpoint with test data
+    response = client.post(
+        "/extract", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"] == error
+
+
+@mock.patch("lec02.hw.job2.main.process_sales_data")
+def test_debug_queue_endpoint(mock_process_sales_data, client):
+    """Test the queue statistics count the jobs admitted by the job2 server."""
+
+    # Setup a fresh controller and a converted directory
+    mock_process_sales_data.return_value = {"files_processed": 1}
+    with mock.patch("lec02.hw.job2.main.admission", AdmissionController()):
+        client.post("/", json={"raw_dir": "test/raw", "stg_dir": "test/stg"})
+
+        # Call endpoint under test
+        response = client.get("/debug/queue")
+
+    # Assert the job was admitted and released
+    assert response.status_code == 200
+    stats = response.get_json()
+    assert stats["admitted"] == 1
+    assert stats["running"] == 0
+    assert stats["queued"] == 0
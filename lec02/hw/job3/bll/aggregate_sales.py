@@ -0,0 +1,185 @@
+import logging
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from lec02.hw.job3.dal.avro_columns import load_sales_columns
+from lec02.hw.job3.dal.result_io import (
+    write_aggregate_file,
+    CLIENT_SALES_AVRO_SCHEMA,
+    HOURLY_SALES_AVRO_SCHEMA,
+    PRODUCT_SALES_AVRO_SCHEMA,
+)
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+
+def factorize(values: Sequence[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Encodes values as integer group codes.
+
+    Values are grouped with np.unique on their 64-bit hashes, which sorts
+    integers instead of strings. Every value is then compared with the first
+    value of its group, and on a hash collision the values themselves are
+    grouped instead. Groups are renumbered in order of first appearance.
+
+    Args:
+        values (Sequence[Any]): Strings, None included
+
+    Returns:
+        Tuple[np.ndarray, List[Any]]: int64 code of every value and the distinct
+        values in order of first appearance
+    """
+    values = np.asarray(values, dtype=object)
+    hashes = np.fromiter(map(hash, values), dtype=np.int64, count=len(values))
+    _, first_index, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    if not np.all(values == values[first_index][inverse]):
+        # Two distinct values share a hash: sort the values, None apart
+        missing = np.equal(values, None)
+        labels = np.where(missing, "n", np.char.add("s", values.astype(str)))
+        _, first_index, inverse = np.unique(
+            labels, return_index=True, return_inverse=True
+        )
+        inverse = inverse.reshape(-1)
+
+    # Renumber the groups in order of first appearance
+    order = np.argsort(first_index, kind="stable")
+    renumber = np.empty(len(order), dtype=np.int64)
+    renumber[order] = np.arange(len(order))
+    return renumber[inverse], values[first_index[order]].tolist()
+
+
+def grouped_totals(
+    codes: np.ndarray, num_groups: int, prices: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Computes revenue, counts and average price per group with NumPy reductions.
+
+    Args:
+        codes (np.ndarray): Group code of every record
+        num_groups (int): Number of groups
+        prices (np.ndarray): float64 price of every record, NaN if missing
+
+    Returns:
+        Dict[str, np.ndarray]: Arrays revenue, sales, priced_sales and avg_price
+        (NaN for groups without prices), indexed by group code
+    """
+    priced = ~np.isnan(prices)
+    revenue = np.bincount(
+        codes, weights=np.where(priced, prices, 0.0), minlength=num_groups
+    )
+    sales = np.bincount(codes, minlength=num_groups)
+    priced_sales = np.bincount(codes[priced], minlength=num_groups)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_price = revenue / priced_sales
+
+    return {
+        "revenue": revenue,
+        "sales": sales,
+        "priced_sales": priced_sales,
+        "avg_price": np.where(priced_sales > 0, avg_price, np.nan),
+    }
+
+
+def _to_records(
+    key_field: str, keys: List[Any], totals: Dict[str, np.ndarray]
+) -> List[Dict[str, Any]]:
+    """Converts grouped totals to aggregate records sorted by revenue."""
+    order = np.argsort(-totals["revenue"], kind="stable")
+    revenue = totals["revenue"][order].tolist()
+    sales = totals["sales"][order].tolist()
+    priced_sales = totals["priced_sales"][order].tolist()
+    avg_price = totals["avg_price"][order].tolist()
+
+    return [
+        {
+            key_field: keys[group],
+            "revenue": revenue[i],
+            "sales": sales[i],
+            "priced_sales": priced_sales[i],
+            "avg_price": None if np.isnan(avg_price[i]) else avg_price[i],
+        }
+        for i, group in enumerate(order.tolist())
+    ]
+
+
+def aggregate_sales_columns(columns: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Aggregates sales columns per product, per client and per hour.
+
+    Args:
+        columns (Dict[str, Any]): Columns returned by load_sales_columns
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Aggregate records under the keys
+        "product", "client" (sorted by revenue) and "hour" (sorted by hour)
+    """
+    prices = columns["price"]
+    results: Dict[str, List[Dict[str, Any]]] = {}
+
+    for key_field in ("product", "client"):
+        codes, keys = factorize(columns[key_field])
+        totals = grouped_totals(codes, len(keys), prices)
+        results[key_field] = _to_records(key_field, keys, totals)
+
+    # Hours are already integers, np.unique gives sorted groups directly
+    hours = columns["purchase_hour"]
+    dated = ~np.isnat(hours)
+    unique_hours, hour_codes = np.unique(hours[dated], return_inverse=True)
+    totals = grouped_totals(hour_codes, len(unique_hours), prices[dated])
+    hour_keys = [str(hour) for hour in unique_hours]
+    results["hour"] = sorted(
+        _to_records("hour", hour_keys, totals), key=lambda record: record["hour"]
+    )
+
+    return results
+
+
+def aggregate_sales_data(stg_dir: str, result_dir: str) -> Dict[str, Any]:
+    """
+    Aggregates the AVRO sales data of a staging directory.
+
+    Writes sales_by_product.avro, sales_by_client.avro and sales_by_hour.avro
+    to result_dir, each with revenue, sales count, priced sales count and
+    average price per group.
+
+    Args:
+        stg_dir (str): Staging directory written by Job2
+        result_dir (str): Target directory for the aggregate AVRO files
+
+    Returns:
+        Dict[str, Any]: Run report with file, record and group counters
+
+    Raises:
+        FileNotFoundError: If stg_dir does not exist
+        ValueError: If a staging file cannot be decoded
+        IOError: If an aggregate file cannot be written
+    """
+    logger.info(f"Aggregating sales data from {stg_dir} to {result_dir}...")
+
+    columns = load_sales_columns(stg_dir)
+    results = aggregate_sales_columns(columns)
+
+    outputs = {
+        "product": ("sales_by_product.avro", PRODUCT_SALES_AVRO_SCHEMA),
+        "client": ("sales_by_client.avro", CLIENT_SALES_AVRO_SCHEMA),
+        "hour": ("sales_by_hour.avro", HOURLY_SALES_AVRO_SCHEMA),
+    }
+    for key_field, (filename, schema) in outputs.items():
+        write_aggregate_file(
+            results[key_field], schema, os.path.join(result_dir, filename)
+        )
+
+    report = {
+        "files_read": columns["files"],
+        "records_aggregated": len(columns["client"]),
+        "products": len(results["product"]),
+        "clients": len(results["client"]),
+        "hours": len(results["hour"]),
+    }
+    logger.info(f"Aggregation completed: {report}.")
+    return report
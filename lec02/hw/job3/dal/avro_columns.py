@@ -0,0 +1,198 @@
+import logging
+import os
+from typing import Any, Dict, List
+
+import fastavro
+import numpy as np
+
+from lec02.hw.job2.dal.dimensions import get_dimension_filepath
+
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def find_avro_files(stg_dir: str) -> List[str]:
+    """
+    Lists the AVRO files of a staging directory, including partition directories.
+
+    Directories starting with "_" or "." (dimension files, temporary sort
+    runs) are skipped.
+
+    Args:
+        stg_dir (str): Staging directory written by Job2
+
+    Returns:
+        List[str]: Sorted paths of the AVRO files
+
+    Raises:
+        FileNotFoundError: If stg_dir does not exist
+    """
+    if not os.path.isdir(stg_dir):
+        logger.error(
+            f"Staging directory {stg_dir} does not exist or is not a directory."
+        )
+        raise FileNotFoundError(
+            f"Staging directory {stg_dir} does not exist or is not a directory."
+        )
+
+    filepaths = []
+    for dir_path, dir_names, filenames in os.walk(stg_dir):
+        dir_names[:] = [name for name in dir_names if not name.startswith(("_", "."))]
+        filepaths.extend(
+            os.path.join(dir_path, filename)
+            for filename in filenames
+            if filename.lower().endswith(".avro")
+        )
+    return sorted(filepaths)
+
+
+def load_dimension_values(stg_dir: str, field: str) -> List[str]:
+    """
+    Loads the values of a dimension written by Job2, indexed by surrogate key.
+
+    Args:
+        stg_dir (str): Staging directory written by Job2
+        field (str): "client" or "product"
+
+    Returns:
+        List[str]: Value of every surrogate key
+
+    Raises:
+        ValueError: If the dimension file is missing or cannot be decoded
+    """
+    filepath = get_dimension_filepath(stg_dir, field)
+    try:
+        with open(filepath, "rb") as f:
+            records = sorted(fastavro.reader(f), key=lambda record: record["id"])
+    except (OSError, ValueError, EOFError) as e:
+        logger.error(f"Error reading dimension file {filepath}: {e}")
+        raise ValueError(f"Error reading dimension file {filepath}: {e}") from e
+
+    return [record["name"] for record in records]
+
+
+def _is_cents_schema(writer_schema: Dict[str, Any]) -> bool:
+    """Checks whether a file was written with the typed cents price encoding."""
+    for field in writer_schema.get("fields", []):
+        if field["name"] == "price":
+            return field["type"] == "long"
+    return False
+
+
+def _is_fact_schema(writer_schema: Dict[str, Any]) -> bool:
+    """Checks whether a file stores surrogate keys instead of client values."""
+    return any(
+        field["name"] == "client_id" for field in writer_schema.get("fields", [])
+    )
+
+
+def _lookup(values: List[str], keys: List[Any]) -> np.ndarray:
+    """Resolves surrogate keys to their dimension values, None staying None."""
+    table = np.array(values + [None], dtype=object)
+    codes = np.fromiter(
+        (-1 if key is None else key for key in keys), dtype=np.int64, count=len(keys)
+    )
+    return table[codes]
+
+
+def _read_block_columns(
+    records: List[Dict[str, Any]],
+    price_scale: float,
+    dimensions: Dict[str, List[str]] | None,
+) -> Dict[str, np.ndarray]:
+    """Converts the records of an AVRO block to column arrays."""
+    if dimensions is not None:
+        clients = _lookup(
+            dimensions["client"], [record.get("client_id") for record in records]
+        )
+        products = _lookup(
+            dimensions["product"], [record.get("product_id") for record in records]
+        )
+    else:
+        clients = np.array([record.get("client") for record in records], dtype=object)
+        products = np.array([record.get("product") for record in records], dtype=object)
+
+    # None becomes NaN and NaT, cents become currency units
+    prices = np.array([record.get("price") for record in records], dtype=np.float64)
+    if price_scale != 1.0:
+        prices *= price_scale
+    purchase_hours = np.array(
+        [record.get("purchase_date") for record in records], dtype="datetime64[s]"
+    ).astype("datetime64[h]")
+
+    return {
+        "client": clients,
+        "product": products,
+        "price": prices,
+        "purchase_hour": purchase_hours,
+    }
+
+
+def load_sales_columns(stg_dir: str) -> Dict[str, Any]:
+    """
+    Loads the sales records of a staging directory into column arrays.
+
+    Both SALES_AVRO_SCHEMA and the typed fast-path schemas are supported: prices
+    are returned in currency units whatever their encoding. Files storing
+    "client_id" and "product_id" surrogate keys are joined with the dimension
+    files with one array lookup per block.
+
+    Records are decoded one AVRO block at a time into arrays, which are
+    concatenated once every file is read.
+
+    Args:
+        stg_dir (str): Staging directory written by Job2
+
+    Returns:
+        Dict[str, Any]: Columns "client" and "product" (object arrays), "price"
+        (float64 array, NaN for missing prices) and "purchase_hour"
+        (datetime64[h] array, NaT for missing dates), plus "files" with the
+        number of files read
+
+    Raises:
+        FileNotFoundError: If stg_dir does not exist
+        ValueError: If a file cannot be decoded
+    """
+    logger.info(f"Loading sales columns from {stg_dir}...")
+
+    blocks: List[Dict[str, np.ndarray]] = []
+    dimensions: Dict[str, List[str]] = {}
+    filepaths = find_avro_files(stg_dir)
+
+    for filepath in filepaths:
+        try:
+            with open(filepath, "rb") as f:
+                reader = fastavro.block_reader(f)
+                price_scale = 0.01 if _is_cents_schema(reader.writer_schema) else 1.0
+                fact_schema = _is_fact_schema(reader.writer_schema)
+                if fact_schema:
+                    for field in ("client", "product"):
+                        if field not in dimensions:
+                            dimensions[field] = load_dimension_values(stg_dir, field)
+                for block in reader:
+                    blocks.append(
+                        _read_block_columns(
+                            list(block),
+                            price_scale,
+                            dimensions if fact_schema else None,
+                        )
+                    )
+        except (ValueError, EOFError) as e:
+            logger.error(f"Error decoding Avro file {filepath}: {e}")
+            raise ValueError(f"Error decoding Avro file {filepath}: {e}") from e
+
+    columns: Dict[str, Any] = {
+        "client": np.empty(0, dtype=object),
+        "product": np.empty(0, dtype=object),
+        "price": np.empty(0, dtype=np.float64),
+        "purchase_hour": np.empty(0, dtype="datetime64[h]"),
+    }
+    if blocks:
+        columns = {
+            name: np.concatenate([block[name] for block in blocks]) for name in columns
+        }
+    columns["files"] = len(filepaths)
+
+    logger.info(f"Loaded {len(columns['client'])} records from {len(filepaths)} files.")
+    return columns
@@ -0,0 +1,76 @@
+import logging
+import os
+from typing import Any, Dict, List
+
+import fastavro
+
+
+# Get a logger specific to this module
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def build_aggregate_schema(name: str, key_field: str) -> Dict[str, Any]:
+    """
+    Builds the AVRO schema of an aggregate keyed by a single string field.
+
+    Args:
+        name (str): Record name of the schema
+        key_field (str): Name of the grouping key
+
+    Returns:
+        Dict[str, Any]: The AVRO schema
+    """
+    return {
+        "type": "record",
+        "name": name,
+        "namespace": "lec02.hw.job3.avro",
+        "fields": [
+            {"name": key_field, "type": ["string", "null"]},
+            {"name": "revenue", "type": "double"},
+            {"name": "sales", "type": "long"},
+            {"name": "priced_sales", "type": "long"},
+            {"name": "avg_price", "type": ["double", "null"]},
+        ],
+    }
+
+
+# Schemas of the aggregates written by Job3
+PRODUCT_SALES_AVRO_SCHEMA: Dict[str, Any] = build_aggregate_schema(
+    "ProductSales", "product"
+)
+CLIENT_SALES_AVRO_SCHEMA: Dict[str, Any] = build_aggregate_schema(
+    "ClientSales", "client"
+)
+HOURLY_SALES_AVRO_SCHEMA: Dict[str, Any] = build_aggregate_schema("HourlySales", "hour")
+
+
+def write_aggregate_file(
+    records: List[Dict[str, Any]], schema: Dict[str, Any], filepath: str
+) -> None:
+    """
+    Writes aggregate records to an AVRO file, creating its directory if needed.
+
+    Args:
+        records (List[Dict[str, Any]]): Aggregate records
+        schema (Dict[str, Any]): AVRO schema of the records
+        filepath (str): Path of the AVRO file to create
+
+    Raises:
+        IOError: If there are I/O errors while writing the file
+        Exception: For any other unexpected errors
+    """
+    logger.debug("Writing %d aggregate records to %s...", len(records), filepath)
+
+    try:
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(filepath, "wb") as f:
+            fastavro.writer(f, schema, records)
+
+        logger.debug("%d aggregate records written to %s.", len(records), filepath)
+
+    except IOError as e:
+        logger.error(f"Error saving aggregate file {filepath}: {e}", exc_info=True)
+        raise IOError(f"Error saving aggregate file {filepath}: {e}") from e
+    except Exception as e:
+        logger.exception(f"An unexpected error occurred: {e}")
+        raise Exception(f"An unexpected error occurred: {e}") from e
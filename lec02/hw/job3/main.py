@@ -0,0 +1,81 @@
+# Import necessary modules
+import logging
+from typing import Any, Dict, Tuple
+from flask import Flask, request
+from dotenv import load_dotenv
+from lec02.hw.common.logging_setup import configure_logging
+from lec02.hw.common.serving import serve
+from lec02.hw.job3.bll.aggregate_sales import aggregate_sales_data
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Configure logging to output to the console (stdout/stderr), see LOG_* variables
+configure_logging()
+
+# Get a logger specific to this module
+logger = logging.getLogger(__name__)
+
+# Initialize Flask application
+app = Flask(__name__)
+
+
+# Define endpoint that accepts POST requests at root URL
+@app.route("/", methods=["POST"])
+def run_job3_endpoint() -> Tuple[Dict[str, Any], int]:
+    """
+    Process POST request to run sales data aggregation job.
+
+    Returns:
+        Tuple containing response dict and HTTP status code
+    """
+    # Log receipt of request
+    logger.info("Received request to run job.")
+
+    # Get JSON data from request
+    input_data = request.get_json()
+
+    # Validate input data exists
+    if not input_data:
+        logger.error("No input data received.")
+        return {"error": "No input data received."}, 400
+
+    # Extract required parameters
+    stg_dir = input_data.get("stg_dir")
+    result_dir = input_data.get("result_dir")
+
+    # Validate stg_dir parameter
+    if not stg_dir:
+        logger.error("Missing 'stg_dir' parameter in input data.")
+        return {"error": "Missing 'stg_dir' parameter in input data."}, 400
+
+    # Validate result_dir parameter
+    if not result_dir:
+        logger.error("Missing 'result_dir' parameter in input data.")
+        return {"error": "Missing 'result_dir' parameter in input data."}, 400
+
+    # Log job execution details
+    logger.info(f"Running job for stg_dir {stg_dir} and result_dir {result_dir}.")
+
+    try:
+        # Execute job to aggregate sales data
+        report = aggregate_sales_data(stg_dir=stg_dir, result_dir=result_dir)
+        logger.info(">>> Job completed successfully.")
+        return {"message": "Job completed successfully.", "report": report}, 201
+
+    # Handle expected errors
+    except (FileNotFoundError, ValueError, OSError, IOError, TypeError) as e:
+        logger.error(f"An error occurred while running job: {e}", exc_info=True)
+        return {"error": f"An error occurred while running job: {e}"}, 500
+
+    # Handle unexpected errors
+    except Exception as e:
+        logger.exception(f"An unexpected error occurred: {e}", exc_info=True)
+        return {"error": f"An unexpected error occurred: {e}"}, 500
+
+
+# Main function to start the Flask server and run the application
+if __name__ == "__main__":
+    logger.info("Flask server startup for Job 3...")
+    # Serve on gunicorn or waitress if installed, see JOB_SERVER
+    serve(app, port=8083)
@@ -0,0 +1,141 @@
+import math
+from unittest import mock
+
+import fastavro
+import numpy as np
+
+from lec02.hw.job2.dal.file_io import SALES_AVRO_SCHEMA
+from lec02.hw.job3.bll.aggregate_sales import (
+    aggregate_sales_columns,
+    aggregate_sales_data,
+    factorize,
+    grouped_totals,
+)
+
+
+def test_factorize():
+    """Test factorize function encodes values in order of first appearance."""
+
+    # Call function under test
+    codes, uniques = factorize(["TV", "PC", "TV", None])
+
+    # Assert codes and distinct values
+    assert codes.tolist() == [0, 1, 0, 2]
+    assert uniques == ["TV", "PC", None]
+
+
+def test_factorize_hash_collision():
+    """Test factorize function groups colliding values by value."""
+
+    # Setup every value hashing to the same code
+    with mock.patch("builtins.hash", return_value=7):
+        # Call function under test
+        codes, uniques = factorize(["TV", "PC", "TV", None])
+
+    # Assert codes and distinct values
+    assert codes.tolist() == [0, 1, 0, 2]
+    assert uniques == ["TV", "PC", None]
+
+
+def test_grouped_totals():
+    """Test grouped_totals function ignores missing prices in revenue and average."""
+
+    # Setup test columns
+    codes = np.array([0, 1, 0, 1, 2])
+    prices = np.array([10.0, 5.0, 20.0, np.nan, np.nan])
+
+    # Call function under test
+    totals = grouped_totals(codes, 3, prices)
+
+    # Assert grouped reductions
+    assert totals["revenue"].tolist() == [30.0, 5.0, 0.0]
+    assert totals["sales"].tolist() == [2, 2, 1]
+    assert totals["priced_sales"].tolist() == [2, 1, 0]
+    assert totals["avg_price"][:2].tolist() == [15.0, 5.0]
+    assert math.isnan(totals["avg_price"][2])
+
+
+def test_aggregate_sales_columns():
+    """Test aggregate_sales_columns function per product, client and hour."""
+
+    # Setup test columns
+    columns = {
+        "client": ["A", "B", "A"],
+        "product": ["TV", "TV", "PC"],
+        "price": np.array([100.0, 300.0, 50.0]),
+        "purchase_hour": np.array(
+            ["2022-08-09T10", "2022-08-09T10", "NaT"], dtype="datetime64[h]"
+        ),
+    }
+
+    # Call function under test
+    results = aggregate_sales_columns(columns)
+
+    # Assert aggregates are sorted by revenue, hours by time
+    assert results["product"] == [
+        {
+            "product": "TV",
+            "revenue": 400.0,
+            "sales": 2,
+            "priced_sales": 2,
+            "avg_price": 200.0,
+        },
+        {
+            "product": "PC",
+            "revenue": 50.0,
+            "sales": 1,
+            "priced_sales": 1,
+            "avg_price": 50.0,
+        },
+    ]
+    assert [record["client"] for record in results["client"]] == ["B", "A"]
+    assert results["hour"] == [
+        {
+            "hour": "2022-08-09T10",
+            "revenue": 400.0,
+            "sales": 2,
+            "priced_sales": 2,
+            "avg_price": 200.0,
+        }
+    ]
+
+
+def test_aggregate_sales_data(tmp_path):
+    """Test aggregate_sales_data reads staging files and writes aggregate files."""
+
+    # Setup staging file written with the default schema
+    stg_dir = tmp_path / "stg"
+    stg_dir.mkdir()
+    with open(stg_dir / "sales_1.avro", "wb") as f:
+        fastavro.writer(
+            f,
+            SALES_AVRO_SCHEMA,
+            [
+                {
+                    "client": "A",
+                    "purchase_date": "2022-08-09",
+                    "product": "TV",
+                    "price": 10,
+                },
+                {
+                    "client": "B",
+                    "purchase_date": "2022-08-09",
+                    "product": "TV",
+                    "price": 2.5,
+                },
+            ],
+        )
+
+    # Call function under test
+    report = aggregate_sales_data(str(stg_dir), str(tmp_path / "result"))
+
+    # Assert report and written aggregates
+    assert report == {
+        "files_read": 1,
+        "records_aggregated": 2,
+        "products": 1,
+        "clients": 2,
+        "hours": 1,
+    }
+    with open(tmp_path / "result" / "sales_by_product.avro", "rb") as f:
+        assert list(fastavro.reader(f))[0]["revenue"] == 12.5
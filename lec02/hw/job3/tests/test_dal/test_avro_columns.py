@@ -0,0 +1,110 @@
+import math
+import fastavro
+import pytest
+
+from lec02.hw.job2.bll.dictionary_encoding import DictionaryEncoder
+from lec02.hw.job2.bll.normalize_sales import normalize_sales_records
+from lec02.hw.job2.dal.dimensions import build_fact_schema, save_dimension
+from lec02.hw.job2.dal.file_io import SALES_AVRO_SCHEMA, build_typed_sales_schema
+from lec02.hw.job3.dal.avro_columns import find_avro_files, load_sales_columns
+
+
+RECORDS = [
+    {"client": "A", "purchase_date": "2022-08-09", "product": "TV", "price": 19.99},
+    {"client": None, "purchase_date": "2022-08-10", "product": "PC", "price": None},
+]
+
+
+def test_find_avro_files(tmp_path):
+    """Test find_avro_files function lists files of partition directories."""
+
+    # Setup staging directory with a partition and a sidecar index
+    (tmp_path / "product=TV").mkdir()
+    (tmp_path / "product=TV" / "sales_1.avro").write_bytes(b"")
+    (tmp_path / "product=TV" / "sales_1.avro.index.json").write_text("{}")
+    (tmp_path / "sales_2.avro").write_bytes(b"")
+    (tmp_path / "_dimensions").mkdir()
+    (tmp_path / "_dimensions" / "client.avro").write_bytes(b"")
+
+    # Call function under test
+    result = find_avro_files(str(tmp_path))
+
+    # Assert only AVRO files are listed
+    assert result == [
+        str(tmp_path / "product=TV" / "sales_1.avro"),
+        str(tmp_path / "sales_2.avro"),
+    ]
+
+
+def test_find_avro_files_missing_dir(tmp_path):
+    """Test find_avro_files function behavior when stg_dir does not exist."""
+
+    # Test that the function raises FileNotFoundError
+    with pytest.raises(FileNotFoundError):
+        find_avro_files(str(tmp_path / "missing"))
+
+
+def test_load_sales_columns_mixed_schemas(tmp_path):
+    """Test load_sales_columns reads default and typed cents files into columns."""
+
+    # Setup one file per schema variant
+    with open(tmp_path / "sales_1.avro", "wb") as f:
+        fastavro.writer(f, SALES_AVRO_SCHEMA, RECORDS)
+    with open(tmp_path / "sales_2.avro", "wb") as f:
+        fastavro.writer(
+            f,
+            build_typed_sales_schema("cents"),
+            normalize_sales_records(RECORDS[:1], "cents"),
+        )
+
+    # Call function under test
+    columns = load_sales_columns(str(tmp_path))
+
+    # Assert columns with prices in currency units
+    assert columns["files"] == 2
+    assert columns["client"].tolist() == ["A", None, "A"]
+    assert columns["price"][0] == pytest.approx(19.99)
+    assert math.isnan(columns["price"][1])
+    assert columns["price"][2] == pytest.approx(19.99)
+    assert [str(hour) for hour in columns["purchase_hour"]] == [
+        "2022-08-09T00",
+        "2022-08-10T00",
+        "2022-08-09T00",
+    ]
+
+
+def test_load_sales_columns_dimensions(tmp_path):
+    """Test load_sales_columns joins surrogate keys with the dimension files."""
+
+    # Setup fact file and dimensions written the way Job2 does
+    encoder = DictionaryEncoder({"client": [], "product": []})
+    with open(tmp_path / "sales_1.avro", "wb") as f:
+        fastavro.writer(
+            f, build_fact_schema(SALES_AVRO_SCHEMA), encoder.encode_records(RECORDS)
+        )
+    for field in ("client", "product"):
+        save_dimension(str(tmp_path), field, encoder.values[field])
+
+    # Call function under test
+    columns = load_sales_columns(str(tmp_path))
+
+    # Assert dimension values are restored
+    assert columns["files"] == 1
+    assert columns["client"].tolist() == ["A", None]
+    assert columns["product"].tolist() == ["TV", "PC"]
+
+
+def test_load_sales_columns_missing_dimension(tmp_path):
+    """Test load_sales_columns raises ValueError when a dimension file is missing."""
+
+    # Setup fact file without dimensions
+    with open(tmp_path / "sales_1.avro", "wb") as f:
+        fastavro.writer(
+            f,
+            build_fact_schema(SALES_AVRO_SCHEMA),
+            DictionaryEncoder({}).encode_records(RECORDS),
+        )
+
+    # Test that the function raises ValueError
+    with pytest.raises(ValueError, match="Error reading dimension file"):
+        load_sales_columns(str(tmp_path))
@@ -0,0 +1,81 @@
+from unittest import mock
+import pytest
+import json
+
+from lec02.hw.job3.main import app
+
+
+@pytest.fixture
+def client():
+    """Fixture to create a test client for the Flask application."""
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+@mock.patch("lec02.hw.job3.main.aggregate_sales_data")
+def test_run_job3_endpoint_success(mock_aggregate_sales_data, client):
+    """Test run_job3_endpoint function behavior with valid input data."""
+
+    # Setup test parameters
+    test_input = {"stg_dir": "test/stg/dir", "result_dir": "test/result/dir"}
+    test_report = {"records_aggregated": 3}
+    mock_aggregate_sales_data.return_value = test_report
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and content
+    assert response.status_code == 201
+    response_data = json.loads(response.data)
+    assert response_data["message"] == "Job completed successfully."
+    assert response_data["report"] == test_report
+
+    # Assert aggregate_sales_data was called with correct parameters
+    mock_aggregate_sales_data.assert_called_once_with(
+        stg_dir="test/stg/dir", result_dir="test/result/dir"
+    )
+
+
+@pytest.mark.parametrize(
+    "test_input, error",
+    [
+        ({}, "No input data received."),
+        ({"result_dir": "r"}, "Missing 'stg_dir' parameter in input data."),
+        ({"stg_dir": "s"}, "Missing 'result_dir' parameter in input data."),
+    ],
+)
+def test_run_job3_endpoint_invalid_input(client, test_input, error):
+    """Test run_job3_endpoint function behavior with missing parameters."""
+
+    # Call endpoint with test data
+    response = client.post(
+        "/", data=json.dumps(test_input), content_type="application/json"
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"] == error
+
+
+@mock.patch("lec02.hw.job3.main.aggregate_sales_data")
+def test_run_job3_endpoint_file_not_found_error(mock_aggregate_sales_data, client):
+    """Test run_job3_endpoint function behavior when stg_dir does not exist."""
+
+    # Configure mock behavior
+    mock_aggregate_sales_data.side_effect = FileNotFoundError("No such directory")
+
+    # Call endpoint with test data
+    response = client.post(
+        "/",
+        data=json.dumps({"stg_dir": "s", "result_dir": "r"}),
+        content_type="application/json",
+    )
+
+    # Assert response status code and error message
+    assert response.status_code == 500
+    assert json.loads(response.data)["error"] == (
+        "An error occurred while running job: No such directory"
+    )